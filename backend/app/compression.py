@@ -0,0 +1,89 @@
+"""Compresión de respuestas (brotli/gzip) según Accept-Encoding.
+
+Se aplica en un after_request a las respuestas de texto (JSON, HTML, CSV, JS)
+que superan COMPRESS_MIN_BYTES. Las respuestas en streaming o con
+direct_passthrough (send_file, exports) se dejan como están: ya van en bloques
+y en su mayoría son formatos comprimidos (xlsx, parquet, pdf, zip).
+"""
+import gzip
+import os
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo gzip
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))  # Buen balance velocidad/tamaño para respuestas dinámicas
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/javascript',
+    'image/svg+xml',
+}
+
+
+def elegir_encoding(accept_encodings) -> str:
+    """'br', 'gzip' o '' según lo que acepta el cliente (brotli solo si está instalado)."""
+    if brotli is not None and accept_encodings['br'] > 0:
+        return 'br'
+    if accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return ''
+
+
+def comprimir(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def _agregar_vary(response: Response) -> None:
+    if 'Accept-Encoding' not in response.vary:
+        response.vary.add('Accept-Encoding')
+
+
+def _comprimir_respuesta(response: Response) -> Response:
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or request.method == 'HEAD'
+    ):
+        return response
+
+    _agregar_vary(response)
+    if response.content_length is not None and response.content_length < COMPRESS_MIN_BYTES:
+        return response
+
+    encoding = elegir_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(comprimir(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # El ETag identifica la representación: la comprimida es otra
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Registra la compresión de respuestas en la app."""
+    app.after_request(_comprimir_respuesta)
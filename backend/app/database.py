@@ -3,5 +3,6 @@ from db.connection import (
     get_db_connection,
     execute_query,
     execute_query_single,
+    iter_query_chunks,
     execute_update,
 )
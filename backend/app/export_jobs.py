@@ -0,0 +1,301 @@
+"""Cola de exportaciones en segundo plano (Excel/PDF pesados).
+
+POST crea un job, un pool de procesos lo renderiza llamando al endpoint
+síncrono original y el GET consulta el progreso. El estado de cada job y el
+archivo resultante viven en disco (EXPORT_JOBS_DIR), así cualquier worker de
+gunicorn puede responder el polling y la descarga.
+
+El id del job es el hash de (tipo, parámetros, versión de datos): pedir el
+mismo export dos veces devuelve el mismo job, y si ya terminó se sirve el
+archivo cacheado sin volver a renderizar.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import execute_query_single
+from .metrics import registrar_cache
+
+EXPORT_JOBS_DIR = Path(os.getenv('EXPORT_JOBS_DIR', Path(tempfile.gettempdir()) / 'dcp_export_jobs'))
+EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '2'))
+EXPORT_CACHE_TTL_SEGUNDOS = int(os.getenv('EXPORT_CACHE_TTL', str(24 * 3600)))
+# Un job 'pendiente'/'ejecutando' sin cambios por más que esto se considera huérfano
+# (p. ej. el worker de gunicorn que lo lanzó se reinició) y se vuelve a encolar
+EXPORT_JOB_TIMEOUT_SEGUNDOS = 15 * 60
+DATA_VERSION_TTL_SEGUNDOS = 30
+CHUNK_SIZE = 64 * 1024
+
+# tipo -> (método, path del endpoint síncrono, extensión, mimetype)
+EXPORT_TIPOS = {
+    'variaciones': ('GET', '/api/variations/export', 'xlsx',
+                    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'dcp_indices': ('GET', '/api/dcp/indices/export', 'xlsx',
+                    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'datos': ('GET', '/api/export/download', None, None),  # xlsx/csv/parquet/arrow según 'format'
+    'licitacion_pdf': ('POST', '/api/licitaciones-lrm/generate-pdf', 'pdf', 'application/pdf'),
+    'licitaciones_lote': ('POST', '/api/licitaciones-lrm/generate-pdf/batch', None, None),  # zip o pdf según 'formato'
+}
+
+ESTADOS_ACTIVOS = ('pendiente', 'ejecutando')
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_en_worker = False  # True dentro de los procesos del pool
+_version_cache = {'valor': None, 'ts': 0.0}
+_version_lock = threading.Lock()
+
+
+# --- Almacenamiento -------------------------------------------------------
+
+def _job_path(job_id: str) -> Path:
+    return EXPORT_JOBS_DIR / f'{job_id}.json'
+
+
+def _resultado_path(job_id: str) -> Path:
+    return EXPORT_JOBS_DIR / f'{job_id}.bin'
+
+
+def leer_job(job_id: str) -> Optional[Dict]:
+    """Estado del job o None si no existe."""
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_job_path(job_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar_job(job: Dict) -> None:
+    """Escritura atómica (tmp + replace) para que el polling nunca lea un JSON a medias."""
+    EXPORT_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    job['actualizado'] = datetime.now().isoformat()
+    tmp = _job_path(job['id']).with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp, _job_path(job['id']))
+
+
+def _actualizar_job(job_id: str, **cambios) -> None:
+    job = leer_job(job_id) or {'id': job_id}
+    job.update(cambios)
+    _guardar_job(job)
+
+
+def resultado_job(job: Dict) -> Optional[Path]:
+    """Ruta del archivo generado si el job terminó y el archivo sigue en disco."""
+    if job.get('estado') != 'completado':
+        return None
+    path = _resultado_path(job['id'])
+    return path if path.exists() else None
+
+
+def limpiar_expirados() -> int:
+    """Borra jobs y archivos más viejos que EXPORT_CACHE_TTL. Devuelve cuántos borró."""
+    if not EXPORT_JOBS_DIR.exists():
+        return 0
+    limite = time.time() - EXPORT_CACHE_TTL_SEGUNDOS
+    borrados = 0
+    for path in EXPORT_JOBS_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < limite:
+                path.unlink()
+                borrados += 1
+        except OSError:
+            pass
+    return borrados
+
+
+# --- Versión de datos y clave de cache -------------------------------------
+
+def data_version() -> str:
+    """
+    Versión de maestro_precios: cambia con cualquier insert/update/delete.
+
+    Usa los contadores de pg_stat_user_tables más el último id (consultas
+    baratas, sin recorrer la tabla). Se cachea unos segundos.
+    """
+    with _version_lock:
+        if _version_cache['valor'] is not None and time.time() - _version_cache['ts'] < DATA_VERSION_TTL_SEGUNDOS:
+            registrar_cache('data_version', True)
+            return _version_cache['valor']
+    registrar_cache('data_version', False)
+    row = execute_query_single("""
+        SELECT
+            (SELECT COALESCE(MAX(id), 0) FROM maestro_precios) AS max_id,
+            COALESCE((
+                SELECT n_tup_ins + n_tup_upd + n_tup_del
+                FROM pg_stat_user_tables
+                WHERE relname = 'maestro_precios'
+            ), 0) AS cambios
+    """)
+    valor = f"{row['max_id']}-{row['cambios']}" if row else '0-0'
+    with _version_lock:
+        _version_cache['valor'] = valor
+        _version_cache['ts'] = time.time()
+    return valor
+
+
+def _params_canonicos(params: Any) -> Any:
+    """Parámetros en forma estable para hashear (listas ordenadas por clave)."""
+    if isinstance(params, dict):
+        return {k: _params_canonicos(params[k]) for k in sorted(params)}
+    if isinstance(params, (list, tuple)):
+        return [_params_canonicos(p) for p in params]
+    return params
+
+
+def clave_job(tipo: str, params: Any, version: str) -> str:
+    payload = json.dumps([tipo, _params_canonicos(params), version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+# --- Ejecución -------------------------------------------------------------
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool de procesos perezoso para renderizado pesado (jobs de export, lotes de PDFs).
+    'spawn' evita forkear un worker de gunicorn con threads.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def en_worker_de_export() -> bool:
+    """True si el código corre dentro de un proceso del pool (no abrir otro pool anidado)."""
+    return _en_worker
+
+
+def _render_job(job_id: str, tipo: str, params: Any) -> None:
+    """
+    Corre en el proceso del pool: llama al endpoint síncrono con el test client
+    de Flask y escribe la respuesta en disco.
+    """
+    global _en_worker
+    _en_worker = True
+    metodo, path, extension, mimetype = EXPORT_TIPOS[tipo]
+    _actualizar_job(job_id, estado='ejecutando', progreso=10, iniciado=datetime.now().isoformat())
+    try:
+        from werkzeug.datastructures import MultiDict
+        from app.main import app  # Import en el proceso hijo (una vez por proceso)
+
+        client = app.test_client()
+        if metodo == 'POST':
+            response = client.post(path, json=params)
+        else:
+            response = client.get(path, query_string=MultiDict([tuple(p) for p in params]))
+        _actualizar_job(job_id, progreso=50)
+
+        if response.status_code != 200:
+            cuerpo = response.get_data(as_text=True)[:2000]
+            response.close()
+            raise RuntimeError(f'{path} respondió {response.status_code}: {cuerpo}')
+
+        destino = _resultado_path(job_id)
+        tmp = destino.with_suffix(f'.{os.getpid()}.part')
+        with open(tmp, 'wb') as f:
+            for chunk in response.iter_encoded():
+                f.write(chunk)
+        response.close()
+        os.replace(tmp, destino)
+
+        filename = None
+        disposition = response.headers.get('Content-Disposition', '')
+        if 'filename=' in disposition:
+            filename = disposition.split('filename=', 1)[1].strip('"; ')
+        _actualizar_job(
+            job_id,
+            estado='completado',
+            progreso=100,
+            completado=datetime.now().isoformat(),
+            filename=filename or f'export_{job_id}.{extension or "bin"}',
+            mimetype=mimetype or response.mimetype,
+            tamano=destino.stat().st_size,
+        )
+    except Exception as e:
+        print(f"[ERROR] export job {job_id} ({tipo}): {str(e)}")
+        traceback.print_exc()
+        _actualizar_job(job_id, estado='error', error=str(e), completado=datetime.now().isoformat())
+
+
+def _job_vigente(job: Optional[Dict]) -> bool:
+    """True si el job sirve: terminado con archivo en disco o todavía en curso (no huérfano)."""
+    if not job:
+        return False
+    if job.get('estado') == 'completado':
+        return resultado_job(job) is not None
+    if job.get('estado') in ESTADOS_ACTIVOS:
+        try:
+            actualizado = datetime.fromisoformat(job['actualizado'])
+        except (KeyError, ValueError):
+            return False
+        return (datetime.now() - actualizado).total_seconds() < EXPORT_JOB_TIMEOUT_SEGUNDOS
+    return False
+
+
+def crear_job(tipo: str, params: Any) -> Tuple[Dict, bool]:
+    """
+    Encola un export (o reutiliza el existente con los mismos parámetros y versión de datos).
+
+    Returns: (job, reutilizado)
+    """
+    if tipo not in EXPORT_TIPOS:
+        raise ValueError(f"Tipo de export desconocido: {tipo}. Opciones: {', '.join(EXPORT_TIPOS)}")
+
+    job_id = clave_job(tipo, params, data_version())
+    existente = leer_job(job_id)
+    vigente = _job_vigente(existente)
+    registrar_cache('export_jobs', vigente)
+    if vigente:
+        return existente, True
+
+    limpiar_expirados()
+    job = {
+        'id': job_id,
+        'tipo': tipo,
+        'params': params,
+        'estado': 'pendiente',
+        'progreso': 0,
+        'error': None,
+        'creado': datetime.now().isoformat(),
+        'iniciado': None,
+        'completado': None,
+        'filename': None,
+        'mimetype': None,
+        'tamano': None,
+    }
+    _guardar_job(job)
+    get_process_pool().submit(_render_job, job_id, tipo, params)
+    return job, False
+
+
+def params_desde_query(args) -> List[List[str]]:
+    """MultiDict de request.args -> [[clave, valor], ...] (conserva claves repetidas como product_ids[])."""
+    return [[k, v] for k, v in args.items(multi=True)]
+
+
+def jobs_en_cola() -> int:
+    """Cantidad de jobs pendientes o en ejecución (según los archivos de estado)."""
+    if not EXPORT_JOBS_DIR.exists():
+        return 0
+    total = 0
+    for path in EXPORT_JOBS_DIR.glob('*.json'):
+        job = leer_job(path.stem)
+        if job and job.get('estado') in ESTADOS_ACTIVOS:
+            total += 1
+    return total
@@ -0,0 +1,67 @@
+"""Imports diferidos de dependencias pesadas (pandas, numpy, openpyxl, reportlab, matplotlib).
+
+`np = lazy_import('numpy')` devuelve un proxy que importa el módulo real en el
+primer acceso a un atributo: los routers se cargan rápido y cada worker de
+gunicorn solo paga pandas/numpy/etc. cuando un endpoint los usa.
+
+Con DCP_EAGER_IMPORTS=1 (útil con `gunicorn --preload`, para que los workers
+compartan las páginas del módulo ya importado) create_app llama a precargar().
+"""
+import importlib
+import os
+import time
+from typing import Dict, List
+
+# Módulos pesados que usa la app, en el orden en que conviene precargarlos
+HEAVY_MODULES = [
+    'numpy',
+    'pandas',
+    'openpyxl',
+    'pyarrow',
+    'reportlab.platypus',
+    'matplotlib.figure',
+    'app.routers.007_licitaciones_lrm.pdf_generator',
+]
+
+
+class LazyModule:
+    """Proxy de un módulo que se importa en el primer acceso a un atributo."""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        estado = 'cargado' if self.__dict__['_module'] is not None else 'sin cargar'
+        return f"<LazyModule {self.__dict__['_name']} ({estado})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def eager_imports_enabled() -> bool:
+    return os.getenv('DCP_EAGER_IMPORTS', '0') == '1'
+
+
+def precargar(modulos: List[str] = None) -> Dict[str, float]:
+    """Importa los módulos pesados ya instalados. Devuelve segundos por módulo (los faltantes se omiten)."""
+    tiempos = {}
+    for nombre in modulos or HEAVY_MODULES:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nombre)
+        except ImportError:
+            continue
+        tiempos[nombre] = time.perf_counter() - inicio
+    return tiempos
@@ -8,32 +8,30 @@ _project_root = Path(__file__).resolve().parent.parent.parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
-from flask import Flask, send_from_directory, send_file, request, jsonify, session
+from flask import Flask, request, jsonify, session
 from flask_cors import CORS
-from pathlib import Path
-from .routers import ticker, prices, dcp, cotizaciones, inflacion_dolares, yield_curve, data_export, licitaciones_lrm, update, politica_monetaria, inflacion_implicita
+from .compression import init_compression
+from .lazy import eager_imports_enabled, precargar
+from .metrics import init_metrics
+from .profiling import init_profiling
+from .query_stats import init_query_stats
+from .serialization import FastJSONProvider
+from .static_assets import StaticManifest
+from .routers import register_blueprints
 
-# Create Flask app
 static_folder = Path(__file__).parent / 'static'
-app = Flask(__name__, static_folder=str(static_folder), static_url_path='/static')
-app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 
 # Configure CORS (supports_credentials requiere orígenes explícitos, no "*")
 _ports = [5000, 8000, 3000]
 _cors_origins = [f"http://localhost:{p}" for p in _ports] + [f"http://127.0.0.1:{p}" for p in _ports]
 # Permitir acceso desde IP local (172.20.10.14 en tu red)
 _cors_origins.extend([f"http://172.20.10.14:{p}" for p in _ports])
-CORS(app, resources={
-    r"/api/*": {
-        "origins": _cors_origins,
-        "supports_credentials": True,
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-    },
-    r"/*": {"origins": "*"},
-})
-
-# Rutas de auth ANTES de blueprints (prioridad máxima)
+
+
+def _is_production():
+    return bool(os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('AZURE_ENVIRONMENT'))
+
+
 def _is_admin_authenticated():
     """Verifica sesión o token Bearer (evita dependencia de cookies)."""
     if session.get('admin_logged_in'):
@@ -45,10 +43,15 @@ def _is_admin_authenticated():
         return admin_tokens.has_token(token)
     return False
 
-try:
-    import uuid
-    from . import admin_tokens
-    from .middleware import admin_only, ADMIN_USER, ADMIN_PASS
+
+def _register_admin_auth(app):
+    """Rutas de auth ANTES de blueprints (prioridad máxima)."""
+    try:
+        import uuid
+        from . import admin_tokens
+        from .middleware import admin_only, ADMIN_USER, ADMIN_PASS
+    except ImportError:
+        return
 
     @app.route('/api/admin/ping', methods=['GET'], strict_slashes=False)
     def admin_ping():
@@ -89,82 +92,129 @@ try:
         if auth.startswith('Bearer '):
             admin_tokens.remove_token(auth[7:].strip())
         return jsonify({'success': True})
-except ImportError:
-    pass
-
-# Register blueprints
-app.register_blueprint(ticker.ticker, url_prefix='')
-app.register_blueprint(data_export, url_prefix='/api')
-app.register_blueprint(prices.bp, url_prefix='/api')
-app.register_blueprint(dcp.bp, url_prefix='/api')
-app.register_blueprint(cotizaciones.bp, url_prefix='/api')
-app.register_blueprint(inflacion_dolares.bp, url_prefix='/api')
-app.register_blueprint(yield_curve.bp, url_prefix='/api')
-app.register_blueprint(licitaciones_lrm.bp, url_prefix='/api')
-app.register_blueprint(politica_monetaria.bp, url_prefix='/api')
-app.register_blueprint(inflacion_implicita.bp, url_prefix='/api')
-app.register_blueprint(update.bp, url_prefix='/api')
-
-# Register admin blueprint only if not in production (Azure/Railway)
-if not (os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('AZURE_ENVIRONMENT')):
-    try:
-        from .routers.admin import bp as admin_bp
-        app.register_blueprint(admin_bp)
-    except ImportError:
-        pass
-
-# Serve admin panel (must be before catch-all route)
-@app.route('/admin')
-@app.route('/admin/<path:path>')
-def serve_admin(path=''):
-    """Serve admin panel frontend (only available locally)."""
-    if os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('AZURE_ENVIRONMENT'):
-        return {"error": "Admin panel not available in production"}, 404
-    
-    # If it's a request for a static file, serve it
-    if path and path != '':
-        static_file = static_folder / 'admin' / path
-        if static_file.exists() and static_file.is_file():
-            return send_file(static_file)
-    
-    # Otherwise, serve index.html
-    admin_index = static_folder / 'admin' / 'index.html'
-    if admin_index.exists():
-        return send_file(admin_index)
-    return {"error": "Admin panel not found"}, 404
-
-# Serve static files
-@app.route('/')
-def index():
-    """Serve the main HTML file."""
-    index_path = static_folder / 'index.html'
-    if index_path.exists():
-        return send_file(index_path)
-    return {"error": "Frontend not built. Please run build script."}, 404
-
-# Catch-all route for React Router (SPA routing)
-# This should only catch routes that haven't been matched by blueprints
-# Flask will only reach here if no blueprint route matched
-@app.route('/<path:path>')
-def serve_spa(path):
-    """Serve index.html for all non-API routes (React Router)."""
-    # Don't interfere with API routes or admin routes - these should be handled by blueprints
-    # If we reach here for api/ or admin/, it means the route doesn't exist
-    if path.startswith('api/') or path.startswith('admin/'):
-        return {"error": "Not found"}, 404
-    
-    # Check if it's a static file request
-    static_file = static_folder / path
-    if static_file.exists() and static_file.is_file():
-        return send_file(static_file)
-    
-    # Otherwise, serve index.html for React Router
-    index_path = static_folder / 'index.html'
-    if index_path.exists():
-        return send_file(index_path)
-    return {"error": "Frontend not built. Please run build script."}, 404
-
-@app.route('/health')
-def health_check():
-    """Health check endpoint."""
-    return {"status": "ok"}
+
+
+def _register_frontend(app, static_manifest):
+    """Rutas del frontend (SPA, panel admin y /static) servidas desde el manifest."""
+
+    def serve_static(filename):
+        """Reemplaza la vista /static/<path> de Flask: sirve desde el manifest."""
+        response = static_manifest.response(filename)
+        if response is None:
+            return {"error": "Not found"}, 404
+        return response
+
+    app.view_functions['static'] = serve_static
+
+    # Serve admin panel (must be before catch-all route)
+    @app.route('/admin')
+    @app.route('/admin/<path:path>')
+    def serve_admin(path=''):
+        """Serve admin panel frontend (only available locally)."""
+        if _is_production():
+            return {"error": "Admin panel not available in production"}, 404
+
+        # If it's a request for a static file, serve it
+        if path and path != '':
+            response = static_manifest.response(f'admin/{path}')
+            if response is not None:
+                return response
+
+        # Otherwise, serve index.html
+        response = static_manifest.response('admin/index.html')
+        if response is not None:
+            return response
+        return {"error": "Admin panel not found"}, 404
+
+    # Serve static files
+    @app.route('/')
+    def index():
+        """Serve the main HTML file."""
+        response = static_manifest.response('index.html')
+        if response is not None:
+            return response
+        return {"error": "Frontend not built. Please run build script."}, 404
+
+    # Catch-all route for React Router (SPA routing)
+    # This should only catch routes that haven't been matched by blueprints
+    # Flask will only reach here if no blueprint route matched
+    @app.route('/<path:path>')
+    def serve_spa(path):
+        """Serve index.html for all non-API routes (React Router)."""
+        # Don't interfere with API routes or admin routes - these should be handled by blueprints
+        # If we reach here for api/ or admin/, it means the route doesn't exist
+        if path.startswith('api/') or path.startswith('admin/'):
+            return {"error": "Not found"}, 404
+
+        # Check if it's a static file request
+        response = static_manifest.response(path)
+        if response is not None:
+            return response
+
+        # Otherwise, serve index.html for React Router
+        response = static_manifest.response('index.html')
+        if response is not None:
+            return response
+        return {"error": "Frontend not built. Please run build script."}, 404
+
+    @app.route('/health')
+    def health_check():
+        """Health check endpoint."""
+        return {"status": "ok"}
+
+
+def create_app():
+    """
+    Crea y configura la app.
+
+    Las dependencias pesadas (pandas, numpy, openpyxl, reportlab, matplotlib) se
+    importan en el primer uso; con DCP_EAGER_IMPORTS=1 se precargan acá (para
+    `gunicorn --preload`).
+    """
+    app = Flask(__name__, static_folder=str(static_folder), static_url_path='/static')
+    app.secret_key = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.json = FastJSONProvider(app)
+    init_metrics(app)  # Antes de la compresión: mide el tamaño comprimido
+    init_compression(app)
+    init_query_stats(app)
+
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": _cors_origins,
+            "supports_credentials": True,
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+        },
+        r"/*": {"origins": "*"},
+    })
+    # Los after_request corren en orden inverso al registro: el de profiling, registrado
+    # último, corre primero y CORS, compresión y métricas se aplican después a su reporte
+    init_profiling(app)
+
+    _register_admin_auth(app)
+
+    # Register blueprints
+    register_blueprints(app)
+
+    # Register admin blueprint only if not in production (Azure/Railway)
+    if not _is_production():
+        try:
+            from .routers.admin import bp as admin_bp
+            app.register_blueprint(admin_bp)
+        except ImportError:
+            pass
+
+    # Estáticos desde el manifest en memoria (hash + variantes gzip/br precalculadas).
+    # Con FLASK_DEBUG se relee un archivo cuando cambia en disco.
+    static_manifest = StaticManifest(static_folder, recargar=os.getenv('FLASK_DEBUG') == '1')
+    app.extensions['static_manifest'] = static_manifest
+    _register_frontend(app, static_manifest)
+
+    if eager_imports_enabled():
+        precargar()
+
+    return app
+
+
+# Create Flask app (gunicorn app.main:app)
+app = create_app()
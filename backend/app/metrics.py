@@ -0,0 +1,256 @@
+"""Métricas operativas en formato de texto de Prometheus (GET /metrics).
+
+Registro en memoria, sin dependencias. Cada worker de gunicorn tiene el suyo
+(las series llevan el label `pid`), así que cada scrape ve un worker; para
+ver el total se suman en Prometheus (sum without (pid)).
+
+Métricas:
+- dcp_http_requests_total / dcp_http_request_duration_seconds /
+  dcp_http_response_size_bytes por blueprint, ruta, método (y status)
+- dcp_http_requests_in_flight
+- dcp_db_queries_total / dcp_db_query_duration_seconds (listener de db.connection)
+- dcp_db_connections / dcp_db_max_connections (pg_stat_activity al scrapear)
+- dcp_cache_requests_total{cache, resultado="hit"|"miss"} y dcp_cache_hit_ratio
+- dcp_export_jobs_en_cola
+"""
+from bisect import bisect_left
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from flask import Flask, Response, g, has_request_context, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # Si está definido, /metrics pide Authorization: Bearer <token>
+
+_PID = str(os.getpid())
+
+
+def _actualizar_pid() -> None:
+    global _PID
+    _PID = str(os.getpid())
+
+
+# Con gunicorn --preload el módulo se importa en el master: cada worker corrige su pid
+os.register_at_fork(after_in_child=_actualizar_pid)
+
+
+def _formato_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    partes = []
+    for clave, valor in labels:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Counter:
+    def __init__(self, nombre: str, ayuda: str):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._valores: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valores(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._valores)
+
+    def exponer(self) -> Iterable[str]:
+        yield f'# HELP {self.nombre} {self.ayuda}'
+        yield f'# TYPE {self.nombre} counter'
+        for labels, valor in sorted(self.valores().items()):
+            yield f'{self.nombre}{_formato_labels(labels)} {_numero(valor)}'
+
+
+class Gauge(Counter):
+    def set(self, valor: float, **labels) -> None:
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valores[clave] = valor
+
+    def dec(self, valor: float = 1, **labels) -> None:
+        self.inc(-valor, **labels)
+
+    def exponer(self) -> Iterable[str]:
+        yield f'# HELP {self.nombre} {self.ayuda}'
+        yield f'# TYPE {self.nombre} gauge'
+        for labels, valor in sorted(self.valores().items()):
+            yield f'{self.nombre}{_formato_labels(labels)} {_numero(valor)}'
+
+
+class Histogram:
+    def __init__(self, nombre: str, ayuda: str, buckets: Tuple[float, ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        # labels -> [conteos por bucket (no acumulados) + overflow, suma, cantidad]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, valor: float, **labels) -> None:
+        clave = tuple(sorted(labels.items()))
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exponer(self) -> Iterable[str]:
+        with self._lock:
+            series = {k: ([*v[0]], v[1], v[2]) for k, v in self._series.items()}
+        yield f'# HELP {self.nombre} {self.ayuda}'
+        yield f'# TYPE {self.nombre} histogram'
+        for labels, (conteos, suma, cantidad) in sorted(series.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float('inf'),), conteos):
+                acumulado += conteo
+                le = labels + (('le', _numero(limite) if limite != float('inf') else '+Inf'),)
+                yield f'{self.nombre}_bucket{_formato_labels(le)} {acumulado}'
+            yield f'{self.nombre}_sum{_formato_labels(labels)} {_numero(suma)}'
+            yield f'{self.nombre}_count{_formato_labels(labels)} {cantidad}'
+
+
+REQUESTS = Counter('dcp_http_requests_total', 'Requests HTTP por ruta y status')
+LATENCIA = Histogram('dcp_http_request_duration_seconds', 'Latencia de requests HTTP', LATENCY_BUCKETS)
+TAMANO = Histogram('dcp_http_response_size_bytes', 'Tamaño de respuestas HTTP (con compresión)', SIZE_BUCKETS)
+EN_CURSO = Gauge('dcp_http_requests_in_flight', 'Requests HTTP en curso')
+QUERIES = Counter('dcp_db_queries_total', 'Queries a la base por ruta')
+LATENCIA_DB = Histogram('dcp_db_query_duration_seconds', 'Duración de queries a la base', LATENCY_BUCKETS)
+CACHE = Counter('dcp_cache_requests_total', 'Accesos a caches en memoria por resultado')
+
+_REGISTRO = [REQUESTS, LATENCIA, TAMANO, EN_CURSO, QUERIES, LATENCIA_DB, CACHE]
+
+
+def registrar_cache(cache: str, hit: bool) -> None:
+    """Cuenta un acceso a un cache en memoria (para dcp_cache_hit_ratio)."""
+    CACHE.inc(cache=cache, resultado='hit' if hit else 'miss', pid=_PID)
+
+
+def _labels_ruta() -> Dict[str, str]:
+    rule = request.url_rule
+    return {
+        'blueprint': request.blueprint or '',
+        'ruta': rule.rule if rule is not None else '<sin_ruta>',
+        'metodo': request.method,
+    }
+
+
+def _inicio_request() -> None:
+    g._metrics_inicio = time.perf_counter()
+    EN_CURSO.inc(pid=_PID)
+
+
+def _fin_request(response):
+    inicio = g.get('_metrics_inicio')
+    if inicio is None:
+        return response
+    labels = _labels_ruta()
+    LATENCIA.observe(time.perf_counter() - inicio, pid=_PID, **labels)
+    REQUESTS.inc(status=str(response.status_code), pid=_PID, **labels)
+    tamano = response.calculate_content_length()
+    if tamano is not None:  # Las respuestas en streaming no tienen largo conocido
+        TAMANO.observe(tamano, pid=_PID, **labels)
+    return response
+
+
+def _teardown_request(exc=None) -> None:
+    if g.get('_metrics_inicio') is not None:
+        EN_CURSO.dec(pid=_PID)
+
+
+def _registrar_query(query: str, duracion: float, filas: int) -> None:
+    ruta = ''
+    if has_request_context() and request.url_rule is not None:
+        ruta = request.url_rule.rule
+    QUERIES.inc(ruta=ruta, pid=_PID)
+    LATENCIA_DB.observe(duracion, pid=_PID)
+
+
+def _metricas_al_scrapear() -> List[str]:
+    """Gauges que se calculan al pedir /metrics (ratio de caches, cola de exports, conexiones)."""
+    lineas = []
+
+    totales: Dict[str, Dict[str, float]] = {}
+    for labels, valor in CACHE.valores().items():
+        d = dict(labels)
+        totales.setdefault(d['cache'], {}).setdefault(d['resultado'], 0)
+        totales[d['cache']][d['resultado']] += valor
+    lineas += ['# HELP dcp_cache_hit_ratio Hits / accesos por cache', '# TYPE dcp_cache_hit_ratio gauge']
+    for cache, r in sorted(totales.items()):
+        total = r.get('hit', 0) + r.get('miss', 0)
+        if total:
+            lineas.append(f'dcp_cache_hit_ratio{_formato_labels((("cache", cache), ("pid", _PID)))} '
+                          f'{_numero(r.get("hit", 0) / total)}')
+
+    try:
+        from .export_jobs import jobs_en_cola
+        lineas += ['# HELP dcp_export_jobs_en_cola Jobs de export pendientes o en ejecución',
+                   '# TYPE dcp_export_jobs_en_cola gauge',
+                   f'dcp_export_jobs_en_cola {jobs_en_cola()}']
+    except Exception as e:
+        print(f"[ERROR] metrics export_jobs: {e}")
+
+    try:
+        from .database import execute_query_single
+        row = execute_query_single("""
+            SELECT
+                (SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()) AS conexiones,
+                current_setting('max_connections')::int AS max_conexiones
+        """)
+        if row:
+            lineas += ['# HELP dcp_db_connections Conexiones abiertas a la base (todos los clientes)',
+                       '# TYPE dcp_db_connections gauge',
+                       f'dcp_db_connections {row["conexiones"]}',
+                       '# HELP dcp_db_max_connections max_connections del servidor PostgreSQL',
+                       '# TYPE dcp_db_max_connections gauge',
+                       f'dcp_db_max_connections {row["max_conexiones"]}']
+    except Exception as e:
+        print(f"[ERROR] metrics db: {e}")
+    return lineas
+
+
+def exponer() -> str:
+    lineas = []
+    for metrica in _REGISTRO:
+        lineas.extend(metrica.exponer())
+    lineas.extend(_metricas_al_scrapear())
+    return '\n'.join(lineas) + '\n'
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    Registra los hooks de métricas y GET /metrics.
+
+    Llamar antes de init_compression: los after_request corren en orden
+    inverso, así el tamaño medido es el de la respuesta ya comprimida.
+    """
+    from db.connection import add_query_listener
+
+    add_query_listener(_registrar_query)
+    app.before_request(_inicio_request)
+    app.after_request(_fin_request)
+    app.teardown_request(_teardown_request)
+
+    @app.route('/metrics')
+    def metrics():
+        """Métricas en formato de texto de Prometheus."""
+        if METRICS_TOKEN and request.headers.get('Authorization', '') != f'Bearer {METRICS_TOKEN}':
+            return {"error": "Unauthorized"}, 401
+        return Response(exponer(), content_type='text/plain; version=0.0.4; charset=utf-8')
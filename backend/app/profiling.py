@@ -0,0 +1,244 @@
+"""Profiling a pedido de requests /api/* para admins.
+
+Agregando `?__profile=1` a cualquier request /api/* con un token admin
+(Authorization: Bearer <token>, ver admin_tokens) el request corre bajo:
+
+- un profiler por muestreo: un thread toma el stack del thread del request
+  cada PROFILE_INTERVAL segundos (sin overhead por llamada como cProfile)
+- tracemalloc: pico de memoria y líneas que más asignaron
+
+y en vez del body normal devuelve el reporte (árbol de llamadas + stacks
+colapsados para flamegraph). Con `__profile_format=collapsed` devuelve solo
+los stacks colapsados en texto (formato de flamegraph.pl / speedscope).
+Si la respuesta es streaming (exports) se consume completa dentro del perfil.
+"""
+from collections import Counter
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, Response, g, jsonify, request
+
+from . import admin_tokens
+
+PROFILE_INTERVAL = float(os.getenv('DCP_PROFILE_INTERVAL', '0.002'))
+MAX_PROFUNDIDAD = 120
+TOP_ALLOCS = 15
+TOP_FUNCIONES = 30
+TRACEMALLOC_FRAMES = 10
+
+# tracemalloc es global al proceso: un solo request perfilado a la vez
+_profile_lock = threading.Lock()
+
+
+def _prefijos_ruta() -> List[str]:
+    """Carpetas que se recortan de los nombres de archivo (las más largas primero)."""
+    carpetas = {p for p in sys.path if p}
+    carpetas.add(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # backend/
+    return sorted((c.rstrip(os.sep) + os.sep for c in carpetas), key=len, reverse=True)
+
+
+_PREFIJOS_RUTA = _prefijos_ruta()
+
+
+def _ubicacion(code) -> str:
+    archivo = code.co_filename
+    for prefijo in _PREFIJOS_RUTA:
+        if archivo.startswith(prefijo):
+            archivo = archivo[len(prefijo):]
+            break
+    return f'{code.co_name} ({archivo}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Muestrea periódicamente el stack de un thread y cuenta stacks idénticos."""
+
+    def __init__(self, thread_id: int, intervalo: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.muestras: Counter = Counter()
+        self.total = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='dcp-profiler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._parar.set()
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_PROFUNDIDAD:
+                stack.append(_ubicacion(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.muestras[tuple(stack)] += 1
+            self.total += 1
+
+    def colapsados(self) -> List[str]:
+        """Líneas 'raiz;...;hoja cantidad' (entrada de flamegraph.pl / speedscope)."""
+        return [f"{';'.join(stack)} {n}" for stack, n in self.muestras.most_common()]
+
+    def funciones(self, top: int = TOP_FUNCIONES) -> List[Dict]:
+        """Tiempo propio (hoja del stack) y total (aparece en el stack) por función."""
+        propio = Counter()
+        total = Counter()
+        for stack, n in self.muestras.items():
+            if stack:
+                propio[stack[-1]] += n
+            for funcion in set(stack):
+                total[funcion] += n
+        ms = self.intervalo * 1000
+        return [
+            {'funcion': f, 'total_ms': round(n * ms, 1), 'propio_ms': round(propio[f] * ms, 1),
+             'porcentaje': round(100 * n / self.total, 1) if self.total else 0.0}
+            for f, n in total.most_common(top)
+        ]
+
+    def arbol(self, min_porcentaje: float = 1.0) -> Dict:
+        """Árbol de llamadas con las muestras por nodo (se podan ramas < min_porcentaje)."""
+        raiz = {'funcion': '<request>', 'muestras': 0, 'hijos': {}}
+        for stack, n in self.muestras.items():
+            nodo = raiz
+            nodo['muestras'] += n
+            for funcion in stack:
+                nodo = nodo['hijos'].setdefault(funcion, {'funcion': funcion, 'muestras': 0, 'hijos': {}})
+                nodo['muestras'] += n
+
+        minimo = self.total * min_porcentaje / 100
+        ms = self.intervalo * 1000
+
+        def convertir(nodo):
+            hijos = sorted((h for h in nodo['hijos'].values() if h['muestras'] >= minimo),
+                           key=lambda h: -h['muestras'])
+            return {'funcion': nodo['funcion'], 'ms': round(nodo['muestras'] * ms, 1),
+                    'hijos': [convertir(h) for h in hijos]}
+        return convertir(raiz)
+
+
+def _es_admin() -> bool:
+    auth = request.headers.get('Authorization', '')
+    return auth.startswith('Bearer ') and admin_tokens.has_token(auth[7:].strip())
+
+
+def _debe_perfilar() -> bool:
+    return (
+        request.args.get('__profile') == '1'
+        and request.path.startswith('/api/')
+        and _es_admin()
+    )
+
+
+def _iniciar():
+    if not _debe_perfilar():
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return jsonify({'error': 'Ya hay un request perfilándose en este worker, reintentar'}), 409
+    tracemalloc_propio = not tracemalloc.is_tracing()
+    if tracemalloc_propio:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    memoria_inicial = tracemalloc.get_traced_memory()[0]
+    snapshot_inicial = tracemalloc.take_snapshot()
+    profiler = SamplingProfiler(threading.get_ident())
+    g._profile = {
+        'profiler': profiler,
+        'tracemalloc_propio': tracemalloc_propio,
+        'memoria_inicial': memoria_inicial,
+        'snapshot_inicial': snapshot_inicial,
+        'inicio': time.perf_counter(),
+    }
+    profiler.start()
+    return None
+
+
+def _consumir_respuesta(response: Response) -> Tuple[int, Optional[str]]:
+    """Lee el body (incluido streaming) dentro del perfil. Devuelve (bytes, error)."""
+    try:
+        tamano = sum(len(chunk) for chunk in response.iter_encoded())
+        return tamano, None
+    except Exception as e:
+        return 0, str(e)
+    finally:
+        response.close()
+
+
+def _top_allocs(snapshot_inicial, snapshot_final) -> List[Dict]:
+    diferencias = snapshot_final.compare_to(snapshot_inicial, 'lineno')
+    return [
+        {'ubicacion': str(d.traceback[0]), 'kb': round(d.size_diff / 1024, 1), 'bloques': d.count_diff}
+        for d in diferencias[:TOP_ALLOCS]
+        if d.size_diff > 0
+    ]
+
+
+def _finalizar(response: Response) -> Response:
+    estado = g.pop('_profile', None)
+    if estado is None:
+        return response
+
+    try:
+        tamano, error_body = _consumir_respuesta(response)
+        duracion = time.perf_counter() - estado['inicio']
+        profiler = estado['profiler']
+        profiler.stop()
+
+        _, pico = tracemalloc.get_traced_memory()
+        snapshot_final = tracemalloc.take_snapshot()
+    finally:
+        if estado['tracemalloc_propio']:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    if request.args.get('__profile_format') == 'collapsed':
+        return Response('\n'.join(profiler.colapsados()) + '\n', mimetype='text/plain')
+
+    return jsonify({
+        'ruta': request.path,
+        'status': response.status_code,
+        'mimetype': response.mimetype,
+        'tamano_bytes': tamano,
+        'error_body': error_body,
+        'duracion_ms': round(duracion * 1000, 1),
+        'muestras': profiler.total,
+        'intervalo_ms': profiler.intervalo * 1000,
+        'memoria': {
+            'pico_kb': round((pico - estado['memoria_inicial']) / 1024, 1),
+            'top_asignaciones': _top_allocs(estado['snapshot_inicial'], snapshot_final),
+        },
+        'funciones': profiler.funciones(),
+        'arbol': profiler.arbol(),
+        'colapsados': profiler.colapsados(),
+    })
+
+
+def _teardown(exc=None) -> None:
+    """Si el request falló antes del after_request, detener el profiler igual."""
+    estado = g.pop('_profile', None)
+    if estado is not None:
+        estado['profiler'].stop()
+        if estado['tracemalloc_propio']:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+
+def init_profiling(app: Flask) -> None:
+    """
+    Registra el modo ?__profile=1.
+
+    Llamar después de los demás init_* y de CORS(app): su after_request corre
+    primero (Flask los corre en orden inverso al registro) y el reporte recibe los
+    headers CORS, la compresión y las métricas como cualquier respuesta.
+    """
+    app.before_request(_iniciar)
+    app.after_request(_finalizar)
+    app.teardown_request(_teardown)
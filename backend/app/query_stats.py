@@ -0,0 +1,166 @@
+"""Instrumentación de queries por request (Server-Timing, presupuesto de queries, N+1).
+
+Se engancha a db.connection con add_query_listener: cada query que corre
+dentro de un request queda registrada en flask.g con su SQL normalizado,
+duración y filas. Al terminar el request:
+
+- se agrega el header Server-Timing (db = tiempo total en queries, app = request completo)
+- si el request superó QUERY_BUDGET queries, o repitió el mismo SQL más de
+  N_PLUS_ONE_UMBRAL veces (patrón N+1), se loguea un [WARN]
+
+Además se acumulan estadísticas globales por SQL normalizado (por worker)
+que expone GET /api/debug/queries.
+"""
+from functools import lru_cache
+import os
+import re
+import threading
+import time
+from typing import Dict, List
+
+from flask import Flask, g, has_request_context, jsonify, request
+
+from db.connection import add_query_listener
+
+QUERY_BUDGET = int(os.getenv('DCP_QUERY_BUDGET', '25'))
+N_PLUS_ONE_UMBRAL = int(os.getenv('DCP_N_PLUS_ONE_UMBRAL', '5'))
+MAX_SQL_DISTINTOS = 500  # Tope de entradas en las estadísticas globales
+MAX_RUTAS_POR_SQL = 10
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_LISTA = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_RE_ESPACIOS = re.compile(r'\s+')
+
+_stats: Dict[str, Dict] = {}
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(query: str) -> str:
+    """
+    SQL sin literales ni listas de placeholders: queries que solo difieren en
+    valores o en la cantidad de ids de un IN (...) quedan agrupadas.
+    """
+    sql = _RE_STRING.sub('?', query)
+    sql = _RE_NUMERO.sub('?', sql)
+    sql = _RE_LISTA.sub('(...)', sql)
+    return _RE_ESPACIOS.sub(' ', sql).strip()
+
+
+def _ruta_actual() -> str:
+    rule = request.url_rule
+    return f'{request.method} {rule.rule}' if rule is not None else f'{request.method} {request.path}'
+
+
+def _registrar_query(query: str, duracion: float, filas: int) -> None:
+    """Listener de db.connection: acumula la query en el request y en las estadísticas globales."""
+    sql = normalizar_sql(query)
+    ruta = None
+    if has_request_context():
+        ruta = _ruta_actual()
+        queries = g.setdefault('_queries', [])
+        queries.append((sql, duracion, filas))
+
+    with _stats_lock:
+        entrada = _stats.get(sql)
+        if entrada is None:
+            if len(_stats) >= MAX_SQL_DISTINTOS:
+                return
+            entrada = _stats[sql] = {
+                'sql': sql, 'llamadas': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'filas': 0, 'rutas': {},
+            }
+        ms = duracion * 1000
+        entrada['llamadas'] += 1
+        entrada['total_ms'] += ms
+        entrada['max_ms'] = max(entrada['max_ms'], ms)
+        entrada['filas'] += filas
+        if ruta and (ruta in entrada['rutas'] or len(entrada['rutas']) < MAX_RUTAS_POR_SQL):
+            entrada['rutas'][ruta] = entrada['rutas'].get(ruta, 0) + 1
+
+
+def queries_del_request() -> List[tuple]:
+    """[(sql normalizado, duración s, filas), ...] del request actual."""
+    return g.get('_queries', [])
+
+
+def top_queries(n: int = 20, orden: str = 'total_ms') -> List[Dict]:
+    """Estadísticas globales ordenadas (total_ms, llamadas, max_ms o filas)."""
+    with _stats_lock:
+        entradas = [dict(e, rutas=dict(e['rutas'])) for e in _stats.values()]
+    for e in entradas:
+        e['promedio_ms'] = e['total_ms'] / e['llamadas'] if e['llamadas'] else 0.0
+    entradas.sort(key=lambda e: e.get(orden, 0), reverse=True)
+    for e in entradas:
+        for campo in ('total_ms', 'max_ms', 'promedio_ms'):
+            e[campo] = round(e[campo], 2)
+    return entradas[:n]
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _inicio_request() -> None:
+    g._request_inicio = time.perf_counter()
+
+
+def _fin_request(response):
+    queries = g.get('_queries')
+    inicio = g.get('_request_inicio')
+    timings = []
+    if queries:
+        total_db_ms = sum(d for _, d, _ in queries) * 1000
+        timings.append(f'db;dur={total_db_ms:.1f};desc="{len(queries)} queries"')
+    if inicio is not None:
+        timings.append(f'app;dur={(time.perf_counter() - inicio) * 1000:.1f}')
+    if timings:
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+    if queries:
+        ruta = _ruta_actual()
+        if len(queries) > QUERY_BUDGET:
+            print(f"[WARN] {ruta}: {len(queries)} queries (presupuesto {QUERY_BUDGET})")
+        repeticiones = {}
+        for sql, _, _ in queries:
+            repeticiones[sql] = repeticiones.get(sql, 0) + 1
+        for sql, veces in repeticiones.items():
+            if veces > N_PLUS_ONE_UMBRAL:
+                print(f"[WARN] {ruta}: posible N+1, {veces} veces: {sql[:200]}")
+    return response
+
+
+def init_query_stats(app: Flask) -> None:
+    """Registra el listener de queries, los hooks del request y GET /api/debug/queries."""
+    from .middleware import admin_session_required
+
+    add_query_listener(_registrar_query)
+    app.before_request(_inicio_request)
+    app.after_request(_fin_request)
+
+    @app.route('/api/debug/queries', methods=['GET', 'DELETE'])
+    @admin_session_required
+    def debug_queries():
+        """
+        Top de queries por tiempo total en este worker.
+
+        Parámetros: top (default 20), orden (total_ms, llamadas, max_ms, promedio_ms, filas).
+        DELETE reinicia las estadísticas.
+        """
+        if request.method == 'DELETE':
+            reset_stats()
+            return jsonify({'success': True})
+        orden = request.args.get('orden', 'total_ms')
+        if orden not in ('total_ms', 'llamadas', 'max_ms', 'promedio_ms', 'filas'):
+            return jsonify({'error': 'orden inválido'}), 400
+        try:
+            top = max(1, min(int(request.args.get('top', 20)), MAX_SQL_DISTINTOS))
+        except ValueError:
+            return jsonify({'error': 'top debe ser un número'}), 400
+        return jsonify({
+            'pid': os.getpid(),
+            'query_budget': QUERY_BUDGET,
+            'n_plus_one_umbral': N_PLUS_ONE_UMBRAL,
+            'queries': top_queries(top, orden),
+        })
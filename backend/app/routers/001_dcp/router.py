@@ -1,11 +1,10 @@
 """API routes for DCP (Dominant Currency Paradigm) index calculation."""
 from datetime import date, datetime
 from typing import List, Dict, Optional
-from io import BytesIO
-from flask import Blueprint, request, jsonify, abort, send_file
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from flask import Blueprint, request, jsonify, abort
 from ...database import execute_query, execute_query_single
+from ...serialization import wants_columnar, columnarize, json_response
+from ...xlsx_export import StreamingWorkbook, Styled, pivot_por_fecha, HEADER_LARGE_STYLE, NUMBER_STYLE, VALUE_STYLE, BOLD_STYLE
 
 bp = Blueprint('dcp', __name__)
 
@@ -153,6 +152,109 @@ def convert_to_monthly(series_data: List[Dict], periodicidad: str) -> List[Dict]
     return result
 
 
+def filtrar_meses_en_rango(prices_monthly: List[Dict], fecha_desde: date, fecha_hasta: date) -> List[Dict]:
+    """
+    Precios mensuales dentro del rango, comparando año-mes (así se incluye el
+    último mes del rango aunque fecha_hasta no sea día 1). Normaliza 'fecha' a date.
+    """
+    fecha_desde_ym = (fecha_desde.year, fecha_desde.month)
+    fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
+    
+    filtrados = []
+    for p in prices_monthly:
+        mes_fecha = p['fecha']
+        # Convertir a date si es necesario
+        if not isinstance(mes_fecha, date):
+            if isinstance(mes_fecha, str):
+                mes_fecha = date.fromisoformat(mes_fecha)
+            else:
+                continue
+        
+        mes_fecha_ym = (mes_fecha.year, mes_fecha.month)
+        if mes_fecha_ym >= fecha_desde_ym and mes_fecha_ym <= fecha_hasta_ym:
+            p['fecha'] = mes_fecha  # Actualizar la fecha en el diccionario
+            filtrados.append(p)
+    return filtrados
+
+
+def calcular_indices_dcp(prices_monthly: List[Dict], tc_monthly: Dict[date, float],
+                         ipc_monthly: Dict[date, float], nominal_real: str) -> List[Dict]:
+    """
+    Índices DCP sin normalizar: base = precio × TC (según moneda); si
+    nominal_real == 'n' se divide por IPC, si 'r' no. Los meses sin TC (o sin
+    IPC, si es nominal) quedan afuera.
+    """
+    indices = []
+    for price_item in prices_monthly:
+        mes_fecha = price_item['fecha']
+        precio = float(price_item['valor'])
+        
+        # Asegurar que mes_fecha sea un objeto date para la comparación
+        if not isinstance(mes_fecha, date):
+            if isinstance(mes_fecha, str):
+                mes_fecha = date.fromisoformat(mes_fecha)
+            else:
+                continue
+        
+        # Verificar que exista TC (y si es nominal, IPC) para este mes
+        if mes_fecha in tc_monthly:
+            tc_valor = float(tc_monthly[mes_fecha])
+            base_valor = precio * tc_valor
+            
+            if nominal_real == 'r':
+                indices.append({'fecha': mes_fecha, 'valor': base_valor})
+            else:
+                if mes_fecha in ipc_monthly:
+                    ipc_valor = float(ipc_monthly[mes_fecha])
+                    if ipc_valor > 0:  # Evitar división por cero
+                        indices.append({'fecha': mes_fecha, 'valor': base_valor / ipc_valor})
+    return indices
+
+
+def normalizar_base_100(indices: List[Dict], fecha_desde: date, fecha_hasta: date) -> List[Dict]:
+    """
+    Índices del rango (año-mes, incluye el último mes) llevados a base 100 en
+    el primero, con fechas ISO. Lista vacía si no hay datos o el primero es 0.
+    """
+    fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
+    indices_filtered = [
+        idx for idx in indices
+        if idx['fecha'] >= fecha_desde
+        and (idx['fecha'].year, idx['fecha'].month) <= fecha_hasta_ym
+    ]
+    if not indices_filtered:
+        return []
+    
+    first_value = indices_filtered[0]['valor']
+    if first_value == 0 or first_value is None:
+        return []
+    
+    factor = 100.0 / first_value
+    return [
+        {
+            'fecha': idx['fecha'].isoformat(),
+            'valor': idx['valor'] * factor
+        }
+        for idx in indices_filtered
+    ]
+
+
+def variacion_por_anio_mes(serie: Dict[date, float], start_ym: tuple, end_ym: tuple) -> Optional[tuple]:
+    """
+    Variación % entre el primer y el último mes de la serie dentro de
+    [start_ym, end_ym]. Devuelve (variacion, primer_ym, ultimo_ym), o None si
+    hay menos de 2 meses en el rango.
+    """
+    by_ym = {(f.year, f.month): float(v) for f, v in serie.items() if isinstance(f, date)}
+    ym_in_range = sorted([ym for ym in by_ym.keys() if start_ym <= ym <= end_ym])
+    if len(ym_in_range) < 2:
+        return None
+    inicial = by_ym[ym_in_range[0]]
+    final = by_ym[ym_in_range[-1]]
+    variacion = ((final / inicial) - 1.0) * 100 if inicial > 0 else 0.0
+    return variacion, ym_in_range[0], ym_in_range[-1]
+
+
 def get_macro_series(maestro_id: int, fecha_desde: date, fecha_hasta: date) -> Dict[date, float]:
     """
     Obtiene una serie macro (TC o IPC) y la convierte a mensual.
@@ -434,25 +536,9 @@ def get_dcp_indices():
             print(f"[DCP] Producto {product_id} ({product_name}): {len(prices_monthly)} precios mensuales después de conversión")
             
             # Filtrar precios mensuales por rango ANTES de calcular índices
-            # Usar comparación de año-mes para asegurar que se incluya el último mes del rango
             fecha_desde_ym = (fecha_desde.year, fecha_desde.month)
             fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
-            
-            # Asegurar que todas las fechas sean objetos date antes de filtrar
-            prices_monthly_filtered = []
-            for p in prices_monthly:
-                mes_fecha = p['fecha']
-                # Convertir a date si es necesario
-                if not isinstance(mes_fecha, date):
-                    if isinstance(mes_fecha, str):
-                        mes_fecha = date.fromisoformat(mes_fecha)
-                    else:
-                        continue
-                
-                mes_fecha_ym = (mes_fecha.year, mes_fecha.month)
-                if mes_fecha_ym >= fecha_desde_ym and mes_fecha_ym <= fecha_hasta_ym:
-                    p['fecha'] = mes_fecha  # Actualizar la fecha en el diccionario
-                    prices_monthly_filtered.append(p)
+            prices_monthly_filtered = filtrar_meses_en_rango(prices_monthly, fecha_desde, fecha_hasta)
             
             print(f"[DCP] Producto {product_id} ({product_name}): {len(prices_monthly)} precios mensuales, {len(prices_monthly_filtered)} filtrados por rango {fecha_desde_ym} a {fecha_hasta_ym}")
             
@@ -479,33 +565,7 @@ def get_dcp_indices():
                 print(f"[DCP] WARNING: No hay TC disponible para producto {product_id} ({product_name})")
                 continue
             
-            # Calcular índices con nominal/real:
-            # base = precio × TC (según moneda)
-            # si nominal_real == 'n' -> dividir por IPC; si 'r' -> no dividir por IPC
-            indices_original = []
-            for price_item in prices_monthly_filtered:
-                mes_fecha = price_item['fecha']
-                precio = float(price_item['valor'])
-                
-                # Asegurar que mes_fecha sea un objeto date para la comparación
-                if not isinstance(mes_fecha, date):
-                    if isinstance(mes_fecha, str):
-                        mes_fecha = date.fromisoformat(mes_fecha)
-                    else:
-                        continue
-                
-                # Verificar que exista TC (y si es nominal, IPC) para este mes
-                if mes_fecha in tc_monthly:
-                    tc_valor = float(tc_monthly[mes_fecha])
-                    base_valor = precio * tc_valor
-                    
-                    if nominal_real == 'r':
-                        indices_original.append({'fecha': mes_fecha, 'valor': base_valor})
-                    else:
-                        if mes_fecha in ipc_monthly:
-                            ipc_valor = float(ipc_monthly[mes_fecha])
-                            if ipc_valor > 0:  # Evitar división por cero
-                                indices_original.append({'fecha': mes_fecha, 'valor': base_valor / ipc_valor})
+            indices_original = calcular_indices_dcp(prices_monthly_filtered, tc_monthly, ipc_monthly, nominal_real)
             
             if not indices_original:
                 print(f"[DCP] WARNING: No se calcularon índices para producto {product_id} ({product_name})")
@@ -518,33 +578,9 @@ def get_dcp_indices():
             print(f"[DCP] Producto {product_id} ({product_name}): {len(indices_original)} índices calculados")
             
             # Normalizar a base 100
-            # Los índices ya están filtrados por rango, así que usamos todos los índices calculados
-            # Usar comparación de año-mes para asegurar que se incluya el último mes del rango
-            fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
-            indices_filtered = [
-                idx for idx in indices_original 
-                if idx['fecha'] >= fecha_desde 
-                and (idx['fecha'].year, idx['fecha'].month) <= fecha_hasta_ym
-            ]
-            
-            if not indices_filtered:
-                continue
-            
-            first_value = indices_filtered[0]['valor']
-            
-            if first_value == 0 or first_value is None:
-                continue  # No se puede normalizar
-            
-            factor = 100.0 / first_value
-            
-            # Aplicar normalización - incluir todos los índices filtrados (hasta donde hay datos)
-            indices_normalized = [
-                {
-                    'fecha': idx['fecha'].isoformat(),
-                    'valor': idx['valor'] * factor
-                }
-                for idx in indices_filtered
-            ]
+            indices_normalized = normalizar_base_100(indices_original, fecha_desde, fecha_hasta)
+            if not indices_normalized:
+                continue  # Sin índices en el rango o primer valor 0: no se puede normalizar
             
             # Calcular información para la tabla de resumen
             # Precio inicial y final en moneda original
@@ -600,17 +636,10 @@ def get_dcp_indices():
                     elif moneda_lower == 'usd':
                         tc_series = tc_usd_monthly
 
-                    if tc_series:
-                        tc_by_ym = {(f.year, f.month): float(v) for f, v in tc_series.items() if isinstance(f, date)}
-                        tc_ym_in_range = sorted([ym for ym in tc_by_ym.keys() if start_ym <= ym <= end_ym])
-                        if len(tc_ym_in_range) >= 2:
-                            tc_inicial = tc_by_ym[tc_ym_in_range[0]]
-                            tc_final = tc_by_ym[tc_ym_in_range[-1]]
-                            if tc_inicial > 0:
-                                variacion_tc = ((tc_final / tc_inicial) - 1.0) * 100
-                            print(f"[DCP] Variación TC: {variacion_tc}% (de {tc_ym_in_range[0]} a {tc_ym_in_range[-1]})")
-                        else:
-                            variacion_tc = 0.0
+                    variacion = variacion_por_anio_mes(tc_series, start_ym, end_ym) if tc_series else None
+                    if variacion:
+                        variacion_tc, primer_ym, ultimo_ym = variacion
+                        print(f"[DCP] Variación TC: {variacion_tc}% (de {primer_ym} a {ultimo_ym})")
                     else:
                         variacion_tc = 0.0
                 
@@ -626,17 +655,10 @@ def get_dcp_indices():
                     variacion_ipc = 0.0
                 else:
                     # Variable nominal => usar (IPC_final / IPC_inicial - 1) * 100
-                    if ipc_monthly:
-                        ipc_by_ym = {(f.year, f.month): float(v) for f, v in ipc_monthly.items() if isinstance(f, date)}
-                        ipc_ym_in_range = sorted([ym for ym in ipc_by_ym.keys() if start_ym <= ym <= end_ym])
-                        if len(ipc_ym_in_range) >= 2:
-                            ipc_inicial = ipc_by_ym[ipc_ym_in_range[0]]
-                            ipc_final = ipc_by_ym[ipc_ym_in_range[-1]]
-                            if ipc_inicial > 0:
-                                variacion_ipc = ((ipc_final / ipc_inicial) - 1.0) * 100
-                            print(f"[DCP] Variación IPC: {variacion_ipc}% (de {ipc_ym_in_range[0]} a {ipc_ym_in_range[-1]})")
-                        else:
-                            variacion_ipc = 0.0
+                    variacion = variacion_por_anio_mes(ipc_monthly, start_ym, end_ym) if ipc_monthly else None
+                    if variacion:
+                        variacion_ipc, primer_ym, ultimo_ym = variacion
+                        print(f"[DCP] Variación IPC: {variacion_ipc}% (de {primer_ym} a {ultimo_ym})")
                     else:
                         variacion_ipc = 0.0
             
@@ -689,6 +711,8 @@ def get_dcp_indices():
             })
         
         print(f"[DCP] Total productos procesados exitosamente: {len(result)}")
+        if wants_columnar():
+            return json_response(columnarize(result))
         return jsonify(result)
     except Exception as e:
         import traceback
@@ -899,130 +923,33 @@ def export_dcp_indices_to_excel():
         indices_norm = [(fecha, valor * factor) for fecha, valor in indices_filtered]
         all_indices_normalized[product_id] = indices_norm
     
-    # Crear Excel
-    wb = Workbook()
-    
-    # Estilos
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    data_alignment = Alignment(horizontal="right", vertical="center")
+    # Crear Excel (write-only: las filas se generan y vuelcan de a una)
+    xlsx = StreamingWorkbook()
     
     # Hoja 1: Índices Normalizados
-    ws1 = wb.active
-    ws1.title = "Índices Normalizados"
-    
-    # Encabezados
-    ws1['A1'] = 'Fecha'
-    ws1['A1'].fill = header_fill
-    ws1['A1'].font = header_font
-    ws1['A1'].alignment = header_alignment
-    
-    col = 2
-    for product_id in sorted(all_indices_normalized.keys()):
-        cell = ws1.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        col += 1
-    
-    # Obtener todas las fechas únicas
-    all_dates = set()
-    for indices in all_indices_normalized.values():
-        all_dates.update([idx[0] for idx in indices])
-    sorted_dates = sorted(all_dates)
-    
-    # Escribir datos
-    row = 2
-    for fecha in sorted_dates:
-        ws1.cell(row=row, column=1).value = fecha
-        col = 2
-        for product_id in sorted(all_indices_normalized.keys()):
-            indices = all_indices_normalized[product_id]
-            valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-            if valor is not None:
-                cell = ws1.cell(row=row, column=col)
-                cell.value = valor
-                cell.alignment = data_alignment
-            col += 1
-        row += 1
+    ids_normalizados = sorted(all_indices_normalized.keys())
+    xlsx.add_sheet(
+        "Índices Normalizados",
+        ['Fecha'] + [product_names[pid] for pid in ids_normalizados],
+        pivot_por_fecha([all_indices_normalized[pid] for pid in ids_normalizados]),
+        column_styles=[None], default_style=VALUE_STYLE,
+        widths=[15], default_width=25,
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 2: Índices Originales
-    ws2 = wb.create_sheet("Índices Originales")
-    
-    ws2['A1'] = 'Fecha'
-    ws2['A1'].fill = header_fill
-    ws2['A1'].font = header_font
-    ws2['A1'].alignment = header_alignment
-    
-    col = 2
-    for product_id in sorted(all_indices_original.keys()):
-        cell = ws2.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        col += 1
-    
-    all_dates_orig = set()
-    for indices in all_indices_original.values():
-        all_dates_orig.update([idx[0] for idx in indices])
-    sorted_dates_orig = sorted(all_dates_orig)
-    
-    row = 2
-    for fecha in sorted_dates_orig:
-        ws2.cell(row=row, column=1).value = fecha
-        col = 2
-        for product_id in sorted(all_indices_original.keys()):
-            indices = all_indices_original[product_id]
-            valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-            if valor is not None:
-                cell = ws2.cell(row=row, column=col)
-                cell.value = valor
-                cell.alignment = data_alignment
-            col += 1
-        row += 1
+    ids_originales = sorted(all_indices_original.keys())
+    xlsx.add_sheet(
+        "Índices Originales",
+        ['Fecha'] + [product_names[pid] for pid in ids_originales],
+        pivot_por_fecha([all_indices_original[pid] for pid in ids_originales]),
+        column_styles=[None], default_style=VALUE_STYLE,
+        widths=[15], default_width=25,
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 3: Precios Originales (solo del rango seleccionado, con TC e IPC)
-    ws3 = wb.create_sheet("Precios Originales")
-    ws3['A1'] = 'Fecha'
-    ws3['A1'].fill = header_fill
-    ws3['A1'].font = header_font
-    ws3['A1'].alignment = header_alignment
-    
-    # Encabezados de productos
-    product_cols = {}
-    col = 2
-    for product_id in sorted(all_prices_original.keys()):
-        cell = ws3.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        product_cols[product_id] = col
-        col += 1
-    
-    # Encabezados de IPC y TC
-    ipc_col = col
-    ws3.cell(row=1, column=ipc_col).value = 'IPC'
-    ws3.cell(row=1, column=ipc_col).fill = header_fill
-    ws3.cell(row=1, column=ipc_col).font = header_font
-    ws3.cell(row=1, column=ipc_col).alignment = header_alignment
-    col += 1
-    
-    tc_usd_col = col
-    ws3.cell(row=1, column=tc_usd_col).value = 'TC USD/UYU'
-    ws3.cell(row=1, column=tc_usd_col).fill = header_fill
-    ws3.cell(row=1, column=tc_usd_col).font = header_font
-    ws3.cell(row=1, column=tc_usd_col).alignment = header_alignment
-    col += 1
-    
-    tc_eur_col = col
-    ws3.cell(row=1, column=tc_eur_col).value = 'TC EUR/UYU'
-    ws3.cell(row=1, column=tc_eur_col).fill = header_fill
-    ws3.cell(row=1, column=tc_eur_col).font = header_font
-    ws3.cell(row=1, column=tc_eur_col).alignment = header_alignment
+    ids_precios = sorted(all_prices_original.keys())
     
     # Obtener todas las fechas del rango (solo las que están en el rango seleccionado)
     all_dates_prices = set()
@@ -1032,120 +959,51 @@ def export_dcp_indices_to_excel():
     all_dates_prices.update([f for f in ipc_monthly.keys() if f >= fecha_desde and f <= fecha_hasta])
     all_dates_prices.update([f for f in tc_usd_monthly.keys() if f >= fecha_desde and f <= fecha_hasta])
     all_dates_prices.update([f for f in tc_eur_monthly.keys() if f >= fecha_desde and f <= fecha_hasta])
-    sorted_dates_prices = sorted(all_dates_prices)
     
-    row = 2
-    for fecha in sorted_dates_prices:
-        ws3.cell(row=row, column=1).value = fecha
-        
-        # Escribir precios de productos
-        for product_id in sorted(all_prices_original.keys()):
-            prices = all_prices_original[product_id]
-            valor = next((p[1] for p in prices if p[0] == fecha), None)
-            if valor is not None:
-                cell = ws3.cell(row=row, column=product_cols[product_id])
-                cell.value = valor
-                cell.number_format = '0.00'
-                cell.alignment = data_alignment
-        
-        # Escribir IPC
-        ipc_valor = ipc_monthly.get(fecha)
-        if ipc_valor is not None:
-            cell = ws3.cell(row=row, column=ipc_col)
-            cell.value = ipc_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        # Escribir TC USD/UYU
-        tc_usd_valor = tc_usd_monthly.get(fecha)
-        if tc_usd_valor is not None:
-            cell = ws3.cell(row=row, column=tc_usd_col)
-            cell.value = tc_usd_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        # Escribir TC EUR/UYU
-        tc_eur_valor = tc_eur_monthly.get(fecha)
-        if tc_eur_valor is not None:
-            cell = ws3.cell(row=row, column=tc_eur_col)
-            cell.value = tc_eur_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        row += 1
+    xlsx.add_sheet(
+        "Precios Originales",
+        ['Fecha'] + [product_names[pid] for pid in ids_precios] + ['IPC', 'TC USD/UYU', 'TC EUR/UYU'],
+        pivot_por_fecha(
+            [all_prices_original[pid] for pid in ids_precios] + [ipc_monthly, tc_usd_monthly, tc_eur_monthly],
+            fechas=all_dates_prices
+        ),
+        column_styles=[None], default_style=NUMBER_STYLE,
+        # Fecha, productos y luego IPC, TC USD/UYU, TC EUR/UYU
+        widths=[15] + [25] * len(ids_precios) + [15, 15, 15],
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 4: Metadatos
-    ws4 = wb.create_sheet("Metadatos")
-    
-    ws4['A1'] = 'Campo'
-    ws4['A1'].fill = header_fill
-    ws4['A1'].font = header_font
-    ws4['B1'] = 'Valor'
-    ws4['B1'].fill = header_fill
-    ws4['B1'].font = header_font
-    
-    metadata = [
-        ('Fecha de exportación', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-        ('Rango de fechas', f'{fecha_desde} a {fecha_hasta}'),
-        ('Productos incluidos', ', '.join([product_names[pid] for pid in sorted(all_indices_normalized.keys())])),
-    ]
-    
-    row = 2
-    for campo, valor in metadata:
-        ws4.cell(row=row, column=1).value = campo
-        ws4.cell(row=row, column=2).value = valor
-        row += 1
-    
-    # Agregar fórmulas por producto
-    ws4.cell(row=row, column=1).value = 'Fórmulas aplicadas'
-    ws4.cell(row=row, column=1).font = Font(bold=True)
-    row += 1
-    
-    for product_id in sorted(all_indices_normalized.keys()):
-        moneda = get_product_currency(product_id)
-        moneda_lower = (moneda or '').lower()
-        if moneda_lower == 'eur':
-            tc_type = 'EUR/UYU'
-        elif moneda_lower == 'usd':
-            tc_type = 'USD/UYU'
-        elif moneda_lower == 'lc' or not moneda:
-            tc_type = 'LC (TC=1.0)'
-        else:
-            tc_type = 'USD/UYU'
-        ws4.cell(row=row, column=1).value = product_names[product_id]
-        ws4.cell(row=row, column=2).value = f'Precio internacional × TC {tc_type} / IPC'
-        row += 1
-    
-    # Ajustar anchos de columna
-    for ws in [ws1, ws2]:
-        ws.column_dimensions['A'].width = 15
-        for col in range(2, len(all_indices_normalized) + 2):
-            ws.column_dimensions[chr(64 + col)].width = 25
-    
-    # Para ws3 (Precios Originales), ajustar considerando productos + IPC + TC USD + TC EUR
-    ws3.column_dimensions['A'].width = 15
-    num_product_cols = len(all_prices_original)
-    for col in range(2, num_product_cols + 2):
-        ws3.column_dimensions[chr(64 + col)].width = 25
-    # IPC, TC USD/UYU, TC EUR/UYU
-    for col in range(num_product_cols + 2, num_product_cols + 5):
-        ws3.column_dimensions[chr(64 + col)].width = 15
-    
-    ws4.column_dimensions['A'].width = 30
-    ws4.column_dimensions['B'].width = 50
-    
-    # Guardar a BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
+    def filas_metadatos():
+        yield ('Fecha de exportación', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        yield ('Rango de fechas', f'{fecha_desde} a {fecha_hasta}')
+        yield ('Productos incluidos', ', '.join([product_names[pid] for pid in ids_normalizados]))
+        
+        # Agregar fórmulas por producto
+        yield (Styled('Fórmulas aplicadas', BOLD_STYLE),)
+        for product_id in ids_normalizados:
+            moneda = get_product_currency(product_id)
+            moneda_lower = (moneda or '').lower()
+            if moneda_lower == 'eur':
+                tc_type = 'EUR/UYU'
+            elif moneda_lower == 'usd':
+                tc_type = 'USD/UYU'
+            elif moneda_lower == 'lc' or not moneda:
+                tc_type = 'LC (TC=1.0)'
+            else:
+                tc_type = 'USD/UYU'
+            yield (product_names[product_id], f'Precio internacional × TC {tc_type} / IPC')
+    
+    xlsx.add_sheet(
+        "Metadatos",
+        ['Campo', 'Valor'],
+        filas_metadatos(),
+        widths=[30, 50],
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Nombre de archivo
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f'indices_dcp_{timestamp}.xlsx'
     
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
-    )
+    return xlsx.response(filename)
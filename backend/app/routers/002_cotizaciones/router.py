@@ -1,11 +1,15 @@
 """API routes for LATAM exchange rates (cotizaciones)."""
+from __future__ import annotations
+
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
-from io import BytesIO
-from flask import Blueprint, request, jsonify, abort, send_file
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from ...database import execute_query, execute_query_single
+from flask import Blueprint, request, jsonify, abort
+from ...database import execute_query, execute_query_single, iter_query_chunks
+from ...lazy import lazy_import
+from ...serialization import wants_columnar, columnarize, json_response
+from ...xlsx_export import StreamingWorkbook
+
+np = lazy_import('numpy')
 
 bp = Blueprint('cotizaciones', __name__)
 
@@ -21,6 +25,81 @@ def parse_fecha(fecha_val):
     return date.fromisoformat(fecha_str)
 
 
+# Variaciones por observaciones: 1d, 5d (1 sem), 22d (1 mes), 250d (1 año) = N observaciones atrás (días con dato)
+VARIACIONES_OBS = [(1, 'variacion_1d'), (5, 'variacion_5d'), (22, 'variacion_22d'), (250, 'variacion_250d')]
+
+
+def cargar_precios_batch(fks_list: List[tuple], fecha_desde: date, fecha_hasta: date):
+    """
+    Carga todas las series (id_variable, id_pais) en una sola consulta.
+    
+    Returns:
+        Tuple (ids, fechas, valores) de arrays numpy alineados, ordenados por serie y fecha.
+        ids es el id sintético (id_variable * 10000 + id_pais).
+    """
+    conditions = " OR ".join(["(id_variable = ? AND id_pais = ?)"] * len(fks_list))
+    params = [v for fk in fks_list for v in fk] + [fecha_desde.isoformat(), fecha_hasta.isoformat()]
+    query = f"""
+        SELECT id_variable, id_pais, DATE(fecha) AS fecha, valor
+        FROM maestro_precios
+        WHERE ({conditions})
+        AND DATE(fecha) >= DATE(?)
+        AND DATE(fecha) <= DATE(?)
+        AND valor IS NOT NULL
+        ORDER BY id_variable, id_pais, fecha ASC
+    """
+    rows = execute_query(query, tuple(params))
+    ids = np.fromiter((r['id_variable'] * 10000 + r['id_pais'] for r in rows), dtype=np.int64, count=len(rows))
+    fechas = np.array([parse_fecha(r['fecha']) for r in rows], dtype='datetime64[D]')
+    valores = np.fromiter((float(r['valor']) for r in rows), dtype=np.float64, count=len(rows))
+    return ids, fechas, valores
+
+
+def limites_series(ids: np.ndarray, fechas: np.ndarray, fecha_desde: date):
+    """
+    Límites de cada serie dentro de los arrays concatenados (ordenados por serie y fecha).
+    
+    Returns:
+        Tuple (starts, ends, primeros, ultimos): inicio y fin (exclusivo) de cada serie,
+        primera observación >= fecha_desde y última observación (-1 si no hay dato en rango)
+    """
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    
+    # Datos para el gráfico: solo [fecha_desde, fecha_hasta] (cola de cada serie, ya ordenada)
+    en_rango = (fechas >= np.datetime64(fecha_desde)).astype(np.int64)
+    n_en_rango = np.add.reduceat(en_rango, starts)
+    primeros = ends - n_en_rango
+    ultimos = np.where(n_en_rango > 0, ends - 1, -1)
+    return starts, ends, primeros, ultimos
+
+
+def calcular_variaciones_obs(starts: np.ndarray, ultimos: np.ndarray, valores: np.ndarray, lags: List[int]) -> Dict[int, np.ndarray]:
+    """
+    Variación % entre la observación `ultimos[i]` y la que está `n` observaciones antes,
+    para todas las series a la vez (desplazamiento de índices sobre arrays alineados).
+    
+    Args:
+        starts: índice de inicio de cada serie en los arrays concatenados
+        ultimos: índice de la última observación de cada serie (o -1 si no hay dato en rango)
+        valores: valores concatenados de todas las series
+        lags: cantidad de observaciones hacia atrás
+        
+    Returns:
+        Dict lag -> array con la variación % (NaN si no aplica)
+    """
+    resultado = {}
+    v0 = np.where(ultimos >= 0, valores[np.clip(ultimos, 0, None)], np.nan)
+    for n in lags:
+        idx_ant = ultimos - n
+        validos = (ultimos >= 0) & (idx_ant >= starts)
+        v_ant = np.where(validos, valores[np.clip(idx_ant, 0, None)], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (v0 - v_ant) / v_ant * 100
+        resultado[n] = np.where(validos & (v0 > 0) & (v_ant > 0), var, np.nan)
+    return resultado
+
+
 @bp.route('/cotizaciones', methods=['GET'])
 def get_cotizaciones():
     """
@@ -115,7 +194,21 @@ def get_cotizaciones():
         if not products:
             return jsonify({'error': 'No se encontraron cotizaciones activas'}), 404
         
-        # Obtener datos de cada cotización
+        # Obtener precios de todas las cotizaciones en una sola consulta:
+        # ampliar rango hacia atrás 250 días para calcular variaciones
+        fecha_desde_eff = min(fecha_desde, fecha_hasta - timedelta(days=250))
+        ids, fechas, valores = cargar_precios_batch(fks_list, fecha_desde_eff, fecha_hasta)
+        
+        if len(ids) == 0:
+            return jsonify(result)
+        
+        starts, ends, primeros, ultimos = limites_series(ids, fechas, fecha_desde)
+        serie_ids = ids[starts]
+        
+        variaciones = calcular_variaciones_obs(starts, ultimos, valores, [n for n, _ in VARIACIONES_OBS])
+        fechas_iso = np.datetime_as_string(fechas, unit='D')
+        posicion = {int(sid): i for i, sid in enumerate(serie_ids)}
+        
         for product in products:
             product_id = product['id']
             product_name = product['nombre']
@@ -123,38 +216,15 @@ def get_cotizaciones():
             product_unidad = product.get('unidad', '')
             product_pais = product.get('pais', '')
             
-            # Convertir id sintético a id_variable e id_pais
-            id_variable = product_id // 10000
-            id_pais = product_id % 10000
-            
-            # Obtener precios: ampliar rango hacia atrás 250 días para calcular variaciones
-            fecha_desde_eff = min(fecha_desde, fecha_hasta - timedelta(days=250))
-            fecha_desde_str = fecha_desde.isoformat()
-            fecha_hasta_str = fecha_hasta.isoformat()
-            fecha_desde_eff_str = fecha_desde_eff.isoformat()
-            query_prices = """
-                SELECT fecha, valor
-                FROM maestro_precios
-                WHERE id_variable = ? AND id_pais = ? 
-                AND DATE(fecha) >= DATE(?)
-                AND DATE(fecha) <= DATE(?)
-                ORDER BY fecha ASC
-            """
-            prices = execute_query(query_prices, (id_variable, id_pais, fecha_desde_eff_str, fecha_hasta_str))
-            
-            if not prices:
+            i = posicion.get(int(product_id))
+            if i is None:
                 continue
             
-            # Normalizar fechas y preparar datos (para el gráfico solo el rango pedido)
-            data_all = []
-            for price_item in prices:
-                fecha_obj = parse_fecha(price_item['fecha'])
-                data_all.append({
-                    'fecha': fecha_obj.isoformat(),
-                    'valor': float(price_item['valor'])
-                })
-            # Datos para el gráfico: solo [fecha_desde, fecha_hasta]
-            data = [d for d in data_all if fecha_desde <= parse_fecha(d['fecha']) <= fecha_hasta]
+            ini, fin = int(primeros[i]), int(ends[i])
+            data = [
+                {'fecha': f, 'valor': v}
+                for f, v in zip(fechas_iso[ini:fin].tolist(), valores[ini:fin].tolist())
+            ]
             
             # Calcular resumen (intervalo pedido)
             if data:
@@ -172,29 +242,11 @@ def get_cotizaciones():
                 fecha_inicial = None
                 fecha_final = None
             
-            # Variaciones 1d, 5d (1 sem), 22d (1 mes), 250d (1 año): N observaciones atrás (días con dato), no N días naturales
             fecha_max = fecha_final  # última fecha en el rango
-            variacion_1d = variacion_5d = variacion_22d = variacion_250d = None
-            if data_all and fecha_max:
-                # Lista ordenada por fecha para tomar "N observaciones atrás"
-                sorted_all = sorted(data_all, key=lambda d: d['fecha'])
-                fechas_ordenadas = [d['fecha'] for d in sorted_all]
-                try:
-                    idx_max = fechas_ordenadas.index(fecha_max)
-                except ValueError:
-                    idx_max = len(fechas_ordenadas) - 1
-                v0 = sorted_all[idx_max]['valor'] if idx_max >= 0 else None
-                if v0 is not None and v0 > 0:
-                    for n_obs, key in [(1, 'variacion_1d'), (5, 'variacion_5d'), (22, 'variacion_22d'), (250, 'variacion_250d')]:
-                        idx_ant = idx_max - n_obs
-                        if idx_ant >= 0:
-                            v_ant = sorted_all[idx_ant]['valor']
-                            if v_ant is not None and v_ant > 0:
-                                val = ((v0 - v_ant) / v_ant) * 100
-                                if key == 'variacion_1d': variacion_1d = round(val, 2)
-                                elif key == 'variacion_5d': variacion_5d = round(val, 2)
-                                elif key == 'variacion_22d': variacion_22d = round(val, 2)
-                                else: variacion_250d = round(val, 2)
+            resumen_var = {}
+            for n_obs, key in VARIACIONES_OBS:
+                val = variaciones[n_obs][i]
+                resumen_var[key] = round(float(val), 2) if not np.isnan(val) else None
             
             # Obtener id_variable del producto
             product_id_variable = product.get('id_variable')
@@ -214,13 +266,12 @@ def get_cotizaciones():
                     'fecha_inicial': fecha_inicial,
                     'fecha_final': fecha_final,
                     'fecha_max': fecha_max,
-                    'variacion_1d': variacion_1d,
-                    'variacion_5d': variacion_5d,
-                    'variacion_22d': variacion_22d,
-                    'variacion_250d': variacion_250d
+                    **resumen_var
                 }
             })
         
+        if wants_columnar():
+            return json_response(columnarize(result))
         return jsonify(result)
     
     except ValueError as e:
@@ -387,27 +438,6 @@ def export_cotizaciones_to_excel():
         fecha_desde = date.fromisoformat(fecha_desde_str)
         fecha_hasta = date.fromisoformat(fecha_hasta_str)
         
-        # Crear workbook
-        wb = Workbook()
-        wb.remove(wb.active)  # Remover hoja por defecto
-        
-        # Hoja 1: Cotizaciones
-        ws_cotizaciones = wb.create_sheet("Cotizaciones")
-        
-        # Encabezados
-        headers = ['Fecha', 'País/Cotización', 'Valor', 'Unidad', 'Fuente']
-        ws_cotizaciones.append(headers)
-        
-        # Estilo para encabezados
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        
-        for col in range(1, len(headers) + 1):
-            cell = ws_cotizaciones.cell(row=1, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
         # Convertir product_ids sintéticos a (id_variable, id_pais) pairs
         fks_list = []
         for product_id in product_ids:
@@ -435,79 +465,57 @@ def export_cotizaciones_to_excel():
         """
         products = execute_query(query_products, tuple(fks_params))
         
-        row_num = 2
-        for product in products:
-            product_id = product['id']
-            product_name = product['nombre']
-            product_source = product.get('fuente', '')
-            
-            # Convertir id sintético a id_variable e id_pais
-            id_variable = product_id // 10000
-            id_pais = product_id % 10000
-            
-            query_prices = """
-                SELECT fecha, valor
-                FROM maestro_precios
-                WHERE id_variable = ? AND id_pais = ? AND fecha >= ? AND fecha <= ?
-                ORDER BY fecha ASC
-            """
-            prices = execute_query(query_prices, (id_variable, id_pais, fecha_desde, fecha_hasta))
-            
-            for price_item in prices:
-                fecha_obj = parse_fecha(price_item['fecha'])
-                ws_cotizaciones.append([
-                    fecha_obj.isoformat(),
-                    product_name,
-                    float(price_item['valor']),
-                    '',  # unidad no existe en nuevo schema
-                    product_source
-                ])
-                row_num += 1
-        
-        # Ajustar ancho de columnas
-        ws_cotizaciones.column_dimensions['A'].width = 12
-        ws_cotizaciones.column_dimensions['B'].width = 30
-        ws_cotizaciones.column_dimensions['C'].width = 15
-        ws_cotizaciones.column_dimensions['D'].width = 15
-        ws_cotizaciones.column_dimensions['E'].width = 20
-        
-        # Hoja 2: Metadatos
-        ws_metadata = wb.create_sheet("Metadatos")
-        ws_metadata.append(['Campo', 'Valor'])
+        # Precios de todas las cotizaciones en una sola consulta, leída por bloques
+        query_prices = f"""
+            SELECT mp.fecha, mp.valor, v.id_nombre_variable as nombre, m.fuente
+            FROM maestro_precios mp
+            JOIN maestro m ON m.id_variable = mp.id_variable AND m.id_pais = mp.id_pais
+            LEFT JOIN variables v ON m.id_variable = v.id_variable
+            WHERE ({' OR '.join(fks_conditions)})
+            AND m.activo = 1
+            AND mp.fecha >= ? AND mp.fecha <= ?
+            ORDER BY m.id_variable, m.id_pais, mp.fecha ASC
+        """
         
-        # Estilo para encabezados de metadatos
-        for col in range(1, 3):
-            cell = ws_metadata.cell(row=1, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        def filas_cotizaciones():
+            for chunk in iter_query_chunks(query_prices, tuple(fks_params) + (fecha_desde, fecha_hasta)):
+                for price_item in chunk:
+                    fecha_obj = parse_fecha(price_item['fecha'])
+                    yield [
+                        fecha_obj.isoformat(),
+                        price_item['nombre'],
+                        float(price_item['valor']),
+                        '',  # unidad no existe en nuevo schema
+                        price_item.get('fuente', '')
+                    ]
         
-        ws_metadata.append(['Fecha desde', fecha_desde_str])
-        ws_metadata.append(['Fecha hasta', fecha_hasta_str])
-        ws_metadata.append(['Total cotizaciones', len(products)])
-        ws_metadata.append(['', ''])
-        ws_metadata.append(['Cotización', 'ID'])
+        def filas_metadatos():
+            yield ['Fecha desde', fecha_desde_str]
+            yield ['Fecha hasta', fecha_hasta_str]
+            yield ['Total cotizaciones', len(products)]
+            yield ['', '']
+            yield ['Cotización', 'ID']
+            for product in products:
+                yield [product['nombre'], product['id']]
         
-        for product in products:
-            ws_metadata.append([product['nombre'], product['id']])
+        # Crear workbook (write-only)
+        xlsx = StreamingWorkbook()
         
-        ws_metadata.column_dimensions['A'].width = 25
-        ws_metadata.column_dimensions['B'].width = 15
+        # Hoja 1: Cotizaciones
+        xlsx.add_sheet(
+            "Cotizaciones",
+            ['Fecha', 'País/Cotización', 'Valor', 'Unidad', 'Fuente'],
+            filas_cotizaciones(),
+            widths=[12, 30, 15, 15, 20],
+        )
         
-        # Guardar en BytesIO
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # Hoja 2: Metadatos
+        xlsx.add_sheet("Metadatos", ['Campo', 'Valor'], filas_metadatos(), widths=[25, 15])
         
         # Generar nombre de archivo
         filename = f"cotizaciones_latam_{fecha_desde_str}_{fecha_hasta_str}.xlsx"
         
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return xlsx.response(filename)
     
     except ValueError as e:
         return jsonify({'error': f'Error en formato de fecha: {str(e)}'}), 400
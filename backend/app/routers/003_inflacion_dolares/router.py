@@ -2,104 +2,18 @@
 import importlib
 from datetime import date, datetime
 from typing import List, Dict, Optional
-from flask import Blueprint, request, jsonify, send_file
-from ...database import execute_query, execute_query_single
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment
-import io
+from flask import Blueprint, request, jsonify
+from ...database import execute_query
+from ...lazy import lazy_import
+from ...xlsx_export import StreamingWorkbook, pivot_por_fecha, HEADER_LARGE_STYLE, NUMBER_STYLE
 
 # Import from numbered module using importlib
 _dcp_module = importlib.import_module('app.routers.001_dcp.router')
 convert_to_monthly = _dcp_module.convert_to_monthly
 
-bp = Blueprint('inflacion_dolares', __name__)
-
+np = lazy_import('numpy')
 
-def get_ipc_by_country(id_pais: int, fecha_desde: date, fecha_hasta: date) -> Dict[date, float]:
-    """
-    Obtiene el IPC mensual de un país específico.
-    
-    Args:
-        id_pais: ID del país
-        fecha_desde: Fecha inicial
-        fecha_hasta: Fecha final
-    
-    Returns:
-        Dict con fechas (primer día del mes) como keys y valores IPC como values
-    """
-    # Buscar IPC del país: id_variable = 9 (IPC), periodicidad='M', id_pais
-    query_maestro = """
-        SELECT m.id_variable, m.id_pais, m.periodicidad
-        FROM maestro m
-        WHERE m.id_pais = ?
-        AND m.id_variable = 9
-        AND m.periodicidad = 'M'
-        LIMIT 1
-    """
-    
-    # Buscar registro de maestro
-    maestro_info = execute_query_single(query_maestro, (id_pais,))
-    
-    if not maestro_info:
-        print(f"[DEBUG] get_ipc_by_country: No se encontró registro en maestro para id_pais={id_pais}, id_variable=9, periodicidad='M'")
-        return {}
-    
-    id_variable = maestro_info['id_variable']
-    id_pais_maestro = maestro_info['id_pais']
-    periodicidad = maestro_info['periodicidad']
-    
-    print(f"[DEBUG] get_ipc_by_country: Encontrado maestro - id_variable={id_variable}, id_pais={id_pais_maestro}, periodicidad={periodicidad}")
-    
-    # Obtener datos del IPC
-    query = """
-        SELECT fecha, valor
-        FROM maestro_precios
-        WHERE id_variable = ? AND id_pais = ? 
-        AND DATE(fecha) >= DATE(?)
-        AND DATE(fecha) <= DATE(?)
-        ORDER BY fecha ASC
-    """
-    
-    fecha_desde_str = fecha_desde.isoformat()
-    fecha_hasta_str = fecha_hasta.isoformat()
-    
-    print(f"[DEBUG] get_ipc_by_country: Buscando datos para id_pais={id_pais}, id_variable={id_variable}, rango {fecha_desde_str} a {fecha_hasta_str}")
-    
-    try:
-        raw_data = execute_query(query, (id_variable, id_pais_maestro, fecha_desde_str, fecha_hasta_str))
-        print(f"[DEBUG] get_ipc_by_country: Query ejecutada - encontrados {len(raw_data) if raw_data else 0} registros en rango {fecha_desde_str} a {fecha_hasta_str}")
-        if raw_data:
-            fechas_encontradas = sorted(set([item['fecha'] for item in raw_data]))
-            print(f"[DEBUG] get_ipc_by_country: Fechas encontradas en raw_data: {fechas_encontradas[0] if fechas_encontradas else 'N/A'} a {fechas_encontradas[-1] if fechas_encontradas else 'N/A'}")
-    except Exception as e:
-        print(f"[ERROR] get_ipc_by_country: Error al ejecutar query: {str(e)}")
-        return {}
-    
-    if not raw_data:
-        print(f"[DEBUG] get_ipc_by_country: No hay datos en maestro_precios para id_variable={id_variable}, id_pais={id_pais_maestro} en el rango especificado")
-        return {}
-    
-    # Convertir a mensual (ya es mensual, pero puede haber múltiples valores por mes)
-    monthly_data = convert_to_monthly(raw_data, periodicidad)
-    
-    # Filtrar por rango usando comparación de año-mes
-    fecha_desde_ym = (fecha_desde.year, fecha_desde.month)
-    fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
-    
-    filtered_data = {}
-    for item in monthly_data:
-        mes_fecha = item['fecha']
-        if not isinstance(mes_fecha, date):
-            if isinstance(mes_fecha, str):
-                mes_fecha = date.fromisoformat(mes_fecha)
-            else:
-                continue
-        
-        mes_fecha_ym = (mes_fecha.year, mes_fecha.month)
-        if mes_fecha_ym >= fecha_desde_ym and mes_fecha_ym <= fecha_hasta_ym:
-            filtered_data[mes_fecha] = item['valor']
-    
-    return filtered_data
+bp = Blueprint('inflacion_dolares', __name__)
 
 
 def get_all_tc_monthly(id_paises: List[int], fecha_desde: date, fecha_hasta: date) -> Dict[int, Dict[date, float]]:
@@ -189,6 +103,138 @@ def get_all_tc_monthly(id_paises: List[int], fecha_desde: date, fecha_hasta: dat
     return resultado
 
 
+def get_all_ipc_monthly(id_paises: List[int], fecha_desde: date, fecha_hasta: date) -> Dict[int, Dict[date, float]]:
+    """
+    Obtiene el IPC mensual (id_variable=9, periodicidad='M') de los países especificados.
+    Una sola query para todos los países.
+    
+    Args:
+        id_paises: Lista de id_pais de los países seleccionados
+        fecha_desde: Fecha inicial
+        fecha_hasta: Fecha final
+    
+    Returns:
+        Dict con id_pais como key y Dict[date, float] como value (IPC mensual por país)
+    """
+    if not id_paises:
+        return {}
+    
+    placeholders = ','.join(['?'] * len(id_paises))
+    query = f"""
+        SELECT 
+            mp.id_pais,
+            mp.fecha,
+            mp.valor
+        FROM maestro_precios mp
+        WHERE mp.id_variable = 9
+        AND mp.id_pais IN ({placeholders})
+        AND EXISTS (
+            SELECT 1 FROM maestro m
+            WHERE m.id_variable = mp.id_variable
+            AND m.id_pais = mp.id_pais
+            AND m.periodicidad = 'M'
+        )
+        AND DATE(mp.fecha) >= DATE(?)
+        AND DATE(mp.fecha) <= DATE(?)
+        ORDER BY mp.id_pais, mp.fecha ASC
+    """
+    
+    fecha_desde_str = fecha_desde.isoformat()
+    fecha_hasta_str = fecha_hasta.isoformat()
+    
+    try:
+        raw_data = execute_query(query, tuple(list(id_paises) + [fecha_desde_str, fecha_hasta_str]))
+    except Exception as e:
+        print(f"[ERROR] get_all_ipc_monthly: Error al obtener datos: {str(e)}")
+        return {}
+    
+    if not raw_data:
+        return {}
+    
+    # Agrupar por país
+    ipc_by_pais = {}
+    for row in raw_data:
+        ipc_by_pais.setdefault(row['id_pais'], []).append({
+            'fecha': row['fecha'],
+            'valor': row['valor']
+        })
+    
+    # Convertir a mensual (puede haber múltiples valores por mes) y filtrar por rango
+    resultado = {}
+    fecha_desde_ym = (fecha_desde.year, fecha_desde.month)
+    fecha_hasta_ym = (fecha_hasta.year, fecha_hasta.month)
+    
+    for id_pais, datos in ipc_by_pais.items():
+        monthly_data = convert_to_monthly(datos, 'M')
+        resultado[id_pais] = {
+            item['fecha']: item['valor']
+            for item in monthly_data
+            if fecha_desde_ym <= (item['fecha'].year, item['fecha'].month) <= fecha_hasta_ym
+        }
+    
+    return resultado
+
+
+def calcular_indices_dolares(id_paises: List[int],
+                             ipc_by_pais: Dict[int, Dict[date, float]],
+                             tc_by_pais: Dict[int, Dict[date, float]]) -> Dict[int, Dict]:
+    """
+    Calcula el índice IPC/TC de todos los países a la vez sobre una matriz país×mes alineada.
+    
+    Args:
+        id_paises: Orden de las filas de la matriz
+        ipc_by_pais: IPC mensual por país (ver get_all_ipc_monthly)
+        tc_by_pais: TC mensual por país (ver get_all_tc_monthly)
+    
+    Returns:
+        Dict con id_pais como key y dict con 'fechas' (meses con IPC y TC > 0),
+        'original' (IPC/TC), 'normalizado' (base 100 en el primer mes), 'ipc' y 'tc'.
+        Solo incluye países con al menos 2 meses válidos y primer valor distinto de 0.
+    """
+    meses = set()
+    for id_pais in id_paises:
+        meses.update(ipc_by_pais.get(id_pais, {}).keys())
+        meses.update(tc_by_pais.get(id_pais, {}).keys())
+    if not meses:
+        return {}
+    
+    meses = sorted(meses)
+    posicion = {mes: j for j, mes in enumerate(meses)}
+    ipc = np.full((len(id_paises), len(meses)), np.nan)
+    tc = np.full((len(id_paises), len(meses)), np.nan)
+    for i, id_pais in enumerate(id_paises):
+        for mes, valor in ipc_by_pais.get(id_pais, {}).items():
+            ipc[i, posicion[mes]] = valor
+        for mes, valor in tc_by_pais.get(id_pais, {}).items():
+            tc[i, posicion[mes]] = valor
+    
+    # Meses con IPC y TC > 0 (evitar división por cero en TC)
+    validos = ~np.isnan(ipc) & (np.nan_to_num(tc) > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indice = np.where(validos, ipc / tc, np.nan)
+    
+    # Base 100: primer mes válido de cada país
+    primer_mes = validos.argmax(axis=1)
+    base = indice[np.arange(len(id_paises)), primer_mes]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalizado = indice * (100.0 / base)[:, None]
+    
+    resultado = {}
+    n_validos = validos.sum(axis=1)
+    for i, id_pais in enumerate(id_paises):
+        if n_validos[i] < 2 or base[i] == 0:
+            continue
+        cols = np.flatnonzero(validos[i])
+        resultado[id_pais] = {
+            'fechas': [meses[j] for j in cols],
+            'original': indice[i, cols].tolist(),
+            'normalizado': normalizado[i, cols].tolist(),
+            'ipc': ipc[i, cols].tolist(),
+            'tc': tc[i, cols].tolist(),
+        }
+    return resultado
+
+
 @bp.route('/inflacion-dolares/products', methods=['GET'])
 def get_inflacion_dolares_products():
     """
@@ -196,78 +242,46 @@ def get_inflacion_dolares_products():
     Filtra por países configurados en filtros_graph_pais para id_graph=3 (Inflación en dólares).
     """
     try:
-        # Primero obtener los países permitidos desde filtros_graph_pais
+        # Una sola query: países permitidos (filtros_graph_pais, graph 3) con cotización
+        # USD/LC activa (id_variable = 20, siempre diaria) e IPC mensual con datos (id_variable = 9)
         try:
-            paises_permitidos_query = """
-                SELECT DISTINCT f.id_pais, pg.nombre_pais_grupo
+            query = """
+                SELECT 
+                    (m.id_variable * 10000 + m.id_pais) as id,
+                    v.id_nombre_variable as nombre,
+                    pg.nombre_pais_grupo as pais,
+                    m.fuente,
+                    m.id_pais
                 FROM filtros_graph_pais f
-                LEFT JOIN pais_grupo pg ON f.id_pais = pg.id_pais
+                INNER JOIN pais_grupo pg ON f.id_pais = pg.id_pais
+                INNER JOIN maestro m ON m.id_pais = f.id_pais
+                LEFT JOIN variables v ON m.id_variable = v.id_variable
                 WHERE f.id_graph = 3
+                AND m.id_variable = 20
+                AND (m.activo = 1 OR CAST(m.activo AS INTEGER) = 1)
+                AND EXISTS (
+                    SELECT 1
+                    FROM maestro ipc
+                    INNER JOIN maestro_precios mp ON ipc.id_variable = mp.id_variable AND ipc.id_pais = mp.id_pais
+                    WHERE ipc.id_pais = f.id_pais
+                    AND ipc.id_variable = 9
+                    AND ipc.periodicidad = 'M'
+                )
                 ORDER BY pg.nombre_pais_grupo
             """
-            paises_permitidos = execute_query(paises_permitidos_query)
+            disponibles = execute_query(query)
         except Exception as e:
-            print(f"[ERROR] inflacion-dolares/products: Error al obtener países permitidos: {str(e)}")
+            print(f"[ERROR] inflacion-dolares/products: Error al obtener países disponibles: {str(e)}")
             return jsonify({'error': 'No se pudo obtener países permitidos desde filtros_graph_pais'}), 500
         
-        if not paises_permitidos:
-            print("[DEBUG] inflacion-dolares/products: No hay países configurados en filtros_graph_pais para graph 3")
-            return jsonify([])
-        
-        print(f"[DEBUG] inflacion-dolares/products: {len(paises_permitidos)} países en filtros_graph_pais para graph 3")
-        
         results = []
         paises_procesados = set()  # Para evitar duplicados por id_pais
-        
-        # Para cada país permitido, buscar una cotización y verificar IPC
-        for pais_filtro in paises_permitidos:
-            id_pais = pais_filtro['id_pais']
-            nombre_pais = pais_filtro.get('nombre_pais_grupo', '')
-            
-            if not nombre_pais or id_pais in paises_procesados:
+        for row in disponibles:
+            id_pais = row.pop('id_pais')
+            if not row.get('pais') or id_pais in paises_procesados:
                 continue
-            
-            # Buscar cotización USD/LC para este país (id_variable = 20, siempre diaria)
-            query_cotizacion = """
-                SELECT 
-                    (m.id_variable * 10000 + m.id_pais) as id,
-                    v.id_nombre_variable as nombre,
-                    pg.nombre_pais_grupo as pais,
-                    m.fuente
-                FROM maestro m
-                LEFT JOIN variables v ON m.id_variable = v.id_variable
-                LEFT JOIN pais_grupo pg ON m.id_pais = pg.id_pais
-                WHERE m.id_pais = ?
-                AND m.id_variable = 20
-                AND (m.activo = 1 OR CAST(m.activo AS INTEGER) = 1)
-                LIMIT 1
-            """
-            cotizacion = execute_query_single(query_cotizacion, (id_pais,))
-            
-            if not cotizacion:
-                print(f"[DEBUG] inflacion-dolares/products: No se encontró cotización para país id={id_pais} ({nombre_pais})")
-                continue
-            
-            # Verificar si existe IPC para este país
-            # Buscar por id_variable = 9 (IPC) y id_pais, y verificar que tenga datos
-            query_ipc = """
-                SELECT COUNT(mp.fecha) as cantidad_datos
-                FROM maestro ipc
-                LEFT JOIN maestro_precios mp ON ipc.id_variable = mp.id_variable AND ipc.id_pais = mp.id_pais
-                WHERE ipc.id_pais = ?
-                AND ipc.id_variable = 9
-                AND ipc.periodicidad = 'M'
-            """
-            ipc_result = execute_query_single(query_ipc, (id_pais,))
-            
-            cantidad_datos = ipc_result.get('cantidad_datos', 0) if ipc_result else 0
-            
-            if cantidad_datos > 0:
-                results.append(cotizacion)
-                paises_procesados.add(id_pais)
-                print(f"[DEBUG] inflacion-dolares/products: Agregado país id={id_pais} ({nombre_pais}) - IPC con {cantidad_datos} datos")
-            else:
-                print(f"[DEBUG] inflacion-dolares/products: No se encontró IPC con datos para país id={id_pais} ({nombre_pais})")
+            results.append(row)
+            paises_procesados.add(id_pais)
         
         print(f"[DEBUG] inflacion-dolares/products: {len(results)} países con cotización e IPC disponible")
         return jsonify(results)
@@ -349,9 +363,13 @@ def get_inflacion_dolares():
         # Extraer id_pais de los países seleccionados
         id_paises_seleccionados = [id_pais for _, id_pais in fks_list]
         
-        # Obtener todos los TC de una vez (más eficiente: 1 query en lugar de N)
+        # Obtener todos los TC e IPC de una vez (1 query cada uno en lugar de N)
         all_tc_monthly = get_all_tc_monthly(id_paises_seleccionados, fecha_desde, fecha_hasta)
-        print(f"[DEBUG] inflacion-dolares: TC obtenidos para {len(all_tc_monthly)} países")
+        all_ipc_monthly = get_all_ipc_monthly(id_paises_seleccionados, fecha_desde, fecha_hasta)
+        print(f"[DEBUG] inflacion-dolares: TC obtenidos para {len(all_tc_monthly)} países, IPC para {len(all_ipc_monthly)} países")
+        
+        # Índice (IPC / TC) para todos los países sobre la matriz país×mes
+        indices_by_pais = calcular_indices_dolares(id_paises_seleccionados, all_ipc_monthly, all_tc_monthly)
         
         # Procesar cada país
         for product in products:
@@ -360,68 +378,23 @@ def get_inflacion_dolares():
             pais = product.get('pais', '')
             product_source = product.get('fuente', '')
             product_unidad = product.get('unidad', '')
-            
-            # Obtener TC mensual del país desde el dict
             id_pais_product = product_id % 10000
-            tc_monthly = all_tc_monthly.get(id_pais_product, {})
             
-            if not tc_monthly:
+            if not all_tc_monthly.get(id_pais_product):
                 print(f"[DEBUG] inflacion-dolares: No se encontró TC para id_pais={id_pais_product} ({pais})")
                 continue
-            
-            print(f"[DEBUG] inflacion-dolares: TC encontrado para {pais}: {len(tc_monthly)} meses")
-            
-            # Obtener IPC mensual del país
-            ipc_monthly = get_ipc_by_country(id_pais_product, fecha_desde, fecha_hasta)
-            
-            if not ipc_monthly:
+            if not all_ipc_monthly.get(id_pais_product):
                 print(f"[DEBUG] inflacion-dolares: No se encontró IPC para id_pais={id_pais_product} ({pais})")
                 continue
             
-            print(f"[DEBUG] inflacion-dolares: IPC encontrado para {pais}: {len(ipc_monthly)} meses")
-            
-            # Debug: mostrar fechas disponibles
-            if tc_monthly:
-                tc_fechas = sorted(tc_monthly.keys())
-                print(f"[DEBUG] inflacion-dolares: TC fechas disponibles: {tc_fechas[0] if tc_fechas else 'N/A'} a {tc_fechas[-1] if tc_fechas else 'N/A'}")
-            if ipc_monthly:
-                ipc_fechas = sorted(ipc_monthly.keys())
-                print(f"[DEBUG] inflacion-dolares: IPC fechas disponibles: {ipc_fechas[0] if ipc_fechas else 'N/A'} a {ipc_fechas[-1] if ipc_fechas else 'N/A'}")
-            
-            # Calcular índice: (IPC / TC)
-            indices = []
-            for mes_fecha, tc_valor in tc_monthly.items():
-                if mes_fecha in ipc_monthly:
-                    ipc_valor = ipc_monthly[mes_fecha]
-                    if tc_valor > 0:  # Evitar división por cero en TC
-                        indice_valor = ipc_valor / tc_valor
-                        indices.append({'fecha': mes_fecha, 'valor': indice_valor})
-                else:
-                    print(f"[DEBUG] inflacion-dolares: Mes {mes_fecha} tiene TC pero no IPC")
-            
-            # Verificar meses con IPC pero sin TC
-            for mes_fecha in ipc_monthly.keys():
-                if mes_fecha not in tc_monthly:
-                    print(f"[DEBUG] inflacion-dolares: Mes {mes_fecha} tiene IPC pero no TC")
-            
-            if len(indices) < 2:
-                continue
-            
-            # Ordenar por fecha
-            indices.sort(key=lambda x: x['fecha'])
-            
-            # Normalizar a base 100 (primer valor = 100)
-            first_value = indices[0]['valor']
-            if first_value == 0 or first_value is None:
+            indices = indices_by_pais.get(id_pais_product)
+            if not indices:
                 continue
             
-            factor = 100.0 / first_value
+            fechas_iso = [f.isoformat() for f in indices['fechas']]
             indices_normalized = [
-                {
-                    'fecha': idx['fecha'].isoformat() if isinstance(idx['fecha'], date) else idx['fecha'],
-                    'valor': idx['valor'] * factor
-                }
-                for idx in indices
+                {'fecha': fecha, 'valor': valor}
+                for fecha, valor in zip(fechas_iso, indices['normalizado'])
             ]
             
             # Calcular variaciones
@@ -429,22 +402,16 @@ def get_inflacion_dolares():
             indice_final = indices_normalized[-1]['valor']
             variacion_indice = ((indice_final / indice_inicial) - 1.0) * 100 if indice_inicial > 0 else 0.0
             
-            # Variación TC (usar fechas originales de indices, no normalizados)
-            fecha_inicial_obj = indices[0]['fecha']
-            fecha_final_obj = indices[-1]['fecha']
-            tc_inicial = tc_monthly[fecha_inicial_obj]
-            tc_final = tc_monthly[fecha_final_obj]
+            # Variación TC
+            tc_inicial = indices['tc'][0]
+            tc_final = indices['tc'][-1]
             variacion_tc = ((tc_final / tc_inicial) - 1.0) * 100 if tc_inicial > 0 else 0.0
             
             # Variación IPC (inflación)
-            ipc_inicial = ipc_monthly[fecha_inicial_obj]
-            ipc_final = ipc_monthly[fecha_final_obj]
+            ipc_inicial = indices['ipc'][0]
+            ipc_final = indices['ipc'][-1]
             variacion_ipc = ((ipc_final / ipc_inicial) - 1.0) * 100 if ipc_inicial > 0 else 0.0
             
-            # Fechas del intervalo real (convertir a ISO string)
-            fecha_inicial = fecha_inicial_obj.isoformat() if isinstance(fecha_inicial_obj, date) else fecha_inicial_obj
-            fecha_final = fecha_final_obj.isoformat() if isinstance(fecha_final_obj, date) else fecha_final_obj
-            
             result.append({
                 'product_id': product_id,
                 'product_name': product_name,
@@ -458,8 +425,8 @@ def get_inflacion_dolares():
                     'variacion_indice': variacion_indice,  # Inflación en dólares
                     'variacion_tc': variacion_tc,
                     'variacion_ipc': variacion_ipc,
-                    'fecha_inicial': fecha_inicial,
-                    'fecha_final': fecha_final
+                    'fecha_inicial': fechas_iso[0],
+                    'fecha_final': fechas_iso[-1]
                 }
             })
         
@@ -537,8 +504,10 @@ def export_inflacion_dolares_to_excel():
         # Extraer id_pais de los países seleccionados
         id_paises_seleccionados = [id_pais for _, id_pais in fks_list]
         
-        # Obtener todos los TC de una vez
+        # Obtener todos los TC e IPC de una vez
         all_tc_monthly = get_all_tc_monthly(id_paises_seleccionados, fecha_desde, fecha_hasta)
+        all_ipc_monthly = get_all_ipc_monthly(id_paises_seleccionados, fecha_desde, fecha_hasta)
+        indices_by_pais = calcular_indices_dolares(id_paises_seleccionados, all_ipc_monthly, all_tc_monthly)
         
         # Almacenar datos para las 3 hojas
         all_indices_normalized = {}  # {pais_id: [(fecha, valor), ...]}
@@ -550,214 +519,70 @@ def export_inflacion_dolares_to_excel():
         # Procesar cada país
         for product in products:
             product_id = product['id']
-            product_name = product['nombre']
             pais = product.get('pais', '')
             id_pais_product = product_id % 10000
             pais_names[id_pais_product] = pais
             
-            # Obtener TC mensual del país
             tc_monthly = all_tc_monthly.get(id_pais_product, {})
-            if not tc_monthly:
-                continue
-            
-            # Obtener IPC mensual del país
-            ipc_monthly = get_ipc_by_country(id_pais_product, fecha_desde, fecha_hasta)
-            if not ipc_monthly:
+            ipc_monthly = all_ipc_monthly.get(id_pais_product, {})
+            if not tc_monthly or not ipc_monthly:
                 continue
             
             # Guardar datos originales (IPC y TC)
-            all_ipc_data[id_pais_product] = sorted([(fecha, valor) for fecha, valor in ipc_monthly.items()])
-            all_tc_data[id_pais_product] = sorted([(fecha, valor) for fecha, valor in tc_monthly.items()])
-            
-            # Calcular índice original: (IPC / TC)
-            indices_orig = []
-            for mes_fecha, tc_valor in tc_monthly.items():
-                if mes_fecha in ipc_monthly:
-                    ipc_valor = ipc_monthly[mes_fecha]
-                    if tc_valor > 0:
-                        indice_valor = ipc_valor / tc_valor
-                        indices_orig.append((mes_fecha, indice_valor))
+            all_ipc_data[id_pais_product] = sorted(ipc_monthly.items())
+            all_tc_data[id_pais_product] = sorted(tc_monthly.items())
             
-            if len(indices_orig) < 2:
+            indices = indices_by_pais.get(id_pais_product)
+            if not indices:
                 continue
-            
-            indices_orig.sort(key=lambda x: x[0])
-            all_indices_original[id_pais_product] = indices_orig
-            
-            # Normalizar a base 100
-            first_value = indices_orig[0][1]
-            if first_value == 0 or first_value is None:
-                continue
-            
-            factor = 100.0 / first_value
-            indices_norm = [(fecha, valor * factor) for fecha, valor in indices_orig]
-            all_indices_normalized[id_pais_product] = indices_norm
-        
-        # Crear Excel
-        wb = Workbook()
+            all_indices_original[id_pais_product] = list(zip(indices['fechas'], indices['original']))
+            all_indices_normalized[id_pais_product] = list(zip(indices['fechas'], indices['normalizado']))
         
-        # Estilos
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        data_alignment = Alignment(horizontal="right", vertical="center")
+        # Crear Excel (write-only: las filas se generan y vuelcan de a una)
+        xlsx = StreamingWorkbook()
         
         # Hoja 1: Índice Normalizado
-        ws1 = wb.active
-        ws1.title = "Índice Normalizado"
-        
-        ws1['A1'] = 'Fecha'
-        ws1['A1'].fill = header_fill
-        ws1['A1'].font = header_font
-        ws1['A1'].alignment = header_alignment
-        
-        col = 2
-        for pais_id in sorted(all_indices_normalized.keys()):
-            cell = ws1.cell(row=1, column=col)
-            cell.value = pais_names[pais_id]
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            col += 1
-        
-        # Obtener todas las fechas únicas
-        all_dates = set()
-        for indices in all_indices_normalized.values():
-            all_dates.update([idx[0] for idx in indices])
-        sorted_dates = sorted(all_dates)
-        
-        # Escribir datos
-        row = 2
-        for fecha in sorted_dates:
-            ws1.cell(row=row, column=1).value = fecha
-            col = 2
-            for pais_id in sorted(all_indices_normalized.keys()):
-                indices = all_indices_normalized[pais_id]
-                valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-                if valor is not None:
-                    cell = ws1.cell(row=row, column=col)
-                    cell.value = valor
-                    cell.number_format = '0.00'
-                    cell.alignment = data_alignment
-                col += 1
-            row += 1
+        ids_normalizados = sorted(all_indices_normalized.keys())
+        xlsx.add_sheet(
+            "Índice Normalizado",
+            ['Fecha'] + [pais_names[pais_id] for pais_id in ids_normalizados],
+            pivot_por_fecha([all_indices_normalized[pais_id] for pais_id in ids_normalizados]),
+            column_styles=[None], default_style=NUMBER_STYLE,
+            header_style=HEADER_LARGE_STYLE,
+        )
         
         # Hoja 2: Índice Original
-        ws2 = wb.create_sheet("Índice Original")
-        
-        ws2['A1'] = 'Fecha'
-        ws2['A1'].fill = header_fill
-        ws2['A1'].font = header_font
-        ws2['A1'].alignment = header_alignment
-        
-        col = 2
-        for pais_id in sorted(all_indices_original.keys()):
-            cell = ws2.cell(row=1, column=col)
-            cell.value = pais_names[pais_id]
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            col += 1
-        
-        all_dates_orig = set()
-        for indices in all_indices_original.values():
-            all_dates_orig.update([idx[0] for idx in indices])
-        sorted_dates_orig = sorted(all_dates_orig)
-        
-        row = 2
-        for fecha in sorted_dates_orig:
-            ws2.cell(row=row, column=1).value = fecha
-            col = 2
-            for pais_id in sorted(all_indices_original.keys()):
-                indices = all_indices_original[pais_id]
-                valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-                if valor is not None:
-                    cell = ws2.cell(row=row, column=col)
-                    cell.value = valor
-                    cell.number_format = '0.00'
-                    cell.alignment = data_alignment
-                col += 1
-            row += 1
+        ids_originales = sorted(all_indices_original.keys())
+        xlsx.add_sheet(
+            "Índice Original",
+            ['Fecha'] + [pais_names[pais_id] for pais_id in ids_originales],
+            pivot_por_fecha([all_indices_original[pais_id] for pais_id in ids_originales]),
+            column_styles=[None], default_style=NUMBER_STYLE,
+            header_style=HEADER_LARGE_STYLE,
+        )
         
         # Hoja 3: Datos Originales (IPC y TC)
-        ws3 = wb.create_sheet("Datos Originales")
-        ws3['A1'] = 'Fecha'
-        ws3['A1'].fill = header_fill
-        ws3['A1'].font = header_font
-        ws3['A1'].alignment = header_alignment
-        
         # Encabezados: IPC y TC para cada país
-        col = 2
-        pais_cols = {}
-        for pais_id in sorted(set(list(all_ipc_data.keys()) + list(all_tc_data.keys()))):
-            # IPC
-            ipc_col = col
-            cell = ws3.cell(row=1, column=ipc_col)
-            cell.value = f'IPC {pais_names[pais_id]}'
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            col += 1
-            
-            # TC
-            tc_col = col
-            cell = ws3.cell(row=1, column=tc_col)
-            cell.value = f'TC USD/LC {pais_names[pais_id]}'
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            col += 1
-            
-            pais_cols[pais_id] = {'ipc': ipc_col, 'tc': tc_col}
-        
-        # Obtener todas las fechas
-        all_dates_raw = set()
-        for data in all_ipc_data.values():
-            all_dates_raw.update([d[0] for d in data])
-        for data in all_tc_data.values():
-            all_dates_raw.update([d[0] for d in data])
-        sorted_dates_raw = sorted(all_dates_raw)
-        
-        row = 2
-        for fecha in sorted_dates_raw:
-            ws3.cell(row=row, column=1).value = fecha
-            
-            for pais_id in sorted(pais_cols.keys()):
-                cols = pais_cols[pais_id]
-                
-                # IPC
-                ipc_valor = next((d[1] for d in all_ipc_data.get(pais_id, []) if d[0] == fecha), None)
-                if ipc_valor is not None:
-                    cell = ws3.cell(row=row, column=cols['ipc'])
-                    cell.value = ipc_valor
-                    cell.number_format = '0.00'
-                    cell.alignment = data_alignment
-                
-                # TC
-                tc_valor = next((d[1] for d in all_tc_data.get(pais_id, []) if d[0] == fecha), None)
-                if tc_valor is not None:
-                    cell = ws3.cell(row=row, column=cols['tc'])
-                    cell.value = tc_valor
-                    cell.number_format = '0.00'
-                    cell.alignment = data_alignment
-            
-            row += 1
-        
-        # Guardar en memoria
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
+        ids_datos = sorted(set(list(all_ipc_data.keys()) + list(all_tc_data.keys())))
+        headers_datos = ['Fecha']
+        columnas_datos = []
+        for pais_id in ids_datos:
+            headers_datos.extend([f'IPC {pais_names[pais_id]}', f'TC USD/LC {pais_names[pais_id]}'])
+            columnas_datos.extend([all_ipc_data.get(pais_id, []), all_tc_data.get(pais_id, [])])
+        
+        xlsx.add_sheet(
+            "Datos Originales",
+            headers_datos,
+            pivot_por_fecha(columnas_datos),
+            column_styles=[None], default_style=NUMBER_STYLE,
+            header_style=HEADER_LARGE_STYLE,
+        )
         
         # Generar nombre de archivo
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f'inflacion_dolares_{timestamp}.xlsx'
         
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return xlsx.response(filename)
     
     except ValueError as e:
         return jsonify({'error': f'Error en formato de fecha: {str(e)}'}), 400
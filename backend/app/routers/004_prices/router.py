@@ -2,11 +2,10 @@
 import importlib
 from datetime import date, datetime
 from typing import List, Optional
-from io import BytesIO
-from flask import Blueprint, request, jsonify, abort, send_file
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from ...database import execute_query, execute_query_single
+from flask import Blueprint, request, jsonify, abort
+from ...database import execute_query, execute_query_single, iter_query_chunks
+from ...serialization import wants_columnar, columnarize, json_response
+from ...xlsx_export import StreamingWorkbook, Styled, pivot_por_fecha, HEADER_LARGE_STYLE, NUMBER_STYLE, VALUE_STYLE, BOLD_STYLE
 
 # Import from numbered module using importlib
 _dcp_module = importlib.import_module('app.routers.001_dcp.router')
@@ -277,6 +276,8 @@ def get_multiple_products_prices():
         
         result_list.append(product_data)
     
+    if wants_columnar():
+        return json_response(columnarize(result_list))
     return jsonify(result_list)
 
 
@@ -579,14 +580,6 @@ def export_variations_to_excel():
     if not ipc_monthly:
         abort(400, description="IPC data not available for the selected date range")
     
-    # Estilos
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    data_alignment = Alignment(horizontal="right", vertical="center")
-    
-    wb = Workbook()
-    
     # Datos para las hojas
     summary_data = []  # Resumen variaciones
     all_indices_calculated = {}  # {product_id: [(fecha, indice), ...]}
@@ -780,262 +773,90 @@ def export_variations_to_excel():
     # Ordenar resumen
     summary_data.sort(key=lambda x: x['variacion_percent'], reverse=(order_by == 'desc'))
     
+    # Crear Excel (write-only: las filas se generan y vuelcan de a una)
+    xlsx = StreamingWorkbook()
+    
     # Hoja 1: Resumen Variaciones
-    ws1 = wb.active
-    ws1.title = "Resumen Variaciones"
-    
-    headers1 = ['Producto', 'Unidad', 'Variación %', 'Índice Inicial', 'Índice Final', 'Fecha Inicial', 'Fecha Final']
-    for col, header in enumerate(headers1, 1):
-        cell = ws1.cell(row=1, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    for row_idx, item in enumerate(summary_data, 2):
-        ws1.cell(row=row_idx, column=1).value = item['nombre']
-        ws1.cell(row=row_idx, column=2).value = item['unidad'] or ''
-        ws1.cell(row=row_idx, column=3).value = item['variacion_percent']
-        ws1.cell(row=row_idx, column=3).number_format = '0.00'
-        ws1.cell(row=row_idx, column=4).value = item['indice_inicial']
-        ws1.cell(row=row_idx, column=4).number_format = '0.00'
-        ws1.cell(row=row_idx, column=5).value = item['indice_final']
-        ws1.cell(row=row_idx, column=5).number_format = '0.00'
-        ws1.cell(row=row_idx, column=6).value = item['fecha_inicial']
-        ws1.cell(row=row_idx, column=7).value = item['fecha_final']
-        ws1.cell(row=row_idx, column=4).alignment = data_alignment
-        ws1.cell(row=row_idx, column=5).alignment = data_alignment
-        ws1.cell(row=row_idx, column=3).alignment = data_alignment
+    xlsx.add_sheet(
+        "Resumen Variaciones",
+        ['Producto', 'Unidad', 'Variación %', 'Índice Inicial', 'Índice Final', 'Fecha Inicial', 'Fecha Final'],
+        ([
+            item['nombre'],
+            item['unidad'] or '',
+            item['variacion_percent'],
+            item['indice_inicial'],
+            item['indice_final'],
+            item['fecha_inicial'],
+            item['fecha_final'],
+        ] for item in summary_data),
+        column_styles=[None, None, NUMBER_STYLE, NUMBER_STYLE, NUMBER_STYLE, None, None],
+        widths=[15], default_width=25,
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 2: Índices Calculados (filtrados)
-    ws2 = wb.create_sheet("Índices Calculados")
-    ws2['A1'] = 'Fecha'
-    ws2['A1'].fill = header_fill
-    ws2['A1'].font = header_font
-    ws2['A1'].alignment = header_alignment
-    
-    col = 2
-    for product_id in sorted(all_indices_calculated.keys()):
-        cell = ws2.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        col += 1
-    
-    all_dates_calc = set()
-    for indices in all_indices_calculated.values():
-        all_dates_calc.update([idx[0] for idx in indices])
-    sorted_dates_calc = sorted(all_dates_calc)
-    
-    row = 2
-    for fecha in sorted_dates_calc:
-        ws2.cell(row=row, column=1).value = fecha
-        col = 2
-        for product_id in sorted(all_indices_calculated.keys()):
-            indices = all_indices_calculated[product_id]
-            valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-            if valor is not None:
-                cell = ws2.cell(row=row, column=col)
-                cell.value = valor
-                cell.number_format = '0.00'
-                cell.alignment = data_alignment
-            col += 1
-        row += 1
+    ids_calculados = sorted(all_indices_calculated.keys())
+    xlsx.add_sheet(
+        "Índices Calculados",
+        ['Fecha'] + [product_names[pid] for pid in ids_calculados],
+        pivot_por_fecha([all_indices_calculated[pid] for pid in ids_calculados]),
+        column_styles=[None], default_style=NUMBER_STYLE,
+        widths=[15], default_width=25,
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 3: Índices Originales (todos los calculados)
-    ws3 = wb.create_sheet("Índices Originales")
-    ws3['A1'] = 'Fecha'
-    ws3['A1'].fill = header_fill
-    ws3['A1'].font = header_font
-    ws3['A1'].alignment = header_alignment
-    
-    col = 2
-    for product_id in sorted(all_indices_original.keys()):
-        cell = ws3.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        col += 1
-    
-    all_dates_orig = set()
-    for indices in all_indices_original.values():
-        all_dates_orig.update([idx[0] for idx in indices])
-    sorted_dates_orig = sorted(all_dates_orig)
-    
-    row = 2
-    for fecha in sorted_dates_orig:
-        ws3.cell(row=row, column=1).value = fecha
-        col = 2
-        for product_id in sorted(all_indices_original.keys()):
-            indices = all_indices_original[product_id]
-            valor = next((idx[1] for idx in indices if idx[0] == fecha), None)
-            if valor is not None:
-                cell = ws3.cell(row=row, column=col)
-                cell.value = valor
-                cell.number_format = '0.00'
-                cell.alignment = data_alignment
-            col += 1
-        row += 1
+    ids_originales = sorted(all_indices_original.keys())
+    xlsx.add_sheet(
+        "Índices Originales",
+        ['Fecha'] + [product_names[pid] for pid in ids_originales],
+        pivot_por_fecha([all_indices_original[pid] for pid in ids_originales]),
+        column_styles=[None], default_style=NUMBER_STYLE,
+        widths=[15], default_width=25,
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 4: Precios Originales (con componentes: productos, IPC, TC USD/UYU, TC EUR/UYU)
-    ws4 = wb.create_sheet("Precios Originales")
-    ws4['A1'] = 'Fecha'
-    ws4['A1'].fill = header_fill
-    ws4['A1'].font = header_font
-    ws4['A1'].alignment = header_alignment
-    
-    # Encabezados: primero productos, luego IPC, TC USD/UYU, TC EUR/UYU
-    col = 2
-    for product_id in sorted(all_prices_original.keys()):
-        cell = ws4.cell(row=1, column=col)
-        cell.value = product_names[product_id]
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        col += 1
-    
-    # Agregar IPC
-    ws4.cell(row=1, column=col).value = 'IPC'
-    ws4.cell(row=1, column=col).fill = header_fill
-    ws4.cell(row=1, column=col).font = header_font
-    ws4.cell(row=1, column=col).alignment = header_alignment
-    ipc_col = col
-    col += 1
-    
-    # Agregar TC USD/UYU
-    ws4.cell(row=1, column=col).value = 'TC USD/UYU'
-    ws4.cell(row=1, column=col).fill = header_fill
-    ws4.cell(row=1, column=col).font = header_font
-    ws4.cell(row=1, column=col).alignment = header_alignment
-    tc_usd_col = col
-    col += 1
-    
-    # Agregar TC EUR/UYU
-    ws4.cell(row=1, column=col).value = 'TC EUR/UYU'
-    ws4.cell(row=1, column=col).fill = header_fill
-    ws4.cell(row=1, column=col).font = header_font
-    ws4.cell(row=1, column=col).alignment = header_alignment
-    tc_eur_col = col
-    
-    # Obtener todas las fechas (de precios, IPC y TC)
-    all_dates_prices = set()
-    for prices in all_prices_original.values():
-        all_dates_prices.update([p[0] for p in prices])
-    all_dates_prices.update(ipc_monthly.keys())
-    all_dates_prices.update(tc_usd_monthly.keys())
-    all_dates_prices.update(tc_eur_monthly.keys())
-    sorted_dates_prices = sorted(all_dates_prices)
-    
-    row = 2
-    for fecha in sorted_dates_prices:
-        ws4.cell(row=row, column=1).value = fecha
-        
-        # Escribir precios de productos
-        col = 2
-        for product_id in sorted(all_prices_original.keys()):
-            prices = all_prices_original[product_id]
-            valor = next((p[1] for p in prices if p[0] == fecha), None)
-            if valor is not None:
-                cell = ws4.cell(row=row, column=col)
-                cell.value = valor
-                cell.number_format = '0.00'
-                cell.alignment = data_alignment
-            col += 1
-        
-        # Escribir IPC
-        ipc_valor = ipc_monthly.get(fecha)
-        if ipc_valor is not None:
-            cell = ws4.cell(row=row, column=ipc_col)
-            cell.value = ipc_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        # Escribir TC USD/UYU
-        tc_usd_valor = tc_usd_monthly.get(fecha)
-        if tc_usd_valor is not None:
-            cell = ws4.cell(row=row, column=tc_usd_col)
-            cell.value = tc_usd_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        # Escribir TC EUR/UYU
-        tc_eur_valor = tc_eur_monthly.get(fecha)
-        if tc_eur_valor is not None:
-            cell = ws4.cell(row=row, column=tc_eur_col)
-            cell.value = tc_eur_valor
-            cell.number_format = '0.00'
-            cell.alignment = data_alignment
-        
-        row += 1
+    ids_precios = sorted(all_prices_original.keys())
+    
+    # Fechas: unión de precios, IPC y TC
+    xlsx.add_sheet(
+        "Precios Originales",
+        ['Fecha'] + [product_names[pid] for pid in ids_precios] + ['IPC', 'TC USD/UYU', 'TC EUR/UYU'],
+        pivot_por_fecha([all_prices_original[pid] for pid in ids_precios] + [ipc_monthly, tc_usd_monthly, tc_eur_monthly]),
+        column_styles=[None], default_style=NUMBER_STYLE,
+        # Fecha, productos y luego IPC, TC USD/UYU, TC EUR/UYU
+        widths=[15] + [25] * len(ids_precios) + [15, 15, 15],
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Hoja 5: Metadatos
-    ws5 = wb.create_sheet("Metadatos")
-    ws5['A1'] = 'Campo'
-    ws5['A1'].fill = header_fill
-    ws5['A1'].font = header_font
-    ws5['B1'] = 'Valor'
-    ws5['B1'].fill = header_fill
-    ws5['B1'].font = header_font
-    
-    metadata = [
-        ('Fecha de exportación', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
-        ('Rango de fechas', f'{fecha_desde} a {fecha_hasta}'),
-        ('Productos incluidos', ', '.join([product_names[pid] for pid in sorted(all_indices_calculated.keys())])),
-        ('Productos omitidos', ', '.join([p['nombre'] for p in omitted_products]) if omitted_products else 'Ninguno'),
-        ('Fórmula aplicada', 'Precio internacional × TC / IPC'),
-    ]
-    
-    row = 2
-    for campo, valor in metadata:
-        ws5.cell(row=row, column=1).value = campo
-        ws5.cell(row=row, column=2).value = valor
-        row += 1
-    
-    # Agregar razones de omisión
-    if omitted_products:
-        ws5.cell(row=row, column=1).value = 'Razones de omisión'
-        ws5.cell(row=row, column=1).font = Font(bold=True)
-        row += 1
-        for omitted in omitted_products:
-            ws5.cell(row=row, column=1).value = omitted['nombre']
-            ws5.cell(row=row, column=2).value = omitted['razon']
-            row += 1
-    
-    # Ajustar anchos de columna
-    for ws in [ws1, ws2, ws3]:
-        ws.column_dimensions['A'].width = 15
-        for col in range(2, len(all_indices_calculated) + 2):
-            ws.column_dimensions[chr(64 + col)].width = 25
-    
-    # Para ws4 (Precios Originales), ajustar considerando productos + IPC + TC USD + TC EUR
-    ws4.column_dimensions['A'].width = 15
-    num_product_cols = len(all_prices_original)
-    for col in range(2, num_product_cols + 2):
-        ws4.column_dimensions[chr(64 + col)].width = 25
-    # IPC, TC USD/UYU, TC EUR/UYU
-    for col in range(num_product_cols + 2, num_product_cols + 5):
-        ws4.column_dimensions[chr(64 + col)].width = 15
-    
-    ws5.column_dimensions['A'].width = 30
-    ws5.column_dimensions['B'].width = 50
-    
-    # Guardar a BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
+    def filas_metadatos():
+        yield ('Fecha de exportación', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        yield ('Rango de fechas', f'{fecha_desde} a {fecha_hasta}')
+        yield ('Productos incluidos', ', '.join([product_names[pid] for pid in ids_calculados]))
+        yield ('Productos omitidos', ', '.join([p['nombre'] for p in omitted_products]) if omitted_products else 'Ninguno')
+        yield ('Fórmula aplicada', 'Precio internacional × TC / IPC')
+        
+        # Agregar razones de omisión
+        if omitted_products:
+            yield (Styled('Razones de omisión', BOLD_STYLE),)
+            for omitted in omitted_products:
+                yield (omitted['nombre'], omitted['razon'])
+    
+    xlsx.add_sheet(
+        "Metadatos",
+        ['Campo', 'Valor'],
+        filas_metadatos(),
+        widths=[30, 50],
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Nombre de archivo
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f'variaciones_dcp_{timestamp}.xlsx'
     
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
-    )
+    return xlsx.response(filename)
 
 
 @bp.route('/stats/<int:product_id>', methods=['GET'])
@@ -1227,77 +1048,27 @@ def export_prices_to_excel():
         """
         params = tuple(fks_params)
 
-    results = execute_query(query, params)
-    
-    # Group by product
-    products_dict = {}
-    for row in results:
-        product_id = row['id']  # Synthetic ID: id_variable * 10000 + id_pais
-        if product_id not in products_dict:
-            products_dict[product_id] = {
-                'product_id': row['id'],
-                'product_name': row['nombre'],
-                'unit': None,  # unidad no existe en nuevo schema
-                'data': []
-            }
-        products_dict[product_id]['data'].append({
-            'fecha': row['fecha'],
-            'valor': row['valor']
-        })
-    
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Precios Corrientes"
-    
-    # Header style
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Data style
-    data_alignment = Alignment(horizontal="right", vertical="center")
-    
-    # Write headers
-    row = 1
-    ws['A1'] = 'Producto'
-    ws['B1'] = 'Unidad'
-    ws['C1'] = 'Fecha'
-    ws['D1'] = 'Precio'
-    
-    # Apply header styles
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Write data
-    row = 2
-    for product_id, product_data in products_dict.items():
-        product_name = product_data['product_name']
-        unit = product_data['unit'] or ''
-        
-        for price_data in product_data['data']:
-            ws[f'A{row}'] = product_name
-            ws[f'B{row}'] = unit
-            ws[f'C{row}'] = price_data['fecha']
-            ws[f'D{row}'] = price_data['valor']
-            
-            # Apply data alignment to price column
-            ws[f'D{row}'].alignment = data_alignment
-            
-            row += 1
-    
-    # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 30
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 15
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
+    def filas_precios():
+        # Filas ya ordenadas por producto y fecha: se escriben a medida que llegan los bloques
+        for chunk in iter_query_chunks(query, params):
+            for row in chunk:
+                yield [
+                    row['nombre'],
+                    '',  # unidad no existe en nuevo schema
+                    row['fecha'],
+                    row['valor'],
+                ]
+    
+    # Create Excel workbook (write-only)
+    xlsx = StreamingWorkbook()
+    xlsx.add_sheet(
+        "Precios Corrientes",
+        ['Producto', 'Unidad', 'Fecha', 'Precio'],
+        filas_precios(),
+        column_styles=[None, None, None, VALUE_STYLE],
+        widths=[30, 15, 15, 15],
+        header_style=HEADER_LARGE_STYLE,
+    )
     
     # Generate filename
     fecha_str = ""
@@ -1310,9 +1081,4 @@ def export_prices_to_excel():
     
     filename = f"precios_corrientes{fecha_str}.xlsx"
     
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
-    )
+    return xlsx.response(filename)
@@ -3,6 +3,7 @@ from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
 from flask import Blueprint, request, jsonify
 from ...database import execute_query, execute_query_single
+from ...serialization import wants_columnar, columnarize, json_response
 
 bp = Blueprint('yield_curve', __name__)
 
@@ -493,6 +494,8 @@ def get_yield_curve_timeseries():
                 "data": data_points
             })
         
+        if wants_columnar():
+            return json_response({"data": columnarize(result_data)})
         return jsonify({"data": result_data})
     
     except Exception as e:
@@ -1,12 +1,11 @@
 """API routes for data export."""
+import csv
 from datetime import date, datetime
-from typing import List, Dict, Optional
-from io import BytesIO
-from flask import Blueprint, request, jsonify, send_file
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-import pandas as pd
-from ...database import execute_query, execute_query_single
+from typing import List, Dict, Optional, Iterator
+from io import StringIO
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from ...database import execute_query, execute_query_single, iter_query_chunks
+from ...xlsx_export import StreamingWorkbook
 
 bp = Blueprint('data_export', __name__)
 
@@ -210,18 +209,221 @@ def get_preview():
         return jsonify([])
 
 
+# Formatos de exportación en streaming (formato largo: una fila por variable/país/fecha)
+STREAM_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+STREAM_CHUNK_ROWS = 20000
+STREAM_COLUMNS = ['id_variable', 'variable', 'id_pais', 'pais', 'fecha', 'valor']
+
+
+class _StreamSink:
+    """Destino file-like para pyarrow: acumula lo escrito para enviarlo por partes en la respuesta."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _export_query_largo(variable_ids: List[int], pais_ids: List[int],
+                        fecha_desde: Optional[str], fecha_hasta: Optional[str]):
+    """Query en formato largo para la exportación en streaming (ordenada para lectura secuencial)."""
+    var_placeholders = ','.join(['?'] * len(variable_ids))
+    pais_placeholders = ','.join(['?'] * len(pais_ids))
+    params = list(variable_ids) + list(pais_ids)
+    where_clauses = [
+        f"mp.id_variable IN ({var_placeholders})",
+        f"mp.id_pais IN ({pais_placeholders})"
+    ]
+    if fecha_desde:
+        where_clauses.append("mp.fecha >= ?")
+        params.append(fecha_desde)
+    if fecha_hasta:
+        where_clauses.append("mp.fecha <= ?")
+        params.append(fecha_hasta)
+    query = f"""
+        SELECT
+            mp.id_variable,
+            v.id_nombre_variable as variable,
+            mp.id_pais,
+            pg.nombre_pais_grupo as pais,
+            DATE(mp.fecha) as fecha,
+            CAST(mp.valor AS DOUBLE PRECISION) as valor
+        FROM maestro_precios mp
+        LEFT JOIN variables v ON mp.id_variable = v.id_variable
+        LEFT JOIN pais_grupo pg ON mp.id_pais = pg.id_pais
+        WHERE {' AND '.join(where_clauses)}
+        ORDER BY mp.id_variable, mp.id_pais, mp.fecha
+    """
+    return query, tuple(params)
+
+
+def _stream_csv(chunks: Iterator[list]) -> Iterator[bytes]:
+    """Genera el CSV por bloques (encabezado + filas)."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STREAM_COLUMNS)
+    for rows in chunks:
+        for row in rows:
+            writer.writerow([row['id_variable'], row['variable'], row['id_pais'], row['pais'],
+                             row['fecha'].isoformat() if row['fecha'] else '', row['valor']])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+    resto = buffer.getvalue()
+    if resto:
+        yield resto.encode('utf-8')
+
+
+def _stream_arrow(chunks: Iterator[list], formato: str) -> Iterator[bytes]:
+    """Genera Parquet (un row group por bloque) o Arrow IPC stream (un record batch por bloque)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id_variable', pa.int32()),
+        ('variable', pa.string()),
+        ('id_pais', pa.int32()),
+        ('pais', pa.string()),
+        ('fecha', pa.date32()),
+        ('valor', pa.float64()),
+    ])
+    sink = _StreamSink()
+    if formato == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        write = writer.write_table
+        to_block = lambda batch: pa.Table.from_batches([batch])
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+        to_block = lambda batch: batch
+
+    try:
+        for rows in chunks:
+            batch = pa.RecordBatch.from_pydict(
+                {col: [row[col] for row in rows] for col in STREAM_COLUMNS},
+                schema=schema
+            )
+            write(to_block(batch))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def _stream_export_response(formato: str, variable_ids: List[int], pais_ids: List[int],
+                            fecha_desde: Optional[str], fecha_hasta: Optional[str]):
+    """Response en streaming leyendo la base con cursor del lado del servidor."""
+    if formato in ('parquet', 'arrow'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return jsonify({'error': f'Formato {formato} no disponible (falta pyarrow en el servidor)'}), 501
+
+    query, params = _export_query_largo(variable_ids, pais_ids, fecha_desde, fecha_hasta)
+    chunks = iter_query_chunks(query, params, chunk_size=STREAM_CHUNK_ROWS)
+    body = _stream_csv(chunks) if formato == 'csv' else _stream_arrow(chunks, formato)
+
+    mimetype, extension = STREAM_FORMATS[formato]
+    filename = f"exportacion_datos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+def _pivot_por_variable(chunks: Iterator[list]):
+    """
+    Agrupa filas ordenadas por variable en pivots fechas x países.
+    
+    Solo mantiene en memoria la variable en curso. Genera
+    (variable, paises, filas) con filas [fecha dd-mm-yyyy, valor país 1, ...].
+    """
+    def pivot(variable, valores):
+        paises = sorted({pais for por_pais in valores.values() for pais in por_pais})
+        filas = (
+            [fecha.strftime('%d-%m-%Y')] + [valores[fecha].get(pais) for pais in paises]
+            for fecha in sorted(valores)
+        )
+        return variable, paises, filas
+
+    variable_actual = None
+    valores = {}  # {fecha: {pais: valor}}
+    for rows in chunks:
+        for row in rows:
+            if row['variable'] != variable_actual:
+                if valores:
+                    yield pivot(variable_actual, valores)
+                variable_actual = row['variable']
+                valores = {}
+            if row['pais'] is None or row['valor'] is None:
+                continue
+            fecha = row['fecha']
+            if isinstance(fecha, datetime):
+                fecha = fecha.date()
+            # 'first' por si hay duplicados
+            valores.setdefault(fecha, {}).setdefault(row['pais'], float(row['valor']))
+    if valores:
+        yield pivot(variable_actual, valores)
+
+
 @bp.route('/export/download', methods=['GET'])
 def download_excel():
-    """Exporta datos a Excel en formato pivotado (fechas x países)."""
+    """
+    Exporta datos a Excel en formato pivotado (fechas x países).
+    
+    Con format=csv|parquet|arrow exporta en formato largo
+    (id_variable, variable, id_pais, pais, fecha, valor) en streaming.
+    """
     try:
         variable_ids = request.args.getlist('variable_ids[]', type=int)
         pais_ids = request.args.getlist('pais_ids[]', type=int)
         fecha_desde = request.args.get('fecha_desde')
         fecha_hasta = request.args.get('fecha_hasta')
+        formato = (request.args.get('format') or 'xlsx').lower()
         
         if not variable_ids or not pais_ids:
             return jsonify({'error': 'Se requieren variables y países'}), 400
         
+        if formato in STREAM_FORMATS:
+            return _stream_export_response(formato, variable_ids, pais_ids, fecha_desde, fecha_hasta)
+        if formato != 'xlsx':
+            return jsonify({'error': 'format debe ser xlsx, csv, parquet o arrow'}), 400
+        
         # Construir query
         var_placeholders = ','.join(['?'] * len(variable_ids))
         pais_placeholders = ','.join(['?'] * len(pais_ids))
@@ -253,73 +455,24 @@ def download_excel():
             ORDER BY v.id_nombre_variable, pg.nombre_pais_grupo, mp.fecha
         """
         
-        results = execute_query(query, tuple(params))
-        
-        # Convertir a DataFrame para hacer pivot
-        df = pd.DataFrame(results)
+        # Crear Excel write-only: una hoja por variable (fechas x países)
+        xlsx = StreamingWorkbook()
+        hojas = 0
+        chunks = iter_query_chunks(query, tuple(params), chunk_size=STREAM_CHUNK_ROWS)
+        for variable, paises, filas in _pivot_por_variable(chunks):
+            xlsx.add_sheet(
+                str(variable)[:31],  # Limitar nombre a 31 chars (límite de Excel)
+                ['Fecha'] + paises,
+                filas,
+                widths=[12], default_width=15,
+            )
+            hojas += 1
         
-        if df.empty:
+        if not hojas:
             return jsonify({'error': 'No hay datos para exportar'}), 400
         
-        # Crear Excel con pandas
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Agrupar por variable
-            for variable in df['variable'].unique():
-                df_var = df[df['variable'] == variable]
-                
-                # Pivot: fechas en filas, países en columnas
-                df_pivot = df_var.pivot_table(
-                    index='fecha',
-                    columns='pais',
-                    values='valor',
-                    aggfunc='first'  # Por si hay duplicados
-                )
-                
-                # Resetear índice para que fecha sea columna
-                df_pivot = df_pivot.reset_index()
-                
-                # Convertir fecha a formato dd-mm-yyyy
-                df_pivot['fecha'] = pd.to_datetime(df_pivot['fecha']).dt.strftime('%d-%m-%Y')
-                
-                # Ordenar por fecha (convertir a datetime para ordenar, luego volver a string)
-                df_pivot['fecha_dt'] = pd.to_datetime(df_pivot['fecha'], format='%d-%m-%Y')
-                df_pivot = df_pivot.sort_values('fecha_dt')
-                df_pivot = df_pivot.drop('fecha_dt', axis=1)
-                
-                # Renombrar columna fecha a "Fecha"
-                df_pivot = df_pivot.rename(columns={'fecha': 'Fecha'})
-                
-                # Escribir a Excel
-                sheet_name = variable[:31]  # Limitar nombre a 31 chars (límite de Excel)
-                df_pivot.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Aplicar estilos a la hoja
-                worksheet = writer.sheets[sheet_name]
-                
-                # Estilo para headers
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                header_font = Font(bold=True, color="FFFFFF")
-                
-                for cell in worksheet[1]:
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = Alignment(horizontal="center")
-                
-                # Ajustar ancho de columnas
-                worksheet.column_dimensions['A'].width = 12  # Fecha
-                for col_idx, col in enumerate(df_pivot.columns[1:], start=2):
-                    col_letter = worksheet.cell(row=1, column=col_idx).column_letter
-                    worksheet.column_dimensions[col_letter].width = 15
-        
-        output.seek(0)
         filename = f"exportacion_datos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        return xlsx.response(filename)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -5,12 +5,176 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage, PageBreak
 from reportlab.lib import colors
+from collections import OrderedDict
+from functools import lru_cache
 from io import BytesIO
 from datetime import datetime
-import matplotlib
-matplotlib.use('Agg')  # Backend sin GUI
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
+import hashlib
+import json
+import threading
+
+from ...metrics import registrar_cache
+
+# Cache LRU de gráficos PNG por proceso, clave = hash de los datos graficados
+# (si cambian los datos cambia la clave, así que nunca sirve un gráfico viejo)
+CHART_CACHE_MAX = 128
+_chart_cache = OrderedDict()
+_chart_lock = threading.Lock()
+
+# Estilos de tabla: se construyen una sola vez por proceso
+ESTILO_TABLA_PRINCIPAL = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
+    ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('TOPPADDING', (0, 0), (-1, 0), 6),
+    
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, 1), 11),
+    ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1f2937')),
+    ('TOPPADDING', (0, 1), (-1, 1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
+    
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+])
+
+ESTILO_TABLA_ESTADISTICAS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('TOPPADDING', (0, 0), (-1, 0), 6),
+    
+    ('FONTNAME', (0, 1), (1, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (1, 1), 11),
+    ('TEXTCOLOR', (0, 1), (1, 1), colors.HexColor('#1f2937')),
+    
+    ('FONTNAME', (2, 1), (2, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (2, 1), (2, 1), 11),
+    ('TEXTCOLOR', (2, 1), (2, 1), colors.HexColor('#6366f1')),
+    
+    ('TOPPADDING', (0, 1), (-1, 1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
+    
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+])
+
+ESTILO_TABLA_DETALLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f9fafb')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+# Color de la tasa de corte según diferencia con BEVSA
+COLOR_VERDE = colors.HexColor('#059669')
+COLOR_AMARILLO = colors.HexColor('#d97706')
+COLOR_ROJO = colors.HexColor('#dc2626')
+
+
+@lru_cache(maxsize=1)
+def obtener_estilos():
+    """Hoja de estilos de párrafo (se arma una vez por proceso)."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        textColor=colors.HexColor('#1f2937'),
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#1f2937'),
+        spaceAfter=10,
+        spaceBefore=15,
+        fontName='Helvetica-Bold'
+    ))
+    return styles
+
+
+def _png_cacheado(tipo: str, datos_grafico, render) -> bytes:
+    """Devuelve el PNG del gráfico desde el cache o lo renderiza con render(datos_grafico)."""
+    clave = hashlib.sha1(json.dumps([tipo, datos_grafico], default=str).encode('utf-8')).hexdigest()
+    with _chart_lock:
+        png = _chart_cache.get(clave)
+        if png is not None:
+            _chart_cache.move_to_end(clave)
+    registrar_cache('licitaciones_grafico', png is not None)
+    if png is not None:
+        return png
+    png = render(datos_grafico)
+    with _chart_lock:
+        _chart_cache[clave] = png
+        while len(_chart_cache) > CHART_CACHE_MAX:
+            _chart_cache.popitem(last=False)
+    return png
+
+
+def _figura_png(fig) -> bytes:
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _render_timeseries(datos_grafico) -> bytes:
+    """Gráfico de tasa BEVSA con las últimas tasas de corte como líneas horizontales."""
+    # matplotlib se importa recién al renderizar (los gráficos cacheados no lo necesitan).
+    # Se usa Figure directamente, sin pyplot: no hay estado global ni hace falta cerrar figuras.
+    from matplotlib.figure import Figure
+    import matplotlib.dates as mdates
+    
+    fechas, valores_ts, cortes = datos_grafico
+    fig = Figure(figsize=(7, 4))
+    ax = fig.add_subplot(111)
+    ax.plot(fechas, valores_ts, linewidth=2, color='#2563eb', label='Tasa BEVSA')
+    # Últimas 3 tasas de corte (de stats) en líneas horizontales con distintos colores
+    colores = ['#dc2626', '#ea580c', '#6b7280']  # rojo, naranja, gris
+    etiquetas = ['Tasa corte (última)', 'Tasa corte (anterior)', 'Tasa corte (anterior a la anterior)']
+    for idx, y in cortes:
+        ax.axhline(y=y, color=colores[idx], linestyle='-', linewidth=1.5, label=etiquetas[idx])
+    ax.set_xlabel('Fecha', fontsize=10)
+    ax.set_ylabel('Tasa (%)', fontsize=10)
+    ax.legend(loc='best', fontsize=8)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.tick_params(axis='x', rotation=45, labelsize=8)
+    ax.tick_params(axis='y', labelsize=9)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d/%m/%Y'))
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    fig.tight_layout()
+    return _figura_png(fig)
+
+
+def _render_curva(datos_grafico) -> bytes:
+    """Gráfico de la curva BEVSA nominal del día."""
+    from matplotlib.figure import Figure
+    
+    labels, valores = datos_grafico
+    fig = Figure(figsize=(7, 4))
+    ax = fig.add_subplot(111)
+    ax.plot(labels, valores, marker='o', linewidth=2, markersize=5, color='#6366f1')
+    ax.set_xlabel('Plazo', fontsize=10)
+    ax.set_ylabel('Tasa (%)', fontsize=10)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.tick_params(axis='x', rotation=45, labelsize=8)
+    ax.tick_params(axis='y', labelsize=9)
+    fig.tight_layout()
+    return _figura_png(fig)
 
 
 def crear_pdf_licitacion(datos: dict) -> BytesIO:
@@ -43,25 +207,7 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
     story = []
     
     # Estilos
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#1f2937'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    ))
-    styles.add(ParagraphStyle(
-        name='SectionTitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#1f2937'),
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName='Helvetica-Bold'
-    ))
+    styles = obtener_estilos()
     
     # Extraer datos
     licitacion = datos.get('licitacion_data', {})
@@ -106,33 +252,17 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
     ]
     
     t1 = Table(data_row1, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    t1.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
-        ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('TOPPADDING', (0, 0), (-1, 0), 6),
-        
-        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (-1, 1), 11),
-        ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1f2937')),
-        ('TOPPADDING', (0, 1), (-1, 1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
-        
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-    ]))
+    t1.setStyle(ESTILO_TABLA_PRINCIPAL)
     
     # Colorear la tasa de corte según diferencia con BEVSA
     if tasa_corte is not None and tasa_bevsa is not None:
         diferencia = abs(tasa_corte - tasa_bevsa)
         if diferencia <= 0.5:
-            color_tasa = colors.HexColor('#059669')  # Verde
+            color_tasa = COLOR_VERDE
         elif diferencia <= 1.0:
-            color_tasa = colors.HexColor('#d97706')  # Amarillo
+            color_tasa = COLOR_AMARILLO
         else:
-            color_tasa = colors.HexColor('#dc2626')  # Rojo
+            color_tasa = COLOR_ROJO
         t1.setStyle(TableStyle([
             ('TEXTCOLOR', (2, 1), (3, 1), color_tasa),
         ]))
@@ -162,37 +292,18 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
                     continue
         
         if fechas and valores_ts:
-            import matplotlib.dates as mdates
-            fig = Figure(figsize=(7, 4))
-            ax = fig.add_subplot(111)
-            ax.plot(fechas, valores_ts, linewidth=2, color='#2563eb', label='Tasa BEVSA')
-            # Últimas 3 tasas de corte (de stats) en líneas horizontales con distintos colores
+            # Últimas 3 tasas de corte (de stats) en líneas horizontales
+            cortes = []
             licitaciones = (stats or {}).get('licitaciones') or []
-            colores = ['#dc2626', '#ea580c', '#6b7280']  # rojo, naranja, gris
-            etiquetas = ['Tasa corte (última)', 'Tasa corte (anterior)', 'Tasa corte (anterior a la anterior)']
             for idx in range(min(3, len(licitaciones))):
                 tc = licitaciones[idx].get('tasa_corte')
                 if tc is not None:
                     try:
-                        y = float(tc)
-                        ax.axhline(y=y, color=colores[idx], linestyle='-', linewidth=1.5, label=etiquetas[idx])
+                        cortes.append((idx, float(tc)))
                     except (TypeError, ValueError):
                         pass
-            ax.set_xlabel('Fecha', fontsize=10)
-            ax.set_ylabel('Tasa (%)', fontsize=10)
-            ax.legend(loc='best', fontsize=8)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.tick_params(axis='x', rotation=45, labelsize=8)
-            ax.tick_params(axis='y', labelsize=9)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%d/%m/%Y'))
-            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            fig.tight_layout()
-            
-            img_buffer_ts = BytesIO()
-            fig.savefig(img_buffer_ts, format='png', dpi=150, bbox_inches='tight')
-            img_buffer_ts.seek(0)
-            plt.close(fig)
-            img_ts = RLImage(img_buffer_ts, width=6.5*inch, height=3.5*inch)
+            png_ts = _png_cacheado('timeseries', (fechas, valores_ts, cortes), _render_timeseries)
+            img_ts = RLImage(BytesIO(png_ts), width=6.5*inch, height=3.5*inch)
             story.append(img_ts)
     
     story.append(Spacer(1, 0.3*inch))
@@ -213,28 +324,7 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
         ]
         
         t3 = Table(stats_data, colWidths=[2*inch, 2*inch, 2*inch])
-        t3.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-            ('TOPPADDING', (0, 0), (-1, 0), 6),
-            
-            ('FONTNAME', (0, 1), (1, 1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (1, 1), 11),
-            ('TEXTCOLOR', (0, 1), (1, 1), colors.HexColor('#1f2937')),
-            
-            ('FONTNAME', (2, 1), (2, 1), 'Helvetica-Bold'),
-            ('FONTSIZE', (2, 1), (2, 1), 11),
-            ('TEXTCOLOR', (2, 1), (2, 1), colors.HexColor('#6366f1')),
-            
-            ('TOPPADDING', (0, 1), (-1, 1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
-            
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-        ]))
+        t3.setStyle(ESTILO_TABLA_ESTADISTICAS)
         
         story.append(t3)
         story.append(Spacer(1, 0.15*inch))
@@ -274,19 +364,7 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
                 ])
             
             t4 = Table(detalle_data, colWidths=[0.9*inch, 1*inch, 0.7*inch, 1*inch, 0.9*inch, 0.9*inch])
-            t4.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f9fafb')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#6b7280')),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
+            t4.setStyle(ESTILO_TABLA_DETALLE)
             
             story.append(t4)
     
@@ -313,24 +391,8 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
             labels = [item.get('nombre', '') for item in curve_items]
             valores = [float(item.get('valor')) for item in curve_items]
             
-            fig = Figure(figsize=(7, 4))
-            ax = fig.add_subplot(111)
-            ax.plot(labels, valores, marker='o', linewidth=2, markersize=5, color='#6366f1')
-            ax.set_xlabel('Plazo', fontsize=10)
-            ax.set_ylabel('Tasa (%)', fontsize=10)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.tick_params(axis='x', rotation=45, labelsize=8)
-            ax.tick_params(axis='y', labelsize=9)
-            fig.tight_layout()
-            
-            # Guardar gráfico en buffer
-            img_buffer = BytesIO()
-            fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close(fig)
-            
-            # Agregar imagen al PDF
-            img = RLImage(img_buffer, width=6.5*inch, height=3.5*inch)
+            png_curva = _png_cacheado('curva', (labels, valores), _render_curva)
+            img = RLImage(BytesIO(png_curva), width=6.5*inch, height=3.5*inch)
             story.append(img)
     
     # Pie de página
@@ -348,6 +410,11 @@ def crear_pdf_licitacion(datos: dict) -> BytesIO:
     return buffer
 
 
+def crear_pdf_licitacion_bytes(datos: dict) -> bytes:
+    """Igual que crear_pdf_licitacion pero devuelve bytes (para renderizar en un pool de procesos)."""
+    return crear_pdf_licitacion(datos).getvalue()
+
+
 def formatear_numero_miles(valor):
     """Formatea un número con separadores de miles."""
     if valor is None:
@@ -3,18 +3,30 @@ from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from flask import Blueprint, request, jsonify, send_file
 from ...database import execute_query, execute_query_single
+from ...export_jobs import data_version, get_process_pool, en_worker_de_export
+from ...metrics import registrar_cache
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from io import BytesIO
 import subprocess
 import threading
 import sys
 from pathlib import Path
 import os
-from .pdf_generator import crear_pdf_licitacion
+import zipfile
 
 bp = Blueprint('licitaciones_lrm', __name__)
 
 # Configuración
 ID_PAIS = 858  # Uruguay
 
+# PDFs ya generados por proceso: {(fecha, plazo, versión de datos): bytes}
+PDF_CACHE_MAX = 64
+MAX_PDFS_BATCH = 50
+MAX_PDFS_RANGO = 500
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
 # Configuración de variables LRM por plazo
 # Mapeo: {plazo_dias: {variable: id_variable}}
 LRM_VARIABLES = {
@@ -503,6 +515,293 @@ def obtener_timeseries_bevsa(plazo: int, fecha_hasta: date, dias: int = 90) -> L
     return timeseries
 
 
+# ==================== LOTES (varios informes con una sola query) ====================
+
+def cargar_series_lote(fecha_desde: date, fecha_hasta: date) -> Dict[int, Tuple[List[date], Dict[date, object]]]:
+    """
+    Carga en una sola query todo lo que necesitan los informes de [fecha_desde, fecha_hasta].
+    
+    - Variables LRM: todo el histórico hasta fecha_hasta (son pocas filas y las
+      estadísticas miran las 5 licitaciones previas a cada fecha).
+    - Variables BEVSA: desde 45 días antes de la más vieja de esas 5 licitaciones
+      previas a fecha_desde (cubre la serie de 40 días, la ventana de 5 días y la curva).
+    
+    Retorna {id_variable: (fechas ordenadas, {fecha: valor})}.
+    """
+    ids_lrm = sorted({id_var for config in LRM_VARIABLES.values() for id_var in config.values()})
+    ids_licitacion = sorted(config["licitacion"] for config in LRM_VARIABLES.values())
+    ids_bevsa = sorted(set(BEVSA_NOMINAL_VARIABLES.values()) | {c["id_variable"] for c in PLAZO_TO_BEVSA.values()})
+    ph_lrm = ','.join(['?'] * len(ids_lrm))
+    ph_licitacion = ','.join(['?'] * len(ids_licitacion))
+    ph_bevsa = ','.join(['?'] * len(ids_bevsa))
+    
+    query = f"""
+        SELECT id_variable, fecha, valor
+        FROM maestro_precios
+        WHERE id_pais = ? AND id_variable IN ({ph_lrm}) AND fecha <= ?
+        UNION ALL
+        SELECT id_variable, fecha, valor
+        FROM maestro_precios
+        WHERE id_pais = ? AND id_variable IN ({ph_bevsa}) AND fecha <= ?
+          AND fecha >= COALESCE((
+              SELECT MIN(fecha) FROM (
+                  SELECT fecha, ROW_NUMBER() OVER (PARTITION BY id_variable ORDER BY fecha DESC) AS rn
+                  FROM maestro_precios
+                  WHERE id_pais = ? AND id_variable IN ({ph_licitacion}) AND fecha <= ?
+              ) previas
+              WHERE rn <= 5
+          ), ?) - INTERVAL '45 days'
+        ORDER BY id_variable, fecha
+    """
+    params = (
+        (ID_PAIS,) + tuple(ids_lrm) + (fecha_hasta,)
+        + (ID_PAIS,) + tuple(ids_bevsa) + (fecha_hasta,)
+        + (ID_PAIS,) + tuple(ids_licitacion) + (fecha_desde, fecha_desde)
+    )
+    
+    series = {}
+    for row in execute_query(query, params):
+        fecha = parse_fecha(row['fecha'])
+        fechas, valores = series.setdefault(row['id_variable'], ([], {}))
+        if fecha not in valores:  # Igual que LIMIT 1: se queda el primer valor de la fecha
+            fechas.append(fecha)
+            valores[fecha] = row['valor']
+    return series
+
+
+def _ultima_fecha_hasta(serie, fecha: date) -> Optional[date]:
+    """Última fecha de la serie <= fecha (búsqueda binaria)."""
+    if not serie:
+        return None
+    fechas = serie[0]
+    i = bisect_right(fechas, fecha)
+    return fechas[i - 1] if i else None
+
+
+def _valor_en(series, id_variable: int, fecha: date):
+    serie = series.get(id_variable)
+    return serie[1].get(fecha) if serie else None
+
+
+def _tasa_bevsa_lote(series, plazo: int, fecha_limite: date) -> Optional[Dict]:
+    """Equivalente en memoria de obtener_tasa_bevsa(plazo, fecha_limite)."""
+    bevsa_config = PLAZO_TO_BEVSA.get(plazo)
+    if not bevsa_config:
+        return None
+    id_variable = bevsa_config["id_variable"]
+    serie = series.get(id_variable)
+    ultima_fecha = _ultima_fecha_hasta(serie, fecha_limite)
+    if ultima_fecha is None:
+        return None
+    
+    fechas, valores = serie
+    fecha_desde = ultima_fecha - timedelta(days=5)
+    ventana = [(f, valores[f]) for f in fechas[bisect_left(fechas, fecha_desde):bisect_right(fechas, ultima_fecha)]
+               if valores[f] is not None]
+    min_valor = min((v for _, v in ventana), default=None)
+    max_valor = max((v for _, v in ventana), default=None)
+    # Fecha más reciente con el mínimo / máximo
+    fecha_min = max((f for f, v in ventana if v == min_valor), default=None)
+    fecha_max = max((f for f, v in ventana if v == max_valor), default=None)
+    
+    return {
+        "plazo": plazo,
+        "nombre": bevsa_config["nombre"],
+        "id_variable": id_variable,
+        "ultima_fecha": ultima_fecha.isoformat(),
+        "ultimo_valor": valores[ultima_fecha],
+        "min_5_dias": min_valor,
+        "max_5_dias": max_valor,
+        "fecha_min": fecha_min.isoformat() if fecha_min else None,
+        "fecha_max": fecha_max.isoformat() if fecha_max else None
+    }
+
+
+def _estadisticas_lote(series, plazo: int, fecha_limite: date) -> Dict:
+    """Equivalente en memoria de obtener_estadisticas_ultimas_5_licitaciones(plazo, fecha_limite)."""
+    config = LRM_VARIABLES[plazo]
+    serie_licitacion = series.get(config["licitacion"])
+    fechas_previas = []
+    if serie_licitacion:
+        fechas = serie_licitacion[0]
+        fechas_previas = fechas[:bisect_right(fechas, fecha_limite)][-5:][::-1]
+    
+    if not fechas_previas:
+        return {
+            "total_licitado": 0,
+            "total_adjudicado": 0,
+            "porcentaje_adjudicacion": 0,
+            "licitaciones": []
+        }
+    
+    bevsa_config = PLAZO_TO_BEVSA.get(plazo)
+    id_bevsa = bevsa_config["id_variable"] if bevsa_config else None
+    
+    licitaciones = []
+    total_licitado = 0
+    total_adjudicado = 0
+    for fecha_lic in fechas_previas:
+        monto_licitado = serie_licitacion[1][fecha_lic] or 0
+        adjudicado = _valor_en(series, config["adjudicado"], fecha_lic) or 0
+        tasa_corte = _valor_en(series, config["tasa_corte"], fecha_lic)
+        monto_adjudicado = monto_licitado * adjudicado
+        
+        tasa_bevsa = None
+        if id_bevsa:
+            fecha_bevsa = _ultima_fecha_hasta(series.get(id_bevsa), fecha_lic)
+            if fecha_bevsa is not None:
+                tasa_bevsa = series[id_bevsa][1][fecha_bevsa]
+        
+        total_licitado += monto_licitado
+        total_adjudicado += monto_adjudicado
+        licitaciones.append({
+            "fecha": fecha_lic.isoformat(),
+            "monto_licitado": monto_licitado,
+            "adjudicado": adjudicado,
+            "monto_adjudicado": monto_adjudicado,
+            "porcentaje_adjudicacion": adjudicado * 100,
+            "tasa_corte": tasa_corte,
+            "tasa_bevsa": tasa_bevsa
+        })
+    
+    porcentaje_adjudicacion = (total_adjudicado / total_licitado * 100) if total_licitado > 0 else 0
+    return {
+        "plazo": plazo,
+        "total_licitado": total_licitado,
+        "total_adjudicado": total_adjudicado,
+        "porcentaje_adjudicacion": porcentaje_adjudicacion,
+        "licitaciones": licitaciones
+    }
+
+
+def _curva_lote(series, fecha_limite: date) -> Dict:
+    """Equivalente en memoria de obtener_curva_bevsa_por_fecha(fecha_limite)."""
+    fechas_curva = [
+        _ultima_fecha_hasta(series.get(id_variable), fecha_limite)
+        for id_variable in BEVSA_NOMINAL_VARIABLES.values()
+    ]
+    fechas_curva = [f for f in fechas_curva if f is not None]
+    if not fechas_curva:
+        return {"fecha": None, "data": [], "fecha_original": fecha_limite.isoformat()}
+    fecha_curva = max(fechas_curva)
+    return {
+        "fecha": fecha_curva.isoformat(),
+        "fecha_original": fecha_limite.isoformat(),
+        "data": [
+            {"nombre": nombre, "id_variable": id_variable, "valor": _valor_en(series, id_variable, fecha_curva)}
+            for nombre, id_variable in BEVSA_NOMINAL_VARIABLES.items()
+        ]
+    }
+
+
+def _timeseries_lote(series, plazo: int, fecha_hasta: date, dias: int = 40) -> List[Dict]:
+    """Equivalente en memoria de obtener_timeseries_bevsa(plazo, fecha_hasta, dias)."""
+    bevsa_config = PLAZO_TO_BEVSA.get(plazo)
+    serie = series.get(bevsa_config["id_variable"]) if bevsa_config else None
+    if not serie:
+        return []
+    fechas, valores = serie
+    fecha_desde = fecha_hasta - timedelta(days=dias)
+    return [
+        {"fecha": f.isoformat(), "valor": valores[f]}
+        for f in fechas[bisect_left(fechas, fecha_desde):bisect_right(fechas, fecha_hasta)]
+    ]
+
+
+def armar_datos_pdf_lote(series, fecha: date, plazo: int) -> Optional[Dict]:
+    """Datos de un informe (mismo formato que generar_pdf_licitacion) a partir de las series del lote."""
+    config = LRM_VARIABLES.get(plazo)
+    if not config:
+        return None
+    return {
+        'licitacion_data': {
+            'fecha': fecha,
+            'plazo': plazo,
+            'monto_licitado': _valor_en(series, config["licitacion"], fecha),
+            'adjudicado': _valor_en(series, config["adjudicado"], fecha),
+            'tasa_corte': _valor_en(series, config["tasa_corte"], fecha),
+        },
+        'bevsa_rate': _tasa_bevsa_lote(series, plazo, fecha),
+        'stats': _estadisticas_lote(series, plazo, fecha),
+        'curve_data': _curva_lote(series, fecha),
+        'timeseries_data': _timeseries_lote(series, plazo, fecha, dias=40),
+    }
+
+
+def combinaciones_en_rango(series, fecha_desde: date, fecha_hasta: date, plazos: List[int]) -> List[Tuple[date, int]]:
+    """(fecha, plazo) de las licitaciones del rango, en orden cronológico."""
+    combinaciones = []
+    for plazo in plazos:
+        serie = series.get(LRM_VARIABLES[plazo]["licitacion"])
+        if not serie:
+            continue
+        fechas = serie[0]
+        for fecha in fechas[bisect_left(fechas, fecha_desde):bisect_right(fechas, fecha_hasta)]:
+            combinaciones.append((fecha, plazo))
+    combinaciones.sort()
+    return combinaciones
+
+
+def generar_pdfs_lote(combinaciones: List[Tuple[date, int]], series=None) -> List[Tuple[date, int, bytes]]:
+    """
+    Genera los informes de varias licitaciones.
+    
+    Los datos salen de una sola query (cargar_series_lote), los PDF ya memoizados
+    se reutilizan y el resto se renderiza en el pool de procesos.
+    """
+    if not combinaciones:
+        return []
+    version = data_version()
+    if series is None:
+        series = cargar_series_lote(min(c[0] for c in combinaciones), max(c[0] for c in combinaciones))
+    
+    resultados = {}
+    pendientes = []
+    for fecha, plazo in combinaciones:
+        pdf = _pdf_desde_cache((fecha, plazo, version))
+        if pdf is not None:
+            resultados[(fecha, plazo)] = pdf
+        else:
+            pendientes.append((fecha, plazo))
+    
+    datos_pendientes = [armar_datos_pdf_lote(series, fecha, plazo) for fecha, plazo in pendientes]
+    from .pdf_generator import crear_pdf_licitacion_bytes  # reportlab/matplotlib recién al generar
+    if len(datos_pendientes) > 1 and not en_worker_de_export():
+        pdfs = list(get_process_pool().map(crear_pdf_licitacion_bytes, datos_pendientes))
+    else:
+        pdfs = [crear_pdf_licitacion_bytes(datos) for datos in datos_pendientes]
+    
+    for (fecha, plazo), pdf in zip(pendientes, pdfs):
+        _guardar_pdf_cache((fecha, plazo, version), pdf)
+        resultados[(fecha, plazo)] = pdf
+    
+    return [(fecha, plazo, resultados[(fecha, plazo)]) for fecha, plazo in combinaciones]
+
+
+def _zip_pdfs(pdfs: List[Tuple[date, int, bytes]]) -> BytesIO:
+    output = BytesIO()
+    # Los PDF ya vienen comprimidos: ZIP sin compresión
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for fecha, plazo, pdf in pdfs:
+            zf.writestr(f"licitacion_lrm_{fecha.isoformat()}_{plazo}dias.pdf", pdf)
+    output.seek(0)
+    return output
+
+
+def _unir_pdfs(pdfs: List[Tuple[date, int, bytes]]) -> BytesIO:
+    """Concatena los informes en un solo PDF (requiere pypdf)."""
+    from pypdf import PdfWriter
+    
+    writer = PdfWriter()
+    for _, _, pdf in pdfs:
+        writer.append(BytesIO(pdf))
+    output = BytesIO()
+    writer.write(output)
+    writer.close()
+    output.seek(0)
+    return output
+
+
 # ==================== ENDPOINTS ====================
 
 @bp.route('/licitaciones-lrm/dates', methods=['GET'])
@@ -856,6 +1155,75 @@ def get_update_licitaciones_lrm_status():
     return jsonify(update_lrm_status)
 
 
+def _pdf_desde_cache(clave: Tuple) -> Optional[bytes]:
+    with _pdf_cache_lock:
+        pdf = _pdf_cache.get(clave)
+        if pdf is not None:
+            _pdf_cache.move_to_end(clave)
+    registrar_cache('licitaciones_pdf', pdf is not None)
+    return pdf
+
+
+def _guardar_pdf_cache(clave: Tuple, pdf: bytes) -> None:
+    with _pdf_cache_lock:
+        _pdf_cache[clave] = pdf
+        while len(_pdf_cache) > PDF_CACHE_MAX:
+            _pdf_cache.popitem(last=False)
+
+
+def generar_pdf_licitacion(fecha: date, plazo: int) -> Optional[bytes]:
+    """
+    Genera el PDF del informe de una licitación (None si no hay datos).
+    
+    Memoizado por (fecha, plazo, versión de datos): mientras no cambie
+    maestro_precios, regenerar el mismo informe no vuelve a consultar ni a renderizar.
+    """
+    clave = (fecha, plazo, data_version())
+    pdf = _pdf_desde_cache(clave)
+    if pdf is not None:
+        return pdf
+    
+    # Obtener datos de la licitación
+    licitacion_data_raw = obtener_datos_licitacion(fecha, plazo)
+    if not licitacion_data_raw:
+        return None
+    
+    # Preparar datos de licitación en el formato del frontend
+    licitacion_data = {
+        'fecha': fecha,
+        'plazo': plazo,
+        'monto_licitado': licitacion_data_raw.get('licitacion'),
+        'adjudicado': licitacion_data_raw.get('adjudicado'),  # Este es el porcentaje (0-1)
+        'tasa_corte': licitacion_data_raw.get('tasa_corte'),
+    }
+    
+    # Obtener tasa BEVSA (con min/max de 5 días)
+    bevsa_rate = obtener_tasa_bevsa(plazo, fecha)
+    
+    # Obtener estadísticas de últimas 5 licitaciones
+    stats = obtener_estadisticas_ultimas_5_licitaciones(plazo, fecha)
+    
+    # Obtener curva BEVSA del día
+    curve_data = obtener_curva_bevsa_por_fecha(fecha)
+    
+    # Obtener serie temporal de últimos 40 días (para gráfico en PDF)
+    timeseries_data = obtener_timeseries_bevsa(plazo, fecha, dias=40)
+    
+    # Preparar datos para el PDF
+    pdf_data = {
+        'licitacion_data': licitacion_data,
+        'bevsa_rate': bevsa_rate,
+        'stats': stats,
+        'curve_data': curve_data,
+        'timeseries_data': timeseries_data
+    }
+    
+    from .pdf_generator import crear_pdf_licitacion  # reportlab/matplotlib recién al generar
+    pdf = crear_pdf_licitacion(pdf_data).getvalue()
+    _guardar_pdf_cache(clave, pdf)
+    return pdf
+
+
 @bp.route('/licitaciones-lrm/generate-pdf', methods=['POST'])
 def generate_pdf():
     """
@@ -881,49 +1249,15 @@ def generate_pdf():
         except ValueError:
             return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
         
-        # Obtener datos de la licitación
-        licitacion_data_raw = obtener_datos_licitacion(fecha, plazo)
-        if not licitacion_data_raw:
+        pdf = generar_pdf_licitacion(fecha, plazo)
+        if pdf is None:
             return jsonify({'error': f'No se encontraron datos para fecha {fecha_str} y plazo {plazo}'}), 404
         
-        # Preparar datos de licitación en el formato del frontend
-        licitacion_data = {
-            'fecha': fecha,
-            'plazo': plazo,
-            'monto_licitado': licitacion_data_raw.get('licitacion'),
-            'adjudicado': licitacion_data_raw.get('adjudicado'),  # Este es el porcentaje (0-1)
-            'tasa_corte': licitacion_data_raw.get('tasa_corte'),
-        }
-        
-        # Obtener tasa BEVSA (con min/max de 5 días)
-        bevsa_rate = obtener_tasa_bevsa(plazo, fecha)
-        
-        # Obtener estadísticas de últimas 5 licitaciones
-        stats = obtener_estadisticas_ultimas_5_licitaciones(plazo, fecha)
-        
-        # Obtener curva BEVSA del día
-        curve_data = obtener_curva_bevsa_por_fecha(fecha)
-        
-        # Obtener serie temporal de últimos 40 días (para gráfico en PDF)
-        timeseries_data = obtener_timeseries_bevsa(plazo, fecha, dias=40)
-        
-        # Preparar datos para el PDF
-        pdf_data = {
-            'licitacion_data': licitacion_data,
-            'bevsa_rate': bevsa_rate,
-            'stats': stats,
-            'curve_data': curve_data,
-            'timeseries_data': timeseries_data
-        }
-        
-        # Generar PDF
-        pdf_buffer = crear_pdf_licitacion(pdf_data)
-        
         # Nombre del archivo
         filename = f"licitacion_lrm_{fecha_str}_{plazo}dias.pdf"
         
         return send_file(
-            pdf_buffer,
+            BytesIO(pdf),
             mimetype='application/pdf',
             as_attachment=True,
             download_name=filename
@@ -934,3 +1268,109 @@ def generate_pdf():
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Error al generar PDF: {str(e)}'}), 500
+
+
+@bp.route('/licitaciones-lrm/generate-pdf/latest', methods=['GET'])
+def generate_pdf_latest():
+    """
+    Genera los informes de las últimas N licitaciones en un ZIP.
+    
+    Query params:
+    - n: cantidad de licitaciones (default 5, máximo MAX_PDFS_BATCH)
+    - plazo: filtrar por plazo (30, 90, 180, 360); sin plazo toma todos
+    """
+    try:
+        n = request.args.get('n', default=5, type=int)
+        plazo = request.args.get('plazo', type=int)
+        
+        if n < 1 or n > MAX_PDFS_BATCH:
+            return jsonify({'error': f'n debe estar entre 1 y {MAX_PDFS_BATCH}'}), 400
+        if plazo is not None and plazo not in LRM_VARIABLES:
+            return jsonify({'error': f'Plazo inválido: {plazo}'}), 400
+        
+        combinaciones = obtener_fechas_disponibles_licitaciones()
+        if plazo is not None:
+            combinaciones = [c for c in combinaciones if c['plazo'] == plazo]
+        combinaciones = combinaciones[:n]
+        
+        if not combinaciones:
+            return jsonify({'error': 'No hay licitaciones disponibles'}), 404
+        
+        output = _zip_pdfs(generar_pdfs_lote([(c['fecha'], c['plazo']) for c in combinaciones]))
+        
+        sufijo = f"_{plazo}dias" if plazo is not None else ''
+        return send_file(
+            output,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=f"licitaciones_lrm_ultimas_{len(combinaciones)}{sufijo}.zip"
+        )
+        
+    except Exception as e:
+        print(f"[ERROR] generate_pdf_latest: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error al generar PDFs: {str(e)}'}), 500
+
+
+@bp.route('/licitaciones-lrm/generate-pdf/batch', methods=['POST'])
+def generate_pdf_batch():
+    """
+    Genera los informes de todas las licitaciones de un rango de fechas.
+    
+    JSON:
+    - fecha_desde, fecha_hasta: YYYY-MM-DD
+    - plazos: lista de plazos (opcional, default todos)
+    - formato: 'zip' (default, un PDF por licitación) o 'pdf' (un solo PDF unido)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        fecha_desde_str = data.get('fecha_desde')
+        fecha_hasta_str = data.get('fecha_hasta')
+        plazos = data.get('plazos') or sorted(LRM_VARIABLES.keys())
+        formato = (data.get('formato') or 'zip').lower()
+        
+        if not fecha_desde_str or not fecha_hasta_str:
+            return jsonify({'error': 'Se requieren fecha_desde y fecha_hasta'}), 400
+        try:
+            fecha_desde = date.fromisoformat(fecha_desde_str)
+            fecha_hasta = date.fromisoformat(fecha_hasta_str)
+        except ValueError:
+            return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
+        if fecha_desde > fecha_hasta:
+            return jsonify({'error': 'fecha_desde debe ser anterior a fecha_hasta'}), 400
+        try:
+            plazos = sorted({int(p) for p in plazos})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'plazos debe ser una lista de números'}), 400
+        if any(p not in LRM_VARIABLES for p in plazos):
+            return jsonify({'error': f'Plazos válidos: {sorted(LRM_VARIABLES.keys())}'}), 400
+        if formato not in ('zip', 'pdf'):
+            return jsonify({'error': "formato debe ser 'zip' o 'pdf'"}), 400
+        if formato == 'pdf':
+            try:
+                import pypdf  # noqa: F401
+            except ImportError:
+                return jsonify({'error': 'Formato pdf no disponible (falta pypdf en el servidor)'}), 501
+        
+        series = cargar_series_lote(fecha_desde, fecha_hasta)
+        combinaciones = combinaciones_en_rango(series, fecha_desde, fecha_hasta, plazos)
+        if not combinaciones:
+            return jsonify({'error': 'No hay licitaciones en el rango seleccionado'}), 404
+        if len(combinaciones) > MAX_PDFS_RANGO:
+            return jsonify({'error': f'El rango tiene {len(combinaciones)} licitaciones (máximo {MAX_PDFS_RANGO})'}), 400
+        
+        pdfs = generar_pdfs_lote(combinaciones, series=series)
+        
+        nombre = f"licitaciones_lrm_{fecha_desde.isoformat()}_{fecha_hasta.isoformat()}"
+        if formato == 'pdf':
+            return send_file(_unir_pdfs(pdfs), mimetype='application/pdf',
+                             as_attachment=True, download_name=f"{nombre}.pdf")
+        return send_file(_zip_pdfs(pdfs), mimetype='application/zip',
+                         as_attachment=True, download_name=f"{nombre}.zip")
+        
+    except Exception as e:
+        print(f"[ERROR] generate_pdf_batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error al generar PDFs: {str(e)}'}), 500
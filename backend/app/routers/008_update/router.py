@@ -1,12 +1,16 @@
 """Router for database update automation endpoints."""
 from flask import Blueprint, jsonify, request, send_file
 from ...middleware import admin_session_required
+from ...database import execute_query, execute_query_single
+import re
+import statistics
 import subprocess
 import os
 import sys
+from decimal import Decimal
 from pathlib import Path
 import threading
-from datetime import datetime
+from datetime import datetime, timedelta
 
 bp = Blueprint('update', __name__)
 
@@ -34,12 +38,17 @@ single_script_in_progress = {}
 LOGS_DIR = Path(__file__).parent.parent.parent.parent.parent / "update" / "logs"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+HISTORIAL_CORRIDAS = 50  # corridas en /update/history
+TENDENCIA_RECIENTES = 5  # corridas "recientes" contra las que se compara el resto
+RUN_ID_RE = re.compile(r'^\d{8}_\d{6}_[0-9a-f]+$')  # formato de historial.nuevo_run_id
+
 
 @bp.route('/update/run', methods=['POST'])
 @admin_session_required
 def run_update():
     """
     Ejecuta update/update_database.py y guarda el log con timestamp.
+    Body opcional {"resume": "<run_id>"}: continúa esa corrida del historial (--resume).
     """
     global update_in_progress, update_status
     
@@ -50,6 +59,10 @@ def run_update():
             'status': update_status
         }), 409
     
+    resume = (request.get_json(silent=True) or {}).get('resume')
+    if resume is not None and not RUN_ID_RE.match(str(resume)):
+        return jsonify({'error': 'resume debe ser un run_id del historial'}), 400
+    
     # Crear nombre de archivo de log con timestamp
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     log_file = LOGS_DIR / f"update_{timestamp}.txt"
@@ -68,7 +81,8 @@ def run_update():
             'output': None,
             'error': None,
             'log_file': str(log_file.name),
-            'progress': []
+            'progress': [],
+            'resume': resume,
         }
         
         try:
@@ -144,8 +158,11 @@ def run_update():
             
             try:
                 # Ejecutar script y capturar output en tiempo real
+                comando = [python_path_str, script_path_str]
+                if resume:
+                    comando += ['--resume', resume]
                 process = subprocess.Popen(
-                    [python_path_str, script_path_str],
+                    comando,
                     cwd=str(project_root),
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
@@ -493,3 +510,156 @@ def get_single_script_status(script_name):
         return jsonify({'error': f'Script {script_name} no encontrado'}), 404
     
     return jsonify(single_script_status[script_name])
+
+
+def _fila_json(fila: dict) -> dict:
+    """Fechas a ISO y NUMERIC a float para jsonify."""
+    return {
+        k: v.isoformat() if isinstance(v, datetime) else float(v) if isinstance(v, Decimal) else v
+        for k, v in fila.items()
+    }
+
+
+def _sin_tablas_historial(error: Exception) -> bool:
+    """True si todavía no corrió ningún pipeline con historial (tablas sin crear)."""
+    texto = str(error)
+    return 'pipeline_' in texto and 'does not exist' in texto
+
+
+@bp.route('/update/history', methods=['GET'])
+@admin_session_required
+def get_update_history():
+    """
+    Historial de corridas de update/ (update/historial.py).
+    Query params: dias (default 30), pipeline (update_database, update_tc, run_problemas).
+    Devuelve las últimas corridas y, por script, la duración mediana reciente contra la
+    anterior para ver qué fuentes se están volviendo más lentas.
+    """
+    try:
+        dias = int(request.args.get('dias', 30))
+    except ValueError:
+        return jsonify({'error': 'dias debe ser un entero'}), 400
+    pipeline = request.args.get('pipeline')
+    desde = datetime.now() - timedelta(days=dias)
+    filtro = " AND c.pipeline = ?" if pipeline else ""
+    params = (desde, pipeline) if pipeline else (desde,)
+
+    try:
+        corridas = execute_query(
+            "SELECT c.run_id, c.pipeline, c.inicio, c.fin, c.duracion_s, c.estado, "
+            "COUNT(s.id) AS scripts, "
+            "SUM(CASE WHEN s.estado <> 'ok' THEN 1 ELSE 0 END) AS fallidos, "
+            "SUM(s.filas_insertadas) AS filas_insertadas, "
+            "SUM(s.filas_actualizadas) AS filas_actualizadas, "
+            "SUM(s.filas_borradas) AS filas_borradas, "
+            "SUM(s.bytes_descargados) AS bytes_descargados "
+            "FROM pipeline_corridas c LEFT JOIN pipeline_scripts s ON s.run_id = c.run_id "
+            f"WHERE c.inicio >= ?{filtro} "
+            "GROUP BY c.run_id ORDER BY c.inicio DESC LIMIT ?",
+            params + (HISTORIAL_CORRIDAS,),
+        )
+        filas = execute_query(
+            "SELECT s.script, s.fase, s.inicio, s.duracion_s, s.estado, "
+            "s.filas_insertadas, s.filas_actualizadas, s.bytes_descargados "
+            "FROM pipeline_scripts s JOIN pipeline_corridas c ON c.run_id = s.run_id "
+            f"WHERE c.inicio >= ?{filtro} ORDER BY s.script, s.inicio",
+            params,
+        )
+    except Exception as e:
+        if _sin_tablas_historial(e):
+            return jsonify({'corridas': [], 'tendencias': [], 'dias': dias})
+        return jsonify({'error': str(e)}), 500
+
+    por_script = {}
+    for fila in filas:
+        por_script.setdefault(fila['script'], []).append(fila)
+
+    tendencias = []
+    for script, ejecuciones in por_script.items():
+        duraciones = [float(e['duracion_s']) for e in ejecuciones if e['estado'] == 'ok']
+        recientes = duraciones[-TENDENCIA_RECIENTES:]
+        anteriores = duraciones[:-TENDENCIA_RECIENTES]
+        mediana_reciente = statistics.median(recientes) if recientes else None
+        mediana_anterior = statistics.median(anteriores) if anteriores else None
+        cambio_pct = None
+        if mediana_reciente is not None and mediana_anterior:
+            cambio_pct = round((mediana_reciente / mediana_anterior - 1) * 100, 1)
+        ultima = ejecuciones[-1]
+        tendencias.append({
+            'script': script,
+            'fase': ultima['fase'],
+            'ejecuciones': len(ejecuciones),
+            'errores': sum(1 for e in ejecuciones if e['estado'] != 'ok'),
+            'ultimo_estado': ultima['estado'],
+            'ultima_duracion_s': float(ultima['duracion_s']),
+            'mediana_reciente_s': mediana_reciente,
+            'mediana_anterior_s': mediana_anterior,
+            'cambio_pct': cambio_pct,
+            'duraciones': [float(e['duracion_s']) for e in ejecuciones[-20:]],
+        })
+    # Primero los que más se enlentecieron; los que no tienen con qué comparar, al final
+    tendencias.sort(key=lambda t: (t['cambio_pct'] is None, -(t['cambio_pct'] or 0)))
+
+    return jsonify({
+        'corridas': [_fila_json(c) for c in corridas],
+        'tendencias': tendencias,
+        'dias': dias,
+    })
+
+
+@bp.route('/update/history/<run_id>', methods=['GET'])
+@admin_session_required
+def get_update_run(run_id):
+    """
+    Timeline (Gantt) de una corrida: cada script con su inicio y fin en segundos desde
+    el arranque de la corrida, más tiempo de reloj contra suma de scripts.
+    """
+    try:
+        corrida = execute_query_single("SELECT * FROM pipeline_corridas WHERE run_id = ?", (run_id,))
+        if corrida is None:
+            return jsonify({'error': f'Corrida {run_id} no encontrada'}), 404
+        filas = execute_query(
+            "SELECT script, fase, inicio, fin, duracion_s, estado, codigo_salida, mensaje, "
+            "filas_insertadas, filas_actualizadas, filas_borradas, bytes_descargados "
+            "FROM pipeline_scripts WHERE run_id = ? ORDER BY inicio, script",
+            (run_id,),
+        )
+    except Exception as e:
+        if _sin_tablas_historial(e):
+            return jsonify({'error': f'Corrida {run_id} no encontrada'}), 404
+        return jsonify({'error': str(e)}), 500
+
+    origen = corrida['inicio']
+    scripts = []
+    eventos = []
+    for fila in filas:
+        inicio_s = (fila['inicio'] - origen).total_seconds()
+        fin_s = (fila['fin'] - origen).total_seconds()
+        eventos.extend([(inicio_s, 1), (fin_s, -1)])
+        script = _fila_json(fila)
+        script.update({'inicio_s': round(inicio_s, 3), 'fin_s': round(fin_s, 3)})
+        scripts.append(script)
+
+    # Máximo de scripts corriendo a la vez (los fines antes que los inicios en el mismo instante)
+    concurrentes = max_concurrentes = 0
+    for _, delta in sorted(eventos):
+        concurrentes += delta
+        max_concurrentes = max(max_concurrentes, concurrentes)
+
+    suma_s = sum(s['duracion_s'] for s in scripts)
+    if corrida.get('duracion_s') is not None:
+        reloj_s = float(corrida['duracion_s'])
+    else:
+        reloj_s = max((s['fin_s'] for s in scripts), default=0.0)
+
+    return jsonify({
+        'corrida': _fila_json(corrida),
+        'scripts': scripts,
+        'resumen': {
+            'reloj_s': round(reloj_s, 3),
+            'suma_scripts_s': round(suma_s, 3),
+            'paralelismo': round(suma_s / reloj_s, 2) if reloj_s else None,
+            'max_concurrentes': max_concurrentes,
+            'fallidos': sum(1 for s in scripts if s['estado'] != 'ok'),
+        },
+    })
@@ -6,6 +6,7 @@ from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Any, List
 from flask import Blueprint, jsonify, request
 from ...database import execute_query, execute_query_single
+from ...serialization import wants_columnar, columnarize, json_response
 
 bp = Blueprint('politica_monetaria', __name__)
 
@@ -268,6 +269,8 @@ def get_series_tpm():
         rows = execute_query(query, (ID_TPM, p["id_pais"], desde.isoformat(), hasta.isoformat()))
         datos = [{"fecha": str(r["fecha"]).split(" ")[0], "valor": round(float(r["valor"]), 2)} for r in rows]
         resultados.append({"pais": p["nombre"], "codigo": p["codigo"], "data": datos})
+    if wants_columnar():
+        return json_response(columnarize(resultados))
     return jsonify(resultados)
 
 
@@ -298,6 +301,8 @@ def get_series_expectativas():
             por_mes[key] = {"fecha": date(f.year, f.month, 1), "valor": round(float(r["valor"]), 2)}
         datos = [{"fecha": v["fecha"].isoformat(), "valor": v["valor"]} for _, v in sorted(por_mes.items())]
         resultados.append({"pais": p["nombre"], "codigo": p["codigo"], "data": datos})
+    if wants_columnar():
+        return json_response(columnarize(resultados))
     return jsonify(resultados)
 
 
@@ -317,6 +322,8 @@ def get_series_embi():
         # Excel/BD tiene valor en decimal (ej. 0.71607); gráfico en puntos básicos (× 100)
         datos = [{"fecha": str(r["fecha"]).split(" ")[0], "valor": round(float(r["valor"]) * 100, 2)} for r in rows]
         resultados.append({"pais": p["nombre"], "codigo": p["codigo"], "data": datos})
+    if wants_columnar():
+        return json_response(columnarize(resultados))
     return jsonify(resultados)
 
 
@@ -342,4 +349,6 @@ def get_series_monedas():
         rows = execute_query(query, (ID_TC_USD, p["id_pais"], desde.isoformat(), hasta.isoformat()))
         datos = [{"fecha": str(r["fecha"]).split(" ")[0], "valor": round(float(r["valor"]), 4)} for r in rows]
         resultados.append({"pais": p["nombre"], "codigo": p["codigo"], "data": datos})
+    if wants_columnar():
+        return json_response(columnarize(resultados))
     return jsonify(resultados)
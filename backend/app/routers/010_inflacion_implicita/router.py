@@ -1,10 +1,13 @@
 """API routes for Inflación implícita curva soberana (1-10 años)."""
+import threading
+import time
 from datetime import date
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from flask import Blueprint, request, jsonify
 
-from ...database import execute_query, execute_query_single
+from ...database import execute_query
+from ...metrics import registrar_cache
 
 bp = Blueprint('inflacion_implicita', __name__)
 
@@ -15,6 +18,11 @@ PLAZOS_IMPLICITA: List[Tuple[int, str]] = [
     (91, "6 años"), (92, "7 años"), (93, "8 años"), (94, "9 años"), (95, "10 años"),
 ]
 
+# Cache en memoria de la matriz plazo×fecha (se recarga pasado el TTL)
+CACHE_TTL_SEGUNDOS = 300
+_matriz_cache = {"ts": 0.0, "data": None}
+_matriz_lock = threading.Lock()
+
 
 def parse_fecha(fecha_val):
     if isinstance(fecha_val, date):
@@ -30,6 +38,78 @@ def _get_plazos_ordenados() -> List[Tuple[int, str]]:
     return PLAZOS_IMPLICITA
 
 
+def _cargar_matriz() -> Tuple[List[date], Dict[int, Dict[date, float]]]:
+    """
+    Carga todos los plazos en una sola query.
+    
+    Returns:
+        Tuple (fechas ordenadas, {id_variable: {fecha: valor}}) = matriz plazo×fecha
+    """
+    id_vars = [p[0] for p in _get_plazos_ordenados()]
+    placeholders = ",".join(["?" for _ in id_vars])
+    q = f"""
+        SELECT id_variable, fecha, valor
+        FROM maestro_precios
+        WHERE id_pais = ? AND id_variable IN ({placeholders})
+        AND valor IS NOT NULL
+        ORDER BY fecha
+    """
+    rows = execute_query(q, (ID_PAIS,) + tuple(id_vars))
+    matriz = {id_var: {} for id_var in id_vars}
+    fechas = set()
+    for r in rows:
+        fecha = parse_fecha(r["fecha"])
+        matriz[r["id_variable"]][fecha] = float(r["valor"])
+        fechas.add(fecha)
+    return sorted(fechas), matriz
+
+
+def get_matriz_implicita(refresh: bool = False) -> Tuple[List[date], Dict[int, Dict[date, float]]]:
+    """Matriz plazo×fecha de inflación implícita, cacheada CACHE_TTL_SEGUNDOS."""
+    with _matriz_lock:
+        vigente = time.time() - _matriz_cache["ts"] < CACHE_TTL_SEGUNDOS
+        if not refresh and vigente and _matriz_cache["data"] is not None:
+            registrar_cache('inflacion_implicita_matriz', True)
+            return _matriz_cache["data"]
+        registrar_cache('inflacion_implicita_matriz', False)
+        data = _cargar_matriz()
+        _matriz_cache["data"] = data
+        _matriz_cache["ts"] = time.time()
+        return data
+
+
+def _curva_para_fecha(fecha_obj: date, matriz: Dict[int, Dict[date, float]]) -> Dict:
+    """Curva (valores por plazo) para una fecha a partir de la matriz."""
+    plazos = _get_plazos_ordenados()
+    valores = []
+    for id_var, _ in plazos:
+        valor = matriz[id_var].get(fecha_obj)
+        valores.append(round(valor, 2) if valor is not None else None)
+    return {
+        "fecha": fecha_obj.isoformat(),
+        "plazos": [nombre for _, nombre in plazos],
+        "valores": valores,
+    }
+
+
+def _evolucion_para_plazo(plazo_num: int, fecha_desde: date, fecha_hasta: date,
+                          fechas: List[date], matriz: Dict[int, Dict[date, float]]) -> Dict:
+    """Serie temporal de un plazo (1..10) en [fecha_desde, fecha_hasta] a partir de la matriz."""
+    id_var, nombre_plazo = _get_plazos_ordenados()[plazo_num - 1]
+    serie = matriz[id_var]
+    data = [
+        {"fecha": f.isoformat(), "valor": round(serie[f], 2)}
+        for f in fechas
+        if fecha_desde <= f <= fecha_hasta and f in serie
+    ]
+    return {
+        "plazo": plazo_num,
+        "nombre_plazo": nombre_plazo,
+        "id_variable": id_var,
+        "data": data,
+    }
+
+
 @bp.route('/inflacion-implicita/fechas', methods=['GET'])
 def get_fechas():
     """Fechas disponibles para la curva de inflación implícita."""
@@ -37,16 +117,8 @@ def get_fechas():
         plazos = _get_plazos_ordenados()
         if not plazos:
             return jsonify({"ultima_fecha": None, "fechas_disponibles": []})
-        id_vars = [p[0] for p in plazos]
-        placeholders = ",".join(["?" for _ in id_vars])
-        q = f"""
-            SELECT DISTINCT fecha
-            FROM maestro_precios
-            WHERE id_pais = ? AND id_variable IN ({placeholders})
-            ORDER BY fecha DESC
-        """
-        r = execute_query(q, (ID_PAIS,) + tuple(id_vars))
-        fechas = sorted([parse_fecha(x["fecha"]) for x in r], reverse=True)
+        fechas_orden, _ = get_matriz_implicita()
+        fechas = list(reversed(fechas_orden))
         ultima = fechas[0].isoformat() if fechas else None
         return jsonify({
             "ultima_fecha": ultima,
@@ -66,31 +138,20 @@ def get_curva():
         plazos = _get_plazos_ordenados()
         if not plazos:
             return jsonify({"error": "No hay variables de inflación implícita"}), 404
+        fechas, matriz = get_matriz_implicita()
+        # Varias fechas en un solo request: fechas[]=YYYY-MM-DD (devuelve lista de curvas)
+        fechas_multi = request.args.getlist("fechas[]")
+        if fechas_multi:
+            return jsonify([_curva_para_fecha(date.fromisoformat(f), matriz) for f in fechas_multi])
         fecha_str = request.args.get("fecha")
         if fecha_str:
             fecha_obj = date.fromisoformat(fecha_str)
         else:
-            ult = execute_query_single(
-                "SELECT MAX(fecha) AS m FROM maestro_precios WHERE id_pais = ? AND id_variable = ?",
-                (ID_PAIS, plazos[0][0]),
-            )
-            if not ult or not ult.get("m"):
+            serie_1 = matriz[plazos[0][0]]
+            if not serie_1:
                 return jsonify({"error": "No hay datos"}), 404
-            fecha_obj = parse_fecha(ult["m"])
-        plazos_nombres = []
-        valores = []
-        for id_var, nombre in plazos:
-            row = execute_query_single(
-                "SELECT valor FROM maestro_precios WHERE id_variable = ? AND id_pais = ? AND fecha = ?",
-                (id_var, ID_PAIS, fecha_obj.isoformat()),
-            )
-            plazos_nombres.append(nombre)
-            valores.append(round(float(row["valor"]), 2) if row and row.get("valor") is not None else None)
-        return jsonify({
-            "fecha": fecha_obj.isoformat(),
-            "plazos": plazos_nombres,
-            "valores": valores,
-        })
+            fecha_obj = max(serie_1)
+        return jsonify(_curva_para_fecha(fecha_obj, matriz))
     except ValueError as e:
         return jsonify({"error": f"Fecha inválida: {e}"}), 400
     except Exception as e:
@@ -107,32 +168,21 @@ def get_evolucion():
         plazos = _get_plazos_ordenados()
         if not plazos:
             return jsonify({"error": "No hay variables de inflación implícita"}), 404
+        # Varios plazos en un solo request: plazos[]=1..10 (devuelve lista de series)
+        plazos_multi = request.args.getlist("plazos[]", type=int)
         plazo_num = request.args.get("plazo", type=int)
-        if plazo_num is None or plazo_num < 1 or plazo_num > 10:
+        seleccion = plazos_multi or [plazo_num]
+        if any(p is None or p < 1 or p > 10 for p in seleccion):
             return jsonify({"error": "plazo debe ser entre 1 y 10"}), 400
-        id_var = plazos[plazo_num - 1][0]
-        nombre_plazo = plazos[plazo_num - 1][1]
         fecha_desde = request.args.get("fecha_desde")
         fecha_hasta = request.args.get("fecha_hasta")
         if not fecha_desde or not fecha_hasta:
             return jsonify({"error": "fecha_desde y fecha_hasta son obligatorios"}), 400
-        q = """
-            SELECT fecha, valor
-            FROM maestro_precios
-            WHERE id_variable = ? AND id_pais = ? AND fecha >= ? AND fecha <= ?
-            ORDER BY fecha
-        """
-        rows = execute_query(q, (id_var, ID_PAIS, fecha_desde, fecha_hasta))
-        data = [
-            {"fecha": parse_fecha(r["fecha"]).isoformat(), "valor": round(float(r["valor"]), 2)}
-            for r in rows if r.get("valor") is not None
-        ]
-        return jsonify({
-            "plazo": plazo_num,
-            "nombre_plazo": nombre_plazo,
-            "id_variable": id_var,
-            "data": data,
-        })
+        desde = date.fromisoformat(fecha_desde)
+        hasta = date.fromisoformat(fecha_hasta)
+        fechas, matriz = get_matriz_implicita()
+        series = [_evolucion_para_plazo(p, desde, hasta, fechas, matriz) for p in seleccion]
+        return jsonify(series if plazos_multi else series[0])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
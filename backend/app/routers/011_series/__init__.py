@@ -0,0 +1,4 @@
+"""Series batch router module."""
+from .router import bp
+
+__all__ = ['bp']
@@ -0,0 +1,311 @@
+"""API routes for batch time series (series genéricas con transformaciones en servidor)."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import Blueprint, request, jsonify
+
+from ...database import execute_query
+from ...lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+bp = Blueprint('series', __name__)
+
+ID_TC_USD = 20  # Tipo de cambio USD/LC (diario) por país
+ID_IPC = 9      # IPC (mensual) por país
+
+MAX_SERIES = 200
+FRECUENCIAS = {'D': 'D', 'W': 'W', 'M': 'M', 'Q': 'Q', 'Y': 'Y'}
+AGREGACIONES = ('mean', 'last', 'first', 'sum', 'min', 'max')
+TRANSFORMACIONES = ('pct', 'yoy', 'base100')
+# Observaciones por año para YoY según frecuencia (D usa desplazamiento por fecha)
+PERIODOS_ANIO = {'W': 52, 'M': 12, 'Q': 4, 'Y': 1}
+
+
+def _parse_keys(product_ids: List[int], series: List[str]) -> List[Tuple[int, int]]:
+    """
+    Normaliza las claves pedidas a pares (id_variable, id_pais), sin duplicados.
+    Acepta product_ids sintéticos (id_variable * 10000 + id_pais) y/o 'id_variable:id_pais'.
+    """
+    keys = []
+    for product_id in product_ids:
+        keys.append((product_id // 10000, product_id % 10000))
+    for s in series:
+        id_variable, id_pais = str(s).split(':')
+        keys.append((int(id_variable), int(id_pais)))
+    return list(dict.fromkeys(keys))
+
+
+def _cargar_panel(keys: List[Tuple[int, int]], fecha_desde: date, fecha_hasta: date) -> pd.DataFrame:
+    """
+    Carga todas las series en una sola query y devuelve un panel ancho
+    (índice fecha, columnas (id_variable, id_pais)).
+    """
+    conditions = " OR ".join(["(id_variable = ? AND id_pais = ?)"] * len(keys))
+    params = [v for key in keys for v in key] + [fecha_desde.isoformat(), fecha_hasta.isoformat()]
+    query = f"""
+        SELECT id_variable, id_pais, DATE(fecha) AS fecha, valor
+        FROM maestro_precios
+        WHERE ({conditions})
+        AND DATE(fecha) >= DATE(?)
+        AND DATE(fecha) <= DATE(?)
+        AND valor IS NOT NULL
+        ORDER BY fecha ASC
+    """
+    rows = execute_query(query, tuple(params))
+    columnas = pd.MultiIndex.from_tuples(keys, names=['id_variable', 'id_pais'])
+    if not rows:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='fecha'), columns=columnas, dtype=float)
+
+    df = pd.DataFrame(rows, columns=['id_variable', 'id_pais', 'fecha', 'valor'])
+    df['fecha'] = pd.to_datetime(df['fecha'])
+    df['valor'] = df['valor'].astype(float)
+    # Varios valores para la misma fecha: promedio (mismo criterio que convert_to_monthly)
+    panel = df.pivot_table(index='fecha', columns=['id_variable', 'id_pais'], values='valor', aggfunc='mean')
+    return panel.reindex(columns=columnas)
+
+
+def _cargar_metadata(keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict]:
+    """Nombre, país, moneda y periodicidad de cada serie (una sola query)."""
+    conditions = " OR ".join(["(m.id_variable = ? AND m.id_pais = ?)"] * len(keys))
+    params = [v for key in keys for v in key]
+    query = f"""
+        SELECT
+            m.id_variable,
+            m.id_pais,
+            v.id_nombre_variable as nombre,
+            pg.nombre_pais_grupo as pais,
+            v.moneda,
+            m.periodicidad,
+            m.fuente
+        FROM maestro m
+        LEFT JOIN variables v ON m.id_variable = v.id_variable
+        LEFT JOIN pais_grupo pg ON m.id_pais = pg.id_pais
+        WHERE ({conditions})
+    """
+    rows = execute_query(query, tuple(params))
+    return {(r['id_variable'], r['id_pais']): r for r in rows}
+
+
+def _a_frecuencia(panel: pd.DataFrame, frecuencia: Optional[str], agregacion: str) -> pd.DataFrame:
+    """Agrega el panel a la frecuencia pedida; la fecha es el primer día del período."""
+    if not frecuencia or panel.empty:
+        return panel
+    periodos = panel.index.to_period(FRECUENCIAS[frecuencia])
+    agregado = panel.groupby(periodos).agg(agregacion)
+    agregado.index = agregado.index.start_time
+    return agregado
+
+
+def _inicio_rango(fecha_desde: date, frecuencia: Optional[str]) -> pd.Timestamp:
+    """
+    Primera fecha del rango pedido en el índice del panel. Con frecuencia los períodos se
+    rotulan por su primer día (_a_frecuencia): entra el período que contiene a fecha_desde.
+    """
+    inicio = pd.Timestamp(fecha_desde)
+    if frecuencia:
+        inicio = inicio.to_period(FRECUENCIAS[frecuencia]).start_time
+    return inicio
+
+
+def _alinear(auxiliar: pd.DataFrame, indice: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Alinea una serie auxiliar (TC, IPC) al índice del panel tomando el último valor conocido.
+    `indice` puede repetir fechas (ej. 28/02 y 29/02 menos un año caen en la misma).
+    """
+    if auxiliar.empty:
+        return pd.DataFrame(np.nan, index=indice, columns=auxiliar.columns)
+    unicas = indice.unique()
+    return auxiliar.reindex(auxiliar.index.union(unicas)).ffill().reindex(indice)
+
+
+def _aplicar_transformacion(panel: pd.DataFrame, transformacion: str,
+                            frecuencia: Optional[str], base_fecha: Optional[date],
+                            fecha_desde: Optional[date] = None) -> pd.DataFrame:
+    """
+    Aplica una transformación a todas las columnas del panel a la vez.
+    `fecha_desde` es el inicio del rango pedido: el panel llega ampliado hacia atrás para
+    pct/yoy, pero base100 sin base_fecha toma como base el primer dato dentro del rango
+    (con frecuencia, desde el período que contiene a fecha_desde).
+    """
+    if transformacion == 'pct':
+        # Variación % respecto a la observación anterior de cada serie
+        return panel.apply(lambda col: col.dropna().pct_change(fill_method=None).reindex(col.index)) * 100
+
+    if transformacion == 'yoy':
+        periodos = PERIODOS_ANIO.get(frecuencia)
+        if periodos:
+            return panel.pct_change(periods=periodos, fill_method=None) * 100
+        # Diaria / original: comparar contra el último dato disponible un año antes
+        hace_un_anio = panel.index - pd.DateOffset(years=1)
+        previo = _alinear(panel, hace_un_anio)
+        previo.index = panel.index
+        return (panel / previo - 1.0) * 100
+
+    if transformacion == 'base100':
+        if base_fecha is not None:
+            base = _alinear(panel, pd.DatetimeIndex([pd.Timestamp(base_fecha)])).iloc[0]
+        else:
+            # Primer valor válido de cada serie dentro del rango pedido
+            en_rango = panel[panel.index >= _inicio_rango(fecha_desde, frecuencia)] if fecha_desde else panel
+            base = en_rango.apply(lambda col: col.dropna().iloc[0] if col.notna().any() else np.nan)
+        return panel.div(base.where(base != 0)) * 100
+
+    raise ValueError(f"Transformación desconocida: {transformacion}")
+
+
+@bp.route('/series/batch', methods=['GET', 'POST'])
+def get_series_batch():
+    """
+    Obtiene muchas series en una sola llamada, con agregación y transformaciones en servidor.
+
+    Parámetros (query string en GET o JSON en POST):
+    - product_ids[]: IDs sintéticos (id_variable * 10000 + id_pais) y/o
+      series[]: 'id_variable:id_pais'
+    - fecha_desde, fecha_hasta: YYYY-MM-DD
+    - frecuencia: D, W, M, Q, Y (opcional; por defecto la original de cada serie)
+    - agregacion: mean (default), last, first, sum, min, max
+    - moneda: 'usd' convierte series en moneda local a dólares (÷ TC USD/LC del país)
+    - deflactar: 1 para expresar a precios constantes del último mes (÷ IPC del país × último IPC)
+    - transformaciones[]: pct, yoy, base100 (se aplican en el orden recibido)
+    - base_fecha: fecha base para base100 (opcional; por defecto el primer dato de cada serie)
+
+    Retorna formato columnar:
+    {"fechas": [...], "series": [{"product_id", "id_variable", "id_pais", "nombre", "pais", "valores": [...]}], "meta": {...}}
+    """
+    try:
+        if request.method == 'POST':
+            body = request.get_json(silent=True) or {}
+            product_ids = [int(x) for x in body.get('product_ids', [])]
+            series = body.get('series', [])
+            get = body.get
+            transformaciones = body.get('transformaciones', [])
+        else:
+            product_ids = request.args.getlist('product_ids[]', type=int)
+            series = request.args.getlist('series[]')
+            get = request.args.get
+            transformaciones = request.args.getlist('transformaciones[]')
+
+        keys = _parse_keys(product_ids, series)
+        if not keys:
+            return jsonify({'error': 'Se requiere al menos una serie (product_ids[] o series[])'}), 400
+        if len(keys) > MAX_SERIES:
+            return jsonify({'error': f'Máximo {MAX_SERIES} series por request'}), 400
+
+        fecha_desde_str = get('fecha_desde')
+        fecha_hasta_str = get('fecha_hasta')
+        if not fecha_desde_str or not fecha_hasta_str:
+            return jsonify({'error': 'Se requieren fecha_desde y fecha_hasta'}), 400
+        fecha_desde = date.fromisoformat(fecha_desde_str)
+        fecha_hasta = date.fromisoformat(fecha_hasta_str)
+        if fecha_desde > fecha_hasta:
+            return jsonify({'error': 'fecha_desde debe ser anterior a fecha_hasta'}), 400
+
+        frecuencia = (get('frecuencia') or '').upper() or None
+        if frecuencia and frecuencia not in FRECUENCIAS:
+            return jsonify({'error': f'frecuencia debe ser una de {", ".join(FRECUENCIAS)}'}), 400
+        agregacion = (get('agregacion') or 'mean').lower()
+        if agregacion not in AGREGACIONES:
+            return jsonify({'error': f'agregacion debe ser una de {", ".join(AGREGACIONES)}'}), 400
+        transformaciones = [t.lower() for t in transformaciones]
+        invalidas = [t for t in transformaciones if t not in TRANSFORMACIONES]
+        if invalidas:
+            return jsonify({'error': f'Transformaciones no soportadas: {", ".join(invalidas)}'}), 400
+        moneda = (get('moneda') or '').lower() or None
+        if moneda and moneda != 'usd':
+            return jsonify({'error': "moneda solo admite 'usd'"}), 400
+        deflactar = str(get('deflactar') or '').lower() in ('1', 'true', 'si', 'sí')
+        base_fecha_str = get('base_fecha')
+        base_fecha = date.fromisoformat(base_fecha_str) if base_fecha_str else None
+
+        metadata = _cargar_metadata(keys)
+        paises = sorted({id_pais for _, id_pais in keys})
+
+        # Series auxiliares (TC, IPC) en la misma query que las pedidas
+        tc_keys = [(ID_TC_USD, p) for p in paises] if moneda else []
+        ipc_keys = [(ID_IPC, p) for p in paises] if deflactar else []
+        todas = list(dict.fromkeys(keys + tc_keys + ipc_keys))
+
+        # Ampliar hacia atrás para pct/yoy y para tener TC/IPC vigente al inicio del rango;
+        # con frecuencia, al menos desde el inicio del primer período (que se agregue completo)
+        inicio_rango = _inicio_rango(fecha_desde, frecuencia)
+        fecha_desde_eff = inicio_rango.date()
+        if transformaciones or moneda or deflactar:
+            fecha_desde_eff = fecha_desde_eff - timedelta(days=400)
+        panel_todo = _cargar_panel(todas, fecha_desde_eff, fecha_hasta)
+
+        panel = _a_frecuencia(panel_todo[keys].dropna(how='all'), frecuencia, agregacion)
+        avisos = []
+
+        if moneda:
+            tc = _a_frecuencia(panel_todo[tc_keys].dropna(how='all'), frecuencia, 'mean')
+            tc = _alinear(tc, panel.index)
+            for key in keys:
+                moneda_serie = ((metadata.get(key) or {}).get('moneda') or 'lc').lower()
+                if moneda_serie == 'usd':
+                    continue
+                if moneda_serie != 'lc':
+                    avisos.append(f'{key[0]}:{key[1]} en {moneda_serie}: sin conversión')
+                    continue
+                tc_pais = tc[(ID_TC_USD, key[1])]
+                panel[key] = panel[key] / tc_pais.where(tc_pais > 0)
+
+        if deflactar:
+            ipc = _alinear(panel_todo[ipc_keys].dropna(how='all'), panel.index)
+            for key in keys:
+                ipc_pais = ipc[(ID_IPC, key[1])]
+                ultimo = ipc_pais.dropna()
+                if ultimo.empty:
+                    avisos.append(f'{key[0]}:{key[1]}: sin IPC para deflactar')
+                    panel[key] = np.nan
+                    continue
+                panel[key] = panel[key] / ipc_pais.where(ipc_pais > 0) * ultimo.iloc[-1]
+
+        for transformacion in transformaciones:
+            panel = _aplicar_transformacion(panel, transformacion, frecuencia, base_fecha, fecha_desde)
+
+        # Recortar al rango pedido y eliminar fechas sin ningún dato
+        panel = panel[(panel.index >= inicio_rango) & (panel.index <= pd.Timestamp(fecha_hasta))]
+        panel = panel.replace([np.inf, -np.inf], np.nan).dropna(how='all')
+
+        fechas = panel.index.strftime('%Y-%m-%d').tolist()
+        valores = panel.round(6).astype(object).where(panel.notna(), None)
+        result_series = []
+        for key in keys:
+            info = metadata.get(key) or {}
+            result_series.append({
+                'product_id': key[0] * 10000 + key[1],
+                'id_variable': key[0],
+                'id_pais': key[1],
+                'nombre': info.get('nombre'),
+                'pais': info.get('pais'),
+                'fuente': info.get('fuente'),
+                'periodicidad': info.get('periodicidad'),
+                'valores': valores[key].tolist(),
+            })
+
+        return jsonify({
+            'fechas': fechas,
+            'series': result_series,
+            'meta': {
+                'fecha_desde': fecha_desde.isoformat(),
+                'fecha_hasta': fecha_hasta.isoformat(),
+                'frecuencia': frecuencia,
+                'agregacion': agregacion,
+                'moneda': moneda,
+                'deflactar': deflactar,
+                'transformaciones': transformaciones,
+                'avisos': avisos,
+            }
+        })
+
+    except ValueError as e:
+        return jsonify({'error': f'Parámetros inválidos: {str(e)}'}), 400
+    except Exception as e:
+        import traceback
+        print(f"[SERIES] ERROR en get_series_batch: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': f'Error al obtener series: {str(e)}'}), 500
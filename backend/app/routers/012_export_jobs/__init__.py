@@ -0,0 +1,4 @@
+"""Export jobs router module."""
+from .router import bp
+
+__all__ = ['bp']
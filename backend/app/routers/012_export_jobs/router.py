@@ -0,0 +1,85 @@
+"""API routes for background export jobs (exports pesados fuera del request)."""
+from flask import Blueprint, request, jsonify, send_file
+
+from ...export_jobs import EXPORT_TIPOS, crear_job, leer_job, resultado_job
+
+bp = Blueprint('export_jobs', __name__)
+
+
+def _normalizar_params(tipo: str, params):
+    """
+    Parámetros del export en la forma que espera el endpoint síncrono.
+
+    GET: dict {clave: valor | [valores]} o lista de pares -> pares [clave, valor]
+    ordenados (mismo export con otro orden de product_ids[] = mismo job).
+    POST: el JSON tal cual.
+    """
+    metodo = EXPORT_TIPOS[tipo][0]
+    if metodo == 'POST':
+        return params or {}
+    pares = []
+    if isinstance(params, dict):
+        for clave, valor in params.items():
+            for item in (valor if isinstance(valor, list) else [valor]):
+                if item is not None:
+                    pares.append([str(clave), str(item)])
+    else:
+        pares = [[str(clave), str(valor)] for clave, valor in (params or [])]
+    return sorted(pares)
+
+
+def _job_json(job: dict) -> dict:
+    data = {k: v for k, v in job.items() if k != 'params'}
+    data['download_url'] = f"/api/export-jobs/{job['id']}/download" if job.get('estado') == 'completado' else None
+    return data
+
+
+@bp.route('/export-jobs', methods=['POST'])
+def create_export_job():
+    """
+    Encola un export.
+    
+    JSON: {"tipo": "variaciones|dcp_indices|datos|licitacion_pdf", "params": {...}}
+    Retorna 202 con el job nuevo, o 200 si ya existe uno igual (en curso o cacheado).
+    """
+    data = request.get_json(silent=True) or {}
+    tipo = data.get('tipo')
+    if tipo not in EXPORT_TIPOS:
+        return jsonify({'error': f"tipo debe ser uno de: {', '.join(EXPORT_TIPOS)}"}), 400
+    
+    try:
+        params = _normalizar_params(tipo, data.get('params'))
+        job, reutilizado = crear_job(tipo, params)
+    except Exception as e:
+        print(f"[ERROR] create_export_job: {str(e)}")
+        return jsonify({'error': f'Error al crear el export: {str(e)}'}), 500
+    
+    payload = _job_json(job)
+    payload['cache'] = reutilizado
+    return jsonify(payload), (200 if reutilizado else 202)
+
+
+@bp.route('/export-jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id: str):
+    """Estado y progreso del job (estado: pendiente, ejecutando, completado, error)."""
+    job = leer_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job no encontrado'}), 404
+    return jsonify(_job_json(job))
+
+
+@bp.route('/export-jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id: str):
+    """Descarga el archivo generado por el job."""
+    job = leer_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job no encontrado'}), 404
+    path = resultado_job(job)
+    if path is None:
+        return jsonify({'error': 'El export todavía no está listo', 'estado': job.get('estado')}), 409
+    return send_file(
+        path,
+        mimetype=job.get('mimetype') or 'application/octet-stream',
+        as_attachment=True,
+        download_name=job.get('filename') or path.name
+    )
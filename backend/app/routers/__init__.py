@@ -34,30 +34,51 @@ def load_module_from_path(module_name, folder_name):
     
     return module
 
-ticker_000 = load_module_from_path('ticker_000', '000_ticker')
-dcp_001 = load_module_from_path('dcp_001', '001_dcp')
-cotizaciones_002 = load_module_from_path('cotizaciones_002', '002_cotizaciones')
-inflacion_dolares_003 = load_module_from_path('inflacion_dolares_003', '003_inflacion_dolares')
-prices_004 = load_module_from_path('prices_004', '004_prices')
-yield_curve_005 = load_module_from_path('yield_curve_005', '005_yield_curve')
-data_export_006 = load_module_from_path('data_export_006', '006_data_export')
-licitaciones_lrm_007 = load_module_from_path('licitaciones_lrm_007', '007_licitaciones_lrm')
-update_008 = load_module_from_path('update_008', '008_update')
-politica_monetaria_009 = load_module_from_path('politica_monetaria_009', '009_politica_monetaria')
-inflacion_implicita_010 = load_module_from_path('inflacion_implicita_010', '010_inflacion_implicita')
-
-# Export modules/blueprints with original names for backward compatibility
-# ticker module exports a blueprint named 'ticker'
-ticker = ticker_000
-# Other modules export 'bp' blueprint - export the modules themselves
-dcp = dcp_001
-cotizaciones = cotizaciones_002
-inflacion_dolares = inflacion_dolares_003
-prices = prices_004
-yield_curve = yield_curve_005
-# data_export exports the blueprint directly
-data_export = data_export_006.data_export
-licitaciones_lrm = licitaciones_lrm_007
-update = update_008
-politica_monetaria = politica_monetaria_009
-inflacion_implicita = inflacion_implicita_010
\ No newline at end of file
+# Registro de routers: (alias, carpeta, atributo del módulo con el blueprint, url_prefix).
+# El orden es el de registro en la app.
+ROUTERS = [
+    ('ticker', '000_ticker', 'ticker', ''),
+    ('data_export', '006_data_export', 'data_export', '/api'),
+    ('prices', '004_prices', 'bp', '/api'),
+    ('dcp', '001_dcp', 'bp', '/api'),
+    ('cotizaciones', '002_cotizaciones', 'bp', '/api'),
+    ('inflacion_dolares', '003_inflacion_dolares', 'bp', '/api'),
+    ('yield_curve', '005_yield_curve', 'bp', '/api'),
+    ('licitaciones_lrm', '007_licitaciones_lrm', 'bp', '/api'),
+    ('politica_monetaria', '009_politica_monetaria', 'bp', '/api'),
+    ('inflacion_implicita', '010_inflacion_implicita', 'bp', '/api'),
+    ('series', '011_series', 'bp', '/api'),
+    ('export_jobs', '012_export_jobs', 'bp', '/api'),
+    ('update', '008_update', 'bp', '/api'),
+]
+
+_ALIASES = {alias: carpeta for alias, carpeta, _, _ in ROUTERS}
+
+
+def get_router_module(folder_name):
+    """Módulo de un router numerado (se carga una sola vez)."""
+    full_module_name = f'app.routers.{folder_name}'
+    module = sys.modules.get(full_module_name)
+    if module is None:
+        module = load_module_from_path(folder_name, folder_name)
+    return module
+
+
+def register_blueprints(app):
+    """Carga los routers y registra sus blueprints en la app (en el orden de ROUTERS)."""
+    for alias, folder_name, attr, url_prefix in ROUTERS:
+        module = get_router_module(folder_name)
+        app.register_blueprint(getattr(module, attr), url_prefix=url_prefix)
+
+
+def __getattr__(name):
+    """
+    Compatibilidad con `from app.routers import dcp`: los routers ya no se cargan
+    al importar el paquete sino al pedirlos (o en register_blueprints).
+    
+    ticker y los demás módulos se exportan como módulo; data_export como blueprint.
+    """
+    if name in _ALIASES:
+        module = get_router_module(_ALIASES[name])
+        return module.data_export if name == 'data_export' else module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
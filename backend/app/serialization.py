@@ -0,0 +1,89 @@
+"""Serialización JSON rápida y formato columnar para endpoints de series."""
+from datetime import date, datetime
+from decimal import Decimal
+import json
+from typing import Any, Dict, List
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: fallback a json estándar
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Tipos que no serializa el encoder base (Decimal de PostgreSQL, numpy, fechas)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):  # numpy arrays/escalares
+        return obj.tolist()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializa a JSON compacto (orjson si está instalado)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj: Any, status: int = 200) -> Response:
+    """Response JSON usando el encoder rápido."""
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de la app: jsonify y app.json usan dumps() (orjson si está).
+
+    Serializa date/datetime en ISO 8601 y Decimal como número, en vez del
+    formato HTTP y el string del encoder por defecto de Flask.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def wants_columnar() -> bool:
+    """True si el request pidió format=columnar."""
+    return (request.args.get('format') or '').lower() == 'columnar'
+
+
+def _fecha_iso(fecha: Any) -> Any:
+    if isinstance(fecha, datetime):
+        return fecha.date().isoformat()
+    if isinstance(fecha, date):
+        return fecha.isoformat()
+    if isinstance(fecha, str) and ' ' in fecha:
+        return fecha.split(' ')[0]
+    return fecha
+
+
+def _numero(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def to_columnar(points: List[Dict], fecha_key: str = 'fecha', valor_key: str = 'valor') -> Dict[str, list]:
+    """[{"fecha": f, "valor": v}, ...] -> {"fechas": [f, ...], "valores": [v, ...]}."""
+    return {
+        'fechas': [_fecha_iso(p[fecha_key]) for p in points],
+        'valores': [_numero(p[valor_key]) for p in points],
+    }
+
+
+def columnarize(series_list: List[Dict], data_key: str = 'data') -> List[Dict]:
+    """Reemplaza la lista de puntos de cada serie (series[data_key]) por su versión columnar."""
+    return [
+        {**serie, data_key: to_columnar(serie.get(data_key) or [])}
+        for serie in series_list
+    ]
@@ -0,0 +1,150 @@
+// Historial de corridas de update/ (tablas pipeline_corridas / pipeline_scripts)
+const FASE_COLORES = {
+    download: 'bg-sky-500',
+    direct: 'bg-indigo-500',
+    calculate: 'bg-emerald-500',
+};
+
+function formatSeconds(seconds) {
+    if (seconds == null) return '--';
+    return formatElapsed(Math.round(seconds));
+}
+
+function formatBytes(bytes) {
+    if (bytes == null) return '--';
+    if (bytes < 1024) return `${bytes} B`;
+    if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+    return `${(bytes / 1024 / 1024).toFixed(1)} MB`;
+}
+
+// Timeline tipo Gantt: una barra por script, ubicada según su inicio/fin dentro de la corrida
+function RunGantt({ detalle }) {
+    const { scripts, resumen } = detalle;
+    const total = Math.max(resumen.reloj_s || 0, ...scripts.map(s => s.fin_s), 1);
+    return (
+        <div>
+            <p className="text-xs text-gray-600 mb-2">
+                Reloj: {formatSeconds(resumen.reloj_s)} · Suma de scripts: {formatSeconds(resumen.suma_scripts_s)}
+                {' '}· Paralelismo: {resumen.paralelismo ?? '--'}x · Máx. simultáneos: {resumen.max_concurrentes}
+                {' '}· Fallidos: {resumen.fallidos}
+            </p>
+            <div className="space-y-0.5 max-h-96 overflow-y-auto">
+                {scripts.map((s, idx) => (
+                    <div key={idx} className="flex items-center text-xs">
+                        <span className="w-64 truncate text-gray-700 pr-2" title={`${s.fase}/${s.script}`}>{s.script}</span>
+                        <div className="relative flex-1 h-3 bg-gray-100 rounded">
+                            <div
+                                className={`absolute h-3 rounded ${s.estado === 'ok' ? (FASE_COLORES[s.fase] || 'bg-gray-500') : 'bg-red-500'}`}
+                                style={{
+                                    left: `${(s.inicio_s / total) * 100}%`,
+                                    width: `${Math.max(((s.fin_s - s.inicio_s) / total) * 100, 0.3)}%`,
+                                }}
+                                title={`${s.script}: ${formatSeconds(s.duracion_s)} (${s.estado})` +
+                                    (s.filas_insertadas != null ? ` · ${s.filas_insertadas} filas insertadas` : '') +
+                                    (s.bytes_descargados != null ? ` · ${formatBytes(s.bytes_descargados)}` : '')}
+                            />
+                        </div>
+                        <span className="w-16 text-right text-gray-500">{formatSeconds(s.duracion_s)}</span>
+                    </div>
+                ))}
+            </div>
+        </div>
+    );
+}
+
+function UpdateHistory({ refreshKey, updating, onResume }) {
+    const [historial, setHistorial] = React.useState(null);
+    const [runId, setRunId] = React.useState(null);
+    const [detalle, setDetalle] = React.useState(null);
+
+    React.useEffect(() => {
+        AdminAPI.getUpdateHistory(30)
+            .then(data => {
+                if (data && Array.isArray(data.corridas)) {
+                    setHistorial(data);
+                    if (data.corridas.length > 0) setRunId(prev => prev || data.corridas[0].run_id);
+                }
+            })
+            .catch(err => console.error('Error cargando historial:', err));
+    }, [refreshKey]);
+
+    React.useEffect(() => {
+        if (!runId) return;
+        setDetalle(null);
+        AdminAPI.getUpdateRun(runId)
+            .then(data => { if (data && data.scripts) setDetalle(data); })
+            .catch(err => console.error('Error cargando corrida:', err));
+    }, [runId]);
+
+    if (!historial || historial.corridas.length === 0) return null;
+
+    const masLentos = historial.tendencias.filter(t => t.cambio_pct != null).slice(0, 10);
+    const seleccionada = historial.corridas.find(c => c.run_id === runId);
+    // Solo update_database admite --resume; se saltean los scripts ya completados
+    const reanudable = seleccionada && seleccionada.pipeline === 'update_database' && seleccionada.estado !== 'ok';
+
+    return (
+        <div className="bg-gray-50 rounded-lg p-4 mt-6">
+            <h3 className="text-sm font-semibold text-gray-700 mb-2">Historial de corridas (últimos {historial.dias} días)</h3>
+            <div className="flex items-center gap-2 mb-3 text-xs">
+                <label className="text-gray-600">Corrida:</label>
+                <select
+                    value={runId || ''}
+                    onChange={e => setRunId(e.target.value)}
+                    className="border rounded px-2 py-1"
+                >
+                    {historial.corridas.map(c => (
+                        <option key={c.run_id} value={c.run_id}>
+                            {c.inicio.replace('T', ' ').slice(0, 16)} · {c.pipeline} · {c.estado}
+                            {' '}· {formatSeconds(c.duracion_s)} · {c.fallidos || 0}/{c.scripts} con error
+                        </option>
+                    ))}
+                </select>
+                {reanudable && onResume && (
+                    <button
+                        type="button"
+                        onClick={() => onResume(runId)}
+                        disabled={updating}
+                        className="px-3 py-1 bg-indigo-600 text-white rounded hover:bg-indigo-700 disabled:opacity-50"
+                        title="Vuelve a correr solo lo que falló, no llegó a correr o cambió desde entonces"
+                    >
+                        Reanudar
+                    </button>
+                )}
+            </div>
+            {detalle ? <RunGantt detalle={detalle} /> : <p className="text-xs text-gray-500">Cargando...</p>}
+
+            {masLentos.length > 0 && (
+                <div className="mt-4">
+                    <h4 className="text-xs font-semibold text-gray-700 mb-1">
+                        Tendencia por script (mediana de las últimas 5 contra las anteriores)
+                    </h4>
+                    <table className="w-full text-xs">
+                        <thead>
+                            <tr className="text-left text-gray-500">
+                                <th className="py-1">Script</th>
+                                <th className="py-1 text-right">Anterior</th>
+                                <th className="py-1 text-right">Reciente</th>
+                                <th className="py-1 text-right">Cambio</th>
+                                <th className="py-1 text-right">Errores</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {masLentos.map(t => (
+                                <tr key={t.script} className="border-t">
+                                    <td className="py-1 text-gray-700">{t.fase}/{t.script}</td>
+                                    <td className="py-1 text-right">{formatSeconds(t.mediana_anterior_s)}</td>
+                                    <td className="py-1 text-right">{formatSeconds(t.mediana_reciente_s)}</td>
+                                    <td className={`py-1 text-right ${t.cambio_pct > 20 ? 'text-red-600 font-semibold' : 'text-gray-700'}`}>
+                                        {t.cambio_pct > 0 ? '+' : ''}{t.cambio_pct}%
+                                    </td>
+                                    <td className="py-1 text-right">{t.errores}/{t.ejecuciones}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+}
@@ -111,14 +111,14 @@ function UpdateTab() {
         }
     };
 
-    const handleUpdateDataset = async () => {
+    const handleUpdateDataset = async (resume = null) => {
         if (updating) return;
         setUpdating(true);
-        setUpdateLog(['Iniciando actualización...']);
+        setUpdateLog([resume ? `Reanudando corrida ${resume}...` : 'Iniciando actualización...']);
         setElapsedSeconds(0);
         
         try {
-            await AdminAPI.runUpdate();
+            await AdminAPI.runUpdate(resume);
             
             const pollInterval = setInterval(async () => {
                 try {
@@ -167,7 +167,7 @@ function UpdateTab() {
             
             <div className="flex justify-center gap-4 mb-6">
                 <button
-                    onClick={handleUpdateDataset}
+                    onClick={() => handleUpdateDataset()}
                     disabled={updating}
                     className="px-6 py-3 bg-indigo-600 text-white rounded-md hover:bg-indigo-700 disabled:opacity-50 disabled:cursor-not-allowed font-medium"
                 >
@@ -219,6 +219,12 @@ function UpdateTab() {
                     </div>
                 </div>
             )}
+
+            <UpdateHistory
+                refreshKey={updateLogs.length > 0 ? updateLogs[0].filename : ''}
+                updating={updating}
+                onResume={handleUpdateDataset}
+            />
         </div>
     );
 }
@@ -135,9 +135,13 @@ const AdminAPI = {
     checkSession: () => fetchAdmin('/check'),
     
     // Update (usa /api/update, mismo origin, con token si hay)
-    runUpdate: async () => {
-        const opts = { method: 'POST', credentials: 'include' };
-        if (_adminToken) opts.headers = { 'Authorization': `Bearer ${_adminToken}` };
+    runUpdate: async (resume = null) => {
+        const opts = { method: 'POST', credentials: 'include', headers: {} };
+        if (_adminToken) opts.headers['Authorization'] = `Bearer ${_adminToken}`;
+        if (resume) {
+            opts.headers['Content-Type'] = 'application/json';
+            opts.body = JSON.stringify({ resume });
+        }
         const r = await fetch(`${window.location.origin}/api/update/run`, opts);
         const data = await r.json().catch(() => ({}));
         if (!r.ok) throw new Error(data.error || `Error ${r.status}`);
@@ -161,4 +165,16 @@ const AdminAPI = {
         if (_adminToken) opts.headers = { 'Authorization': `Bearer ${_adminToken}` };
         return fetch(`${window.location.origin}/api/update/logs`, opts).then(r => r.json());
     },
+    getUpdateHistory: (dias = 30, pipeline = '') => {
+        const opts = { credentials: 'include' };
+        if (_adminToken) opts.headers = { 'Authorization': `Bearer ${_adminToken}` };
+        const params = new URLSearchParams({ dias });
+        if (pipeline) params.set('pipeline', pipeline);
+        return fetch(`${window.location.origin}/api/update/history?${params}`, opts).then(r => r.json());
+    },
+    getUpdateRun: (runId) => {
+        const opts = { credentials: 'include' };
+        if (_adminToken) opts.headers = { 'Authorization': `Bearer ${_adminToken}` };
+        return fetch(`${window.location.origin}/api/update/history/${encodeURIComponent(runId)}`, opts).then(r => r.json());
+    },
 };
@@ -174,22 +174,14 @@ function DataExport() {
         
         setLoading(true);
         try {
-            const params = new URLSearchParams();
-            selectedVariables.forEach(id => params.append('variable_ids[]', id));
-            selectedCountries.forEach(id => params.append('pais_ids[]', id));
-            if (fechaDesde) params.append('fecha_desde', fechaDesde);
-            if (fechaHasta) params.append('fecha_hasta', fechaHasta);
+            const params = {
+                'variable_ids[]': selectedVariables,
+                'pais_ids[]': selectedCountries
+            };
+            if (fechaDesde) params.fecha_desde = fechaDesde;
+            if (fechaHasta) params.fecha_hasta = fechaHasta;
             
-            const response = await fetch(`/api/export/download?${params}`);
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `exportacion_datos_${new Date().toISOString().split('T')[0]}.xlsx`;
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
+            await runExportJob('datos', params);
         } catch (error) {
             console.error('Error descargando:', error);
             alert('Error al descargar archivo');
@@ -139,35 +139,11 @@ function DCPPage() {
         }
 
         try {
-            const params = new URLSearchParams();
-            selectedProductsDCP.forEach(id => params.append('product_ids[]', id));
-            params.append('fecha_desde', fechaDesde);
-            params.append('fecha_hasta', fechaHasta);
-
-            const response = await fetch(`${API_BASE}/dcp/indices/export?${params}`);
-            if (!response.ok) {
-                throw new Error('Error al generar el archivo Excel');
-            }
-
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            
-            const contentDisposition = response.headers.get('Content-Disposition');
-            let filename = 'indices_precios_relativos.xlsx';
-            if (contentDisposition) {
-                const filenameMatch = contentDisposition.match(/filename="?(.+)"?/i);
-                if (filenameMatch) {
-                    filename = filenameMatch[1];
-                }
-            }
-            
-            a.download = filename;
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
+            await runExportJob('dcp_indices', {
+                'product_ids[]': selectedProductsDCP,
+                fecha_desde: fechaDesde,
+                fecha_hasta: fechaHasta
+            });
         } catch (error) {
             console.error('Error downloading Excel:', error);
             alert('Error al descargar el archivo Excel');
@@ -61,7 +61,7 @@ function InflacionImplicitaPage({ embeddedView }) {
         }
         setLoading(true);
         setError(null);
-        Promise.all(fechas.map(fecha => fetch(`${API_BASE}/inflacion-implicita/curva?fecha=${fecha}`).then(r => r.ok ? r.json() : Promise.reject(new Error(r.statusText)))))
+        fetch(`${API_BASE}/inflacion-implicita/curva?${fechas.map(f => `fechas[]=${f}`).join('&')}`).then(r => r.ok ? r.json() : Promise.reject(new Error(r.statusText)))
             .then(arr => {
                 setCurvaData(arr);
                 setError(null);
@@ -81,7 +81,7 @@ function InflacionImplicitaPage({ embeddedView }) {
         }
         setLoading(true);
         setError(null);
-        Promise.all(plazosIds.map(plazo => fetch(`${API_BASE}/inflacion-implicita/evolucion?plazo=${plazo}&fecha_desde=${fechaDesde}&fecha_hasta=${fechaHasta}`).then(r => r.ok ? r.json() : Promise.reject(new Error(r.statusText)))))
+        fetch(`${API_BASE}/inflacion-implicita/evolucion?${plazosIds.map(p => `plazos[]=${p}`).join('&')}&fecha_desde=${fechaDesde}&fecha_hasta=${fechaHasta}`).then(r => r.ok ? r.json() : Promise.reject(new Error(r.statusText)))
             .then(arr => {
                 setEvolucionData(arr);
                 setError(null);
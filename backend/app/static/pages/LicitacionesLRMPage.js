@@ -83,33 +83,11 @@ function LicitacionesLRMPage() {
         }
         
         try {
-            const response = await fetch(`${API_BASE}/licitaciones-lrm/generate-pdf`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    fecha: selectedCombinacion.fecha,
-                    plazo: selectedCombinacion.plazo
-                })
+            await runExportJob('licitacion_pdf', {
+                fecha: selectedCombinacion.fecha,
+                plazo: selectedCombinacion.plazo
             });
             
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || `Error ${response.status}`);
-            }
-            
-            // Descargar el PDF
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `licitacion_lrm_${selectedCombinacion.fecha}_${selectedCombinacion.plazo}dias.pdf`;
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
-            
         } catch (error) {
             console.error('Error generating PDF:', error);
             alert(`Error al generar PDF: ${error.message}`);
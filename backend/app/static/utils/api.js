@@ -19,3 +19,41 @@ function parseISODateLocal(isoDateStr) {
     if (!y || !m || !d) return null;
     return new Date(y, m - 1, d);
 }
+
+// Exports pesados en segundo plano: crea el job, consulta el progreso y descarga el archivo
+// tipo: 'variaciones' | 'dcp_indices' | 'datos' | 'licitacion_pdf'
+// params: objeto {clave: valor | [valores]} (mismos parámetros que el endpoint síncrono)
+async function runExportJob(tipo, params, onProgress) {
+    const createResponse = await fetch(`${API_BASE}/export-jobs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ tipo, params })
+    });
+    let job = await createResponse.json();
+    if (!createResponse.ok) {
+        throw new Error(job.error || `Error ${createResponse.status}`);
+    }
+
+    while (job.estado === 'pendiente' || job.estado === 'ejecutando') {
+        if (onProgress) onProgress(job.progreso || 0);
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`${API_BASE}/export-jobs/${job.id}`);
+        job = await statusResponse.json();
+        if (!statusResponse.ok) {
+            throw new Error(job.error || `Error ${statusResponse.status}`);
+        }
+    }
+    if (job.estado !== 'completado') {
+        throw new Error(job.error || 'Error al generar el archivo');
+    }
+    if (onProgress) onProgress(100);
+
+    // El download_url es relativo al host; API_BASE ya incluye /api
+    const a = document.createElement('a');
+    a.href = `${API_BASE}/export-jobs/${job.id}/download`;
+    a.download = job.filename || '';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    return job;
+}
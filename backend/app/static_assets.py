@@ -0,0 +1,166 @@
+"""Manifest en memoria de los archivos estáticos del frontend.
+
+Al arrancar se leen todos los archivos de static/, se calcula un hash de
+contenido por archivo y se precomprimen (gzip y brotli si está instalado) los
+de texto. Los HTML se reescriben para que cada `/static/<archivo>` lleve
+`?v=<hash>`: esas URLs no cambian mientras el archivo no cambie, así que se
+sirven con Cache-Control immutable. index.html se cachea poco tiempo (es el
+que trae los hashes nuevos después de un deploy).
+
+Así cada request de un .js se resuelve con un lookup en un dict, sin
+Path.exists()/send_file, y el navegador no vuelve a bajar JS que no cambió.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from flask import Response, request
+
+from .compression import COMPRESSIBLE_MIMETYPES, brotli, elegir_encoding
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Assets pedidos sin ?v=<hash> (o con un hash viejo): siempre revalidar con ETag
+REVALIDATE_CACHE = 'no-cache'
+HTML_MAX_AGE_SEGUNDOS = int(os.getenv('STATIC_HTML_MAX_AGE', '60'))
+MIN_BYTES_COMPRIMIR = 256
+EXTENSIONES_IGNORADAS = ('.backup', '.map', '.tmp')
+
+_STATIC_REF = re.compile(r'''((?:src|href)=["'])/static/([^"'?#]+)(["'])''')
+
+
+class StaticAsset:
+    """Un archivo del manifest con sus variantes codificadas."""
+
+    __slots__ = ('path', 'mimetype', 'hash', 'variantes', 'mtime')
+
+    def __init__(self, path: Path, mimetype: str, contenido: bytes, mtime: float):
+        self.path = path
+        self.mimetype = mimetype
+        self.hash = hashlib.sha256(contenido).hexdigest()[:16]
+        self.mtime = mtime
+        self.variantes = {'': contenido}
+        if mimetype in COMPRESSIBLE_MIMETYPES and len(contenido) >= MIN_BYTES_COMPRIMIR:
+            self.variantes['gzip'] = gzip.compress(contenido, compresslevel=9)
+            if brotli is not None:
+                self.variantes['br'] = brotli.compress(contenido, quality=11)  # Una sola vez por archivo: calidad máxima
+
+    @property
+    def es_html(self) -> bool:
+        return self.mimetype == 'text/html'
+
+
+def _mimetype(path: Path) -> str:
+    if path.suffix == '.js':
+        return 'application/javascript'
+    return mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+
+class StaticManifest:
+    """Índice ruta relativa -> StaticAsset de una carpeta de estáticos."""
+
+    def __init__(self, root: Path, recargar: bool = False):
+        self.root = Path(root)
+        # En desarrollo (recargar=True) se vuelve a leer un archivo si cambió su mtime
+        self.recargar = recargar
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+        self.build()
+
+    def build(self) -> None:
+        """Lee y precomprime todos los archivos. Los HTML van al final para poder fingerprintear sus referencias."""
+        assets = {}
+        if not self.root.exists():
+            self._assets = assets
+            return
+        html = []
+        for path in sorted(self.root.rglob('*')):
+            if not path.is_file() or path.suffix in EXTENSIONES_IGNORADAS:
+                continue
+            rel = path.relative_to(self.root).as_posix()
+            if _mimetype(path) == 'text/html':
+                html.append((rel, path))
+            else:
+                assets[rel] = self._cargar(path)
+        for rel, path in html:
+            assets[rel] = self._cargar(path, assets)
+        with self._lock:
+            self._assets = assets
+
+    def _cargar(self, path: Path, assets: Optional[Dict[str, StaticAsset]] = None) -> StaticAsset:
+        contenido = path.read_bytes()
+        mimetype = _mimetype(path)
+        if mimetype == 'text/html':
+            contenido = self._fingerprint_html(contenido, assets if assets is not None else self._assets)
+        return StaticAsset(path, mimetype, contenido, path.stat().st_mtime)
+
+    @staticmethod
+    def _fingerprint_html(contenido: bytes, assets: Dict[str, StaticAsset]) -> bytes:
+        """Agrega ?v=<hash> a cada /static/<archivo> que esté en el manifest."""
+        def reemplazar(m):
+            asset = assets.get(m.group(2))
+            if asset is None:
+                return m.group(0)
+            return f'{m.group(1)}/static/{m.group(2)}?v={asset.hash}{m.group(3)}'
+        return _STATIC_REF.sub(reemplazar, contenido.decode('utf-8')).encode('utf-8')
+
+    def get(self, rel: str) -> Optional[StaticAsset]:
+        """Asset por ruta relativa (None si no existe o la ruta sale de la carpeta)."""
+        rel = rel.lstrip('/')
+        asset = self._assets.get(rel)
+        if asset is None or not self.recargar:
+            return asset
+        try:
+            mtime = asset.path.stat().st_mtime
+        except OSError:
+            return None
+        if mtime != asset.mtime:
+            # Cambió un archivo en desarrollo: rearmar todo (los HTML dependen de los hashes)
+            self.build()
+            asset = self._assets.get(rel)
+        return asset
+
+    def url(self, rel: str) -> str:
+        """URL fingerprinteada de un asset (/static/<rel>?v=<hash>)."""
+        asset = self.get(rel)
+        return f'/static/{rel}?v={asset.hash}' if asset else f'/static/{rel}'
+
+    def response(self, rel: str) -> Optional[Response]:
+        """
+        Response para el asset o None si no existe.
+
+        Elige la variante según Accept-Encoding, responde 304 si el ETag
+        coincide y pone Cache-Control según el tipo de archivo y si la URL
+        trae el hash vigente.
+        """
+        asset = self.get(rel)
+        if asset is None:
+            return None
+
+        encoding = elegir_encoding(request.accept_encodings)
+        if encoding not in asset.variantes:
+            encoding = 'gzip' if 'gzip' in asset.variantes and request.accept_encodings['gzip'] > 0 else ''
+        etag = f'{asset.hash}-{encoding}' if encoding else asset.hash
+
+        if asset.es_html:
+            cache_control = f'public, max-age={HTML_MAX_AGE_SEGUNDOS}'
+        elif request.args.get('v') == asset.hash:
+            cache_control = IMMUTABLE_CACHE
+        else:
+            cache_control = REVALIDATE_CACHE
+
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(asset.variantes[encoding], mimetype=asset.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        if len(asset.variantes) > 1:
+            response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,169 @@
+"""Escritura de Excel en streaming (openpyxl write-only) compartida por los exports.
+
+Las hojas se alimentan con iteradores de filas: openpyxl en modo write-only
+vuelca cada fila a disco al recibirla, así que la memoria no crece con el
+tamaño del export. El .xlsx final se guarda en un archivo temporal y se envía
+al cliente en bloques.
+
+openpyxl se importa al crear el primer workbook (no al cargar los routers).
+"""
+from collections import namedtuple
+import os
+import tempfile
+from typing import Any, Iterable, List, Optional, Sequence
+
+from flask import Response
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CHUNK_SIZE = 64 * 1024
+
+# Nombres de los estilos registrados en cada workbook
+HEADER_STYLE = 'dcp_encabezado'          # Fondo azul, negrita blanca, centrado
+HEADER_LARGE_STYLE = 'dcp_encabezado_12'  # Igual que el anterior con fuente 12
+NUMBER_STYLE = 'dcp_numero'              # '0.00' alineado a la derecha
+VALUE_STYLE = 'dcp_valor'                # Alineado a la derecha sin formato
+BOLD_STYLE = 'dcp_negrita'
+
+# Valor con estilo propio dentro de una fila (p. ej. títulos en hojas de metadatos)
+Styled = namedtuple('Styled', ['value', 'style'])
+
+
+def _named_styles() -> list:
+    """Crea los NamedStyle (un objeto nuevo por workbook: openpyxl los asocia al libro)."""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    data_alignment = Alignment(horizontal="right", vertical="center")
+    return [
+        NamedStyle(name=HEADER_STYLE, fill=header_fill,
+                   font=Font(bold=True, color="FFFFFF"), alignment=header_alignment),
+        NamedStyle(name=HEADER_LARGE_STYLE, fill=header_fill,
+                   font=Font(bold=True, color="FFFFFF", size=12), alignment=header_alignment),
+        NamedStyle(name=NUMBER_STYLE, number_format='0.00', alignment=data_alignment),
+        NamedStyle(name=VALUE_STYLE, alignment=data_alignment),
+        NamedStyle(name=BOLD_STYLE, font=Font(bold=True)),
+    ]
+
+
+def pivot_por_fecha(columnas: Sequence[Any], fechas: Optional[Iterable] = None) -> List[list]:
+    """
+    Matriz densa fecha x serie: filas [fecha, valor serie 1, valor serie 2, ...].
+
+    Cada columna es una lista de pares (fecha, valor) o un dict {fecha: valor}.
+    Las filas son `fechas` (ordenadas) o, si no se pasa, la unión de las fechas
+    de todas las columnas. Se construye una sola vez con un índice por fecha,
+    en O(puntos) en vez de recorrer cada serie por celda. Si una fecha se repite
+    en una serie, queda el primer valor.
+    """
+    pares_por_columna = [col.items() if isinstance(col, dict) else col for col in columnas]
+    if fechas is None:
+        todas = set()
+        for pares in pares_por_columna:
+            todas.update(fecha for fecha, _ in pares)
+        fechas = todas
+    filas = [[fecha] + [None] * len(pares_por_columna) for fecha in sorted(fechas)]
+    indice = {fila[0]: fila for fila in filas}
+
+    for j, pares in enumerate(pares_por_columna, 1):
+        vistos = set()
+        for fecha, valor in pares:
+            fila = indice.get(fecha)
+            if fila is not None and fecha not in vistos:
+                fila[j] = valor
+                vistos.add(fecha)
+    return filas
+
+
+class StreamingWorkbook:
+    """Workbook write-only con los estilos del DCP registrados."""
+
+    def __init__(self):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+
+        self._write_only_cell = WriteOnlyCell
+        self.workbook = Workbook(write_only=True)
+        for style in _named_styles():
+            self.workbook.add_named_style(style)
+
+    def add_sheet(
+        self,
+        title: str,
+        headers: Sequence[Any],
+        rows: Iterable[Sequence[Any]],
+        column_styles: Optional[Sequence[Optional[str]]] = None,
+        default_style: Optional[str] = None,
+        widths: Optional[Sequence[float]] = None,
+        default_width: Optional[float] = None,
+        header_style: str = HEADER_STYLE,
+    ) -> int:
+        """
+        Agrega una hoja consumiendo `rows` fila a fila. Devuelve la cantidad de filas de datos.
+
+        column_styles[i] es el estilo de los valores no nulos de la columna i;
+        las columnas fuera de la lista usan default_style. Un valor Styled
+        usa su propio estilo. widths funciona igual con default_width.
+        """
+        from openpyxl.utils import get_column_letter
+
+        ws = self.workbook.create_sheet(title=title)
+        column_styles = list(column_styles or [])
+        widths = list(widths or [])
+
+        # En write-only los anchos deben definirse antes de escribir filas
+        for col in range(1, len(headers) + 1):
+            width = widths[col - 1] if col <= len(widths) else default_width
+            if width:
+                ws.column_dimensions[get_column_letter(col)].width = width
+
+        ws.append([self._cell(ws, header, header_style) for header in headers])
+
+        count = 0
+        for row in rows:
+            cells = []
+            for i, value in enumerate(row):
+                if isinstance(value, Styled):
+                    cells.append(self._cell(ws, value.value, value.style))
+                    continue
+                style = column_styles[i] if i < len(column_styles) else default_style
+                cells.append(self._cell(ws, value, style) if (style and value is not None) else value)
+            ws.append(cells)
+            count += 1
+        return count
+
+    def _cell(self, ws, value: Any, style: Optional[str]):
+        cell = self._write_only_cell(ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def response(self, filename: str) -> Response:
+        """Guarda el workbook en un temporal y lo envía en bloques (el temporal se borra al terminar)."""
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            self.workbook.save(path)
+            size = os.path.getsize(path)
+        except Exception:
+            os.unlink(path)
+            raise
+
+        def generate():
+            try:
+                with open(path, 'rb') as f:
+                    while True:
+                        chunk = f.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+            finally:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+        response = Response(generate(), mimetype=XLSX_MIMETYPE, direct_passthrough=True)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Content-Length'] = str(size)
+        return response
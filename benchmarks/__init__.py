@@ -0,0 +1 @@
+"""Benchmarks de performance de la app (ver README.txt)."""
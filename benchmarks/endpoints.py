@@ -0,0 +1,262 @@
+"""
+Benchmark de endpoints: escenarios cronometrados contra todos los routers con
+el test client de Flask (sin red ni gunicorn: mide routers + base).
+
+Pensado para correr contra la base sintética de benchmarks.synthetic_data,
+así el volumen de datos es el mismo en cada corrida. Por escenario reporta
+la primera llamada (caches fríos), min/p50/p95/p99 de las repeticiones,
+status, bytes y queries/tiempo de base (del header Server-Timing de
+query_stats). El JSON resultante se puede comparar entre commits.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.endpoints --database-url postgresql://localhost/dcp_bench --output base.json
+    python -m benchmarks.endpoints --compare base.json --output actual.json
+    python -m benchmarks.endpoints --escenarios dcp,cotizaciones --repeticiones 20
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import reporte
+from .reporte import PROJECT_ROOT
+
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+
+_RE_DB_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+# (nombre, método, ruta, params o body JSON)
+Escenario = Tuple[str, str, str, Dict]
+
+
+def _preparar_entorno(database_url: str) -> None:
+    """La app lee DATABASE_URL al importar db.connection: se fija antes del import."""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('DCP_QUERY_BUDGET', '1000000')  # Sin [WARN] de presupuesto durante el benchmark
+    for ruta in (str(PROJECT_ROOT), str(BACKEND_DIR)):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+
+
+def _ids_de_prueba(execute_query) -> Dict:
+    """Elige de la base los ids que usan los escenarios (mismos para la misma base sintética)."""
+    def ids(query: str, params: tuple = ()) -> List[int]:
+        return [int(r['id']) for r in execute_query(query, params)]
+
+    return {
+        'dcp': ids("""
+            SELECT DISTINCT m.id_variable * 10000 + m.id_pais AS id
+            FROM maestro m
+            JOIN variables v ON v.id_variable = m.id_variable
+            JOIN sub_familia sf ON sf.id_sub_familia = v.id_sub_familia
+            WHERE sf.id_familia = 2
+            ORDER BY id LIMIT 12
+        """),
+        'cotizaciones': ids("""
+            SELECT m.id_variable * 10000 + m.id_pais AS id
+            FROM maestro m
+            WHERE m.es_cotizacion = 1 AND m.periodicidad = 'D'
+            ORDER BY id LIMIT 8
+        """),
+        'tc': ids("""
+            SELECT m.id_variable * 10000 + m.id_pais AS id
+            FROM maestro m WHERE m.id_variable = 20
+            ORDER BY id LIMIT 6
+        """),
+        'variables': ids("""
+            SELECT DISTINCT m.id_variable AS id FROM maestro m
+            JOIN variables v ON v.id_variable = m.id_variable
+            JOIN sub_familia sf ON sf.id_sub_familia = v.id_sub_familia
+            WHERE sf.id_familia IN (2, 3)
+            ORDER BY id LIMIT 20
+        """),
+        'paises': ids("SELECT DISTINCT id_pais AS id FROM maestro ORDER BY id LIMIT 5"),
+        'ultima_fecha': (execute_query("SELECT MAX(fecha) AS f FROM maestro_precios") or [{}])[0].get('f'),
+    }
+
+
+def _fecha(valor) -> date:
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10]) if valor else date.today()
+
+
+def escenarios(ids: Dict) -> List[Escenario]:
+    """Escenarios por router. Los rangos son relativos a la última fecha con datos."""
+    hasta = _fecha(ids['ultima_fecha'])
+    h = hasta.isoformat()
+    d1 = (hasta - timedelta(days=365)).isoformat()
+    d5 = (hasta - timedelta(days=5 * 365)).isoformat()
+    d10 = (hasta - timedelta(days=10 * 365)).isoformat()
+    rango_1 = {'fecha_desde': d1, 'fecha_hasta': h}
+    rango_5 = {'fecha_desde': d5, 'fecha_hasta': h}
+
+    export = {'variable_ids[]': ids['variables'], 'pais_ids[]': ids['paises'], **rango_5}
+    return [
+        ('ticker', 'GET', '/api/ticker/ticker', {}),
+        ('dcp.products', 'GET', '/api/dcp/products', {}),
+        ('dcp.indices.1y', 'GET', '/api/dcp/indices', {'product_ids[]': ids['dcp'][:4], **rango_1}),
+        ('dcp.indices.10y', 'GET', '/api/dcp/indices',
+         {'product_ids[]': ids['dcp'], 'fecha_desde': d10, 'fecha_hasta': h}),
+        ('dcp.export', 'GET', '/api/dcp/indices/export', {'product_ids[]': ids['dcp'], **rango_5}),
+        ('cotizaciones.products', 'GET', '/api/cotizaciones/products', {}),
+        ('cotizaciones.5y', 'GET', '/api/cotizaciones', {'product_ids[]': ids['cotizaciones'], **rango_5}),
+        ('cotizaciones.export', 'GET', '/api/cotizaciones/export',
+         {'product_ids[]': ids['cotizaciones'], **rango_5}),
+        ('inflacion_dolares.5y', 'GET', '/api/inflacion-dolares', {'product_ids[]': ids['tc'], **rango_5}),
+        ('inflacion_dolares.export', 'GET', '/api/inflacion-dolares/export', {'product_ids[]': ids['tc'], **rango_5}),
+        ('prices.products', 'GET', '/api/products', {}),
+        ('prices.prices.5y', 'GET', '/api/products/prices', {'product_ids[]': ids['dcp'], **rango_5}),
+        ('prices.variations.1y', 'GET', '/api/variations', rango_1),
+        ('prices.variations.export', 'GET', '/api/variations/export', rango_1),
+        ('yield_curve.dates', 'GET', '/api/yield-curve/dates', {}),
+        ('yield_curve.data', 'GET', '/api/yield-curve/data', {'tipo': 'nominal'}),
+        ('yield_curve.table.nominal', 'GET', '/api/yield-curve/table', {'tipo': 'nominal'}),
+        ('yield_curve.table.real', 'GET', '/api/yield-curve/table', {'tipo': 'real'}),
+        ('data_export.preview', 'GET', '/api/export/preview', export),
+        ('data_export.xlsx', 'GET', '/api/export/download', {**export, 'format': 'xlsx'}),
+        ('data_export.csv', 'GET', '/api/export/download', {**export, 'format': 'csv'}),
+        ('licitaciones.dates', 'GET', '/api/licitaciones-lrm/dates', {}),
+        ('licitaciones.stats', 'GET', '/api/licitaciones-lrm/stats', {'plazo': 90, 'fecha_limite': h}),
+        ('licitaciones.curve', 'GET', '/api/licitaciones-lrm/curve', {}),
+        ('politica_monetaria', 'GET', '/api/politica-monetaria', {}),
+        ('inflacion_implicita.curva', 'GET', '/api/inflacion-implicita/curva', {}),
+        ('inflacion_implicita.evolucion', 'GET', '/api/inflacion-implicita/evolucion',
+         {'plazos[]': [1, 5, 10], **rango_5}),
+        ('series.batch.yoy_mensual', 'GET', '/api/series/batch',
+         {'product_ids[]': ids['dcp'], 'frecuencia': 'M', 'transformaciones[]': ['yoy'], **rango_5}),
+        ('series.batch.usd_deflactado', 'POST', '/api/series/batch',
+         {'product_ids': ids['dcp'], 'moneda': 'usd', 'deflactar': 1, **rango_5}),
+    ]
+
+
+def _llamar(client, metodo: str, ruta: str, params: Dict) -> Tuple[float, int, int, Optional[str]]:
+    """Un request completo (incluido el body en streaming). Devuelve (ms, status, bytes, server-timing)."""
+    inicio = time.perf_counter()
+    if metodo == 'POST':
+        response = client.post(ruta, json=params)
+    else:
+        response = client.get(ruta, query_string=params)
+    cuerpo = response.get_data()
+    ms = (time.perf_counter() - inicio) * 1000
+    timing = response.headers.get('Server-Timing')
+    response.close()
+    return ms, response.status_code, len(cuerpo), timing
+
+
+def _db_timing(header: Optional[str]) -> Tuple[int, float]:
+    m = _RE_DB_TIMING.search(header or '')
+    return (int(m.group(2)), float(m.group(1))) if m else (0, 0.0)
+
+
+def correr_escenario(client, escenario: Escenario, warmup: int, repeticiones: int,
+                     log: Callable[[str], None] = print) -> Dict:
+    nombre, metodo, ruta, params = escenario
+    primera_ms, status, tamano, timing = _llamar(client, metodo, ruta, params)
+    queries, db_ms = _db_timing(timing)
+    for _ in range(max(0, warmup - 1)):
+        _llamar(client, metodo, ruta, params)
+
+    tiempos = []
+    statuses = {status}
+    for _ in range(repeticiones):
+        ms, status, tamano, timing = _llamar(client, metodo, ruta, params)
+        tiempos.append(ms)
+        statuses.add(status)
+    queries_caliente, db_ms_caliente = _db_timing(timing)
+
+    resultado = {
+        'metodo': metodo,
+        'ruta': ruta,
+        'status': sorted(statuses),
+        'bytes': tamano,
+        'primera_ms': round(primera_ms, 3),
+        'queries_primera': queries,
+        'db_ms_primera': db_ms,
+        'queries': queries_caliente,
+        'db_ms': db_ms_caliente,
+        **reporte.resumir(tiempos),
+    }
+    marca = '' if statuses <= {200} else f'  [WARN] status {sorted(statuses)}'
+    log(f"  {nombre:<32} p50 {resultado.get('p50_ms', 0):9.2f} ms  p95 {resultado.get('p95_ms', 0):9.2f} ms  "
+        f"{queries_caliente:3d} q  {tamano:>10,} B{marca}")
+    return resultado
+
+
+def _filas_maestro_precios(execute_query) -> Optional[int]:
+    try:
+        return int(execute_query("SELECT COUNT(*) AS n FROM maestro_precios")[0]['n'])
+    except Exception as e:
+        print(f"[WARN] No se pudo contar maestro_precios: {e}")
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark de endpoints con el test client de Flask')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='Base a usar (default: BENCH_DATABASE_URL)')
+    parser.add_argument('--escenarios', help='Filtrar por prefijo, separados por coma (ej: dcp,series)')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--output', help='Guardar el reporte JSON en este archivo')
+    parser.add_argument('--compare', help='Reporte JSON base para comparar (p50)')
+    parser.add_argument('--umbral', type=float, default=0.10, help='Cambio relativo que cuenta como regresión')
+    parser.add_argument('--fallar-si-regresion', action='store_true',
+                        help='Salir con código 1 si algún escenario empeora más que --umbral')
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        print('[ERROR] Indicá la base con --database-url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 2
+    _preparar_entorno(args.database_url)
+
+    from app.main import app  # La instancia del módulo: otra create_app() duplicaría los listeners de queries
+    from db.connection import execute_query
+
+    client = app.test_client()
+
+    lista = escenarios(_ids_de_prueba(execute_query))
+    if args.escenarios:
+        prefijos = [p.strip() for p in args.escenarios.split(',') if p.strip()]
+        lista = [e for e in lista if any(e[0].startswith(p) for p in prefijos)]
+    if not lista:
+        print('[ERROR] Ningún escenario coincide con --escenarios', file=sys.stderr)
+        return 2
+
+    print(f'[INFO] {len(lista)} escenarios, warmup {args.warmup}, {args.repeticiones} repeticiones')
+    inicio = time.perf_counter()
+    resultados = {}
+    for escenario in lista:
+        try:
+            resultados[escenario[0]] = correr_escenario(client, escenario, args.warmup, args.repeticiones)
+        except Exception as e:
+            print(f"[ERROR] {escenario[0]}: {e}")
+            resultados[escenario[0]] = {'ruta': escenario[2], 'error': str(e)}
+
+    resultado = {
+        'metadata': reporte.metadata(
+            filas_maestro_precios=_filas_maestro_precios(execute_query),
+            warmup=args.warmup,
+            repeticiones=args.repeticiones,
+            segundos=round(time.perf_counter() - inicio, 1),
+        ),
+        'escenarios': resultados,
+    }
+    if args.output:
+        reporte.guardar(resultado, args.output)
+
+    if args.compare:
+        base = reporte.cargar(args.compare)
+        print(f"\nComparación contra {args.compare} ({((base.get('metadata') or {}).get('commit') or '?')[:10]})")
+        filas = reporte.comparar(base.get('escenarios', {}), resultados, 'p50_ms', args.umbral)
+        regresiones = reporte.imprimir_comparacion(filas, 'p50_ms')
+        if regresiones and args.fallar_si_regresion:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
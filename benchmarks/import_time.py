@@ -0,0 +1,128 @@
+"""
+Perfil de tiempo de import de la app (arranque en frío de un worker de gunicorn).
+
+Importa app.main en un proceso nuevo con `python -X importtime` y reporta:
+- tiempo total de import y módulos con mayor tiempo acumulado
+- qué dependencias pesadas (pandas, numpy, openpyxl, reportlab, matplotlib)
+  quedaron cargadas antes del primer request (con imports diferidos: ninguna)
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --eager              # con DCP_EAGER_IMPORTS=1
+    python -m benchmarks.import_time --output import.json --max-segundos 1.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+
+# Mismo listado que app.lazy.HEAVY_MODULES (sin importar la app en este proceso)
+HEAVY_MODULES = ['numpy', 'pandas', 'openpyxl', 'pyarrow', 'reportlab', 'matplotlib']
+
+_SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import app.main
+total = time.perf_counter() - inicio
+print(json.dumps({
+    'total_segundos': total,
+    'cargados': [m for m in %r if m in sys.modules],
+    'modulos': len(sys.modules),
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> List[Dict]:
+    """Líneas 'import time: self [us] | cumulative | package' -> lista de dicts."""
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        try:
+            self_us, acumulado_us, nombre = linea[len('import time:'):].split('|')
+            filas.append({
+                'modulo': nombre.strip(),
+                'self_ms': int(self_us) / 1000,
+                'acumulado_ms': int(acumulado_us) / 1000,
+            })
+        except ValueError:
+            continue
+    return filas
+
+
+def medir(eager: bool = False, top: int = 25) -> Dict:
+    """Importa app.main en un subproceso y devuelve el perfil."""
+    env = dict(os.environ)
+    env['DCP_EAGER_IMPORTS'] = '1' if eager else '0'
+    env.setdefault('PYTHONDONTWRITEBYTECODE', '1')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SCRIPT % (HEAVY_MODULES,)],
+        cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        ultimas = '\n'.join(proc.stderr.splitlines()[-20:])
+        raise RuntimeError(f'No se pudo importar app.main:\n{ultimas}')
+
+    resumen = json.loads(proc.stdout.strip().splitlines()[-1])
+    filas = _parse_importtime(proc.stderr)
+    # Tiempo propio sumado por paquete raíz (numpy, pandas, flask, app, ...)
+    por_paquete = {}
+    for fila in filas:
+        paquete = fila['modulo'].split('.')[0]
+        por_paquete[paquete] = por_paquete.get(paquete, 0) + fila['self_ms']
+
+    return {
+        'modo': 'eager' if eager else 'lazy',
+        'python': sys.version.split()[0],
+        'total_segundos': round(resumen['total_segundos'], 4),
+        'modulos_cargados': resumen['modulos'],
+        'dependencias_pesadas_cargadas': resumen['cargados'],
+        'paquetes_ms': dict(sorted(((k, round(v, 1)) for k, v in por_paquete.items()),
+                                   key=lambda kv: -kv[1])[:top]),
+        'top_modulos_ms': [
+            {'modulo': f['modulo'], 'acumulado_ms': round(f['acumulado_ms'], 1)}
+            for f in sorted(filas, key=lambda f: -f['acumulado_ms'])[:top]
+        ],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Perfil de tiempo de import de app.main')
+    parser.add_argument('--eager', action='store_true', help='Medir con DCP_EAGER_IMPORTS=1')
+    parser.add_argument('--top', type=int, default=25, help='Cantidad de módulos a listar')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Se reporta la mediana')
+    parser.add_argument('--output', help='Archivo JSON de salida (default: stdout)')
+    parser.add_argument('--max-segundos', type=float,
+                        help='Falla (exit 1) si el import tarda más, o si en modo lazy se cargó una dependencia pesada')
+    args = parser.parse_args(argv)
+
+    corridas = [medir(eager=args.eager, top=args.top) for _ in range(max(1, args.repeticiones))]
+    corridas.sort(key=lambda r: r['total_segundos'])
+    reporte = corridas[len(corridas) // 2]
+    reporte['corridas_segundos'] = [r['total_segundos'] for r in corridas]
+
+    salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(salida, encoding='utf-8')
+    else:
+        print(salida)
+
+    if args.max_segundos is not None:
+        if reporte['total_segundos'] > args.max_segundos:
+            print(f"[ERROR] import de app.main: {reporte['total_segundos']:.3f}s > {args.max_segundos}s", file=sys.stderr)
+            return 1
+        if not args.eager and reporte['dependencias_pesadas_cargadas']:
+            print(f"[ERROR] dependencias pesadas cargadas al importar: {reporte['dependencias_pesadas_cargadas']}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
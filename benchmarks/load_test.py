@@ -0,0 +1,449 @@
+"""
+Prueba de carga concurrente: usuarios virtuales que reproducen sesiones de
+páginas del dashboard contra la app corriendo en gunicorn.
+
+Sesiones (elegidas al azar según --mezcla):
+- home:        /api/ticker/ticker + /api/politica-monetaria (lo que carga la portada)
+- dcp:         lista de productos, elige 2-5, /dcp/indices + /products/prices
+               y, a veces, exporta (/dcp/indices/export o /products/prices/export)
+- yield_curve: /yield-curve/dates y recorre fechas (/yield-curve/data por fecha
+               + /yield-curve/table de la primera), como al mover el selector
+
+Reporta por endpoint: requests, req/s, p50/p95/p99 y tasa de error (status
+>= 400 o excepción). Durante la corrida lee /metrics para registrar el máximo
+de conexiones a la base contra max_connections y cuenta los errores de
+"too many connections" aparte.
+
+Con --configs levanta gunicorn local para cada combinación workers x threads
+(ej. 2x2,4x2,4x4) y corre la misma carga, para dimensionar el deploy.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --usuarios 20 --duracion 60
+    python -m benchmarks.load_test --database-url postgresql://localhost/dcp_bench --configs 2x2,4x2,4x4
+    python -m benchmarks.load_test --configs 2x2 --usuarios 50 --mezcla home=5,dcp=3,yield_curve=2 --output carga.json
+"""
+import argparse
+import os
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from . import reporte
+from .reporte import PROJECT_ROOT
+
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+
+MEZCLA_DEFAULT = {'home': 5, 'dcp': 3, 'yield_curve': 2}
+PROB_EXPORT = 0.3
+TIMEOUT_REQUEST = 120  # Igual que --timeout de gunicorn en el Procfile
+
+_RE_ERROR_CONEXIONES = re.compile(r'too many (clients|connections)|remaining connection slots', re.IGNORECASE)
+_RE_METRICA = re.compile(r'^(dcp_db_connections|dcp_db_max_connections) (\d+)', re.MULTILINE)
+
+
+class Resultados:
+    """Latencias y errores por endpoint, compartidos entre los usuarios virtuales."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, Counter] = defaultdict(Counter)
+        self.sesiones: Counter = Counter()
+        self.errores_conexiones_db = 0
+
+    def registrar(self, endpoint: str, ms: float, error: Optional[str], sin_conexiones_db: bool = False) -> None:
+        with self._lock:
+            self.latencias[endpoint].append(ms)
+            if error:
+                self.errores[endpoint][error] += 1
+            if sin_conexiones_db:
+                self.errores_conexiones_db += 1
+
+    def sesion(self, nombre: str) -> None:
+        with self._lock:
+            self.sesiones[nombre] += 1
+
+    def resumen(self, segundos: float) -> Dict:
+        with self._lock:
+            latencias = {k: list(v) for k, v in self.latencias.items()}
+            errores = {k: dict(v) for k, v in self.errores.items()}
+        endpoints = {}
+        for endpoint, tiempos in sorted(latencias.items()):
+            n_errores = sum(errores.get(endpoint, {}).values())
+            endpoints[endpoint] = {
+                **reporte.resumir(tiempos),
+                'req_s': round(len(tiempos) / segundos, 2) if segundos else 0.0,
+                'errores': n_errores,
+                'tasa_error': round(n_errores / len(tiempos), 4) if tiempos else 0.0,
+                'tipos_error': errores.get(endpoint, {}),
+            }
+        total = sum(len(t) for t in latencias.values())
+        total_errores = sum(e['errores'] for e in endpoints.values())
+        todas = [ms for t in latencias.values() for ms in t]
+        return {
+            'segundos': round(segundos, 1),
+            'requests': total,
+            'req_s': round(total / segundos, 2) if segundos else 0.0,
+            'errores': total_errores,
+            'tasa_error': round(total_errores / total, 4) if total else 0.0,
+            'errores_conexiones_db': self.errores_conexiones_db,
+            'latencia_global': reporte.resumir(todas),
+            'sesiones': dict(self.sesiones),
+            'endpoints': endpoints,
+        }
+
+
+class UsuarioVirtual(threading.Thread):
+    """Elige sesiones según la mezcla y las recorre hasta que se pide parar."""
+
+    def __init__(self, base_url: str, datos: Dict, mezcla: Dict[str, int], resultados: Resultados,
+                 parar: threading.Event, pausa: float, seed: int):
+        super().__init__(daemon=True)
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.datos = datos
+        self.resultados = resultados
+        self.parar = parar
+        self.pausa = pausa
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.sesiones = list(mezcla)
+        self.pesos = [mezcla[s] for s in self.sesiones]
+
+    def run(self) -> None:
+        try:
+            while not self.parar.is_set():
+                nombre = self.rng.choices(self.sesiones, self.pesos)[0]
+                getattr(self, f'_sesion_{nombre}')()
+                self.resultados.sesion(nombre)
+        finally:
+            self.session.close()
+
+    def _pensar(self) -> None:
+        if self.pausa > 0:
+            self.parar.wait(self.rng.expovariate(1 / self.pausa))
+
+    def _get(self, endpoint: str, ruta: str, params=None):
+        """GET midiendo hasta leer el body completo. Devuelve el JSON (o None)."""
+        if self.parar.is_set():
+            return None
+        inicio = time.perf_counter()
+        error = None
+        sin_conexiones = False
+        cuerpo = None
+        try:
+            response = self.session.get(f'{self.base_url}{ruta}', params=params, timeout=TIMEOUT_REQUEST)
+            contenido = response.content
+            if response.status_code >= 400:
+                error = str(response.status_code)
+                sin_conexiones = bool(_RE_ERROR_CONEXIONES.search(contenido[:2000].decode('utf-8', 'replace')))
+            elif response.headers.get('Content-Type', '').startswith('application/json'):
+                cuerpo = response.json()
+        except Exception as e:
+            error = type(e).__name__
+        ms = (time.perf_counter() - inicio) * 1000
+        self.resultados.registrar(endpoint, ms, error, sin_conexiones)
+        self._pensar()
+        return cuerpo
+
+    def _rango(self, meses: int) -> Dict[str, str]:
+        hasta = self.datos['hasta']
+        return {'fecha_desde': (hasta - timedelta(days=30 * meses)).isoformat(), 'fecha_hasta': hasta.isoformat()}
+
+    def _sesion_home(self) -> None:
+        self._get('GET /api/ticker/ticker', '/api/ticker/ticker')
+        self._get('GET /api/politica-monetaria', '/api/politica-monetaria')
+
+    def _sesion_dcp(self) -> None:
+        productos = self._get('GET /api/dcp/products', '/api/dcp/products')
+        ids = [p['id'] for p in productos if isinstance(p, dict) and 'id' in p] if isinstance(productos, list) else []
+        ids = ids or self.datos['productos']
+        if not ids:
+            return
+        elegidos = self.rng.sample(ids, min(len(ids), self.rng.randint(2, 5)))
+        params = {'product_ids[]': elegidos, **self._rango(self.rng.choice([6, 12, 60]))}
+        self._get('GET /api/dcp/indices', '/api/dcp/indices', params)
+        self._get('GET /api/products/prices', '/api/products/prices', params)
+        if self.rng.random() < PROB_EXPORT:
+            if self.rng.random() < 0.5:
+                self._get('GET /api/dcp/indices/export', '/api/dcp/indices/export', params)
+            else:
+                self._get('GET /api/products/prices/export', '/api/products/prices/export', params)
+
+    def _sesion_yield_curve(self) -> None:
+        respuesta = self._get('GET /api/yield-curve/dates', '/api/yield-curve/dates')
+        fechas = (respuesta or {}).get('fechas_disponibles') or self.datos['fechas_curva']
+        if not fechas:
+            return
+        # Recorre fechas consecutivas desde un punto al azar (como al mover el selector)
+        inicio = self.rng.randrange(len(fechas))
+        tipo = self.rng.choice(['nominal', 'nominal', 'real'])
+        recorrido = fechas[inicio:inicio + self.rng.randint(3, 8)]
+        for fecha in recorrido:
+            self._get('GET /api/yield-curve/data', '/api/yield-curve/data', {'fecha': fecha, 'tipo': tipo})
+        self._get('GET /api/yield-curve/table', '/api/yield-curve/table', {'fecha': recorrido[0], 'tipo': tipo})
+
+
+class MonitorConexiones(threading.Thread):
+    """Lee dcp_db_connections / dcp_db_max_connections de /metrics cada `intervalo` segundos."""
+
+    def __init__(self, base_url: str, token: Optional[str], parar: threading.Event, intervalo: float = 2.0):
+        super().__init__(daemon=True)
+        self.url = f"{base_url.rstrip('/')}/metrics"
+        self.headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self.parar = parar
+        self.intervalo = intervalo
+        self.muestras: List[Tuple[float, int]] = []
+        self.max_conexiones: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def run(self) -> None:
+        import requests
+
+        inicio = time.perf_counter()
+        while not self.parar.wait(self.intervalo):
+            try:
+                texto = requests.get(self.url, headers=self.headers, timeout=10).text
+            except Exception as e:
+                self.error = str(e)
+                continue
+            valores = dict((k, int(v)) for k, v in _RE_METRICA.findall(texto))
+            if 'dcp_db_connections' in valores:
+                self.muestras.append((round(time.perf_counter() - inicio, 1), valores['dcp_db_connections']))
+            if 'dcp_db_max_connections' in valores:
+                self.max_conexiones = valores['dcp_db_max_connections']
+
+    def resumen(self) -> Dict:
+        pico = max((c for _, c in self.muestras), default=None)
+        return {
+            'pico': pico,
+            'max_connections': self.max_conexiones,
+            'uso_pico': round(pico / self.max_conexiones, 3) if pico is not None and self.max_conexiones else None,
+            'muestras': self.muestras,
+            'error': self.error if not self.muestras else None,
+        }
+
+
+def _descubrir_datos(base_url: str) -> Dict:
+    """Productos y fechas de la curva para las sesiones (una sola vez, antes de la carga)."""
+    import requests
+
+    base = base_url.rstrip('/')
+    productos = requests.get(f'{base}/api/dcp/products', timeout=TIMEOUT_REQUEST).json()
+    curva = requests.get(f'{base}/api/yield-curve/dates', timeout=TIMEOUT_REQUEST).json()
+    fechas_curva = curva.get('fechas_disponibles', []) if isinstance(curva, dict) else []
+    hasta = date.fromisoformat(fechas_curva[0]) if fechas_curva else date.today()
+    return {
+        'productos': [p['id'] for p in productos if isinstance(p, dict) and 'id' in p] if isinstance(productos, list) else [],
+        'fechas_curva': fechas_curva,
+        'hasta': hasta,
+    }
+
+
+def correr_carga(base_url: str, usuarios: int, duracion: float, rampa: float, mezcla: Dict[str, int],
+                 pausa: float, metrics_token: Optional[str], seed: int = 42) -> Dict:
+    datos = _descubrir_datos(base_url)
+    resultados = Resultados()
+    parar = threading.Event()
+    monitor = MonitorConexiones(base_url, metrics_token, parar)
+    monitor.start()
+
+    hilos = []
+    inicio = time.perf_counter()
+    for i in range(usuarios):
+        hilo = UsuarioVirtual(base_url, datos, mezcla, resultados, parar, pausa, seed + i)
+        hilo.start()
+        hilos.append(hilo)
+        if rampa > 0 and i + 1 < usuarios:
+            parar.wait(rampa / usuarios)
+
+    parar.wait(max(0.0, duracion - (time.perf_counter() - inicio)))
+    parar.set()
+    for hilo in hilos:
+        hilo.join(timeout=TIMEOUT_REQUEST)
+    segundos = time.perf_counter() - inicio
+    monitor.join(timeout=15)
+
+    resumen = resultados.resumen(segundos)
+    resumen['usuarios'] = usuarios
+    resumen['conexiones_db'] = monitor.resumen()
+    return resumen
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_health(base_url: str, proceso: subprocess.Popen, timeout: float = 60) -> None:
+    import requests
+
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f'gunicorn terminó con código {proceso.returncode}')
+        try:
+            if requests.get(f'{base_url}/health', timeout=2).status_code == 200:
+                return
+        except Exception:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f'gunicorn no respondió /health en {timeout}s')
+
+
+def levantar_gunicorn(workers: int, threads: int, database_url: Optional[str],
+                      log_path: Optional[str] = None) -> Tuple[subprocess.Popen, str]:
+    """gunicorn local con los mismos flags que el Procfile (salvo workers/threads)."""
+    puerto = _puerto_libre()
+    env = dict(os.environ)
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    salida = open(log_path, 'ab') if log_path else subprocess.DEVNULL
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{puerto}',
+         '--workers', str(workers), '--threads', str(threads), '--timeout', str(TIMEOUT_REQUEST),
+         'app.main:app'],
+        cwd=str(BACKEND_DIR), env=env, stdout=salida, stderr=subprocess.STDOUT,
+    )
+    base_url = f'http://127.0.0.1:{puerto}'
+    try:
+        _esperar_health(base_url, proceso)
+    except Exception:
+        detener_gunicorn(proceso)
+        raise
+    return proceso, base_url
+
+
+def detener_gunicorn(proceso: subprocess.Popen) -> None:
+    if proceso.poll() is None:
+        proceso.send_signal(signal.SIGTERM)
+        try:
+            proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+            proceso.wait()
+
+
+def _parse_mezcla(texto: Optional[str]) -> Dict[str, int]:
+    if not texto:
+        return dict(MEZCLA_DEFAULT)
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, _, peso = parte.partition('=')
+        nombre = nombre.strip()
+        if nombre not in MEZCLA_DEFAULT:
+            raise ValueError(f'Sesión desconocida: {nombre} (válidas: {", ".join(MEZCLA_DEFAULT)})')
+        mezcla[nombre] = int(peso or 1)
+    if not any(mezcla.values()):
+        raise ValueError('La mezcla necesita al menos una sesión con peso > 0')
+    return mezcla
+
+
+def _parse_configs(texto: str) -> List[Tuple[int, int]]:
+    configs = []
+    for parte in texto.split(','):
+        workers, _, threads = parte.strip().lower().partition('x')
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+
+def _imprimir(nombre: str, resumen: Dict) -> None:
+    g = resumen['latencia_global']
+    db = resumen['conexiones_db']
+    print(f"\n== {nombre}: {resumen['requests']} requests en {resumen['segundos']}s = {resumen['req_s']} req/s, "
+          f"error {resumen['tasa_error'] * 100:.2f}%, p50 {g.get('p50_ms', 0):.0f} ms, p99 {g.get('p99_ms', 0):.0f} ms")
+    if db.get('pico') is not None:
+        print(f"   conexiones a la base: pico {db['pico']} de max_connections {db['max_connections']}")
+    if resumen['errores_conexiones_db']:
+        print(f"   [WARN] {resumen['errores_conexiones_db']} errores por límite de conexiones de la base")
+    ancho = max([len(e) for e in resumen['endpoints']] + [8])
+    print(f"   {'endpoint':<{ancho}} {'n':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'error':>7}")
+    for endpoint, r in resumen['endpoints'].items():
+        print(f"   {endpoint:<{ancho}} {r.get('n', 0):>6} {r['req_s']:>7.1f} {r.get('p50_ms', 0):>8.0f} "
+              f"{r.get('p95_ms', 0):>8.0f} {r.get('p99_ms', 0):>8.0f} {r['tasa_error'] * 100:>6.1f}%")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Prueba de carga con sesiones de páginas del dashboard')
+    parser.add_argument('--url', help='App ya levantada (ej. http://127.0.0.1:8000). Excluye --configs')
+    parser.add_argument('--configs', help='Levantar gunicorn local por cada workers x threads (ej. 2x2,4x2)')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='DATABASE_URL para el gunicorn local (default: BENCH_DATABASE_URL)')
+    parser.add_argument('--usuarios', type=int, default=10, help='Usuarios virtuales concurrentes')
+    parser.add_argument('--duracion', type=float, default=60, help='Segundos de carga por configuración')
+    parser.add_argument('--rampa', type=float, default=5, help='Segundos para arrancar todos los usuarios')
+    parser.add_argument('--pausa', type=float, default=0.0,
+                        help='Pausa media entre requests de un usuario (s, exponencial). 0 = sin pausa')
+    parser.add_argument('--mezcla', help='Pesos de sesiones, ej: home=5,dcp=3,yield_curve=2')
+    parser.add_argument('--metrics-token', default=os.environ.get('METRICS_TOKEN'))
+    parser.add_argument('--log-gunicorn', help='Archivo donde dejar la salida de gunicorn')
+    parser.add_argument('--output', help='Guardar el reporte JSON en este archivo')
+    args = parser.parse_args(argv)
+
+    try:
+        mezcla = _parse_mezcla(args.mezcla)
+        configs = _parse_configs(args.configs) if args.configs else []
+    except ValueError as e:
+        print(f'[ERROR] {e}', file=sys.stderr)
+        return 2
+    if bool(args.url) == bool(configs):
+        print('[ERROR] Indicá --url (app ya levantada) o --configs (gunicorn local)', file=sys.stderr)
+        return 2
+    if configs and not args.database_url and not os.environ.get('DATABASE_URL'):
+        print('[ERROR] Para levantar gunicorn indicá --database-url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 2
+
+    corridas = {}
+    if args.url:
+        print(f'[INFO] {args.usuarios} usuarios contra {args.url} durante {args.duracion}s')
+        corridas['externo'] = correr_carga(args.url, args.usuarios, args.duracion, args.rampa, mezcla,
+                                           args.pausa, args.metrics_token)
+        _imprimir(args.url, corridas['externo'])
+    for workers, threads in configs:
+        nombre = f'{workers}x{threads}'
+        print(f'[INFO] gunicorn --workers {workers} --threads {threads}: '
+              f'{args.usuarios} usuarios durante {args.duracion}s')
+        try:
+            proceso, base_url = levantar_gunicorn(workers, threads, args.database_url, args.log_gunicorn)
+        except Exception as e:
+            print(f'[ERROR] {nombre}: {e}')
+            corridas[nombre] = {'error': str(e)}
+            continue
+        try:
+            corridas[nombre] = correr_carga(base_url, args.usuarios, args.duracion, args.rampa, mezcla,
+                                            args.pausa, args.metrics_token)
+            corridas[nombre].update(workers=workers, threads=threads)
+        finally:
+            detener_gunicorn(proceso)
+        _imprimir(nombre, corridas[nombre])
+
+    if len(corridas) > 1:
+        print('\nResumen por configuración:')
+        for nombre, r in corridas.items():
+            if 'error' in r:
+                print(f'   {nombre:<8} [ERROR] {r["error"]}')
+                continue
+            print(f"   {nombre:<8} {r['req_s']:>8.1f} req/s  p95 {r['latencia_global'].get('p95_ms', 0):>7.0f} ms  "
+                  f"error {r['tasa_error'] * 100:5.2f}%  pico conexiones {r['conexiones_db'].get('pico')}")
+
+    if args.output:
+        reporte.guardar({
+            'metadata': reporte.metadata(usuarios=args.usuarios, duracion=args.duracion, mezcla=mezcla,
+                                         pausa=args.pausa),
+            'corridas': corridas,
+        }, args.output)
+    return 1 if any('error' in r for r in corridas.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Micro-benchmarks de las funciones de cálculo puro (sin base ni Flask).
+
+Mide cada función con entradas sintéticas de 1k a 1M puntos y reporta la
+curva de escalado: tiempo, ns por punto y exponente empírico (pendiente
+log-log: ~1 lineal, ~2 cuadrático). Sirve para saber qué loops dominan
+antes de reescribirlos.
+
+Casos:
+- dcp.convert_to_monthly           precios diarios -> promedio mensual (001_dcp)
+- dcp.indices                      loops de get_dcp_indices: filtro por rango,
+                                   índice precio×TC/IPC, base 100, variaciones TC/IPC
+- cotizaciones.variaciones         límites de series + variaciones 1d/5d/22d/250d (002_cotizaciones)
+- helpers.combinar_anio_mes_a_fecha
+- helpers.validar_fechas_unificado (update/direct/_helpers.py)
+- ipc_multipais.convertir_inflacion_a_indice  (update/direct/017_ipc_multipais.py)
+- uyu_nxr_sintetico.cadena         encadenado hacia adelante/atrás (update/calculate/002_uyu_nxr_sintetico.py)
+
+Si un tamaño supera --max-segundos se omiten los tamaños mayores de ese caso.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.micro
+    python -m benchmarks.micro --casos dcp,cotizaciones --tamanos 1000,10000,100000,1000000
+    python -m benchmarks.micro --output micro.json --compare micro_base.json
+"""
+import argparse
+import contextlib
+import gc
+import importlib
+import importlib.util
+import io
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import reporte
+from .reporte import PROJECT_ROOT
+
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+UPDATE_DIR = PROJECT_ROOT / 'update'
+
+TAMANOS_DEFAULT = [1_000, 10_000, 100_000, 1_000_000]
+MESES_POR_PRODUCTO = 240  # dcp.indices: productos de 20 años mensuales
+OBS_POR_SERIE = 2_500      # cotizaciones: ~10 años de días hábiles por serie
+SEED = 42
+
+
+def _preparar_path() -> None:
+    for ruta in (str(PROJECT_ROOT), str(BACKEND_DIR), str(UPDATE_DIR / 'direct')):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+
+
+def _router(carpeta: str):
+    return importlib.import_module(f'app.routers.{carpeta}.router')
+
+
+def _script(ruta_relativa: str):
+    """Carga un script de update/ como módulo (sin ejecutar su main)."""
+    ruta = UPDATE_DIR / ruta_relativa
+    nombre = 'bench_' + ruta.stem
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    sys.modules[nombre] = modulo
+    return modulo
+
+
+# ---------------------------------------------------------------------------
+# Casos: setup(n) arma las entradas (no se mide), la función devuelta se mide
+# ---------------------------------------------------------------------------
+
+def _caso_convert_to_monthly(n: int) -> Callable[[], object]:
+    convert_to_monthly = _router('001_dcp').convert_to_monthly
+    rng = random.Random(SEED)
+    inicio = date(1900, 1, 1)
+    filas = [{'fecha': inicio + timedelta(days=i), 'valor': 100 + rng.random()} for i in range(n)]
+    return lambda: convert_to_monthly(filas, 'D')
+
+
+def _meses(desde: date, cantidad: int) -> List[date]:
+    return [date(desde.year + (desde.month - 1 + k) // 12, (desde.month - 1 + k) % 12 + 1, 1) for k in range(cantidad)]
+
+
+def _caso_dcp_indices(n: int) -> Callable[[], object]:
+    dcp = _router('001_dcp')
+    rng = random.Random(SEED)
+    meses = _meses(date(2000, 1, 1), MESES_POR_PRODUCTO)
+    tc = {m: 20 + rng.random() * 20 for m in meses}
+    ipc = {m: 100 * (1.005 ** k) for k, m in enumerate(meses)}
+    fecha_desde, fecha_hasta = meses[0], meses[-1]
+    start_ym, end_ym = (fecha_desde.year, fecha_desde.month), (fecha_hasta.year, fecha_hasta.month)
+
+    productos = []
+    restantes = n
+    while restantes > 0:
+        cantidad = min(MESES_POR_PRODUCTO, restantes)
+        productos.append(([{'fecha': m, 'valor': 50 + rng.random() * 10} for m in meses[:cantidad]],
+                          rng.choice(['n', 'r'])))
+        restantes -= cantidad
+
+    def correr():
+        resultado = []
+        for precios, nominal_real in productos:
+            filtrados = dcp.filtrar_meses_en_rango(precios, fecha_desde, fecha_hasta)
+            indices = dcp.calcular_indices_dcp(filtrados, tc, ipc, nominal_real)
+            normalizados = dcp.normalizar_base_100(indices, fecha_desde, fecha_hasta)
+            resultado.append((normalizados,
+                              dcp.variacion_por_anio_mes(tc, start_ym, end_ym),
+                              dcp.variacion_por_anio_mes(ipc, start_ym, end_ym)))
+        return resultado
+    return correr
+
+
+def _caso_cotizaciones(n: int) -> Callable[[], object]:
+    import numpy as np
+
+    cot = _router('002_cotizaciones')
+    rng = np.random.default_rng(SEED)
+    largos = [OBS_POR_SERIE] * (n // OBS_POR_SERIE) + ([n % OBS_POR_SERIE] if n % OBS_POR_SERIE else [])
+    ids = np.repeat(np.arange(len(largos), dtype=np.int64) * 10000 + 858, largos)
+    fechas = np.concatenate([np.datetime64('2015-01-01') + np.arange(k) for k in largos]).astype('datetime64[D]')
+    valores = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    fecha_desde = date(2015, 1, 1) + timedelta(days=OBS_POR_SERIE // 2)
+    lags = [lag for lag, _ in cot.VARIACIONES_OBS]
+
+    def correr():
+        starts, ends, primeros, ultimos = cot.limites_series(ids, fechas, fecha_desde)
+        return cot.calcular_variaciones_obs(starts, ultimos, valores, lags)
+    return correr
+
+
+def _fechas_horarias(n: int):
+    """n timestamps dentro del rango de pandas (1M días no entra: se usa frecuencia horaria)."""
+    import pandas as pd
+    return pd.date_range('1950-01-01', periods=n, freq='h')
+
+
+def _caso_combinar_anio_mes(n: int) -> Callable[[], object]:
+    import pandas as pd
+
+    helpers = _script('direct/_helpers.py')
+    rng = random.Random(SEED)
+    textos = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto',
+              'septiembre', 'octubre', 'noviembre', 'diciembre']
+    meses = [textos[rng.randrange(12)] if rng.random() < 0.1 else rng.randint(1, 12) for _ in range(n)]
+    df = pd.DataFrame({'AÑO': [rng.randint(1990, 2030) for _ in range(n)], 'MES': meses})
+    return lambda: helpers.combinar_anio_mes_a_fecha(df)
+
+
+def _caso_validar_fechas(n: int) -> Callable[[], object]:
+    import pandas as pd
+
+    helpers = _script('direct/_helpers.py')
+    fechas = _fechas_horarias(n).strftime('%Y-%m-%d')
+    df = pd.DataFrame({'FECHA': fechas, 'VALOR': 1.0})
+    return lambda: helpers.validar_fechas_unificado(df)
+
+
+def _caso_inflacion_a_indice(n: int) -> Callable[[], object]:
+    import numpy as np
+    import pandas as pd
+
+    ipc = _script('direct/017_ipc_multipais.py')
+    fechas = _fechas_horarias(n)
+    rng = np.random.default_rng(SEED)
+    df = pd.DataFrame({'Fecha': fechas, 'IPC': rng.normal(0.5, 0.3, n)})
+    fecha_base = str(fechas[n // 2])  # Base al medio: corren los dos loops (adelante y atrás)
+    return lambda: ipc.convertir_inflacion_a_indice(df, fecha_base=fecha_base)
+
+
+def _caso_nxr_sintetico(n: int) -> Callable[[], object]:
+    import numpy as np
+    import pandas as pd
+
+    nxr = _script('calculate/002_uyu_nxr_sintetico.py')
+    fechas = _fechas_horarias(n)
+    rng = np.random.default_rng(SEED)
+    df = pd.DataFrame({
+        'fecha': fechas,
+        'variacion_uyu_sintetico': rng.normal(0, 0.005, n),
+        'nxr_uyu': 40 + rng.random(n),
+    })
+    fecha_base = str(fechas[n // 2])
+    return lambda: nxr.construir_serie_sintetica(df.copy(), fecha_base)
+
+
+CASOS: Dict[str, Callable[[int], Callable[[], object]]] = {
+    'dcp.convert_to_monthly': _caso_convert_to_monthly,
+    'dcp.indices': _caso_dcp_indices,
+    'cotizaciones.variaciones': _caso_cotizaciones,
+    'helpers.combinar_anio_mes_a_fecha': _caso_combinar_anio_mes,
+    'helpers.validar_fechas_unificado': _caso_validar_fechas,
+    'ipc_multipais.convertir_inflacion_a_indice': _caso_inflacion_a_indice,
+    'uyu_nxr_sintetico.cadena': _caso_nxr_sintetico,
+}
+
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+def medir(funcion: Callable[[], object], repeticiones: int, max_segundos: float,
+          min_segundos: float = 0.2) -> List[float]:
+    """
+    Tiempos en ms: al menos `repeticiones` corridas (o hasta juntar min_segundos
+    si son muy rápidas), cortando si se pasa de max_segundos.
+    """
+    tiempos = []
+    total = 0.0
+    salida = io.StringIO()
+    while True:
+        gc.collect()
+        with contextlib.redirect_stdout(salida):  # Las funciones de update/ imprimen [INFO]/[OK]
+            inicio = time.perf_counter()
+            funcion()
+            duracion = time.perf_counter() - inicio
+        salida.seek(0)
+        salida.truncate()
+        tiempos.append(duracion * 1000)
+        total += duracion
+        if total >= max_segundos:
+            break
+        if len(tiempos) >= repeticiones and (total >= min_segundos or len(tiempos) >= 1000):
+            break
+    return tiempos
+
+
+def exponente(puntos: List[Tuple[int, float]]) -> Optional[float]:
+    """Pendiente de log(tiempo) vs log(n) por mínimos cuadrados."""
+    puntos = [(n, t) for n, t in puntos if n > 0 and t > 0]
+    if len(puntos) < 2:
+        return None
+    xs = [math.log(n) for n, _ in puntos]
+    ys = [math.log(t) for _, t in puntos]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else None
+
+
+def correr_caso(nombre: str, tamanos: List[int], repeticiones: int, max_segundos: float) -> Dict:
+    setup = CASOS[nombre]
+    resultado = {'tamanos': {}, 'omitidos': []}
+    for i, n in enumerate(tamanos):
+        try:
+            funcion = setup(n)
+        except ImportError as e:
+            print(f'  [WARN] {nombre}: dependencia faltante ({e}), se omite')
+            resultado['error'] = f'ImportError: {e}'
+            return resultado
+        tiempos = medir(funcion, repeticiones, max_segundos)
+        del funcion
+        resumen = reporte.resumir(tiempos)
+        resumen['ns_por_punto'] = round(resumen['min_ms'] * 1e6 / n, 1)
+        resultado['tamanos'][str(n)] = resumen
+        print(f"  {nombre:<44} n={n:>9,}  min {resumen['min_ms']:11.2f} ms  "
+              f"p50 {resumen['p50_ms']:11.2f} ms  {resumen['ns_por_punto']:10.1f} ns/punto")
+        if tiempos[0] / 1000 >= max_segundos and i + 1 < len(tamanos):
+            resultado['omitidos'] = tamanos[i + 1:]
+            print(f'  [WARN] {nombre}: n={n:,} superó {max_segundos}s, se omiten {tamanos[i + 1:]}')
+            break
+
+    puntos = [(int(n), r['min_ms']) for n, r in resultado['tamanos'].items()]
+    resultado['exponente'] = exponente(puntos)
+    if resultado['exponente'] is not None:
+        resultado['exponente'] = round(resultado['exponente'], 2)
+    return resultado
+
+
+def _imprimir_ranking(resultados: Dict[str, Dict]) -> None:
+    """Casos ordenados por costo por punto en el mayor tamaño medido."""
+    filas = []
+    for nombre, r in resultados.items():
+        if not r.get('tamanos'):
+            continue
+        n_max = max(r['tamanos'], key=int)
+        filas.append((r['tamanos'][n_max]['ns_por_punto'], nombre, int(n_max), r.get('exponente')))
+    if not filas:
+        return
+    print('\nRanking (ns por punto en el mayor tamaño medido; exponente ~1 = lineal):')
+    for ns, nombre, n_max, exp in sorted(filas, reverse=True):
+        exp_str = f'{exp:.2f}' if exp is not None else '-'
+        print(f'  {nombre:<44} {ns:12.1f} ns/punto  (n={n_max:,}, exponente {exp_str})')
+
+
+def _aplanar(resultados: Dict[str, Dict]) -> Dict[str, Dict]:
+    """{caso: {tamanos: {n: resumen}}} -> {'caso@n': resumen} para reporte.comparar."""
+    return {f'{caso}@{n}': resumen
+            for caso, r in resultados.items()
+            for n, resumen in (r.get('tamanos') or {}).items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks de funciones de cálculo con curvas de escalado')
+    parser.add_argument('--casos', help='Filtrar por prefijo, separados por coma (ej: dcp,helpers)')
+    parser.add_argument('--tamanos', default=','.join(str(t) for t in TAMANOS_DEFAULT),
+                        help='Cantidad de puntos, separados por coma')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--max-segundos', type=float, default=30.0,
+                        help='Presupuesto por tamaño; si una corrida lo supera se omiten los tamaños mayores')
+    parser.add_argument('--output', help='Guardar el reporte JSON en este archivo')
+    parser.add_argument('--compare', help='Reporte JSON base para comparar (min por caso y tamaño)')
+    parser.add_argument('--umbral', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    try:
+        tamanos = sorted({int(t) for t in args.tamanos.split(',') if t.strip()})
+    except ValueError:
+        print('[ERROR] --tamanos debe ser una lista de enteros', file=sys.stderr)
+        return 2
+    casos = list(CASOS)
+    if args.casos:
+        prefijos = [p.strip() for p in args.casos.split(',') if p.strip()]
+        casos = [c for c in casos if any(c.startswith(p) for p in prefijos)]
+    if not casos or not tamanos:
+        print('[ERROR] Ningún caso o tamaño para correr', file=sys.stderr)
+        return 2
+
+    _preparar_path()
+    print(f'[INFO] {len(casos)} casos, tamaños {tamanos}')
+    inicio = time.perf_counter()
+    resultados = {}
+    for caso in casos:
+        resultados[caso] = correr_caso(caso, tamanos, args.repeticiones, args.max_segundos)
+    _imprimir_ranking(resultados)
+
+    resultado = {
+        'metadata': reporte.metadata(
+            tamanos=tamanos,
+            repeticiones=args.repeticiones,
+            max_segundos=args.max_segundos,
+            segundos=round(time.perf_counter() - inicio, 1),
+        ),
+        'casos': resultados,
+    }
+    if args.output:
+        reporte.guardar(resultado, args.output)
+
+    if args.compare:
+        base = reporte.cargar(args.compare)
+        print(f'\nComparación contra {args.compare}')
+        filas = reporte.comparar(_aplanar(base.get('casos', {})), _aplanar(resultados), 'min_ms', args.umbral)
+        reporte.imprimir_comparacion(filas, 'min_ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Utilidades compartidas de los benchmarks: estadísticas de tiempos, metadatos
+del entorno (commit, python, host) y comparación de reportes JSON entre commits.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentil(valores: Sequence[float], p: float) -> float:
+    """Percentil p (0-100) con interpolación lineal. valores no vacío."""
+    ordenados = sorted(valores)
+    if len(ordenados) == 1:
+        return ordenados[0]
+    k = (len(ordenados) - 1) * p / 100
+    piso = math.floor(k)
+    techo = min(piso + 1, len(ordenados) - 1)
+    return ordenados[piso] + (ordenados[techo] - ordenados[piso]) * (k - piso)
+
+
+def resumir(tiempos_ms: Sequence[float]) -> Dict[str, float]:
+    """min / p50 / p95 / p99 / max / media de una lista de tiempos en ms."""
+    if not tiempos_ms:
+        return {}
+    return {
+        'n': len(tiempos_ms),
+        'min_ms': round(min(tiempos_ms), 3),
+        'p50_ms': round(percentil(tiempos_ms, 50), 3),
+        'p95_ms': round(percentil(tiempos_ms, 95), 3),
+        'p99_ms': round(percentil(tiempos_ms, 99), 3),
+        'max_ms': round(max(tiempos_ms), 3),
+        'media_ms': round(sum(tiempos_ms) / len(tiempos_ms), 3),
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        proc = subprocess.run(['git', *args], cwd=str(PROJECT_ROOT), capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def metadata(**extra) -> Dict:
+    """Datos para saber contra qué se midió: commit, árbol sucio, python, host."""
+    estado = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'rama': _git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'cambios_sin_commit': bool(estado) if estado is not None else None,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'cpus': _cpus(),
+        **extra,
+    }
+
+
+def _cpus() -> Optional[int]:
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+
+def guardar(reporte: Dict, ruta: str) -> None:
+    Path(ruta).write_text(json.dumps(reporte, indent=2, ensure_ascii=False, default=str), encoding='utf-8')
+    print(f'[OK] Reporte guardado en {ruta}')
+
+
+def cargar(ruta: str) -> Dict:
+    return json.loads(Path(ruta).read_text(encoding='utf-8'))
+
+
+def comparar(base: Dict[str, Dict], actual: Dict[str, Dict], metrica: str = 'p50_ms',
+             umbral: float = 0.10) -> List[Dict]:
+    """
+    Compara dos {nombre: resumen} por `metrica`. Marca regresión/mejora cuando
+    el cambio relativo supera `umbral` (0.10 = 10%).
+    """
+    filas = []
+    for nombre in sorted(set(base) | set(actual)):
+        antes = (base.get(nombre) or {}).get(metrica)
+        despues = (actual.get(nombre) or {}).get(metrica)
+        fila = {'nombre': nombre, 'antes': antes, 'despues': despues, 'cambio': None, 'veredicto': ''}
+        if antes and despues is not None:
+            cambio = (despues - antes) / antes
+            fila['cambio'] = cambio
+            if cambio > umbral:
+                fila['veredicto'] = 'REGRESION'
+            elif cambio < -umbral:
+                fila['veredicto'] = 'mejora'
+        elif antes is None:
+            fila['veredicto'] = 'nuevo'
+        elif despues is None:
+            fila['veredicto'] = 'falta'
+        filas.append(fila)
+    return filas
+
+
+def imprimir_comparacion(filas: List[Dict], metrica: str = 'p50_ms') -> int:
+    """Imprime la tabla de comparar() y devuelve la cantidad de regresiones."""
+    ancho = max([len(f['nombre']) for f in filas] + [10])
+    print(f"{'escenario':<{ancho}}  {'antes':>10}  {'después':>10}  {'cambio':>8}")
+    for f in filas:
+        antes = f"{f['antes']:.2f}" if f['antes'] is not None else '-'
+        despues = f"{f['despues']:.2f}" if f['despues'] is not None else '-'
+        cambio = f"{f['cambio'] * 100:+.1f}%" if f['cambio'] is not None else ''
+        print(f"{f['nombre']:<{ancho}}  {antes:>10}  {despues:>10}  {cambio:>8}  {f['veredicto']}")
+    print(f'({metrica})')
+    return sum(1 for f in filas if f['veredicto'] == 'REGRESION')
@@ -0,0 +1,317 @@
+"""
+Generador de una base sintética para benchmarks (mismo schema que scripts/schema_postgresql.sql).
+
+Crea el catálogo completo (pais_grupo, familia, sub_familia, variables, maestro)
+y llena maestro_precios con series diarias (días hábiles), semanales y
+mensuales con huecos:
+
+- las variables que los routers tienen fijas en código (TC 6/7/20, IPC 9,
+  EMBI 22, expectativas 23/24, licitaciones LRM 25-36, curva BEVSA 37-51,
+  TPM 52, curva real 69-84, inflación implícita 86-95)
+- N variables sintéticas × M países, repartidas entre familias de precios
+  (las que usan DCP, variaciones y exports)
+
+Los valores son caminatas aleatorias con semilla fija: misma semilla y
+parámetros => misma base, así los reportes de benchmarks son comparables.
+
+La base destino se recrea (el schema hace DROP TABLE): se pasa explícita
+con --database-url o BENCH_DATABASE_URL y nunca se toma DATABASE_URL.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.synthetic_data --database-url postgresql://localhost/dcp_bench
+    python -m benchmarks.synthetic_data --variables 300 --paises 15 --desde 2005-01-01
+"""
+import argparse
+import io
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = PROJECT_ROOT / 'scripts' / 'schema_postgresql.sql'
+
+PAISES_REALES = [
+    (858, 'Uruguay'), (32, 'Argentina'), (76, 'Brasil'), (152, 'Chile'), (170, 'Colombia'),
+    (604, 'Perú'), (484, 'México'), (600, 'Paraguay'), (840, 'Estados Unidos'),
+]
+PAISES_POLITICA = [152, 170, 604, 858, 484]
+
+FAMILIAS = [
+    (1, 'Macroeconomía'),
+    (2, 'Precios internacionales'),
+    (3, 'Precios locales'),
+    (4, 'Mercado financiero'),
+]
+# (id_sub_familia, nombre, id_familia)
+SUB_FAMILIAS = [
+    (1, 'Tipos de cambio', 4),
+    (2, 'Alimentos', 3),
+    (3, 'Construcción', 3),
+    (4, 'Combustibles', 3),
+    (5, 'Servicios', 3),
+    (6, 'Precios al consumidor', 1),
+    (7, 'Commodities agrícolas', 2),
+    (8, 'Energía y metales', 2),
+    (10, 'Curva soberana', 4),
+    (11, 'Licitaciones LRM', 4),
+    (12, 'Tasas y expectativas', 1),
+    (13, 'Insumos', 3),
+    (14, 'Inflación implícita', 4),
+]
+SUB_FAMILIAS_SINTETICAS = [7, 8, 2, 3, 4, 5, 13]
+
+# Tipos de serie: cómo se generan los valores
+NIVEL, TASA, PROPORCION, MONTO = 'nivel', 'tasa', 'proporcion', 'monto'
+
+ID_VARIABLE_SINTETICA = 1000
+ID_PAIS_SINTETICO = 2000
+
+
+def _variables_fijas() -> List[Dict]:
+    """Variables con id fijo en los routers. paises=None => todos los países reales."""
+    uy = [858]
+    fijas = [
+        dict(id=6, nombre='USD/UYU', sub=1, per='D', tipo=NIVEL, paises=uy, moneda='UYU', cotizacion=True),
+        dict(id=7, nombre='EUR/UYU', sub=1, per='D', tipo=NIVEL, paises=uy, moneda='UYU', cotizacion=True),
+        dict(id=9, nombre='IPC', sub=6, per='M', tipo=NIVEL, paises=None, tendencia=0.004),
+        dict(id=20, nombre='Tipo de cambio USD/LC', sub=1, per='D', tipo=NIVEL,
+             paises=[p for p, _ in PAISES_REALES if p != 840], cotizacion=True),
+        dict(id=22, nombre='EMBI', sub=12, per='D', tipo=TASA, paises=None, nivel=300, vol=3.0),
+        dict(id=23, nombre='Expectativa de inflación 12m', sub=12, per='M', tipo=TASA, paises=PAISES_POLITICA, nivel=4.0),
+        dict(id=24, nombre='Expectativa de inflación 24m', sub=12, per='M', tipo=TASA, paises=PAISES_POLITICA, nivel=4.0),
+        dict(id=52, nombre='Tasa de política monetaria', sub=12, per='D', tipo=TASA, paises=PAISES_POLITICA,
+             nivel=6.0, vol=0.01),
+    ]
+    for i, plazo in enumerate((30, 90, 180, 360)):
+        fijas += [
+            dict(id=25 + i, nombre=f'LRM tasa de corte {plazo}d', sub=11, per='L', tipo=TASA, paises=uy, nivel=8.0,
+                 offset=i),
+            dict(id=29 + i, nombre=f'LRM adjudicado {plazo}d', sub=11, per='L', tipo=PROPORCION, paises=uy, offset=i),
+            dict(id=33 + i, nombre=f'LRM licitación {plazo}d', sub=11, per='L', tipo=MONTO, paises=uy, offset=i),
+        ]
+    plazos_nominal = ['1 mes', '2 meses', '3 meses', '6 meses', '9 meses'] + [f'{n} año{"s" if n > 1 else ""}' for n in range(1, 11)]
+    for i, nombre in enumerate(plazos_nominal):
+        fijas.append(dict(id=37 + i, nombre=f'Curva nominal {nombre}', sub=10, per='D', tipo=TASA, paises=uy,
+                          nivel=7.0 + i * 0.2, nominal='N'))
+    plazos_real = ['3 meses', '6 meses'] + [f'{n} año{"s" if n > 1 else ""}' for n in range(1, 11)]
+    for i, nombre in enumerate(plazos_real):
+        fijas.append(dict(id=73 + i, nombre=f'Curva real {nombre}', sub=10, per='D', tipo=TASA, paises=uy,
+                          nivel=2.0 + i * 0.1, nominal='R'))
+    for i, nombre in enumerate(['15 años', '20 años', '25 años', '30 años']):
+        fijas.append(dict(id=69 + i, nombre=f'Curva real {nombre}', sub=10, per='D', tipo=TASA, paises=uy,
+                          nivel=3.5 + i * 0.1, nominal='R'))
+    for i in range(10):
+        fijas.append(dict(id=86 + i, nombre=f'Inflación implícita {i + 1} año{"s" if i else ""}', sub=14, per='D',
+                          tipo=TASA, paises=uy, nivel=5.5 + i * 0.05))
+    return fijas
+
+
+def _variables_sinteticas(n: int, rng: random.Random) -> List[Dict]:
+    periodicidades = ['D', 'D', 'W', 'M']  # Mitad diarias, como en la base real
+    variables = []
+    for i in range(n):
+        per = periodicidades[i % len(periodicidades)]
+        variables.append(dict(
+            id=ID_VARIABLE_SINTETICA + i,
+            nombre=f'Producto sintético {i + 1:04d}',
+            sub=SUB_FAMILIAS_SINTETICAS[i % len(SUB_FAMILIAS_SINTETICAS)],
+            per=per, tipo=NIVEL, paises=None,
+            moneda=rng.choice(['USD', 'USD', 'UYU', 'EUR']),
+            nominal='N', nivel=rng.uniform(10, 5000),
+        ))
+    return variables
+
+
+def _fechas(per: str, desde: date, hasta: date, offset: int = 0) -> Iterator[date]:
+    """Días hábiles (D), viernes (W), primero de mes (M) o licitaciones semanales (L)."""
+    if per == 'M':
+        d = date(desde.year, desde.month, 1)
+        while d <= hasta:
+            yield d
+            d = date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+        return
+    if per == 'W':
+        d = desde + timedelta(days=(4 - desde.weekday()) % 7)
+        paso = 7
+    elif per == 'L':
+        # Una licitación por semana y plazo, en días distintos (martes a viernes)
+        d = desde + timedelta(days=(1 + offset - desde.weekday()) % 7)
+        paso = 7
+    else:
+        d = desde
+        paso = 1
+    while d <= hasta:
+        if d.weekday() < 5:
+            yield d
+        d += timedelta(days=paso)
+
+
+def _valores(var: Dict, n: int, rng: random.Random) -> Iterator[float]:
+    tipo = var['tipo']
+    if tipo == PROPORCION:
+        for _ in range(n):
+            yield round(min(1.0, max(0.2, rng.gauss(0.85, 0.15))), 6)
+        return
+    if tipo == MONTO:
+        for _ in range(n):
+            yield round(rng.uniform(2e9, 2e10), 2)
+        return
+    if tipo == TASA:
+        nivel = var.get('nivel', 5.0) * rng.uniform(0.9, 1.1)
+        vol = var.get('vol', 0.03)
+        for _ in range(n):
+            nivel = max(0.01, nivel + rng.gauss(0, vol))
+            yield round(nivel, 6)
+        return
+    nivel = var.get('nivel') or rng.uniform(10, 500)
+    tendencia = var.get('tendencia', 0.0)
+    vol = {'D': 0.01, 'W': 0.02, 'M': 0.03}.get(var['per'], 0.01)
+    if tendencia:
+        vol = 0.003
+    for _ in range(n):
+        nivel *= math.exp(tendencia + rng.gauss(0, vol))
+        yield round(nivel, 6)
+
+
+def _con_huecos(fechas: List[date], rng: random.Random, prob_hueco: float) -> List[date]:
+    """Saca puntos sueltos y, a veces, un bloque entero (serie discontinuada un tiempo)."""
+    fechas = [f for f in fechas if rng.random() >= prob_hueco]
+    if len(fechas) > 60 and rng.random() < 0.3:
+        inicio = rng.randrange(len(fechas) - 40)
+        del fechas[inicio:inicio + rng.randint(5, 30)]
+    return fechas
+
+
+def _copy(cursor, tabla: str, columnas: List[str], filas) -> None:
+    buffer = io.StringIO()
+    for fila in filas:
+        buffer.write('\t'.join('\\N' if v is None else str(v) for v in fila))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN", buffer)
+
+
+def generar(database_url: str, n_variables: int, n_paises: int, desde: date, hasta: date,
+            seed: int = 42, prob_hueco: float = 0.02) -> Dict:
+    """Recrea el schema y carga la base sintética. Devuelve un resumen (cantidades y tiempo)."""
+    import psycopg2
+
+    rng = random.Random(seed)
+    inicio = time.perf_counter()
+
+    paises = list(PAISES_REALES[:n_paises])
+    for k in range(max(0, n_paises - len(PAISES_REALES))):
+        paises.append((ID_PAIS_SINTETICO + k, f'País sintético {k + 1}'))
+    ids_paises = [p for p, _ in paises]
+    nombres_paises = dict(paises)
+
+    variables = _variables_fijas() + _variables_sinteticas(n_variables, rng)
+
+    conn = psycopg2.connect(database_url)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SCHEMA_PATH.read_text(encoding='utf-8'))
+
+        _copy(cursor, 'pais_grupo', ['id_pais', 'nombre_pais_grupo'], paises)
+        _copy(cursor, 'familia', ['id_familia', 'nombre_familia'], FAMILIAS)
+        _copy(cursor, 'sub_familia', ['id_sub_familia', 'nombre_sub_familia', 'id_familia'], SUB_FAMILIAS)
+        _copy(cursor, 'variables',
+              ['id_variable', 'id_nombre_variable', 'id_sub_familia', 'nominal_o_real', 'moneda', 'id_tipo_serie'],
+              [(v['id'], v['nombre'], v['sub'], v.get('nominal', 'N'), v.get('moneda'), 1) for v in variables])
+
+        maestro = []
+        series: List[Tuple[Dict, int]] = []
+        for var in variables:
+            paises_var = [p for p in (var['paises'] or ids_paises) if p in nombres_paises]
+            for id_pais in paises_var:
+                periodicidad = 'D' if var['per'] == 'L' else var['per']
+                maestro.append((
+                    len(maestro) + 1, f"{var['nombre']} - {nombres_paises[id_pais]}", 'P', 'SINTETICO',
+                    periodicidad, None, None, 1, var.get('moneda'), var.get('nominal', 'N'), None, None,
+                    1 if var.get('cotizacion') else 0, nombres_paises[id_pais], var['id'], id_pais, None,
+                ))
+                series.append((var, id_pais))
+        _copy(cursor, 'maestro',
+              ['id', 'nombre', 'tipo', 'fuente', 'periodicidad', 'unidad', 'categoria', 'activo', 'moneda',
+               'nominal_real', 'link', 'mercado', 'es_cotizacion', 'pais', 'id_variable', 'id_pais',
+               'script_update'],
+              maestro)
+
+        total_filas = 0
+        bloque = []
+        for var, id_pais in series:
+            fechas = list(_fechas(var['per'], desde, hasta, var.get('offset', 0)))
+            if var['per'] != 'L':  # Licitación, adjudicado y tasa de corte comparten fechas
+                fechas = _con_huecos(fechas, rng, prob_hueco)
+            for fecha, valor in zip(fechas, _valores(var, len(fechas), rng)):
+                bloque.append((var['id'], id_pais, fecha.isoformat(), valor))
+            if len(bloque) >= 200_000:
+                _copy(cursor, 'maestro_precios', ['id_variable', 'id_pais', 'fecha', 'valor'], bloque)
+                total_filas += len(bloque)
+                bloque = []
+        if bloque:
+            _copy(cursor, 'maestro_precios', ['id_variable', 'id_pais', 'fecha', 'valor'], bloque)
+            total_filas += len(bloque)
+
+        conn.commit()
+        conn.autocommit = True
+        conn.cursor().execute('ANALYZE')
+    finally:
+        conn.close()
+
+    return {
+        'seed': seed,
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'paises': len(paises),
+        'variables': len(variables),
+        'series': len(series),
+        'filas_maestro_precios': total_filas,
+        'segundos': round(time.perf_counter() - inicio, 1),
+    }
+
+
+def _es_local(database_url: str) -> bool:
+    host = urlparse(database_url).hostname or 'localhost'
+    return host in ('localhost', '127.0.0.1', '::1') or host.startswith('/')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Genera una base PostgreSQL sintética para benchmarks')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='Base destino (default: BENCH_DATABASE_URL). SE RECREA EL SCHEMA.')
+    parser.add_argument('--variables', type=int, default=120, help='Variables sintéticas (además de las fijas)')
+    parser.add_argument('--paises', type=int, default=len(PAISES_REALES), help='Países (los primeros son reales)')
+    parser.add_argument('--desde', default='2012-01-01')
+    parser.add_argument('--hasta', default=date.today().isoformat())
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prob-hueco', type=float, default=0.02, help='Probabilidad de faltante por punto')
+    parser.add_argument('--permitir-remoto', action='store_true', help='Permitir una base que no es localhost')
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        print('[ERROR] Indicá la base con --database-url o BENCH_DATABASE_URL', file=sys.stderr)
+        return 2
+    if args.database_url == os.environ.get('DATABASE_URL'):
+        print('[ERROR] La base de benchmarks no puede ser DATABASE_URL (el schema se recrea)', file=sys.stderr)
+        return 2
+    if not _es_local(args.database_url) and not args.permitir_remoto:
+        print('[ERROR] La base no es local; usar --permitir-remoto si es una base descartable', file=sys.stderr)
+        return 2
+
+    resumen = generar(args.database_url, args.variables, args.paises,
+                      date.fromisoformat(args.desde), date.fromisoformat(args.hasta),
+                      seed=args.seed, prob_hueco=args.prob_hueco)
+    print(f"[OK] {resumen['series']} series, {resumen['filas_maestro_precios']:,} filas "
+          f"en {resumen['segundos']}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
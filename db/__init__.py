@@ -7,6 +7,7 @@ from .connection import (
     get_db_engine,
     execute_query,
     execute_query_single,
+    iter_query_chunks,
     execute_update,
     insert_dataframe,
     is_postgresql,
@@ -17,6 +18,7 @@ __all__ = [
     "get_db_engine",
     "execute_query",
     "execute_query_single",
+    "iter_query_chunks",
     "execute_update",
     "insert_dataframe",
     "is_postgresql",
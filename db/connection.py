@@ -2,9 +2,13 @@
 Abstracción de conexión a base de datos.
 Solo PostgreSQL vía DATABASE_URL (Azure/producción).
 """
+import atexit
+import json
 import os
+import time
+import uuid
 from pathlib import Path
-from typing import Optional, Any
+from typing import Callable, Optional, Any, Iterator
 
 PROJECT_ROOT = Path(__file__).parent.parent
 
@@ -76,6 +80,66 @@ def _row_to_dict(row) -> dict:
     return dict(row)
 
 
+# Listeners de instrumentación: fn(query, duracion_segundos, filas). Los registra
+# la app (backend/app/query_stats.py); los scripts de update no registran ninguno.
+_query_listeners: list = []
+
+
+def add_query_listener(listener: Callable[[str, float, int], None]) -> None:
+    """Registra una función que se llama después de cada query con (sql, duración en s, filas)."""
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+
+def remove_query_listener(listener: Callable[[str, float, int], None]) -> None:
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+
+def _notify_query(query: str, inicio: float, filas: int) -> None:
+    if not _query_listeners:
+        return
+    duracion = time.perf_counter() - inicio
+    for listener in list(_query_listeners):
+        try:
+            listener(query, duracion, filas)
+        except Exception as e:  # La instrumentación nunca rompe una query
+            print(f"[ERROR] query listener: {e}")
+
+
+# Filas escritas por este proceso. Los scripts de update/ corren con
+# DCP_FILAS_ESCRITAS=<archivo> y al salir las vuelcan ahí para el historial de corridas
+_filas_escritas = {'insertadas': 0, 'actualizadas': 0, 'borradas': 0}
+_VERBOS_ESCRITURA = {'INSERT': 'insertadas', 'UPDATE': 'actualizadas', 'DELETE': 'borradas'}
+
+
+def _contar_escritura(query: str, filas: int) -> None:
+    palabras = query.split(None, 1)
+    clave = _VERBOS_ESCRITURA.get(palabras[0].upper()) if palabras else None
+    if clave:
+        _filas_escritas[clave] += filas
+
+
+def filas_escritas() -> dict:
+    """{'insertadas', 'actualizadas', 'borradas'} acumuladas en este proceso."""
+    return dict(_filas_escritas)
+
+
+def volcar_filas_escritas() -> None:
+    """Escribe filas_escritas() como JSON en DCP_FILAS_ESCRITAS (si está definida)."""
+    ruta = os.getenv('DCP_FILAS_ESCRITAS')
+    if not ruta:
+        return
+    try:
+        Path(ruta).write_text(json.dumps(_filas_escritas), encoding='utf-8')
+    except OSError as e:
+        print(f"[WARN] No se pudieron guardar las filas escritas en {ruta}: {e}")
+
+
+if os.getenv('DCP_FILAS_ESCRITAS'):
+    atexit.register(volcar_filas_escritas)
+
+
 def _prepare_query_pg(query: str) -> str:
     """Convierte placeholders ? a %s para PostgreSQL."""
     return query.replace("?", "%s")
@@ -83,18 +147,24 @@ def _prepare_query_pg(query: str) -> str:
 
 def execute_query(query: str, params: tuple = (), db_path: Optional[str] = None) -> list:
     """Ejecuta SELECT y devuelve lista de dicts."""
+    inicio = time.perf_counter()
+    filas = 0
     conn = get_db_connection(db_path)
     try:
         cursor = conn.cursor()
         cursor.execute(_prepare_query_pg(query), params)
         rows = cursor.fetchall()
+        filas = len(rows)
         return [_row_to_dict(row) for row in rows]
     finally:
         conn.close()
+        _notify_query(query, inicio, filas)
 
 
 def execute_query_single(query: str, params: tuple = (), db_path: Optional[str] = None) -> Optional[dict]:
     """Ejecuta SELECT y devuelve un solo resultado como dict."""
+    inicio = time.perf_counter()
+    row = None
     conn = get_db_connection(db_path)
     try:
         cursor = conn.cursor()
@@ -103,16 +173,48 @@ def execute_query_single(query: str, params: tuple = (), db_path: Optional[str]
         return _row_to_dict(row) if row else None
     finally:
         conn.close()
+        _notify_query(query, inicio, 1 if row else 0)
+
+
+def iter_query_chunks(query: str, params: tuple = (), chunk_size: int = 10000,
+                      db_path: Optional[str] = None) -> Iterator[list]:
+    """
+    Ejecuta SELECT con un cursor del lado del servidor y devuelve las filas por bloques
+    (listas de dicts de hasta chunk_size filas). No materializa el resultado completo
+    en memoria; pensado para exportaciones grandes en streaming.
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    conn = get_db_connection(db_path)
+    try:
+        cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = chunk_size
+        cursor.execute(_prepare_query_pg(query), params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            filas += len(rows)
+            yield [_row_to_dict(row) for row in rows]
+        cursor.close()
+    finally:
+        conn.close()
+        # Incluye el tiempo en que el consumidor procesa cada bloque (la conexión sigue abierta)
+        _notify_query(query, inicio, filas)
 
 
 def execute_update(query: str, params: tuple = (), db_path: Optional[str] = None) -> tuple[bool, Optional[str], Optional[int]]:
     """Ejecuta INSERT, UPDATE o DELETE. Returns: (success, error_message, lastrowid)"""
+    inicio = time.perf_counter()
+    filas = 0
     conn = get_db_connection(db_path)
     try:
         cursor = conn.cursor()
         q = _prepare_query_pg(query)
         cursor.execute(q, params)
+        filas = max(cursor.rowcount, 0)
         conn.commit()
+        _contar_escritura(query, filas)
         lastrowid = None
         if "INSERT" in q.upper():
             try:
@@ -127,6 +229,7 @@ def execute_update(query: str, params: tuple = (), db_path: Optional[str] = None
         return (False, str(e), None)
     finally:
         conn.close()
+        _notify_query(query, inicio, filas)
 
 
 def insert_dataframe(
@@ -139,3 +242,4 @@ def insert_dataframe(
     """Inserta un DataFrame en una tabla usando PostgreSQL."""
     engine = get_db_engine()
     df.to_sql(table, engine, if_exists=if_exists, index=index, method="multi")
+    _filas_escritas['insertadas'] += len(df)
@@ -109,3 +109,38 @@ CREATE INDEX IF NOT EXISTS idx_maestro_precios_id_variable ON maestro_precios(id
 CREATE INDEX IF NOT EXISTS idx_maestro_precios_id_pais ON maestro_precios(id_pais);
 CREATE INDEX IF NOT EXISTS idx_maestro_precios_fecha ON maestro_precios(fecha);
 CREATE INDEX IF NOT EXISTS idx_maestro_precios_variable_pais_fecha ON maestro_precios(id_variable, id_pais, fecha);
+
+-- Historial de corridas de update/ (lo crea también update/historial.py)
+CREATE TABLE IF NOT EXISTS pipeline_corridas (
+    run_id TEXT PRIMARY KEY,
+    pipeline TEXT NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    fin TIMESTAMP,
+    duracion_s NUMERIC(12, 3),
+    estado TEXT NOT NULL,
+    host TEXT,
+    opciones TEXT,
+    reanudada TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_scripts (
+    id SERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES pipeline_corridas(run_id) ON DELETE CASCADE,
+    script TEXT NOT NULL,
+    fase TEXT NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    fin TIMESTAMP NOT NULL,
+    duracion_s NUMERIC(12, 3) NOT NULL,
+    estado TEXT NOT NULL,
+    codigo_salida INTEGER,
+    mensaje TEXT,
+    filas_insertadas INTEGER,
+    filas_actualizadas INTEGER,
+    filas_borradas INTEGER,
+    bytes_descargados BIGINT,
+    huella TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_scripts_run_id ON pipeline_scripts(run_id);
+CREATE INDEX IF NOT EXISTS idx_pipeline_scripts_script_inicio ON pipeline_scripts(script, inicio);
+CREATE INDEX IF NOT EXISTS idx_pipeline_corridas_inicio ON pipeline_corridas(inicio);
@@ -0,0 +1,9 @@
+"""Rutas de import para los tests: raíz (db, update) y backend (app)."""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+for ruta in (str(PROJECT_ROOT), str(PROJECT_ROOT / 'backend')):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
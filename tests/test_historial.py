@@ -0,0 +1,172 @@
+"""update/historial.py: Corrida con y sin base de datos."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import connection
+from update import historial
+
+
+class BDFalsa:
+    """Reemplaza execute_update / execute_query(_single) de db.connection y guarda las queries."""
+
+    def __init__(self, monkeypatch, falla: bool = False):
+        self.updates = []
+        self.corridas = {}
+        self.scripts = []
+        self.falla = falla
+        monkeypatch.setenv('DATABASE_URL', 'postgresql://usuario@localhost/macrodata')
+        monkeypatch.setattr(connection, 'execute_update', self.execute_update)
+        monkeypatch.setattr(connection, 'execute_query', self.execute_query)
+        monkeypatch.setattr(connection, 'execute_query_single', self.execute_query_single)
+
+    def execute_update(self, query, params=()):
+        if self.falla:
+            return False, 'conexión rechazada', None
+        self.updates.append((query, params))
+        if query.startswith('INSERT INTO pipeline_corridas'):
+            run_id, pipeline, inicio, _, opciones = params
+            self.corridas[run_id] = {'pipeline': pipeline, 'inicio': inicio, 'duracion_s': None,
+                                     'opciones': opciones}
+        elif query.startswith('UPDATE pipeline_corridas SET fin = ?'):
+            self.corridas[params[-1]]['duracion_s'] = params[1]
+        elif query.startswith('INSERT INTO pipeline_scripts'):
+            self.scripts.append(params)
+        return True, None, 1
+
+    def execute_query_single(self, query, params=()):
+        return self.corridas.get(params[0])
+
+    def execute_query(self, query, params=()):
+        # DISTINCT ON (fase, script) ... ORDER BY inicio DESC: la última de cada script
+        ultimas = {}
+        for fila in sorted((s for s in self.scripts if s[0] == params[0]), key=lambda s: s[3]):
+            ultimas[(fila[2], fila[1])] = {
+                'fase': fila[2], 'script': fila[1], 'estado': fila[6], 'huella': fila[13], 'fin': fila[4],
+            }
+        return list(ultimas.values())
+
+
+def test_sin_bd_no_registra_nada(monkeypatch):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    corrida = historial.Corrida('update_tc')
+    assert not corrida.activa
+    entorno, ruta = corrida.entorno_script('x.py')
+    assert entorno['DCP_FILAS_ESCRITAS'] == str(ruta)
+    ahora = datetime.now()
+    corrida.registrar_script('x.py', 'direct', ahora, ahora, True, 'Ejecutado exitosamente', ruta)
+    corrida.finalizar([{'exitosos': [], 'fallidos': []}])
+    assert not ruta.parent.exists()
+
+
+def test_activa_segun_db_connection(monkeypatch):
+    # DATABASE_URL puede venir del .env que carga db.connection: se decide con is_postgresql()
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.setattr(connection, 'is_postgresql', lambda: True)
+    monkeypatch.setattr(connection, 'execute_update', lambda query, params=(): (True, None, 1))
+    assert historial.Corrida('update_database').activa
+
+
+def test_con_bd_registra_corrida_y_scripts(monkeypatch):
+    bd = BDFalsa(monkeypatch)
+    corrida = historial.Corrida('update_database', {'workers': 2})
+    assert corrida.activa
+    assert corrida.run_id in bd.corridas
+    assert any('CREATE TABLE IF NOT EXISTS pipeline_scripts' in q for q, _ in bd.updates)
+
+    _, ruta = corrida.entorno_script('016_ipc.py')
+    ruta.write_text(json.dumps({'insertadas': 10, 'actualizadas': 2, 'borradas': 0}), encoding='utf-8')
+    inicio = datetime(2026, 1, 1, 3, 0, 0)
+    corrida.registrar_script('016_ipc.py', 'direct', inicio, inicio + timedelta(seconds=12.5),
+                             True, 'Ejecutado exitosamente', ruta, None, 'abc')
+    corrida.registrar_script('ipc_paraguay.py', 'download', inicio, inicio + timedelta(seconds=3),
+                             False, 'Error: El script terminó con código 2\nTraceback', None, 2048, 'def')
+
+    ok, error = bd.scripts
+    assert ok[1:8] == ('016_ipc.py', 'direct', inicio, inicio + timedelta(seconds=12.5), 12.5, 'ok', 0)
+    assert ok[9:12] == (10, 2, 0)
+    assert error[6:8] == ('error', 2)
+    assert error[12] == 2048
+
+    corrida.finalizar([{'exitosos': [1], 'fallidos': []}, {'exitosos': [], 'fallidos': [1]}])
+    query, params = bd.updates[-1]
+    assert query.startswith('UPDATE pipeline_corridas SET fin')
+    assert params[2:] == ('con_errores', corrida.run_id)
+
+
+def test_error_de_bd_desactiva_el_historial_sin_cortar_el_pipeline(monkeypatch):
+    BDFalsa(monkeypatch, falla=True)
+    corrida = historial.Corrida('run_problemas')
+    assert not corrida.activa
+    ahora = datetime.now()
+    corrida.registrar_script('x.py', 'direct', ahora, ahora, True, 'Ejecutado exitosamente')
+    corrida.finalizar([])
+
+
+def test_reanudar_trae_opciones_y_solo_los_scripts_ok(monkeypatch):
+    bd = BDFalsa(monkeypatch)
+    original = historial.Corrida('update_database', {'workers': 2, 'solo': ['016_ipc']})
+    inicio = original.inicio
+    original.registrar_script('016_ipc.py', 'direct', inicio, inicio + timedelta(seconds=5),
+                              False, 'Error: El script terminó con código 1', None, None, 'h1')
+    original.registrar_script('016_ipc.py', 'direct', inicio + timedelta(seconds=6),
+                              inicio + timedelta(seconds=9), True, 'Ejecutado exitosamente', None, None, 'h2')
+    original.registrar_script('tpm_uyu.py', 'download', inicio, inicio + timedelta(seconds=4),
+                              False, 'Cancelado por el usuario', None, None, 'h3')
+    original.finalizar([], estado='cancelado')
+    bd.corridas[original.run_id]['duracion_s'] = 100.0
+
+    reanudada = historial.Corrida('update_database', reanudar=original.run_id)
+    assert reanudada.run_id == original.run_id
+    assert reanudada.opciones == {'workers': 2, 'solo': ['016_ipc']}
+    assert reanudada.hechos == {'direct/016_ipc.py': 'h2'}
+    assert reanudada.inicio == inicio
+    query, params = bd.updates[-1]
+    assert 'reanudada = ?' in query and params == (reanudada.reanudada, original.run_id)
+
+
+def test_reanudar_no_cuenta_el_tiempo_entre_cancelar_y_reanudar(monkeypatch):
+    bd = BDFalsa(monkeypatch)
+    original = historial.Corrida('update_database')
+    original.finalizar([], estado='cancelado')
+    bd.corridas[original.run_id].update({'inicio': datetime(2026, 1, 1, 3, 0), 'duracion_s': 100.0})
+
+    reanudada = historial.Corrida('update_database', reanudar=original.run_id)
+    reanudada.reanudada -= timedelta(seconds=20)
+    reanudada.finalizar([])
+    _, params = bd.updates[-1]
+    assert 120.0 <= params[1] < 125.0
+
+
+def test_reanudar_sin_duracion_usa_el_ultimo_script(monkeypatch):
+    # La corrida murió sin finalizar (SIGKILL, reinicio del contenedor)
+    BDFalsa(monkeypatch)
+    original = historial.Corrida('update_database')
+    inicio = original.inicio
+    original.registrar_script('tpm_uyu.py', 'download', inicio, inicio + timedelta(seconds=30),
+                              True, 'Ejecutado exitosamente', None, None, 'h')
+    reanudada = historial.Corrida('update_database', reanudar=original.run_id)
+    assert reanudada.segundos_previos == 30.0
+
+
+def test_reanudar_errores(monkeypatch):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    with pytest.raises(ValueError, match='requiere DATABASE_URL'):
+        historial.Corrida('update_database', reanudar='20260101_030000_abcdef')
+    BDFalsa(monkeypatch)
+    with pytest.raises(ValueError, match='No existe'):
+        historial.Corrida('update_database', reanudar='20260101_030000_abcdef')
+    otra = historial.Corrida('update_tc')
+    with pytest.raises(ValueError, match='es de update_tc'):
+        historial.Corrida('update_database', reanudar=otra.run_id)
+
+
+@pytest.mark.parametrize('mensaje, esperado', [
+    ('Timeout: El script tardó más de 3600s', ('timeout', None)),
+    ('Cancelado por el usuario', ('cancelado', None)),
+    ('Error: El script terminó por la señal 9', ('error', -9)),
+    ('Error al ejecutar script: boom', ('error', None)),
+])
+def test_estado_de_resultado(mensaje, esperado):
+    assert historial.estado_de_resultado(False, mensaje) == esperado
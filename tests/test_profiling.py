@@ -0,0 +1,27 @@
+"""Orden de los after_request de create_app: el reporte de ?__profile=1 con CORS."""
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_cors')
+
+from app import admin_tokens
+from app.main import _cors_origins, create_app
+
+
+def test_reporte_de_profiling_lleva_headers_cors(monkeypatch):
+    app = create_app()
+
+    @app.route('/api/_prueba_profiling')
+    def prueba():
+        return {'ok': True}
+
+    monkeypatch.setattr(admin_tokens, '_admin_tokens', {'token-de-prueba'})
+    origen = _cors_origins[0]
+    respuesta = app.test_client().get(
+        '/api/_prueba_profiling?__profile=1',
+        headers={'Authorization': 'Bearer token-de-prueba', 'Origin': origen},
+    )
+    assert respuesta.status_code == 200
+    assert 'arbol' in respuesta.get_json()
+    assert respuesta.headers.get('Access-Control-Allow-Origin') == origen
+    assert respuesta.headers.get('Access-Control-Allow-Credentials') == 'true'
@@ -0,0 +1,110 @@
+"""Transformaciones de /api/series/batch (routers/011_series)."""
+import importlib
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+np = pytest.importorskip('numpy')
+pytest.importorskip('flask')
+
+series = importlib.import_module('app.routers.011_series.router')
+
+CLAVE = (1, 1)
+
+
+def _panel_diario(desde: str, hasta: str) -> 'pd.DataFrame':
+    indice = pd.date_range(desde, hasta, freq='D')
+    return pd.DataFrame({CLAVE: np.arange(len(indice)) + 1.0}, index=indice)
+
+
+def test_base100_por_defecto_usa_el_primer_dato_del_rango():
+    # El endpoint carga 400 días de más hacia atrás; la base es el inicio del rango pedido
+    panel = _panel_diario('2019-11-27', '2021-12-31')
+    resultado = series._aplicar_transformacion(panel, 'base100', None, None, date(2021, 1, 1))
+    assert resultado.loc['2021-01-01', CLAVE] == pytest.approx(100.0)
+
+
+def test_base100_con_base_fecha():
+    panel = _panel_diario('2021-01-01', '2021-01-10')
+    resultado = series._aplicar_transformacion(panel, 'base100', None, date(2021, 1, 5), date(2021, 1, 1))
+    assert resultado.loc['2021-01-05', CLAVE] == pytest.approx(100.0)
+    assert resultado.loc['2021-01-10', CLAVE] == pytest.approx(200.0)
+
+
+def test_yoy_diaria_cruzando_anio_bisiesto():
+    panel = _panel_diario('2019-01-01', '2021-12-31')
+    resultado = series._aplicar_transformacion(panel, 'yoy', None, None)
+    # 29/02/2020 y 28/02/2020 comparan contra 28/02/2019
+    hace_un_anio = panel.loc['2019-02-28', CLAVE]
+    assert resultado.loc['2020-02-29', CLAVE] == pytest.approx((panel.loc['2020-02-29', CLAVE] / hace_un_anio - 1) * 100)
+    assert resultado.loc['2020-02-28', CLAVE] == pytest.approx((panel.loc['2020-02-28', CLAVE] / hace_un_anio - 1) * 100)
+    assert resultado.loc['2020-01-01':, CLAVE].notna().all()
+    assert resultado.loc[:'2019-12-31', CLAVE].isna().all()
+
+
+def test_yoy_mensual_usa_12_periodos():
+    indice = pd.date_range('2020-01-01', periods=24, freq='MS')
+    panel = pd.DataFrame({CLAVE: [100.0] * 12 + [110.0] * 12}, index=indice)
+    resultado = series._aplicar_transformacion(panel, 'yoy', 'M', None)
+    assert resultado[CLAVE].iloc[:12].isna().all()
+    assert resultado[CLAVE].iloc[12:].tolist() == pytest.approx([10.0] * 12)
+
+
+def test_pct_ignora_huecos():
+    indice = pd.date_range('2021-01-01', periods=4, freq='D')
+    panel = pd.DataFrame({CLAVE: [100.0, np.nan, 110.0, 121.0]}, index=indice)
+    resultado = series._aplicar_transformacion(panel, 'pct', None, None)
+    assert np.isnan(resultado[CLAVE].iloc[0])
+    assert np.isnan(resultado[CLAVE].iloc[1])
+    assert resultado[CLAVE].iloc[2:].tolist() == pytest.approx([10.0, 10.0])
+
+
+def test_alinear_toma_el_ultimo_valor_conocido_con_fechas_repetidas():
+    auxiliar = pd.DataFrame({CLAVE: [1.0, 2.0]}, index=pd.DatetimeIndex(['2021-01-01', '2021-01-10']))
+    indice = pd.DatetimeIndex(['2021-01-05', '2021-01-05', '2021-01-12'])
+    alineado = series._alinear(auxiliar, indice)
+    assert alineado[CLAVE].tolist() == [1.0, 1.0, 2.0]
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """/api/series/batch con la BD reemplazada por una serie diaria 1, 2, 3... desde 2019-01-01."""
+    flask = pytest.importorskip('flask')
+    cargas = []
+
+    def cargar_panel(keys, fecha_desde, fecha_hasta):
+        cargas.append(fecha_desde)
+        panel = _panel_diario('2019-01-01', '2021-12-31')
+        return panel[(panel.index >= pd.Timestamp(fecha_desde)) & (panel.index <= pd.Timestamp(fecha_hasta))]
+
+    monkeypatch.setattr(series, '_cargar_panel', cargar_panel)
+    monkeypatch.setattr(series, '_cargar_metadata', lambda keys: {})
+    app = flask.Flask(__name__)
+    app.register_blueprint(series.bp, url_prefix='/api')
+    cliente = app.test_client()
+    cliente.cargas = cargas
+    return cliente
+
+
+@pytest.mark.parametrize('frecuencia, fecha_desde, primera', [
+    ('M', '2021-01-15', '2021-01-01'),
+    ('Q', '2021-02-15', '2021-01-01'),
+    ('Y', '2020-06-01', '2020-01-01'),
+])
+@pytest.mark.parametrize('base100', [False, True])
+def test_fecha_desde_a_mitad_de_periodo_conserva_el_primer_periodo(cliente, frecuencia, fecha_desde, primera, base100):
+    consulta = {'series[]': '1:1', 'fecha_desde': fecha_desde, 'fecha_hasta': '2021-12-31',
+                'frecuencia': frecuencia, 'agregacion': 'first'}
+    if base100:
+        consulta['transformaciones[]'] = 'base100'
+    respuesta = cliente.get('/api/series/batch', query_string=consulta)
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos['fechas'][0] == primera
+    valores = datos['series'][0]['valores']
+    if base100:
+        assert valores[0] == pytest.approx(100.0)
+    else:
+        # El primer período se agrega completo: su primer dato es el del inicio del período
+        assert valores[0] == pytest.approx((pd.Timestamp(primera) - pd.Timestamp('2019-01-01')).days + 1)
@@ -0,0 +1,184 @@
+"""update/update_database.py: selección del DAG, recursos, saltear al reanudar y cancelación."""
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from update import update_database as u
+
+
+def _script(carpeta: Path, nombre: str, produce=(), consume=(), cuerpo: str = '') -> Path:
+    ruta = carpeta / nombre
+    ruta.write_text(f"PRODUCE = {list(produce)!r}\nCONSUME = {list(consume)!r}\n{cuerpo}", encoding='utf-8')
+    return ruta
+
+
+@pytest.fixture
+def dag(tmp_path):
+    """descarga -> direct -> calculate, más un direct independiente."""
+    tareas = [
+        ('download', _script(tmp_path, 'bajar.py', produce=['historicos/x.xlsx'])),
+        ('direct', _script(tmp_path, 'cargar.py', produce=['serie:1/858'], consume=['historicos/x.xlsx'])),
+        ('direct', _script(tmp_path, 'suelto.py', produce=['serie:2/858'])),
+        ('calculate', _script(tmp_path, 'derivar.py', produce=['serie:3/858'], consume=['serie:1/858'])),
+    ]
+    return tareas, u.construir_dependencias(tareas)
+
+
+def test_only_corre_solo_esos_scripts(dag):
+    tareas, dependencias = dag
+    elegidas = u.seleccionar_tareas(tareas, dependencias, solo=['cargar', 'calculate/derivar.py'])
+    assert [s.name for _, s in elegidas] == ['cargar.py', 'derivar.py']
+
+
+def test_downstream_of_suma_todo_lo_que_depende(dag):
+    tareas, dependencias = dag
+    elegidas = u.seleccionar_tareas(tareas, dependencias, downstream_de=['bajar.py'])
+    assert [s.name for _, s in elegidas] == ['bajar.py', 'cargar.py', 'derivar.py']
+    assert u.seleccionar_tareas(tareas, dependencias) == tareas
+
+
+def test_seleccion_con_nombres_desconocidos_o_ambiguos(dag, tmp_path):
+    tareas, dependencias = dag
+    with pytest.raises(ValueError, match="No existe el script 'nada'"):
+        u.seleccionar_tareas(tareas, dependencias, solo=['nada'])
+    otra = tmp_path / 'otra'
+    otra.mkdir()
+    tareas = tareas + [('calculate', _script(otra, 'cargar.py'))]
+    with pytest.raises(ValueError, match='ambiguo'):
+        u.seleccionar_tareas(tareas, dependencias, downstream_de=['cargar'])
+
+
+def test_usa_navegador_detecta_imports_dentro_de_funciones(tmp_path):
+    con = _script(tmp_path, 'con.py', cuerpo="def f():\n    from selenium import webdriver\n")
+    sin = _script(tmp_path, 'sin.py', cuerpo="import requests\n")
+    assert u._recursos_de('direct', con) == ['navegador']
+    assert u._recursos_de('direct', sin) == []
+    assert u._recursos_de('download', sin) == u.RECURSOS_POR_DEFECTO
+
+
+def test_limites_de_recursos_valen_para_direct_y_calculate(monkeypatch, tmp_path):
+    selenium = "def f():\n    from selenium import webdriver\n"
+    tareas = [
+        ('download', _script(tmp_path, 'bajar.py', cuerpo="import selenium\n")),
+        ('direct', _script(tmp_path, 'a.py', cuerpo=selenium)),
+        ('direct', _script(tmp_path, 'b.py', cuerpo=selenium)),
+        ('calculate', _script(tmp_path, 'c.py', cuerpo=selenium)),
+        ('calculate', _script(tmp_path, 'sin_navegador.py')),
+    ]
+    monkeypatch.setitem(u.LIMITES_RECURSOS, 'navegador', 2)
+    lock = threading.Lock()
+    abiertos = {'navegador': 0, 'max': 0, 'total': 0, 'max_total': 0}
+
+    def ejecutar(script_path, *args):
+        navegador = u._usa_navegador(script_path)
+        with lock:
+            abiertos['total'] += 1
+            abiertos['max_total'] = max(abiertos['max_total'], abiertos['total'])
+            if navegador:
+                abiertos['navegador'] += 1
+                abiertos['max'] = max(abiertos['max'], abiertos['navegador'])
+        time.sleep(0.1)
+        with lock:
+            abiertos['total'] -= 1
+            if navegador:
+                abiertos['navegador'] -= 1
+        return True, 'ok', 0.1, ''
+
+    monkeypatch.setattr(u, 'ejecutar_script', ejecutar)
+    resultados = u.ejecutar_en_paralelo(tareas, 5)
+    assert len(resultados['exitosos']) == 5
+    assert abiertos['max'] == 2
+    assert abiertos['max_total'] == 3
+
+
+def _corrida_con(tareas, claves):
+    hechos = {u._clave(c, s): u.huella_insumos(s) for c, s in tareas if u._clave(c, s) in claves}
+    return SimpleNamespace(hechos=hechos, run_id='20260101_030000_abcdef')
+
+
+def test_saltea_lo_completado_sin_cambios(dag):
+    tareas, dependencias = dag
+    corrida = _corrida_con(tareas, {'download/bajar.py', 'direct/cargar.py', 'direct/suelto.py'})
+    assert u.scripts_a_saltear(tareas, dependencias, corrida) == {
+        'download/bajar.py', 'direct/cargar.py', 'direct/suelto.py',
+    }
+
+
+def test_repite_lo_que_depende_de_un_script_que_vuelve_a_correr(dag):
+    tareas, dependencias = dag
+    # bajar.py no terminó bien: se repiten cargar.py y derivar.py aunque estén completos
+    corrida = _corrida_con(tareas, {'direct/cargar.py', 'direct/suelto.py', 'calculate/derivar.py'})
+    assert u.scripts_a_saltear(tareas, dependencias, corrida) == {'direct/suelto.py'}
+
+
+def test_repite_si_cambio_el_codigo(dag):
+    tareas, dependencias = dag
+    corrida = _corrida_con(tareas, {c + '/' + s.name for c, s in tareas})
+    suelto = tareas[2][1]
+    suelto.write_text(suelto.read_text(encoding='utf-8') + "# cambio\n", encoding='utf-8')
+    assert u.scripts_a_saltear(tareas, dependencias, corrida) == {
+        'download/bajar.py', 'direct/cargar.py', 'calculate/derivar.py',
+    }
+
+
+def test_ejecutar_en_paralelo_no_corre_los_salteados(dag, monkeypatch):
+    tareas, dependencias = dag
+    corridos = []
+    monkeypatch.setattr(u, 'ejecutar_script', lambda s, *a: corridos.append(s.name) or (True, 'ok', 0.0, ''))
+    resultados = u.ejecutar_en_paralelo(tareas, 2, dependencias, saltear={'download/bajar.py'})
+    assert sorted(corridos) == ['cargar.py', 'derivar.py', 'suelto.py']
+    assert [r['script'] for r in resultados['exitosos']] == ['bajar.py', 'cargar.py', 'suelto.py', 'derivar.py']
+
+
+def test_reanudar_usa_las_opciones_de_la_corrida(monkeypatch, tmp_path):
+    class CorridaFalsa:
+        def __init__(self, pipeline, opciones=None, reanudar=None):
+            self.opciones = {'workers': 2, 'solo': None, 'downstream_de': ['dolar_bevsa_uyu'],
+                             'por_fases': False}
+            self.activa = False
+
+        def finalizar(self, resultados, estado=None):
+            pass
+
+    llamadas = []
+    vacio = {'exitosos': [], 'fallidos': []}
+    monkeypatch.setattr(u.historial, 'Corrida', CorridaFalsa)
+    monkeypatch.setattr(u, 'ejecutar_dag', lambda *a: llamadas.append(a) or (vacio, vacio))
+    monkeypatch.setattr(u, 'REPORTE_FILE', tmp_path / 'update_database.txt')
+    monkeypatch.setattr(u, 'MODO_INPROCESO', False)
+    monkeypatch.setattr(signal, 'signal', lambda *a: None)
+    with pytest.raises(SystemExit):
+        u.ejecutar_todas_actualizaciones(reanudar='20260101_030000_abcdef')
+    workers, solo, downstream_de, _ = llamadas[0]
+    assert (workers, solo, downstream_de) == (2, None, ['dolar_bevsa_uyu'])
+
+
+@pytest.mark.skipif(not hasattr(os, 'killpg'), reason='grupos de procesos solo en POSIX')
+def test_cancelar_mata_los_scripts_y_lo_que_lanzaron(monkeypatch, tmp_path):
+    monkeypatch.setattr(u, '_senal_cancelacion', None)
+    archivo_pid = tmp_path / 'nieto.pid'
+    nieto = tmp_path / 'nieto.py'
+    nieto.write_text(f"import os, time\nopen({str(archivo_pid)!r}, 'w').write(str(os.getpid()))\n"
+                     "time.sleep(60)\n", encoding='utf-8')
+    script = _script(tmp_path, 'lento.py', cuerpo=(
+        f"import subprocess, sys, time\nsubprocess.Popen([sys.executable, {str(nieto)!r}])\ntime.sleep(60)\n"
+    ))
+    anterior = signal.signal(signal.SIGTERM, u._al_cancelar)
+    try:
+        threading.Timer(1.5, os.kill, (os.getpid(), signal.SIGTERM)).start()
+        with pytest.raises(u._Cancelacion):
+            u.ejecutar_en_paralelo([('download', script)], 2)
+    finally:
+        signal.signal(signal.SIGTERM, anterior)
+    assert u._senal_cancelacion == signal.SIGTERM
+    assert not u._procesos
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(archivo_pid.read_text()), 0)
+    # Ya cancelada no se lanza nada más
+    assert u._ejecutar_script(Path(sys.executable)) == (False, "Cancelado por el usuario", 0.0, '')
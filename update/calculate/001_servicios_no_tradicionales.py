@@ -14,6 +14,10 @@ como promedio mensual de las series:
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:16/999"]
+CONSUME = ["serie:8/999", "serie:1/999", "serie:5/999", "serie:3/999"]
+
 import sys
 import os
 from pathlib import Path
@@ -15,6 +15,10 @@ real de Uruguay en una fecha base.
 Debe ejecutarse al final del update (después de los direct que cargan NXR).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:85/858"]
+CONSUME = ["serie:20/76", "serie:20/152", "serie:20/170", "serie:20/484", "serie:20/858"]
+
 import sys
 from pathlib import Path
 
@@ -65,6 +69,49 @@ def leer_serie_nxr(id_pais: int) -> pd.DataFrame:
     return df
 
 
+def construir_serie_sintetica(df_all: pd.DataFrame, fecha_base_str: str) -> pd.DataFrame:
+    """
+    Encadena la variación sintética desde la fecha base (valor = NXR Uruguay real).
+
+    df_all: columnas fecha, variacion_uyu_sintetico, nxr_uyu (sin NaN en la variación).
+    Devuelve df_all indexado por fecha con la columna nxr_sintetico.
+    """
+    # 5) Fecha base
+    fecha_base = pd.to_datetime(fecha_base_str)
+    if fecha_base not in df_all["fecha"].values:
+        # Usar la primera fecha disponible que tenga nxr_uyu
+        fecha_base = df_all["fecha"].min()
+        print(f"[INFO] Fecha base no encontrada; usando {fecha_base.date()}")
+
+    df_all = df_all.set_index("fecha").sort_index()
+    # Asegurar dtypes numéricos para evitar FutureWarning al asignar
+    df_all["variacion_uyu_sintetico"] = df_all["variacion_uyu_sintetico"].astype(np.float64)
+
+    # 6) Construir serie sintética (asignaciones en float64 para evitar dtype incompatible)
+    valor_inicial = float(df_all.loc[fecha_base, "nxr_uyu"])
+    df_all["nxr_sintetico"] = np.nan
+    df_all["nxr_sintetico"] = df_all["nxr_sintetico"].astype(np.float64)
+    df_all.loc[fecha_base, "nxr_sintetico"] = valor_inicial
+
+    idx = df_all.index
+    # Hacia adelante (t > fecha_base)
+    pos_base = idx.get_loc(fecha_base)
+    for i in range(pos_base + 1, len(idx)):
+        t = idx[i]
+        t_ant = idx[i - 1]
+        var = df_all.loc[t, "variacion_uyu_sintetico"]
+        df_all.loc[t, "nxr_sintetico"] = float(df_all.loc[t_ant, "nxr_sintetico"] * (1 + var))
+
+    # Hacia atrás (t < fecha_base)
+    for i in range(pos_base - 1, -1, -1):
+        t = idx[i]
+        t_sig = idx[i + 1]
+        var_sig = df_all.loc[t_sig, "variacion_uyu_sintetico"]
+        df_all.loc[t, "nxr_sintetico"] = float(df_all.loc[t_sig, "nxr_sintetico"] / (1 + var_sig))
+
+    return df_all
+
+
 def main():
     print("=" * 60)
     print("NXR SINTÉTICO URUGUAY (id_variable=85, id_pais=858)")
@@ -115,38 +162,8 @@ def main():
         print("[ERROR] No quedaron fechas comunes entre NXR 4 países y Uruguay.")
         return
 
-    # 5) Fecha base
-    fecha_base = pd.to_datetime(FECHA_BASE)
-    if fecha_base not in df_all["fecha"].values:
-        # Usar la primera fecha disponible que tenga nxr_uyu
-        fecha_base = df_all["fecha"].min()
-        print(f"[INFO] Fecha base no encontrada; usando {fecha_base.date()}")
-
-    df_all = df_all.set_index("fecha").sort_index()
-    # Asegurar dtypes numéricos para evitar FutureWarning al asignar
-    df_all["variacion_uyu_sintetico"] = df_all["variacion_uyu_sintetico"].astype(np.float64)
-
-    # 6) Construir serie sintética (asignaciones en float64 para evitar dtype incompatible)
-    valor_inicial = float(df_all.loc[fecha_base, "nxr_uyu"])
-    df_all["nxr_sintetico"] = np.nan
-    df_all["nxr_sintetico"] = df_all["nxr_sintetico"].astype(np.float64)
-    df_all.loc[fecha_base, "nxr_sintetico"] = valor_inicial
-
-    idx = df_all.index
-    # Hacia adelante (t > fecha_base)
-    pos_base = idx.get_loc(fecha_base)
-    for i in range(pos_base + 1, len(idx)):
-        t = idx[i]
-        t_ant = idx[i - 1]
-        var = df_all.loc[t, "variacion_uyu_sintetico"]
-        df_all.loc[t, "nxr_sintetico"] = float(df_all.loc[t_ant, "nxr_sintetico"] * (1 + var))
-
-    # Hacia atrás (t < fecha_base)
-    for i in range(pos_base - 1, -1, -1):
-        t = idx[i]
-        t_sig = idx[i + 1]
-        var_sig = df_all.loc[t_sig, "variacion_uyu_sintetico"]
-        df_all.loc[t, "nxr_sintetico"] = float(df_all.loc[t_sig, "nxr_sintetico"] / (1 + var_sig))
+    # 5-6) Serie sintética anclada en la fecha base
+    df_all = construir_serie_sintetica(df_all, FECHA_BASE)
 
     # 7) Salida: FECHA, VALOR
     out = df_all.reset_index()
@@ -11,6 +11,19 @@ en %, desde la primera fecha donde haya dato en ambas series (nominal y real) pa
 
 Debe ejecutarse después de cargar curvas nominal y real (direct).
 """
+
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:86/858", "serie:87/858", "serie:88/858", "serie:89/858", "serie:90/858", "serie:91/858",
+    "serie:92/858", "serie:93/858", "serie:94/858", "serie:95/858",
+]
+CONSUME = [
+    "serie:42/858", "serie:43/858", "serie:44/858", "serie:45/858", "serie:46/858", "serie:47/858",
+    "serie:48/858", "serie:49/858", "serie:50/858", "serie:51/858", "serie:75/858", "serie:76/858",
+    "serie:77/858", "serie:78/858", "serie:79/858", "serie:80/858", "serie:81/858", "serie:82/858",
+    "serie:83/858", "serie:84/858",
+]
+
 import sys
 from pathlib import Path
 
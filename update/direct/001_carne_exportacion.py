@@ -14,6 +14,10 @@ Por lo tanto, este script lee únicamente desde data_raw/ generado por el script
 5) Insertar en SQLite solo si el usuario confirma.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:11/858"]
+CONSUME = ["data_raw/serie_semanal_ingreso_medio_exportacion_inac.xlsx"]
+
 import os
 
 import pandas as pd
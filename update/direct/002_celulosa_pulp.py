@@ -10,6 +10,10 @@ siguiendo el flujo del README:
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:4/999"]
+CONSUME = []
+
 import os
 import zipfile
 import io
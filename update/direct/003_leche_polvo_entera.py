@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de exportación leche en polvo entera (I
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:10/858"]
+CONSUME = ["data_raw/exportacion_leche_polvo_entera.xlsx"]
+
 import os
 
 import pandas as pd
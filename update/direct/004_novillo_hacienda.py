@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de novillo hacienda (INAC).
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:12/858"]
+CONSUME = ["data_raw/precios_hacienda_inac.xlsx"]
+
 import os
 
 import pandas as pd
@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de precio al productor de leche (INALE).
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:13/858"]
+CONSUME = ["data_raw/precio_leche_productor.xlsx"]
+
 import os
 
 import pandas as pd
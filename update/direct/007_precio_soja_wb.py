@@ -11,6 +11,10 @@ Columna A tiene fechas en formato "2025M12" (diciembre 2025) o "2025M07" (julio
 Columna Y es el precio de soja.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:18/999"]
+CONSUME = ["historicos/commodities_banco_mundial.xlsx"]
+
 import os
 import re
 
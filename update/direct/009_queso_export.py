@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de exportación queso (INALE).
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:14/858"]
+CONSUME = []
+
 import os
 
 import pandas as pd
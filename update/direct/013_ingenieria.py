@@ -19,6 +19,10 @@ NOTA: Usa API v2 sin registro (funciona para rangos de hasta 10 años).
 Para obtener datos desde 2010, se hacen múltiples consultas si es necesario.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:8/999"]
+CONSUME = []
+
 import os
 import sys
 from datetime import datetime
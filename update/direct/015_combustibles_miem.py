@@ -8,6 +8,12 @@ Actualiza series de combustibles MIEM:
 3) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:7/858"]
+CONSUME = [
+    "data_raw/miem_derivados/precios medios de derivados de petroleo con y sin impuestos.xls",
+]
+
 import os
 import sys
 
@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de IPC (Índice de Precios al Consumo) d
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:9/858"]
+CONSUME = []
+
 import os
 import sys
 from io import BytesIO
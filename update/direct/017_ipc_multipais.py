@@ -17,6 +17,10 @@ Países incluidos:
 4) Insertar directamente en SQLite (sin Excel de prueba).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:9/152", "serie:9/76", "serie:9/484", "serie:9/604"]
+CONSUME = []
+
 import re
 from datetime import datetime
 
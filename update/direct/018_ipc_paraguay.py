@@ -12,6 +12,10 @@ de Paraguay desde el Excel del Banco Central del Paraguay (BCP).
 5) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:9/600"]
+CONSUME = ["data_raw/ipc_paraguay.xlsx"]
+
 import os
 import re
 import sys
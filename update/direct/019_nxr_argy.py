@@ -12,6 +12,10 @@ Este script se ejecuta periódicamente para actualizar con datos nuevos.
 NOTA: Para la carga inicial del CSV histórico, usar nxr_argy_cargar_historico.py
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:21/32"]
+CONSUME = []
+
 import json
 import os
 import re
@@ -12,6 +12,13 @@ Para cada plazo, procesa 3 variables:
 - Tasa de corte (columna AA)
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:25/858", "serie:26/858", "serie:27/858", "serie:28/858", "serie:29/858", "serie:30/858",
+    "serie:31/858", "serie:32/858", "serie:33/858", "serie:34/858", "serie:35/858", "serie:36/858",
+]
+CONSUME = ["historicos/instrumentos_emitidos_bcu_y_gobierno_central.xlsx"]
+
 import os
 import sys
 from pathlib import Path
@@ -22,6 +22,13 @@ Países incluidos:
 5) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:20/484", "serie:20/170", "serie:20/36", "serie:20/554", "serie:20/710", "serie:20/600",
+    "serie:20/604", "serie:20/32",
+]
+CONSUME = []
+
 import os
 import sys
 from datetime import datetime
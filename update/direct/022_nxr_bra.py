@@ -10,6 +10,10 @@ Actualiza la base de datos con la serie de tipo de cambio USD/BRL del Banco Cent
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:20/76"]
+CONSUME = []
+
 from datetime import datetime
 
 import pandas as pd
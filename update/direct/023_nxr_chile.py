@@ -12,6 +12,10 @@ de Chile (BCCH), usando su API oficial (bcchapi).
 5) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:20/152"]
+CONSUME = []
+
 from datetime import datetime
 
 import pandas as pd
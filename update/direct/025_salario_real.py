@@ -9,6 +9,10 @@ Actualiza la base de datos con la serie de Salario Real (índice, sector privado
 4) Actualizar automáticamente la base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:15/858"]
+CONSUME = []
+
 import os
 import sys
 from io import BytesIO
@@ -11,6 +11,10 @@ Actualiza la base de datos con la serie de tipo de cambio EUR/UYU del INE.
 NOTA: El valor es el promedio entre compra (columna E) y venta (columna F).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:6/858"]
+CONSUME = []
+
 import os
 import sys
 from io import BytesIO
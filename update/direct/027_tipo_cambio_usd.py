@@ -10,6 +10,10 @@ Lee update/historicos/dolar_bevsa_uyu.xlsx:
 Ejecutá primero update/run_single.py dolar_bevsa_uyu para actualizar el Excel.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:20/858"]
+CONSUME = ["historicos/dolar_bevsa_uyu.xlsx"]
+
 import os
 
 import pandas as pd
@@ -28,6 +28,14 @@ Estructura del archivo:
 - ... (ver MAPEO_FILAS_VARIABLES para el mapeo completo)
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:53/858", "serie:54/858", "serie:55/858", "serie:56/858", "serie:57/858", "serie:58/858",
+    "serie:59/858", "serie:60/858", "serie:61/858", "serie:62/858", "serie:63/858", "serie:64/858",
+    "serie:65/858", "serie:66/858", "serie:67/858", "serie:68/858",
+]
+CONSUME = ["historicos/web_exp_ciiu_ip.xls"]
+
 import os
 import sys
 from datetime import datetime
@@ -1,5 +1,12 @@
 """Script para insertar datos de curva de pesos NOMINALES en maestro_precios"""
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:42/858", "serie:43/858", "serie:44/858", "serie:45/858", "serie:46/858", "serie:47/858",
+    "serie:48/858", "serie:49/858", "serie:50/858", "serie:51/858",
+]
+CONSUME = ["historicos/curva_pesos_uyu.xlsx"]
+
 import os
 import sys
 from datetime import datetime
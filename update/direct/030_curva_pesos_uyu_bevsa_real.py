@@ -1,5 +1,12 @@
 """Script para insertar datos de curva de pesos REALES en maestro_precios"""
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:75/858", "serie:76/858", "serie:77/858", "serie:78/858", "serie:79/858", "serie:80/858",
+    "serie:81/858", "serie:82/858", "serie:83/858", "serie:84/858",
+]
+CONSUME = ["historicos/curva_pesos_uyu_ui.xlsx"]
+
 import os
 import sys
 from datetime import datetime
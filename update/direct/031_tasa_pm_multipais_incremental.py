@@ -17,6 +17,10 @@ Países incluidos:
   Rusia, Tailandia, Turquía, Zona Euro
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:52/*"]
+CONSUME = []
+
 import os
 import sys
 from datetime import datetime, timedelta
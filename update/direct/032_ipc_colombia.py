@@ -5,6 +5,10 @@ Procesa el Excel de IPC de Colombia del DANE y lo inserta en maestro_precios.
 Lee update/historicos/ipc_colombia.xlsx, transforma a formato tidy e inserta en BD.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:9/170"]
+CONSUME = ["historicos/ipc_colombia.xlsx"]
+
 import os
 import pandas as pd
 from datetime import datetime
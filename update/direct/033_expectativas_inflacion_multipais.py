@@ -19,6 +19,17 @@ Fuentes:
 Requisito: En maestro deben existir los registros (id_variable, id_pais) para cada serie.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = [
+    "serie:23/152", "serie:23/858", "serie:23/170", "serie:23/484", "serie:23/604", "serie:24/152",
+    "serie:24/858", "serie:24/170",
+]
+CONSUME = [
+    "historicos/expectativas_inflacion_uyu_bcu.xls", "historicos/expectativas_inflacion_peru.xlsx",
+    "historicos/expectativas_inflacion_mexico.xlsx",
+    "historicos/expectativas_eme_analistas_banrep.xlsx",
+]
+
 import os
 import sys
 from pathlib import Path
@@ -5,6 +5,10 @@ Lee update/historicos/tpm_uyu.xlsx (col A fecha, col B TPM) y carga en maestro_p
 El Excel lo genera update/download/tpm_uyu.py (Tasa 1 Día BCU).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:52/858"]
+CONSUME = ["historicos/tpm_uyu.xlsx"]
+
 import sys
 from pathlib import Path
 
@@ -12,6 +12,10 @@ desde update/historicos/embi.xlsx a maestro_precios.
 Requisito: En maestro deben existir (id_variable=22, id_pais) para cada pais a cargar.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["serie:22/*"]
+CONSUME = ["historicos/embi.xlsx"]
+
 import sys
 from pathlib import Path
 
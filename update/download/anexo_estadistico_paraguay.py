@@ -7,6 +7,10 @@ el archivo desde el enlace con class="btn-alternative btn-base" y download.
 El nombre del Excel cambia cada mes (ej: Anexo_Estadístico_del_Informe_Económico_05_02_2026.xlsx).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/anexo_estadistico_paraguay.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
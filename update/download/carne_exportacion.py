@@ -6,6 +6,10 @@ y guardarlo dentro de la carpeta `data_raw/` con el nombre estándar `serie_sema
 según el flujo definido en 0_README.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["data_raw/serie_semanal_ingreso_medio_exportacion_inac.xlsx"]
+CONSUME = []
+
 import os
 import time
 
@@ -215,5 +219,9 @@ def descargar_excel_inac():
         driver.quit()
 
 
-if __name__ == "__main__":
+def main():
     descargar_excel_inac()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ Archivo: CMO-Historical-Data-Monthly.xlsx
 Se guarda como: commodities_banco_mundial.xlsx en update/historicos
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/commodities_banco_mundial.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
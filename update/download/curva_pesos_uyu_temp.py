@@ -5,6 +5,10 @@ Extrae la tabla histórica de ITLUP (nominales) desde BEVSA y la guarda como Exc
 La tabla contiene la curva de pesos uruguayos nominales con diferentes plazos (1 mes a 10 años).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/curva_pesos_uyu.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -5,6 +5,10 @@ Extrae la tabla histórica de CUI desde BEVSA y actualiza curva_pesos_uyu_ui.xls
 Solo actualiza el Excel, no inserta en base de datos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/curva_pesos_uyu_ui.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -6,6 +6,10 @@ Descarga el Excel del dólar BEVSA desde el botón "Exportar" en HistoricoDiario
 dolar_bevsa_uyu.xlsx (base histórica).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/dolar_bevsa_uyu.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
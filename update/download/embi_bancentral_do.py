@@ -10,6 +10,10 @@ Enlace: CDN Serie_Historica_Spread_del_EMBI.xlsx
 Se guarda como: embi.xlsx en update/historicos
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/embi.xlsx"]
+CONSUME = []
+
 import os
 import sys
 
@@ -5,6 +5,10 @@ Descarga el Excel de Encuesta de Expectativas de Inflación desde el BCU.
 Descarga directamente desde la URL del Excel y lo guarda en update/historicos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/expectativas_inflacion_uyu_bcu.xls"]
+CONSUME = []
+
 import os
 import time
 import requests
@@ -7,6 +7,10 @@ Scrapea la página web para encontrar el enlace de descarga más reciente.
 El nombre del Excel cambia cada mes (ej: EVE_Anexo_Estadístico_enero_2026.xlsx).
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/expectativas_economicas_paraguay.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -11,6 +11,10 @@ Flujo:
 4) Encontrar y descargar "Serie histórica (disponible desde 2001)".
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/expectativas_eme_analistas_banrep.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
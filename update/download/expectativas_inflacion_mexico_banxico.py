@@ -5,6 +5,10 @@ Descarga los datos de Expectativas de Inflación desde Banxico usando su API.
 Convierte los datos JSON a Excel y los guarda en update/historicos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/expectativas_inflacion_mexico.xlsx"]
+CONSUME = []
+
 import os
 import pandas as pd
 import requests
@@ -5,6 +5,10 @@ Descarga los datos de Expectativas de Inflación a 12 meses desde el BCRP usando
 Convierte los datos JSON a Excel y los guarda en update/historicos.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/expectativas_inflacion_peru.xlsx"]
+CONSUME = []
+
 import os
 import pandas as pd
 import requests
@@ -6,6 +6,10 @@ Hace scraping con Selenium: abre la página, localiza el enlace en la tabla
 y hace clic para descargar.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/instrumentos_emitidos_bcu_y_gobierno_central.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -263,5 +267,9 @@ def descargar_excel_bcu():
         driver.quit()
 
 
-if __name__ == "__main__":
+def main():
     descargar_excel_bcu()
+
+
+if __name__ == "__main__":
+    main()
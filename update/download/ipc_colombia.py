@@ -5,6 +5,10 @@ Descarga el Excel de Índices - series de empalme del IPC de Colombia desde el D
 Scrapea la página web para encontrar el enlace de descarga más reciente.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/ipc_colombia.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
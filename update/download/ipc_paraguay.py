@@ -5,6 +5,10 @@ Descarga el Excel de IPC de Paraguay desde el Banco Central del Paraguay (BCP).
 Scrapea la página web para encontrar el enlace de descarga más reciente.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["data_raw/ipc_paraguay.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -6,6 +6,10 @@ y lo guarda en data_raw con el nombre estándar.
 Busca automáticamente la URL más reciente probando diferentes años/meses.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["data_raw/exportacion_leche_polvo_entera.xlsx"]
+CONSUME = []
+
 import os
 import time
 from datetime import datetime
@@ -229,5 +233,9 @@ def descargar_excel_inale():
         driver.quit()
 
 
-if __name__ == "__main__":
+def main():
     descargar_excel_inale()
+
+
+if __name__ == "__main__":
+    main()
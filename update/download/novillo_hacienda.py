@@ -6,6 +6,10 @@ y guardarlo dentro de la carpeta `data_raw/` con el nombre estándar `precios_ha
 según el flujo definido en 0_README.
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["data_raw/precios_hacienda_inac.xlsx"]
+CONSUME = []
+
 import os
 import time
 
@@ -209,6 +213,10 @@ def descargar_excel_inac():
         driver.quit()
 
 
-if __name__ == "__main__":
+def main():
     descargar_excel_inac()
 
+
+if __name__ == "__main__":
+    main()
+
@@ -8,6 +8,10 @@ Hace clic en el botón "Descargar Excel" y guarda el archivo como
 update/historicos/tpm_uyu.xlsx
 """
 
+# Dependencias para el scheduler de update/update_database.py
+PRODUCE = ["historicos/tpm_uyu.xlsx"]
+CONSUME = []
+
 import os
 import sys
 import time
@@ -0,0 +1,232 @@
+"""
+Historial de corridas del pipeline de update/
+=============================================
+Cada corrida de update_database.py, update_tc.py o run_problemas.py guarda en la BD una
+fila en pipeline_corridas y una por script en pipeline_scripts: fase, inicio/fin, duración,
+estado, filas insertadas/actualizadas/borradas y bytes descargados.
+
+- Filas: db/connection.py cuenta lo que escribe cada script y lo vuelca al salir en el
+  archivo de DCP_FILAS_ESCRITAS (ver entorno_script).
+- Bytes: tamaño de los archivos de PRODUCE del script que cambiaron durante la corrida.
+
+Las tablas se crean solas la primera vez (también están en scripts/schema_postgresql.sql).
+Si la BD no responde el pipeline sigue igual: solo se pierde el historial de esa corrida.
+
+El endpoint /api/update/history (routers/008_update) lo muestra como tendencias por
+script y timeline tipo Gantt por corrida.
+
+Reanudar (--resume <run_id> en update_database.py): la corrida sigue bajo el mismo run_id
+y `hechos` trae los scripts que ya terminaron bien, con la huella de sus insumos. `inicio`
+queda el original y `reanudada` guarda el momento de la última reanudación; duracion_s
+suma solo el tiempo corriendo, no el rato entre la cancelación y el --resume.
+"""
+
+import json
+import re
+import socket
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+# Importar db.connection carga el .env del proyecto (DATABASE_URL puede venir solo de ahí)
+from db import connection
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_corridas (
+        run_id TEXT PRIMARY KEY,
+        pipeline TEXT NOT NULL,
+        inicio TIMESTAMP NOT NULL,
+        fin TIMESTAMP,
+        duracion_s NUMERIC(12, 3),
+        estado TEXT NOT NULL,
+        host TEXT,
+        opciones TEXT,
+        reanudada TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_scripts (
+        id SERIAL PRIMARY KEY,
+        run_id TEXT NOT NULL REFERENCES pipeline_corridas(run_id) ON DELETE CASCADE,
+        script TEXT NOT NULL,
+        fase TEXT NOT NULL,
+        inicio TIMESTAMP NOT NULL,
+        fin TIMESTAMP NOT NULL,
+        duracion_s NUMERIC(12, 3) NOT NULL,
+        estado TEXT NOT NULL,
+        codigo_salida INTEGER,
+        mensaje TEXT,
+        filas_insertadas INTEGER,
+        filas_actualizadas INTEGER,
+        filas_borradas INTEGER,
+        bytes_descargados BIGINT,
+        huella TEXT
+    )
+    """,
+    "ALTER TABLE pipeline_scripts ADD COLUMN IF NOT EXISTS huella TEXT",
+    "ALTER TABLE pipeline_corridas ADD COLUMN IF NOT EXISTS reanudada TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_scripts_run_id ON pipeline_scripts(run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_scripts_script_inicio ON pipeline_scripts(script, inicio)",
+    "CREATE INDEX IF NOT EXISTS idx_pipeline_corridas_inicio ON pipeline_corridas(inicio)",
+]
+
+MAX_MENSAJE = 4000
+
+
+def nuevo_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def estado_de_resultado(exitoso: bool, mensaje: str) -> Tuple[str, Optional[int]]:
+    """(estado, código de salida) a partir de la tupla de ejecutar_script."""
+    if exitoso:
+        return 'ok', 0
+    if mensaje.startswith('Timeout'):
+        return 'timeout', None
+    if mensaje.startswith(('Interrumpido', 'Cancelado')):
+        return 'cancelado', None
+    m = re.search(r'terminó con código (-?\d+)', mensaje)
+    if m:
+        return 'error', int(m.group(1))
+    m = re.search(r'terminó por la señal (\d+)', mensaje)
+    if m:
+        return 'error', -int(m.group(1))
+    return 'error', None
+
+
+class Corrida:
+    """Una corrida de un pipeline; registra cada script a medida que termina."""
+
+    def __init__(self, pipeline: str, opciones: Optional[Dict] = None, reanudar: Optional[str] = None):
+        self.pipeline = pipeline
+        self.run_id = reanudar or nuevo_run_id()
+        self.inicio = datetime.now()
+        self.reanudada: Optional[datetime] = None  # al reanudar; desde acá corre el reloj
+        self.segundos_previos = 0.0  # al reanudar: lo que ya había corrido la corrida
+        self.opciones = opciones or {}
+        self.hechos: Dict[str, Optional[str]] = {}  # 'fase/script' -> huella, al reanudar
+        self.activa = connection.is_postgresql()
+        self._dir_filas = Path(tempfile.mkdtemp(prefix=f'dcp_run_{self.run_id}_'))
+        if reanudar:
+            self._reanudar()
+            return
+        if not self.activa:
+            print("[WARN] Sin DATABASE_URL de PostgreSQL: la corrida no se guarda en el historial")
+            return
+        self._ejecutar(
+            "INSERT INTO pipeline_corridas (run_id, pipeline, inicio, estado, host, opciones) "
+            "VALUES (?, ?, ?, 'ejecutando', ?, ?)",
+            (self.run_id, pipeline, self.inicio, socket.gethostname(),
+             json.dumps(opciones or {}, ensure_ascii=False, default=str)),
+            crear_tablas=True,
+        )
+        if self.activa:
+            print(f"[INFO] Historial: corrida {self.run_id}")
+
+    def _reanudar(self) -> None:
+        """Carga la corrida `run_id` para continuarla; ValueError si no se puede."""
+        if not self.activa:
+            raise ValueError("Reanudar una corrida requiere DATABASE_URL (el historial está en la BD)")
+        try:
+            corrida = connection.execute_query_single(
+                "SELECT pipeline, inicio, duracion_s, opciones FROM pipeline_corridas WHERE run_id = ?",
+                (self.run_id,),
+            )
+        except Exception as e:
+            raise ValueError(f"No se pudo leer la corrida {self.run_id}: {e}")
+        if corrida is None:
+            raise ValueError(f"No existe la corrida {self.run_id}")
+        if corrida['pipeline'] != self.pipeline:
+            raise ValueError(f"La corrida {self.run_id} es de {corrida['pipeline']}, no de {self.pipeline}")
+        self.opciones = json.loads(corrida['opciones'] or '{}')
+        # La última ejecución de cada script en la corrida; solo cuentan las exitosas
+        filas = connection.execute_query(
+            "SELECT DISTINCT ON (fase, script) fase, script, estado, huella, fin FROM pipeline_scripts "
+            "WHERE run_id = ? ORDER BY fase, script, inicio DESC",
+            (self.run_id,),
+        )
+        self.hechos = {f"{f['fase']}/{f['script']}": f['huella'] for f in filas if f['estado'] == 'ok'}
+        # Sin duracion_s la corrida murió sin finalizar: corrió hasta su último script
+        if corrida['duracion_s'] is not None:
+            self.segundos_previos = float(corrida['duracion_s'])
+        elif filas:
+            self.segundos_previos = max((max(f['fin'] for f in filas) - corrida['inicio']).total_seconds(), 0.0)
+        self.inicio = corrida['inicio']
+        self.reanudada = datetime.now()
+        self._ejecutar(
+            "UPDATE pipeline_corridas SET estado = 'ejecutando', fin = NULL, reanudada = ? WHERE run_id = ?",
+            (self.reanudada, self.run_id),
+            crear_tablas=True,
+        )
+        print(f"[INFO] Historial: reanudando corrida {self.run_id} ({len(self.hechos)} scripts completados)")
+
+    def _ejecutar(self, query: str, params: tuple, crear_tablas: bool = False) -> None:
+        """execute_update sin romper el pipeline: ante un error se desactiva el historial."""
+        if not self.activa:
+            return
+        try:
+            if crear_tablas:
+                for sentencia in DDL:
+                    ok, error, _ = connection.execute_update(sentencia)
+                    if not ok:
+                        raise RuntimeError(error)
+            ok, error, _ = connection.execute_update(query, params)
+            if not ok:
+                raise RuntimeError(error)
+        except Exception as e:
+            print(f"[WARN] Historial desactivado para esta corrida: {e}")
+            self.activa = False
+
+    def entorno_script(self, nombre_script: str) -> Tuple[Dict[str, str], Path]:
+        """Variables de entorno para el script y el archivo donde deja sus filas escritas."""
+        ruta = self._dir_filas / f"{uuid.uuid4().hex}_{nombre_script}.json"
+        return {'DCP_FILAS_ESCRITAS': str(ruta), 'DCP_RUN_ID': self.run_id}, ruta
+
+    def registrar_script(self, nombre_script: str, fase: str, inicio: datetime, fin: datetime,
+                         exitoso: bool, mensaje: str, ruta_filas: Optional[Path] = None,
+                         bytes_descargados: Optional[int] = None, huella: Optional[str] = None) -> None:
+        filas = {}
+        if ruta_filas is not None:
+            try:
+                filas = json.loads(ruta_filas.read_text(encoding='utf-8'))
+                ruta_filas.unlink()
+            except (OSError, ValueError):
+                filas = {}  # el script no usó db.connection o murió antes de volcar
+        estado, codigo = estado_de_resultado(exitoso, mensaje)
+        self._ejecutar(
+            "INSERT INTO pipeline_scripts (run_id, script, fase, inicio, fin, duracion_s, estado, "
+            "codigo_salida, mensaje, filas_insertadas, filas_actualizadas, filas_borradas, bytes_descargados, "
+            "huella) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.run_id, nombre_script, fase, inicio, fin, round((fin - inicio).total_seconds(), 3),
+             estado, codigo, None if exitoso else mensaje[:MAX_MENSAJE],
+             filas.get('insertadas'), filas.get('actualizadas'), filas.get('borradas'),
+             bytes_descargados, huella),
+        )
+
+    def finalizar(self, resultados: List[Dict], estado: Optional[str] = None) -> None:
+        """
+        Cierra la corrida. `resultados`: dicts con 'exitosos'/'fallidos' como los de
+        ejecutar_fase_*; sin `estado` explícito queda 'ok' o 'con_errores'.
+        """
+        if estado is None:
+            hay_fallidos = any(r.get('fallidos') for r in resultados)
+            estado = 'con_errores' if hay_fallidos else 'ok'
+        fin = datetime.now()
+        duracion = self.segundos_previos + (fin - (self.reanudada or self.inicio)).total_seconds()
+        self._ejecutar(
+            "UPDATE pipeline_corridas SET fin = ?, duracion_s = ?, estado = ? WHERE run_id = ?",
+            (fin, round(duracion, 3), estado, self.run_id),
+        )
+        try:
+            for archivo in self._dir_filas.iterdir():
+                archivo.unlink()
+            self._dir_filas.rmdir()
+        except OSError:
+            pass
@@ -0,0 +1,299 @@
+"""
+Runner en proceso para los scripts de update/
+=============================================
+ejecutar_script (update_database.py) lanza un intérprete nuevo por script, que vuelve a
+importar pandas, numpy, SQLAlchemy, psycopg2 y Selenium antes de hacer nada útil.
+
+Acá los scripts que exponen main() corren en un hijo forkeado de un fork server
+(multiprocessing 'forkserver') que ya tiene esas librerías importadas. Cada script sigue
+en su propio proceso, así que se mantiene lo que daba el subprocess:
+  - timeout: el hijo y todo lo que lanzó (chromedriver, Chrome) se matan por grupo
+  - log: stdout/stderr del hijo (incluido lo que escriben librerías en C) van a un archivo
+  - aislamiento: un segfault, sys.exit() o estado global roto no afecta al que llama
+
+Las conexiones a la BD no se comparten: cada script abre las suyas como antes (no se
+pueden heredar conexiones abiertas a través de un fork).
+
+Solo disponible donde existe 'forkserver' (Linux/macOS); en Windows usar subprocess.
+
+Uso:
+    from update.inproceso import disponible, tiene_main, ejecutar_en_proceso
+    if disponible() and tiene_main(ruta):
+        exitoso, mensaje, tiempo, output = ejecutar_en_proceso(ruta, timeout=3600)
+"""
+
+import ast
+import importlib.util
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Lo que el fork server importa una sola vez; lo que no esté instalado se ignora
+PRECARGA = [
+    'numpy',
+    'pandas',
+    'openpyxl',
+    'requests',
+    'sqlalchemy',
+    'psycopg2',
+    'selenium.webdriver',
+]
+MAX_RESPUESTAS = 30  # igual que ejecutar_script: respuestas automáticas a confirmaciones
+
+_contexto = None
+_lock = threading.Lock()
+_en_curso: Set[int] = set()  # pids de los hijos corriendo (cada uno líder de su grupo)
+
+
+def disponible() -> bool:
+    return 'forkserver' in multiprocessing.get_all_start_methods()
+
+
+def _get_contexto():
+    """Contexto forkserver con PRECARGA; el server arranca con el primer proceso."""
+    global _contexto
+    with _lock:
+        if _contexto is None:
+            _contexto = multiprocessing.get_context('forkserver')
+            _contexto.set_forkserver_preload(PRECARGA)
+    return _contexto
+
+
+@contextmanager
+def _sin_main_del_padre():
+    """
+    multiprocessing vuelve a ejecutar el __main__ del padre (update_database.py) en el
+    fork server y en cada hijo. Acá no hace falta: el hijo solo necesita este
+    módulo, así que al arrancar se muestra un __main__ vacío.
+    """
+    with _lock:
+        principal = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = principal
+
+
+def _iniciar(proceso) -> None:
+    with _sin_main_del_padre():
+        proceso.start()
+
+
+def calentar() -> None:
+    """
+    Arranca el fork server ya (importa PRECARGA) para que el primer script no pague
+    ese costo. Opcional: sin esto arranca con el primer ejecutar_en_proceso.
+    """
+    if not disponible():
+        return
+    proceso = _get_contexto().Process(target=_nada)
+    _iniciar(proceso)
+    proceso.join()
+
+
+def _nada() -> None:
+    pass
+
+
+def tiene_main(ruta_script: Path) -> bool:
+    """True si el script define `def main()` a nivel de módulo (sin importarlo)."""
+    try:
+        arbol = ast.parse(Path(ruta_script).read_text(encoding='utf-8'))
+    except (OSError, SyntaxError):
+        return False
+    return any(isinstance(n, ast.FunctionDef) and n.name == 'main' for n in arbol.body)
+
+
+class _RespuestasAutomaticas:
+    """stdin del hijo: contesta "sí" a los input() de confirmación, como el modo automático."""
+
+    def __init__(self):
+        self.respuestas = 0
+
+    def readline(self, *args) -> str:
+        if self.respuestas >= MAX_RESPUESTAS:
+            return ''
+        self.respuestas += 1
+        print('sí')
+        return 'sí\n'
+
+    def isatty(self) -> bool:
+        return False
+
+    def fileno(self) -> int:
+        raise OSError('stdin automático sin descriptor')
+
+
+def _correr_en_hijo(ruta_script: str, ruta_log: str, entorno: Optional[Dict[str, str]] = None) -> None:
+    """Punto de entrada del hijo: redirige la salida, carga el script y llama a main()."""
+    # Grupo de procesos propio para poder matar también a chromedriver/Chrome en el timeout
+    os.setsid()
+
+    fd_log = os.open(ruta_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    os.dup2(fd_log, 1)
+    os.dup2(fd_log, 2)
+    os.close(fd_log)
+    sys.stdout.reconfigure(line_buffering=True, encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(line_buffering=True, encoding='utf-8', errors='replace')
+    sys.stdin = _RespuestasAutomaticas()
+    if entorno:
+        os.environ.update(entorno)
+
+    # Mismo entorno que `python <script>` con cwd=PROJECT_ROOT
+    ruta = Path(ruta_script)
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, str(ruta.parent))
+    sys.argv = [str(ruta)]
+
+    codigo = 0
+    try:
+        spec = importlib.util.spec_from_file_location(f"_update_{ruta.stem}", ruta)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        modulo.main()
+    except SystemExit as e:
+        if e.code is None:
+            codigo = 0
+        elif isinstance(e.code, int):
+            codigo = e.code
+        else:
+            print(e.code)
+            codigo = 1
+    except BaseException:
+        traceback.print_exc()
+        codigo = 1
+    finally:
+        # os._exit no corre atexit: las filas escritas para el historial se vuelcan acá
+        conexion = sys.modules.get('db.connection')
+        if conexion is not None and hasattr(conexion, 'volcar_filas_escritas'):
+            conexion.volcar_filas_escritas()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    # Sin atexit ni limpieza del intérprete: el hijo es descartable
+    os._exit(codigo)
+
+
+def _matar_grupo(pid: int) -> None:
+    for senal in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(pid, senal)
+        except (ProcessLookupError, PermissionError):
+            return
+        time.sleep(2)
+
+
+def hijos_en_curso() -> List[int]:
+    """Pids de los hijos que están corriendo; como hacen setsid, sirven para os.killpg."""
+    return list(_en_curso)
+
+
+def _mensaje_error(output: str, returncode: int) -> str:
+    """Mismo resumen de error que ejecutar_script: líneas relevantes o las últimas 10."""
+    if returncode < 0:
+        mensaje = f"Error: El script terminó por la señal {-returncode}"
+    else:
+        mensaje = f"Error: El script terminó con código {returncode}"
+    lineas = output.strip().split('\n')
+    relevantes = []
+    for i, linea in enumerate(lineas):
+        if any(k in linea.lower() for k in ['error', 'exception', 'traceback', 'failed', 'fallo']):
+            relevantes.extend(lineas[max(0, i - 2):min(len(lineas), i + 5)])
+    if relevantes:
+        mensaje += "\n" + "\n".join(relevantes[-20:])
+    elif len(lineas) > 10:
+        mensaje += "\n" + "\n".join(lineas[-10:])
+    return mensaje
+
+
+def ejecutar_en_proceso(ruta_script: Path, timeout: float = 3600, ruta_log: Optional[Path] = None,
+                        al_imprimir: Optional[Callable[[str], None]] = None,
+                        cancelado: Optional[Callable[[], bool]] = None,
+                        entorno: Optional[Dict[str, str]] = None) -> Tuple[bool, str, float, str]:
+    """
+    Corre main() de `ruta_script` en un hijo del fork server.
+
+    Args:
+        ruta_script: Script con def main()
+        timeout: Segundos máximos; al vencer se mata el grupo de procesos del hijo
+        ruta_log: Archivo donde se agrega la salida (default: temporal, se borra al final)
+        al_imprimir: Callback por cada línea nueva de salida (progreso en vivo)
+        cancelado: Callback consultado cada 0.5s; si devuelve True se mata el hijo
+        entorno: Variables de entorno extra para el hijo (ej. DCP_FILAS_ESCRITAS)
+
+    Returns:
+        Tuple (exitoso, mensaje, tiempo_ejecucion, output_completo), como ejecutar_script
+    """
+    inicio = time.time()
+    temporal = ruta_log is None
+    if temporal:
+        fd, nombre = tempfile.mkstemp(prefix='update_', suffix='.log')
+        os.close(fd)
+        ruta_log = Path(nombre)
+    offset = ruta_log.stat().st_size if ruta_log.exists() else 0
+
+    proceso = _get_contexto().Process(
+        target=_correr_en_hijo, args=(str(ruta_script), str(ruta_log), entorno), daemon=False
+    )
+
+    motivo = None
+    partes = []
+    pendiente = ''
+    try:
+        _iniciar(proceso)
+        _en_curso.add(proceso.pid)
+        with open(ruta_log, 'r', encoding='utf-8', errors='replace') as f:
+            f.seek(offset)
+            while True:
+                proceso.join(0.5)
+                nuevo = f.read()
+                if nuevo:
+                    partes.append(nuevo)
+                    if al_imprimir:
+                        pendiente += nuevo
+                        *lineas, pendiente = pendiente.split('\n')
+                        for linea in lineas:
+                            al_imprimir(linea + '\n')
+                if proceso.exitcode is not None:
+                    break
+                if time.time() - inicio > timeout:
+                    motivo = f"Timeout: El script tardó más de {timeout:.0f}s"
+                elif cancelado and cancelado():
+                    motivo = "Cancelado por el usuario"
+                if motivo:
+                    _matar_grupo(proceso.pid)
+                    proceso.join(5)
+                    partes.append(f.read())
+                    break
+            if al_imprimir and pendiente:
+                al_imprimir(pendiente)
+    except KeyboardInterrupt:
+        if proceso.pid:
+            _matar_grupo(proceso.pid)
+        motivo = "Interrumpido por el usuario"
+    finally:
+        _en_curso.discard(proceso.pid)
+        if temporal:
+            try:
+                ruta_log.unlink()
+            except OSError:
+                pass
+
+    tiempo = time.time() - inicio
+    output = ''.join(partes)
+    if motivo:
+        return False, motivo, tiempo, output
+    if proceso.exitcode == 0:
+        return True, "Ejecutado exitosamente", tiempo, output
+    return False, _mensaje_error(output, proceso.exitcode), tiempo, output
@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import datetime
 
 from update.update_database import ejecutar_script, PROJECT_ROOT
+from update.historial import Corrida
 
 # Reporte en la raíz del proyecto
 REPORTE_FILE = PROJECT_ROOT / "update_problemas_report.txt"
@@ -68,6 +69,7 @@ def main():
 
     resultados = []
     inicio_total = time.time()
+    corrida = Corrida('run_problemas')
 
     for i, (ruta, fase, nombre) in enumerate(scripts_a_ejecutar, 1):
         print(f"[{i}/{len(scripts_a_ejecutar)}] [{fase}] {nombre}")
@@ -87,7 +89,8 @@ def main():
             print()
             continue
 
-        exitoso, mensaje, tiempo, output = ejecutar_script(ruta, modo_automatico=True)
+        exitoso, mensaje, tiempo, output = ejecutar_script(ruta, modo_automatico=True,
+                                                           corrida=corrida, fase=fase)
 
         resultado = {
             "fase": fase,
@@ -107,6 +110,7 @@ def main():
         print()
 
     tiempo_total = time.time() - inicio_total
+    corrida.finalizar([], estado='ok' if all(r['exitoso'] for r in resultados) else 'con_errores')
 
     # Escribir reporte .txt
     lineas = []
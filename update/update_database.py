@@ -5,27 +5,101 @@ Ejecuta automáticamente todos los scripts de actualización en el orden correct
 1. FASE 1: Descargar Excels (update/download/)
 2. FASE 2: Actualizar BD (update/direct/ y update/calculate/)
 
+Por defecto las fases se ejecutan como un DAG: cada script declara PRODUCE / CONSUME
+(archivos y series) y arranca apenas terminan los scripts que producen sus insumos.
+  python update/update_database.py --workers 4
+  python update/update_database.py --downstream-of dolar_bevsa_uyu
+  python update/update_database.py --only 002_uyu_nxr_sintetico
+  python update/update_database.py --por-fases   # orden fijo anterior
+  python update/update_database.py --inproceso    # scripts con main() en un fork server
+  python update/update_database.py --resume 20260301_030000_a1b2c3  # continuar una corrida
+
 Genera un reporte en update_database.txt con errores y resumen.
 Diseñado para ejecutarse automáticamente (cron/task scheduler/Azure/GitHub Actions).
 """
 
+import argparse
+import ast
+import hashlib
+import signal
 import subprocess
 import sys
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+import threading
 import time
 from datetime import datetime
-from typing import List, Tuple, Dict
+from functools import lru_cache
+from typing import List, Tuple, Dict, Optional, Set
 import os
 
 # Detectar la raíz del proyecto (directorio padre de update/)
 SCRIPT_DIR = Path(__file__).parent.absolute()
 PROJECT_ROOT = SCRIPT_DIR.parent  # Raíz del proyecto
 
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from update import historial, inproceso
+
 # Configuración
 REPORTE_FILE = PROJECT_ROOT / "update_database.txt"
 TIMEOUT_SCRIPT = 3600  # 1 hora máximo por script
 
+# FASE 1 en paralelo: cantidad de scripts de descarga corriendo a la vez (1 = secuencial)
+DOWNLOAD_WORKERS = int(os.getenv("UPDATE_DOWNLOAD_WORKERS", "4"))
+PROGRESO_CADA = 30  # segundos entre líneas de progreso cuando no termina ningún script
+# Scripts con main() corren en un hijo del fork server de update/inproceso.py en lugar de
+# un intérprete nuevo (sin re-importar pandas & co. por script). --inproceso lo activa.
+MODO_INPROCESO = os.getenv("UPDATE_INPROCESO", "").lower() in ("1", "true", "yes")
+
+# Recursos que usa cada script (descargas, direct y calculate). Un script solo arranca
+# cuando todos sus recursos tienen lugar; cada recurso admite 1 script a la vez salvo
+# LIMITES_RECURSOS.
+#   sitio:<host>   -> no abrir dos navegadores contra el mismo sitio
+#   carpeta:<dir>  -> el script detecta su Excel comparando la carpeta antes/después de
+#                     la descarga, así que dos a la vez en la misma carpeta se pisan
+#   navegador      -> Chrome abiertos a la vez en toda la corrida; se agrega solo a los
+#                     scripts que importan selenium (_usa_navegador), de cualquier fase
+RECURSOS_SCRIPTS: Dict[str, List[str]] = {
+    'anexo_estadistico_paraguay.py': ['sitio:bcp.gov.py', 'carpeta:historicos'],
+    'expectativas_economicas_paraguay.py': ['sitio:bcp.gov.py', 'carpeta:historicos'],
+    'ipc_paraguay.py': ['sitio:bcp.gov.py', 'carpeta:data_raw'],
+    'carne_exportacion.py': ['sitio:inac.uy', 'carpeta:data_raw'],
+    'novillo_hacienda.py': ['sitio:inac.uy', 'carpeta:data_raw'],
+    'leche_polvo_entera.py': ['sitio:inale.org', 'carpeta:data_raw'],
+    'precio_leche_productor.py': ['sitio:inale.org', 'carpeta:data_raw'],
+    'commodities_banco_mundial.py': ['sitio:worldbank.org', 'carpeta:historicos'],
+    'curva_pesos_uyu_temp.py': ['sitio:bevsa.com.uy'],
+    'curva_pesos_uyu_ui_temp.py': ['sitio:bevsa.com.uy'],
+    'dolar_bevsa_uyu.py': ['sitio:bevsa.com.uy', 'carpeta:historicos'],
+    'encuesta_expectativas_inflacion_bcu.py': ['sitio:bcu.gub.uy', 'carpeta:historicos'],
+    'instrumentos_emitidos_bcu_y_gobierno_central.py': ['sitio:bcu.gub.uy', 'carpeta:historicos'],
+    'tpm_uyu.py': ['sitio:bcu.gub.uy', 'carpeta:historicos'],
+    'expectativas_eme_analistas_banrep.py': ['sitio:banrep.gov.co', 'carpeta:historicos'],
+    'ipc_colombia.py': ['sitio:dane.gov.co'],
+    'embi_bancentral_do.py': ['sitio:bancentral.gov.do'],
+    'expectativas_inflacion_mexico_banxico.py': ['sitio:banxico.org.mx'],
+    'expectativas_inflacion_peru_bcrp.py': ['sitio:bcrp.gob.pe'],
+    '019_nxr_argy.py': ['sitio:rava.com'],
+}
+# Descargas nuevas que todavía no están en RECURSOS_SCRIPTS: se asume lo peor
+RECURSOS_POR_DEFECTO = ['carpeta:historicos', 'carpeta:data_raw']
+# Con --workers alto los direct/calculate corren en paralelo; Chrome sigue acotado aparte
+MAX_NAVEGADORES = int(os.getenv("UPDATE_MAX_NAVEGADORES", str(DOWNLOAD_WORKERS)))
+LIMITES_RECURSOS: Dict[str, int] = {'navegador': MAX_NAVEGADORES}
+
+# SIGTERM (/api/update/cancel) o Ctrl-C: _al_cancelar guarda la señal y mata los scripts
+# en curso; ejecutar_todas_actualizaciones marca la corrida 'cancelado' (ver _cerrar_cancelada)
+_senal_cancelacion: Optional[int] = None
+# Pids de los scripts lanzados con subprocess; cada uno corre en su propia sesión (grupo de
+# procesos) para poder matar también lo que lanzó (chromedriver, Chrome)
+_procesos: Set[int] = set()
+
+
+class _Cancelacion(BaseException):
+    """La lanza _al_cancelar en el hilo principal para cortar la corrida."""
+
 
 def descubrir_scripts_download() -> Dict[str, List[Path]]:
     """
@@ -86,141 +160,217 @@ def descubrir_scripts_update() -> Dict[str, List[Path]]:
     return scripts
 
 
-def ejecutar_script(ruta_script: Path, modo_automatico: bool = True) -> Tuple[bool, str, float, str]:
+def ejecutar_script(ruta_script: Path, modo_automatico: bool = True,
+                    corrida: Optional[historial.Corrida] = None,
+                    fase: Optional[str] = None) -> Tuple[bool, str, float, str]:
     """
-    Ejecuta un script usando subprocess.
+    Ejecuta un script usando subprocess (o en proceso con MODO_INPROCESO).
     En modo automático, responde automáticamente "sí" a todas las confirmaciones.
     
     Args:
         ruta_script: Path al script a ejecutar
         modo_automatico: Si True, responde automáticamente a confirmaciones
+        corrida: Si se pasa, el resultado queda en el historial (update/historial.py)
+        fase: Fase para el historial (default: carpeta del script, ej. 'download')
         
     Returns:
         Tuple (exitoso, mensaje, tiempo_ejecucion, output_completo)
     """
+    if corrida is None or _senal_cancelacion is not None:
+        # Tras cancelar no se lanza nada más ni se registra: la corrida ya se está cerrando
+        return _ejecutar_script(ruta_script, modo_automatico)
+    
+    entorno, ruta_filas = corrida.entorno_script(ruta_script.name)
+    archivos = _archivos_producidos(ruta_script)
+    huella = huella_insumos(ruta_script)
+    inicio = datetime.now()
+    resultado = _ejecutar_script(ruta_script, modo_automatico, entorno)
+    fin = datetime.now()
+    if _senal_cancelacion is not None and not resultado[0]:
+        # Lo mató _al_cancelar: queda 'cancelado' (no 'error') y se repite al reanudar
+        resultado = (False, "Cancelado por el usuario") + tuple(resultado[2:])
+    corrida.registrar_script(
+        ruta_script.name, fase or ruta_script.parent.name, inicio, fin,
+        resultado[0], resultado[1], ruta_filas, _bytes_escritos(archivos, inicio), huella,
+    )
+    return resultado
+
+
+def _ruta_archivo(item: str) -> Path:
+    """Archivo de PRODUCE/CONSUME ('historicos/…' en update/, 'data_raw/…' en la raíz)."""
+    base = SCRIPT_DIR if (SCRIPT_DIR / item.split('/')[0]).is_dir() else PROJECT_ROOT
+    return base / item
+
+
+def _archivos_producidos(ruta_script: Path) -> List[Path]:
+    decl = leer_dependencias(ruta_script)
+    return [_ruta_archivo(item) for item in (decl[0] if decl else []) if not item.startswith('serie:')]
+
+
+def huella_insumos(ruta_script: Path) -> str:
+    """
+    Huella de lo que usa el script: su código y los archivos de CONSUME (tamaño y fecha
+    de modificación). Las series no entran: si cambian es porque volvió a correr su
+    productor, y eso ya lo resuelve el DAG (scripts_a_saltear).
+    """
+    huella = hashlib.sha1(ruta_script.read_bytes())
+    decl = leer_dependencias(ruta_script)
+    for item in sorted(decl[1] if decl else []):
+        if item.startswith('serie:'):
+            continue
+        try:
+            info = _ruta_archivo(item).stat()
+            huella.update(f"{item}:{info.st_size}:{info.st_mtime_ns}".encode())
+        except OSError:
+            huella.update(f"{item}:-".encode())
+    return huella.hexdigest()[:16]
+
+
+def _bytes_escritos(archivos: List[Path], desde: datetime) -> Optional[int]:
+    """Bytes de los `archivos` modificados desde `desde`; None si el script no produce archivos."""
+    if not archivos:
+        return None
+    total = 0
+    for archivo in archivos:
+        try:
+            info = archivo.stat()
+        except OSError:
+            continue
+        if info.st_mtime >= desde.timestamp() - 1:
+            total += info.st_size
+    return total
+
+
+def _ejecutar_script(ruta_script: Path, modo_automatico: bool = True,
+                     entorno: Optional[Dict[str, str]] = None) -> Tuple[bool, str, float, str]:
+    """ejecutar_script sin historial; `entorno` son variables extra para el script."""
+    if _senal_cancelacion is not None:
+        return False, "Cancelado por el usuario", 0.0, ''
+    if MODO_INPROCESO and modo_automatico and inproceso.disponible() and inproceso.tiene_main(ruta_script):
+        return inproceso.ejecutar_en_proceso(ruta_script, timeout=TIMEOUT_SCRIPT, entorno=entorno,
+                                             cancelado=lambda: _senal_cancelacion is not None)
+    
     inicio = time.time()
     nombre_script = ruta_script.name
     output_completo = []
     
     try:
-        # Cambiar al directorio del proyecto para que los scripts funcionen correctamente
-        cwd_original = os.getcwd()
-        os.chdir(PROJECT_ROOT)
+        # Ejecutar el script como subprocess con cwd=PROJECT_ROOT (sin os.chdir: la fase
+        # de descargas llama a esta función desde varios hilos a la vez)
+        proceso = subprocess.Popen(
+            [sys.executable, str(ruta_script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,  # Combinar stderr con stdout
+            text=True,
+            bufsize=1,
+            universal_newlines=True,
+            cwd=PROJECT_ROOT,
+            env={**os.environ, **entorno} if entorno else None,
+            start_new_session=True
+        )
+        _procesos.add(proceso.pid)
+        if _senal_cancelacion is not None:
+            _terminar_hijos()  # la señal llegó mientras arrancaba
         
-        try:
-            # Ejecutar el script como subprocess
-            proceso = subprocess.Popen(
-                [sys.executable, str(ruta_script)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # Combinar stderr con stdout
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=PROJECT_ROOT
-            )
-            
-            # Leer output línea por línea
-            import threading
-            import queue
-            
-            output_queue = queue.Queue()
-            
-            def leer_output():
-                """Lee stdout/stderr y lo pone en la cola"""
-                try:
-                    for linea in proceso.stdout:
-                        output_queue.put(linea)
-                        output_completo.append(linea)
-                except:
-                    pass
-            
-            thread_output = threading.Thread(target=leer_output, daemon=True)
-            thread_output.start()
-            
-            # Procesar output y responder a confirmaciones si está en modo automático
-            prompts_confirmacion = [
-                "¿confirmás que los datos son correctos",
-                "¿confirmás que querés cambiar a selenium",
-                "¿confirmás la inserción",
-                "¿desea",
-                "¿está seguro",
-                "(sí/no):",
-                "(yes/no):",
-                "confirmar",
-                "¿confirmas"
-            ]
-            
-            respuestas_enviadas = 0
-            max_respuestas = 30
-            
-            while proceso.poll() is None or not output_queue.empty():
-                try:
-                    linea = output_queue.get(timeout=0.1)
-                    
-                    # Si detectamos un prompt de confirmación y estamos en modo automático
-                    if modo_automatico:
-                        linea_lower = linea.lower()
-                        if any(prompt in linea_lower for prompt in prompts_confirmacion):
-                            if respuestas_enviadas < max_respuestas:
-                                try:
-                                    proceso.stdin.write("sí\n")
-                                    proceso.stdin.flush()
-                                    respuestas_enviadas += 1
-                                except:
-                                    pass
-                except queue.Empty:
-                    continue
-                except:
-                    break
-            
-            # Cerrar stdin
+        # Leer output línea por línea
+        import threading
+        import queue
+        
+        output_queue = queue.Queue()
+        
+        def leer_output():
+            """Lee stdout/stderr y lo pone en la cola"""
             try:
-                proceso.stdin.close()
+                for linea in proceso.stdout:
+                    output_queue.put(linea)
+                    output_completo.append(linea)
             except:
                 pass
-            
-            # Esperar a que termine
+        
+        thread_output = threading.Thread(target=leer_output, daemon=True)
+        thread_output.start()
+        
+        # Procesar output y responder a confirmaciones si está en modo automático
+        prompts_confirmacion = [
+            "¿confirmás que los datos son correctos",
+            "¿confirmás que querés cambiar a selenium",
+            "¿confirmás la inserción",
+            "¿desea",
+            "¿está seguro",
+            "(sí/no):",
+            "(yes/no):",
+            "confirmar",
+            "¿confirmas"
+        ]
+        
+        respuestas_enviadas = 0
+        max_respuestas = 30
+        
+        while proceso.poll() is None or not output_queue.empty():
             try:
-                proceso.wait(timeout=TIMEOUT_SCRIPT)
-            except subprocess.TimeoutExpired:
-                proceso.kill()
-                tiempo = time.time() - inicio
-                return False, f"Timeout: El script tardó más de {TIMEOUT_SCRIPT}s", tiempo, ''.join(output_completo)
-            
-            # Esperar a que termine el hilo
-            thread_output.join(timeout=2)
-            
+                linea = output_queue.get(timeout=0.1)
+                
+                # Si detectamos un prompt de confirmación y estamos en modo automático
+                if modo_automatico:
+                    linea_lower = linea.lower()
+                    if any(prompt in linea_lower for prompt in prompts_confirmacion):
+                        if respuestas_enviadas < max_respuestas:
+                            try:
+                                proceso.stdin.write("sí\n")
+                                proceso.stdin.flush()
+                                respuestas_enviadas += 1
+                            except:
+                                pass
+            except queue.Empty:
+                continue
+            except:
+                break
+        
+        # Cerrar stdin
+        try:
+            proceso.stdin.close()
+        except:
+            pass
+        
+        # Esperar a que termine
+        try:
+            proceso.wait(timeout=TIMEOUT_SCRIPT)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
             tiempo = time.time() - inicio
-            output_text = ''.join(output_completo)
+            return False, f"Timeout: El script tardó más de {TIMEOUT_SCRIPT}s", tiempo, ''.join(output_completo)
+        
+        # Esperar a que termine el hilo
+        thread_output.join(timeout=2)
+        
+        tiempo = time.time() - inicio
+        output_text = ''.join(output_completo)
+        
+        # Verificar código de salida
+        if proceso.returncode == 0:
+            return True, "Ejecutado exitosamente", tiempo, output_text
+        else:
+            # Extraer mensaje de error relevante
+            error_lines = output_text.strip().split('\n')
+            error_msg = f"Error: El script terminó con código {proceso.returncode}"
             
-            # Verificar código de salida
-            if proceso.returncode == 0:
-                return True, "Ejecutado exitosamente", tiempo, output_text
-            else:
-                # Extraer mensaje de error relevante
-                error_lines = output_text.strip().split('\n')
-                error_msg = f"Error: El script terminó con código {proceso.returncode}"
-                
-                # Buscar líneas de error relevantes
-                error_relevant = []
-                for i, line in enumerate(error_lines):
-                    if any(keyword in line.lower() for keyword in ['error', 'exception', 'traceback', 'failed', 'fallo']):
-                        # Incluir contexto (líneas antes y después)
-                        start = max(0, i - 2)
-                        end = min(len(error_lines), i + 5)
-                        error_relevant.extend(error_lines[start:end])
-                
-                if error_relevant:
-                    error_msg += "\n" + "\n".join(error_relevant[-20:])  # Últimas 20 líneas relevantes
-                elif len(error_lines) > 10:
-                    error_msg += "\n" + "\n".join(error_lines[-10:])  # Últimas 10 líneas
-                
-                return False, error_msg, tiempo, output_text
-        finally:
-            # Restaurar directorio original
-            os.chdir(cwd_original)
+            # Buscar líneas de error relevantes
+            error_relevant = []
+            for i, line in enumerate(error_lines):
+                if any(keyword in line.lower() for keyword in ['error', 'exception', 'traceback', 'failed', 'fallo']):
+                    # Incluir contexto (líneas antes y después)
+                    start = max(0, i - 2)
+                    end = min(len(error_lines), i + 5)
+                    error_relevant.extend(error_lines[start:end])
+            
+            if error_relevant:
+                error_msg += "\n" + "\n".join(error_relevant[-20:])  # Últimas 20 líneas relevantes
+            elif len(error_lines) > 10:
+                error_msg += "\n" + "\n".join(error_lines[-10:])  # Últimas 10 líneas
             
+            return False, error_msg, tiempo, output_text
+        
     except KeyboardInterrupt:
         if 'proceso' in locals():
             proceso.kill()
@@ -231,6 +381,9 @@ def ejecutar_script(ruta_script: Path, modo_automatico: bool = True) -> Tuple[bo
         error_msg = f"Error al ejecutar script: {str(e)}"
         error_traceback = traceback.format_exc()
         return False, f"{error_msg}\n{error_traceback}", tiempo, ''.join(output_completo)
+    finally:
+        if 'proceso' in locals():
+            _procesos.discard(proceso.pid)
 
 
 def generar_reporte(resultados_fase1: Dict, resultados_fase2: Dict, tiempo_total: float) -> str:
@@ -358,13 +511,204 @@ def generar_reporte(resultados_fase1: Dict, resultados_fase2: Dict, tiempo_total
     return "\n".join(reporte)
 
 
-def ejecutar_fase_descargas() -> Dict:
+def _formatear_duracion(segundos: float) -> str:
+    segundos = int(segundos)
+    if segundos < 60:
+        return f"{segundos}s"
+    return f"{segundos // 60}m{segundos % 60:02d}s"
+
+
+def _imprimir_progreso(total: int, resultados: Dict, corriendo: Dict[str, float],
+                       en_espera: int, inicio: float) -> None:
+    """Una línea con el estado agregado de la fase de descargas."""
+    ok = len(resultados['exitosos'])
+    err = len(resultados['fallidos'])
+    ahora = time.time()
+    activos = ", ".join(
+        f"{nombre} ({_formatear_duracion(ahora - desde)})"
+        for nombre, desde in sorted(corriendo.items(), key=lambda x: x[1])
+    ) or "-"
+    print(f"[PROGRESO] {ok + err}/{total} listos ({ok} OK, {err} ERROR) | "
+          f"corriendo: {activos} | en espera: {en_espera} | {_formatear_duracion(ahora - inicio)}",
+          flush=True)
+
+
+def _clave(categoria: str, script_path: Path) -> str:
+    return f"{categoria}/{script_path.name}"
+
+
+@lru_cache(maxsize=None)
+def _usa_navegador(script_path: Path) -> bool:
+    """True si el script importa selenium en algún lado (también dentro de una función)."""
+    try:
+        arbol = ast.parse(script_path.read_text(encoding='utf-8'))
+    except (OSError, SyntaxError):
+        return False
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import) and any(a.name.split('.')[0] == 'selenium' for a in nodo.names):
+            return True
+        if isinstance(nodo, ast.ImportFrom) and (nodo.module or '').split('.')[0] == 'selenium':
+            return True
+    return False
+
+
+def _recursos_de(categoria: str, script_path: Path) -> List[str]:
+    """Recursos de concurrencia de un script, de cualquier fase (ver RECURSOS_SCRIPTS)."""
+    por_defecto = RECURSOS_POR_DEFECTO if categoria == 'download' else []
+    recursos = list(RECURSOS_SCRIPTS.get(script_path.name, por_defecto))
+    if _usa_navegador(script_path):
+        recursos.append('navegador')
+    return recursos
+
+
+def _resultado_salteado(categoria: str, script_path: Path) -> Dict:
+    print(f"[SALTEADO] {_clave(categoria, script_path)}: ya completado y sin cambios en sus insumos")
+    return {
+        'categoria': categoria,
+        'script': script_path.name,
+        'tiempo': 0.0,
+        'mensaje': "Salteado: ya completado en la corrida que se reanuda"
+    }
+
+
+def ejecutar_en_paralelo(tareas: List[Tuple[str, Path]], workers: int,
+                         dependencias: Dict[str, Set[str]] = None,
+                         corrida: Optional[historial.Corrida] = None,
+                         saltear: Set[str] = None) -> Dict:
+    """
+    Corre los scripts de `tareas` con hasta `workers` a la vez.
+    Un script arranca cuando terminaron todos sus `dependencias` (claves 'categoria/script')
+    y sus recursos (_recursos_de) tienen lugar. Si una dependencia falló el script
+    corre igual (con los insumos de la corrida anterior), como en la ejecución por fases.
+    Los de `saltear` (--resume) cuentan como exitosos sin correr.
+    
+    Returns:
+        Dict con 'exitosos' y 'fallidos' en el orden de `tareas`
+    """
+    workers = max(1, workers)
+    dependencias = dependencias or {}
+    resultados = {
+        'exitosos': [],
+        'fallidos': []
+    }
+    orden = {_clave(c, s): i for i, (c, s) in enumerate(tareas)}
+    
+    pendientes = [(c, s) for c, s in tareas if _clave(c, s) not in (saltear or set())]
+    terminados = set()
+    for categoria, script_path in tareas:
+        if _clave(categoria, script_path) in (saltear or set()):
+            resultados['exitosos'].append(_resultado_salteado(categoria, script_path))
+            terminados.add(_clave(categoria, script_path))
+    fallidos = set()
+    en_uso: Dict[str, int] = {}
+    corriendo: Dict[str, float] = {}  # nombre -> inicio
+    futuros = {}
+    inicio = time.time()
+    
+    def hay_lugar(recursos: List[str]) -> bool:
+        return all(en_uso.get(r, 0) < LIMITES_RECURSOS.get(r, 1) for r in recursos)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pendientes or futuros:
+            # Lanzar, en orden, todo lo que tenga worker, insumos listos y recursos libres
+            for categoria, script_path in list(pendientes):
+                if len(futuros) >= workers:
+                    break
+                clave = _clave(categoria, script_path)
+                previos = dependencias.get(clave, set())
+                recursos = _recursos_de(categoria, script_path)
+                if not previos <= terminados or not hay_lugar(recursos):
+                    continue
+                for r in recursos:
+                    en_uso[r] = en_uso.get(r, 0) + 1
+                pendientes.remove((categoria, script_path))
+                corriendo[script_path.name] = time.time()
+                print(f"[INICIO] {clave}", flush=True)
+                for previo in sorted(previos & fallidos):
+                    print(f"[WARN] {clave}: {previo} falló, corre con sus insumos anteriores")
+                futuro = pool.submit(ejecutar_script, script_path, True, corrida, categoria)
+                futuros[futuro] = (categoria, script_path)
+            
+            if not futuros:
+                # Nada corriendo y nada lanzable: dependencias que nunca se cumplen
+                for categoria, script_path in pendientes:
+                    clave = _clave(categoria, script_path)
+                    faltan = ", ".join(sorted(dependencias.get(clave, set()) - terminados))
+                    resultados['fallidos'].append({
+                        'categoria': categoria,
+                        'script': script_path.name,
+                        'tiempo': 0.0,
+                        'error': f"No se ejecutó: dependencias sin resolver ({faltan})"
+                    })
+                    print(f"[ERROR] {clave}: dependencias sin resolver ({faltan})")
+                break
+            
+            listos, _ = wait(futuros, timeout=PROGRESO_CADA, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                categoria, script_path = futuros.pop(futuro)
+                nombre_script = script_path.name
+                clave = _clave(categoria, script_path)
+                corriendo.pop(nombre_script, None)
+                for r in _recursos_de(categoria, script_path):
+                    en_uso[r] -= 1
+                terminados.add(clave)
+                
+                try:
+                    exitoso, mensaje, tiempo, output = futuro.result()
+                except Exception as e:
+                    exitoso, mensaje, tiempo = False, f"Error al ejecutar script: {e}", 0.0
+                
+                if exitoso:
+                    resultados['exitosos'].append({
+                        'categoria': categoria,
+                        'script': nombre_script,
+                        'tiempo': tiempo,
+                        'mensaje': mensaje
+                    })
+                    print(f"[OK] {nombre_script} - Tiempo: {tiempo:.2f}s")
+                else:
+                    fallidos.add(clave)
+                    resultados['fallidos'].append({
+                        'categoria': categoria,
+                        'script': nombre_script,
+                        'tiempo': tiempo,
+                        'error': mensaje
+                    })
+                    print(f"[ERROR] {nombre_script}")
+                    print(f"  {mensaje[:200]}...")  # Primeros 200 caracteres
+            
+            _imprimir_progreso(len(tareas), resultados, corriendo, len(pendientes), inicio)
+    
+    # El reporte lista los scripts en el orden de descubrimiento, no en el de finalización
+    for clave in resultados:
+        resultados[clave].sort(key=lambda r: orden[f"{r['categoria']}/{r['script']}"])
+    
+    tiempo_reloj = time.time() - inicio
+    suma_scripts = sum(r['tiempo'] for clave in resultados for r in resultados[clave])
+    print()
+    print(f"[INFO] {tiempo_reloj:.2f}s de reloj para {suma_scripts:.2f}s de scripts")
+    print()
+    
+    return resultados
+
+
+def ejecutar_fase_descargas(workers: int = None, corrida: Optional[historial.Corrida] = None,
+                            saltear: Set[str] = None) -> Dict:
     """
     Ejecuta FASE 1: Todos los scripts de descarga.
+    Corre hasta `workers` scripts a la vez respetando los límites de RECURSOS_SCRIPTS
+    (un navegador por sitio, una descarga por carpeta compartida, MAX_NAVEGADORES en total).
+    
+    Args:
+        workers: Scripts simultáneos (default: DOWNLOAD_WORKERS; 1 = secuencial)
+        corrida: Corrida del historial donde registrar cada script
+        saltear: Claves 'download/script' a no correr (--resume)
     
     Returns:
         Dict con 'exitosos' y 'fallidos'
     """
+    workers = max(1, workers or DOWNLOAD_WORKERS)
+    
     print("=" * 80)
     print("FASE 1: DESCARGAR ARCHIVOS EXCEL")
     print("=" * 80)
@@ -384,52 +728,25 @@ def ejecutar_fase_descargas() -> Dict:
         print("[INFO] No se encontraron scripts de descarga.")
         return {'exitosos': [], 'fallidos': []}
     
-    print(f"Scripts de descarga detectados: {len(scripts_a_ejecutar)}")
+    print(f"Scripts de descarga detectados: {len(scripts_a_ejecutar)} (workers: {workers})")
     print("-" * 80)
     for categoria, script in scripts_a_ejecutar:
-        print(f"  - {categoria}/{script.name}")
-    print()
-    
-    # Ejecutar cada script
-    resultados = {
-        'exitosos': [],
-        'fallidos': []
-    }
-    
-    for i, (categoria, script_path) in enumerate(scripts_a_ejecutar, 1):
-        nombre_script = script_path.name
-        print(f"[{i}/{len(scripts_a_ejecutar)}] Ejecutando: {categoria}/{nombre_script}")
-        print("-" * 80)
-        
-        exitoso, mensaje, tiempo, output = ejecutar_script(script_path, modo_automatico=True)
-        
-        if exitoso:
-            resultados['exitosos'].append({
-                'categoria': categoria,
-                'script': nombre_script,
-                'tiempo': tiempo,
-                'mensaje': mensaje
-            })
-            print(f"[OK] {nombre_script} - Tiempo: {tiempo:.2f}s")
+        recursos = _recursos_de(categoria, script)
+        if script.name not in RECURSOS_SCRIPTS:
+            print(f"  - {categoria}/{script.name}  [WARN] sin recursos declarados, usa {recursos}")
         else:
-            resultados['fallidos'].append({
-                'categoria': categoria,
-                'script': nombre_script,
-                'tiempo': tiempo,
-                'error': mensaje
-            })
-            print(f"[ERROR] {nombre_script}")
-            print(f"  {mensaje[:200]}...")  # Primeros 200 caracteres
-        
-        print()
+            print(f"  - {categoria}/{script.name}  {recursos}")
+    print()
     
-    return resultados
+    return ejecutar_en_paralelo(scripts_a_ejecutar, workers, corrida=corrida, saltear=saltear)
 
 
-def ejecutar_fase_actualizaciones() -> Dict:
+def ejecutar_fase_actualizaciones(corrida: Optional[historial.Corrida] = None,
+                                  saltear: Set[str] = None) -> Dict:
     """
     Ejecuta FASE 2: Todos los scripts de actualización.
-    Orden: primero todos los de 'direct', luego todos los de 'calculate'
+    Orden: primero todos los de 'direct', luego todos los de 'calculate'.
+    Los de `saltear` (--resume) cuentan como exitosos sin correr.
     
     Returns:
         Dict con 'exitosos' y 'fallidos'
@@ -481,10 +798,14 @@ def ejecutar_fase_actualizaciones() -> Dict:
     for i, (categoria, script_path) in enumerate(scripts_a_ejecutar, 1):
         nombre_script = script_path.name
         tipo = "DIRECT" if categoria == 'direct' else "CALCULATE"
+        if saltear and _clave(categoria, script_path) in saltear:
+            resultados['exitosos'].append(_resultado_salteado(categoria, script_path))
+            continue
         print(f"[{i}/{len(scripts_a_ejecutar)}] [{tipo}] Ejecutando: {nombre_script}")
         print("-" * 80)
         
-        exitoso, mensaje, tiempo, output = ejecutar_script(script_path, modo_automatico=True)
+        exitoso, mensaje, tiempo, output = ejecutar_script(script_path, modo_automatico=True,
+                                                           corrida=corrida, fase=categoria)
         
         if exitoso:
             resultados['exitosos'].append({
@@ -509,35 +830,329 @@ def ejecutar_fase_actualizaciones() -> Dict:
     return resultados
 
 
-def ejecutar_todas_actualizaciones() -> None:
+def leer_dependencias(ruta_script: Path) -> Optional[Tuple[List[str], List[str]]]:
     """
-    Ejecuta todas las actualizaciones automáticamente en dos fases.
-    Genera reporte en update_database.txt en la raíz del proyecto
+    Lee PRODUCE / CONSUME del script sin importarlo (no carga pandas ni abre la BD).
+    Cada entrada es un archivo relativo a update/ o al proyecto ('historicos/x.xlsx',
+    'data_raw/x.xlsx') o una serie 'serie:<id_variable>/<id_pais>'.
+    
+    Returns:
+        (produce, consume), o None si el script no declara dependencias
+    """
+    try:
+        arbol = ast.parse(ruta_script.read_text(encoding='utf-8'))
+    except (OSError, SyntaxError) as e:
+        print(f"[WARN] No se pudieron leer dependencias de {ruta_script.name}: {e}")
+        return None
+    
+    declarado = {}
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and len(nodo.targets) == 1 and isinstance(nodo.targets[0], ast.Name):
+            nombre = nodo.targets[0].id
+            if nombre in ('PRODUCE', 'CONSUME'):
+                try:
+                    declarado[nombre] = [str(x) for x in ast.literal_eval(nodo.value)]
+                except ValueError:
+                    print(f"[WARN] {ruta_script.name}: {nombre} no es una lista literal")
+    
+    if 'PRODUCE' not in declarado and 'CONSUME' not in declarado:
+        return None
+    return declarado.get('PRODUCE', []), declarado.get('CONSUME', [])
+
+
+def construir_dependencias(tareas: List[Tuple[str, Path]]) -> Dict[str, Set[str]]:
+    """
+    Arma el DAG: para cada script, las claves 'categoria/script' que producen lo que consume.
+    Un script sin PRODUCE/CONSUME conserva el orden por fases: un 'direct' espera a
+    todas las descargas y un 'calculate' a todas las descargas y todos los 'direct'.
+    Los insumos que nadie produce (archivos cargados a mano) se asumen disponibles.
+    """
+    declaraciones = {_clave(c, s): leer_dependencias(s) for c, s in tareas}
+    productores: Dict[str, Set[str]] = {}
+    for clave, decl in declaraciones.items():
+        if decl:
+            for item in decl[0]:
+                productores.setdefault(item, set()).add(clave)
+    
+    fases_previas = {'download': [], 'direct': ['download'], 'calculate': ['download', 'direct']}
+    dependencias: Dict[str, Set[str]] = {}
+    for categoria, script_path in tareas:
+        clave = _clave(categoria, script_path)
+        decl = declaraciones[clave]
+        if decl is None:
+            previas = fases_previas.get(categoria, [])
+            dependencias[clave] = {_clave(c, s) for c, s in tareas if c in previas}
+            if categoria != 'download':
+                print(f"[WARN] {clave} no declara PRODUCE/CONSUME: espera a las fases {previas}")
+        else:
+            dependencias[clave] = set()
+            for item in decl[1]:
+                dependencias[clave] |= productores.get(item, set()) - {clave}
+    
+    _verificar_sin_ciclos(dependencias)
+    return dependencias
+
+
+def _verificar_sin_ciclos(dependencias: Dict[str, Set[str]]) -> None:
+    """Orden topológico (Kahn); si sobran nodos hay un ciclo entre ellos."""
+    faltan = {clave: set(previos) for clave, previos in dependencias.items()}
+    listos = [clave for clave, previos in faltan.items() if not previos]
+    while listos:
+        hecho = listos.pop()
+        for clave, previos in faltan.items():
+            if hecho in previos:
+                previos.discard(hecho)
+                if not previos:
+                    listos.append(clave)
+    ciclo = sorted(clave for clave, previos in faltan.items() if previos)
+    if ciclo:
+        raise ValueError(f"Ciclo en PRODUCE/CONSUME entre: {', '.join(ciclo)}")
+
+
+def _buscar_tarea(nombre: str, tareas: List[Tuple[str, Path]]) -> str:
+    """Acepta 'categoria/script.py', 'script.py' o 'script'; devuelve la clave."""
+    candidatos = [
+        _clave(c, s) for c, s in tareas
+        if nombre in (_clave(c, s), s.name, s.stem, f"{c}/{s.stem}")
+    ]
+    if not candidatos:
+        raise ValueError(f"No existe el script '{nombre}'")
+    if len(candidatos) > 1:
+        raise ValueError(f"'{nombre}' es ambiguo: {', '.join(candidatos)}")
+    return candidatos[0]
+
+
+def seleccionar_tareas(tareas: List[Tuple[str, Path]], dependencias: Dict[str, Set[str]],
+                       solo: List[str] = None, downstream_de: List[str] = None) -> List[Tuple[str, Path]]:
+    """
+    Filtra `tareas` según --only (esos scripts, sin sus dependencias) y --downstream-of
+    (esos scripts y todo lo que depende de ellos, directa o indirectamente). Sin filtros
+    devuelve todas; con ambos, la unión.
+    """
+    if not solo and not downstream_de:
+        return tareas
+    
+    elegidas = {_buscar_tarea(n, tareas) for n in solo or []}
+    vistas = set()
+    pendientes = [_buscar_tarea(n, tareas) for n in downstream_de or []]
+    while pendientes:
+        clave = pendientes.pop()
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        elegidas.add(clave)
+        pendientes.extend(c for c, previos in dependencias.items() if clave in previos)
+    
+    return [(c, s) for c, s in tareas if _clave(c, s) in elegidas]
+
+
+def scripts_a_saltear(tareas: List[Tuple[str, Path]], dependencias: Dict[str, Set[str]],
+                      corrida: historial.Corrida) -> Set[str]:
+    """
+    Al reanudar: claves de los scripts que ya terminaron bien en `corrida` y no hace
+    falta repetir. Se repite un script si cambió su huella_insumos (código o archivos de
+    CONSUME) o si vuelve a correr alguno de los scripts de los que depende.
+    """
+    saltear = {
+        _clave(c, s) for c, s in tareas
+        if _clave(c, s) in corrida.hechos and corrida.hechos[_clave(c, s)] == huella_insumos(s)
+    }
+    cambio = True
+    while cambio:
+        cambio = False
+        for clave in list(saltear):
+            if dependencias.get(clave, set()) - saltear:
+                saltear.discard(clave)
+                cambio = True
+    return saltear
+
+
+def _todas_las_tareas() -> List[Tuple[str, Path]]:
+    """(categoria, script) de descargas, direct y calculate, en orden de descubrimiento."""
+    tareas = [('download', s) for s in descubrir_scripts_download()['download']]
+    por_fase = descubrir_scripts_update()
+    for categoria in ['direct', 'calculate']:
+        tareas.extend((categoria, s) for s in por_fase.get(categoria, []))
+    return tareas
+
+
+def ejecutar_dag(workers: int = None, solo: List[str] = None, downstream_de: List[str] = None,
+                 corrida: Optional[historial.Corrida] = None) -> Tuple[Dict, Dict]:
+    """
+    Ejecuta descargas, 'direct' y 'calculate' como un único DAG: cada script arranca
+    apenas terminaron los que producen lo que consume (PRODUCE/CONSUME en el script).
+    
+    Args:
+        workers: Scripts simultáneos de cualquier fase (default: DOWNLOAD_WORKERS); los
+            límites de _recursos_de (sitios, carpetas, MAX_NAVEGADORES) valen igual para todos
+        solo: --only, scripts a correr sin sus dependencias
+        downstream_de: --downstream-of, scripts a correr junto con todo lo que depende de ellos
+        corrida: Corrida del historial donde registrar cada script
+    
+    Returns:
+        (resultados de descargas, resultados de direct/calculate) para generar_reporte
     """
+    workers = max(1, workers or DOWNLOAD_WORKERS)
+    
     print("=" * 80)
-    print("ACTUALIZACIÓN AUTOMÁTICA DE BASE DE DATOS")
+    print("EJECUCIÓN POR DEPENDENCIAS (DAG)")
     print("=" * 80)
-    print(f"Fecha/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("Modo: AUTOMÁTICO (sin confirmaciones manuales)")
     print()
     
-    inicio_total = time.time()
+    tareas = _todas_las_tareas()
+    dependencias = construir_dependencias(tareas)
+    tareas = seleccionar_tareas(tareas, dependencias, solo, downstream_de)
+    claves = {_clave(c, s) for c, s in tareas}
+    # Las dependencias fuera de la selección se asumen ya hechas (sus archivos/series existen)
+    dependencias = {clave: previos & claves for clave, previos in dependencias.items() if clave in claves}
+    
+    if not tareas:
+        print("[WARN] No hay scripts para ejecutar.")
+        return {'exitosos': [], 'fallidos': []}, {'exitosos': [], 'fallidos': []}
     
-    # FASE 1: Descargar archivos
-    resultados_fase1 = ejecutar_fase_descargas()
+    saltear = scripts_a_saltear(tareas, dependencias, corrida) if corrida and corrida.hechos else set()
     
+    print(f"Scripts a ejecutar: {len(tareas) - len(saltear)} (workers: {workers})")
+    if saltear:
+        print(f"Reanudando corrida {corrida.run_id}: {len(saltear)} ya completados se saltean")
+    print("-" * 80)
+    for categoria, script_path in tareas:
+        clave = _clave(categoria, script_path)
+        previos = sorted(dependencias[clave])
+        marca = "  [ya completado]" if clave in saltear else ""
+        recursos = _recursos_de(categoria, script_path)
+        print(f"  - {clave}" + (f"  <- {', '.join(previos)}" if previos else "")
+              + (f"  {recursos}" if recursos else "") + marca)
     print()
+    
+    resultados = ejecutar_en_paralelo(tareas, workers, dependencias, corrida, saltear)
+    
+    fase1 = {k: [r for r in v if r['categoria'] == 'download'] for k, v in resultados.items()}
+    fase2 = {k: [r for r in v if r['categoria'] != 'download'] for k, v in resultados.items()}
+    return fase1, fase2
+
+
+def _terminar_hijos() -> None:
+    """Mata los scripts en curso con todo lo que lanzaron: SIGTERM y, 2s después, SIGKILL."""
+    grupos = list(_procesos) + inproceso.hijos_en_curso()
+    if not grupos:
+        return
+    if not hasattr(os, 'killpg'):  # Windows: sin grupos de procesos
+        for pid in grupos:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        return
+    for senal in (signal.SIGTERM, signal.SIGKILL):
+        for pid in grupos:
+            try:
+                os.killpg(pid, senal)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if senal == signal.SIGTERM:
+            time.sleep(2)
+
+
+def _al_cancelar(signum, frame) -> None:
+    """
+    SIGTERM (/api/update/cancel) o Ctrl-C. Mata los scripts en curso antes de cortar: si
+    siguieran escribiendo en la BD, un --resume podría pisarse con ellos. La corrida se
+    marca 'cancelado' fuera del handler (_cerrar_cancelada), sin ir a la BD desde acá.
+    """
+    global _senal_cancelacion
+    if _senal_cancelacion is not None:
+        return  # segunda señal mientras se cierra
+    _senal_cancelacion = signum
+    print("[WARN] Cancelando: terminando los scripts en curso...", flush=True)
+    _terminar_hijos()
+    raise _Cancelacion()
+
+
+def _cerrar_cancelada(corrida: historial.Corrida) -> None:
+    """Con los scripts ya terminados: la corrida queda 'cancelado' y se puede reanudar."""
+    corrida.finalizar([], estado='cancelado')
+    if corrida.activa:
+        print(f"[WARN] Corrida cancelada. Para continuar: "
+              f"python update/update_database.py --resume {corrida.run_id}", flush=True)
+    sys.exit(128 + _senal_cancelacion)
+
+
+def ejecutar_todas_actualizaciones(workers: int = None, solo: List[str] = None,
+                                   downstream_de: List[str] = None, por_fases: bool = False,
+                                   reanudar: str = None) -> None:
+    """
+    Ejecuta todas las actualizaciones automáticamente.
+    Por defecto como DAG (ejecutar_dag); con por_fases=True, en dos fases: todas las
+    descargas y después direct + calculate en secuencia.
+    Genera reporte en update_database.txt en la raíz del proyecto
+    
+    Args:
+        workers: Scripts simultáneos (default: DOWNLOAD_WORKERS)
+        solo: --only, scripts a correr sin sus dependencias
+        downstream_de: --downstream-of, scripts a correr junto con lo que depende de ellos
+        por_fases: Ejecución por fases en lugar del DAG
+        reanudar: --resume, run_id a continuar con su misma selección de scripts; se
+            saltean los ya completados cuyos insumos no cambiaron (scripts_a_saltear)
+    """
     print("=" * 80)
-    print("FASE 1 COMPLETADA")
+    print("ACTUALIZACIÓN AUTOMÁTICA DE BASE DE DATOS")
     print("=" * 80)
-    print(f"Exitosos: {len(resultados_fase1['exitosos'])}")
-    print(f"Fallidos: {len(resultados_fase1['fallidos'])}")
+    print(f"Fecha/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("Modo: AUTOMÁTICO (sin confirmaciones manuales)")
     print()
     
-    # FASE 2: Actualizar base de datos
-    resultados_fase2 = ejecutar_fase_actualizaciones()
+    inicio_total = time.time()
+    corrida = historial.Corrida('update_database', {
+        'workers': workers, 'solo': solo, 'downstream_de': downstream_de,
+        'por_fases': por_fases, 'inproceso': MODO_INPROCESO,
+    }, reanudar=reanudar)
+    if reanudar:
+        solo = corrida.opciones.get('solo')
+        downstream_de = corrida.opciones.get('downstream_de')
+        por_fases = corrida.opciones.get('por_fases', False)
+        if workers is None:
+            workers = corrida.opciones.get('workers')
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _al_cancelar)
+        signal.signal(signal.SIGINT, _al_cancelar)
+    
+    try:
+        if MODO_INPROCESO and inproceso.disponible():
+            print("[INFO] Modo en proceso: iniciando fork server...")
+            inproceso.calentar()
+            print(f"[OK] Fork server listo ({time.time() - inicio_total:.2f}s)")
+            print()
+        
+        if not por_fases:
+            resultados_fase1, resultados_fase2 = ejecutar_dag(workers, solo, downstream_de, corrida)
+        else:
+            saltear = set()
+            if corrida.hechos:
+                tareas = _todas_las_tareas()
+                saltear = scripts_a_saltear(tareas, construir_dependencias(tareas), corrida)
+            
+            # FASE 1: Descargar archivos
+            resultados_fase1 = ejecutar_fase_descargas(workers, corrida, saltear)
+            
+            print()
+            print("=" * 80)
+            print("FASE 1 COMPLETADA")
+            print("=" * 80)
+            print(f"Exitosos: {len(resultados_fase1['exitosos'])}")
+            print(f"Fallidos: {len(resultados_fase1['fallidos'])}")
+            print()
+            
+            # FASE 2: Actualizar base de datos
+            resultados_fase2 = ejecutar_fase_actualizaciones(corrida, saltear)
+    except _Cancelacion:
+        _cerrar_cancelada(corrida)
+    if _senal_cancelacion is not None:
+        # La señal cayó donde la excepción se tragó (ej. el except: de _ejecutar_script)
+        _cerrar_cancelada(corrida)
     
     tiempo_total = time.time() - inicio_total
+    corrida.finalizar([resultados_fase1, resultados_fase2])
     
     # Generar y guardar reporte
     reporte = generar_reporte(resultados_fase1, resultados_fase2, tiempo_total)
@@ -559,6 +1174,8 @@ def ejecutar_todas_actualizaciones() -> None:
     print(f"    Exitosos: {len(resultados_fase2['exitosos'])}")
     print(f"    Fallidos: {len(resultados_fase2['fallidos'])}")
     print(f"  Tiempo total: {tiempo_total:.2f}s ({tiempo_total/60:.2f} minutos)")
+    if corrida.activa:
+        print(f"  Historial: corrida {corrida.run_id}")
     print()
     
     # Mostrar errores en consola también
@@ -575,10 +1192,51 @@ def ejecutar_todas_actualizaciones() -> None:
                 print(f"    [ERROR] {res['categoria']}/{res['script']}")
         print()
         print(f"Ver detalles en: {REPORTE_FILE.absolute()}")
+        if corrida.activa:
+            print(f"Para reintentar solo lo pendiente: python update/update_database.py --resume {corrida.run_id}")
     
     # Siempre salir con 0 para no fallar el pipeline (cron/CI); el reporte lista los fallidos
     sys.exit(0)
 
 
 if __name__ == "__main__":
-    ejecutar_todas_actualizaciones()
+    parser = argparse.ArgumentParser(description="Actualización automática de la base de datos")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help=f"Scripts en paralelo (default: UPDATE_DOWNLOAD_WORKERS o {DOWNLOAD_WORKERS})",
+    )
+    parser.add_argument(
+        "--only", nargs="+", metavar="SCRIPT", default=None,
+        help="Correr solo estos scripts, sin sus dependencias (ej: 002_uyu_nxr_sintetico)",
+    )
+    parser.add_argument(
+        "--downstream-of", nargs="+", metavar="SCRIPT", default=None,
+        help="Correr estos scripts y todo lo que depende de ellos (ej: download/dolar_bevsa_uyu.py)",
+    )
+    parser.add_argument(
+        "--por-fases", action="store_true",
+        help="Ejecución anterior: todas las descargas y después direct + calculate en secuencia",
+    )
+    parser.add_argument(
+        "--inproceso", action="store_true",
+        help="Correr los scripts con main() en un fork server precargado (también UPDATE_INPROCESO=1)",
+    )
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", default=None,
+        help="Continuar una corrida del historial: saltea los scripts ya completados sin cambios en sus insumos",
+    )
+    args = parser.parse_args()
+    if args.inproceso:
+        MODO_INPROCESO = True
+    if args.por_fases and (args.only or args.downstream_of):
+        parser.error("--only/--downstream-of no se combinan con --por-fases")
+    if args.resume and (args.only or args.downstream_of or args.por_fases):
+        parser.error("--resume usa la selección de la corrida original (sin --only/--downstream-of/--por-fases)")
+    try:
+        ejecutar_todas_actualizaciones(
+            workers=args.workers, solo=args.only,
+            downstream_de=args.downstream_of, por_fases=args.por_fases,
+            reanudar=args.resume,
+        )
+    except ValueError as e:
+        parser.error(str(e))
@@ -22,6 +22,7 @@ if str(_repo_root) not in sys.path:
 
 # Reutilizar lógica de update_database
 from update.update_database import ejecutar_script, PROJECT_ROOT, TIMEOUT_SCRIPT
+from update.historial import Corrida
 
 REPORTE_FILE = PROJECT_ROOT / "update_tc.txt"
 
@@ -51,6 +52,7 @@ def main():
     resultados_fase1 = {'exitosos': [], 'fallidos': []}
     resultados_fase2 = {'exitosos': [], 'fallidos': []}
     inicio_total = time.time()
+    corrida = Corrida('update_tc')
 
     # FASE 1: Download
     print("=" * 80)
@@ -66,7 +68,8 @@ def main():
             print(f"[ERROR] No encontrado: {script_path.name}")
             continue
         print(f"Ejecutando: {script_path.name}")
-        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True)
+        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True,
+                                                      corrida=corrida, fase='download')
         if exitoso:
             resultados_fase1['exitosos'].append({'script': script_path.name, 'tiempo': tiempo})
             print(f"[OK] {script_path.name} ({tiempo:.2f}s)")
@@ -89,7 +92,8 @@ def main():
             print(f"[ERROR] No encontrado: {script_path.name}")
             continue
         print(f"Ejecutando: {script_path.name}")
-        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True)
+        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True,
+                                                      corrida=corrida, fase='direct')
         if exitoso:
             resultados_fase2['exitosos'].append({'script': script_path.name, 'tiempo': tiempo})
             print(f"[OK] {script_path.name} ({tiempo:.2f}s)")
@@ -112,7 +116,8 @@ def main():
             print(f"[ERROR] No encontrado: {script_path.name}")
             continue
         print(f"Ejecutando: {script_path.name}")
-        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True)
+        exitoso, mensaje, tiempo, _ = ejecutar_script(script_path, modo_automatico=True,
+                                                      corrida=corrida, fase='calculate')
         if exitoso:
             resultados_fase2['exitosos'].append({'script': script_path.name, 'tiempo': tiempo})
             print(f"[OK] {script_path.name} ({tiempo:.2f}s)")
@@ -122,6 +127,7 @@ def main():
         print()
 
     tiempo_total = time.time() - inicio_total
+    corrida.finalizar([resultados_fase1, resultados_fase2])
 
     # Generar reporte
     reporte = []